@@ -1,17 +1,23 @@
 #!/usr/bin/env python3
 """中英文简历项目统一构建工具。
 
-支持 zh/en 双语变体的 XeLaTeX -> BibTeX -> XeLaTeX x2 编译流程，
+支持 zh/en 双语变体的 XeLaTeX -> BibTeX -> XeLaTeX 编译流程（遍数按交叉引用状态的不动点决定，
+引用未变时跳过 BibTeX；构建清单记录全部输入，未变化时直接复用缓存 PDF），
 并提供基于 Pillow 的像素级 PDF 比较验收能力，用于简历版式回归检测。
 
+多个变体（``--variant all`` 或多次 ``--tex-file``）在独立的工作进程中并行构建：各变体的
+缓存目录本就互相隔离（``.latex-cache/<tex_stem>/``），输出按行加 ``[<tex_stem>]`` 前缀实时输出，
+单个变体失败不影响其他变体，结束时汇总各变体耗时。
+
 子命令：
-  build    渲染 PDF（支持 --variant all/zh/en）
+  build    渲染 PDF（支持 --variant all/zh/en，--tex-file 可重复指定，-j 控制并发数）
   clean    清理缓存与中间文件
   compare  与基线 PDF 做像素级比较
 """
 from __future__ import annotations
 
 import argparse
+import io
 import json
 import os
 import re
@@ -19,8 +25,18 @@ import shutil
 import subprocess
 import sys
 import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+from dataclasses import dataclass
 from pathlib import Path
 
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+from latex_build_driver import BibliographyStep, run_latex_passes
+
 # bensz-cv 公共包根目录（packages/bensz-cv）
 PACKAGE_DIR = Path(__file__).resolve().parents[1]
 # bensz-fonts 共享字体包根目录（packages/bensz-fonts），用于注入 TEXINPUTS
@@ -77,6 +93,40 @@ class BuildError(RuntimeError):
     pass
 
 
+@dataclass
+class VariantResult:
+    """单个变体（TeX 主文件）的构建结果。"""
+
+    tex_stem: str
+    seconds: float
+    pdf: Path | None = None
+    error: str = ""
+
+
+class PrefixedLineWriter(io.TextIOBase):
+    """按行给输出加前缀并立即写出，多个工作进程共享终端时各行保持完整、可区分。"""
+
+    def __init__(self, prefix: str, target):
+        self.prefix = prefix
+        self.target = target
+        self.pending = ""
+
+    def write(self, text: str) -> int:
+        self.pending += text
+        *lines, self.pending = self.pending.split("\n")
+        for line in lines:
+            self.target.write(f"{self.prefix}{line}\n")
+        if lines:
+            self.target.flush()
+        return len(text)
+
+    def flush(self) -> None:
+        if self.pending:
+            self.target.write(f"{self.prefix}{self.pending}\n")
+            self.pending = ""
+        self.target.flush()
+
+
 def configure_windows_stdio_utf8() -> None:
     """在 Windows 上将 stdout/stderr 编码切换为 UTF-8，避免中文乱码。"""
     if sys.platform != "win32":
@@ -230,16 +280,19 @@ def run_best_effort(
     )
 
 
-def build_single(project_dir: Path, tex_path: Path) -> Path:
+def build_single(project_dir: Path, tex_path: Path, force: bool = False) -> Path:
     """单语种完整构建流程。
 
-    编译链路：xelatex -> bibtex -> xelatex -> xelatex。
-    中间产物隔离到 .latex-cache/<tex_stem>/ 目录下，
+    编译链路：xelatex -> bibtex -> xelatex …，交叉引用状态达到不动点即停止；
+    引用集合与 ``references/`` 未变时跳过 bibtex。
+    中间产物隔离并保留在 .latex-cache/<tex_stem>/ 目录下（增量构建复用 aux 状态，
+    构建清单成立时跳过编译），
     最终 PDF 复制回项目根目录，并保留 SyncTeX 文件以支持编辑器跳转。
 
     Args:
         project_dir: CV 项目根目录。
         tex_path: TeX 主文件路径（需位于项目根目录下）。
+        force: 忽略构建清单，强制重新编译。
 
     Returns:
         生成的 PDF 文件路径。
@@ -249,8 +302,6 @@ def build_single(project_dir: Path, tex_path: Path) -> Path:
     """
     tex_stem = tex_path.stem
     cache_dir = project_dir / CACHE_DIRNAME / tex_stem
-    if cache_dir.exists():
-        shutil.rmtree(cache_dir)
     cache_dir.mkdir(parents=True, exist_ok=True)
 
     clean_root_artifacts(project_dir, tex_stem)
@@ -271,23 +322,34 @@ def build_single(project_dir: Path, tex_path: Path) -> Path:
         tex_path.name,
     ]
 
-    xelatex_run_1 = run_best_effort(xelatex_cmd, cwd=project_dir, env=tex_env)
-    sync_optional_tree(cache_dir, project_dir, "references")
-    normalize_bibtex_aux(cache_dir, tex_stem)
-    bib_run = run_best_effort([resolve_executable("bibtex"), tex_stem], cwd=cache_dir, env=tex_env)
-    xelatex_run_2 = run_best_effort(xelatex_cmd, cwd=project_dir, env=tex_env)
-    xelatex_run_3 = run_best_effort(xelatex_cmd, cwd=project_dir, env=tex_env)
+    def prepare_bibtex() -> None:
+        sync_optional_tree(cache_dir, project_dir, "references")
+        normalize_bibtex_aux(cache_dir, tex_stem)
+
+    report = run_latex_passes(
+        xelatex_cmd,
+        cwd=project_dir,
+        env=tex_env,
+        cache_dir=cache_dir,
+        tex_stem=tex_stem,
+        bibliography=BibliographyStep(
+            "bibtex",
+            [resolve_executable("bibtex"), tex_stem],
+            cwd=cache_dir,
+            inputs=[project_dir / "references"],
+            prepare=prepare_bibtex,
+        ),
+        runner=run_best_effort,
+        extra_inputs=[FONTS_PACKAGE_DIR / "fonts"] if FONTS_PACKAGE_DIR.exists() else None,
+        force=force,
+    )
 
     pdf_source = cache_dir / f"{tex_stem}.pdf"
     log_path = cache_dir / f"{tex_stem}.log"
-    if not pdf_source.exists() or bib_run.returncode != 0 or log_has_fatal_errors(log_path):
+    bib_failed = report.bib_result is not None and report.bib_result.returncode != 0
+    if not pdf_source.exists() or bib_failed or log_has_fatal_errors(log_path):
         compiler_logs = "\n\n".join(
-            [
-                summarize_process_output("xelatex pass 1", xelatex_run_1),
-                summarize_process_output("bibtex", bib_run),
-                summarize_process_output("xelatex pass 2", xelatex_run_2),
-                summarize_process_output("xelatex pass 3", xelatex_run_3),
-            ]
+            summarize_process_output(record.label, record.result) for record in report.passes
         )
         raise BuildError(f"PDF 渲染失败：{pdf_source}\n\n{compiler_logs}")
 
@@ -296,30 +358,95 @@ def build_single(project_dir: Path, tex_path: Path) -> Path:
     clean_root_artifacts(project_dir, tex_stem)
     print(f"✓ PDF generated: {output_pdf}")
     print(f"✓ Build cache: {cache_dir}")
+    print(f"✓ Compile passes: {report.describe()}")
     synctex_path = cache_dir / f"{tex_stem}.synctex.gz"
     if synctex_path.exists():
         print(f"✓ SyncTeX: {synctex_path}")
     return output_pdf
 
 
-def build_project(project_dir: Path, variant: str, tex_file: str | None) -> list[Path]:
+def build_variant(project_dir: Path, tex_path: Path, force: bool = False) -> VariantResult:
+    """构建单个变体并捕获异常（工作进程入口），输出逐行加 ``[<tex_stem>]`` 前缀。"""
+    writer = PrefixedLineWriter(f"[{tex_path.stem}] ", sys.stdout)
+    start = time.perf_counter()
+    try:
+        with redirect_stdout(writer):
+            pdf = build_single(project_dir, tex_path, force=force)
+    except Exception as exc:
+        return VariantResult(tex_path.stem, time.perf_counter() - start, error=f"{type(exc).__name__}: {exc}")
+    finally:
+        writer.flush()
+    return VariantResult(tex_path.stem, time.perf_counter() - start, pdf=pdf)
+
+
+def build_project(
+    project_dir: Path,
+    variant: str,
+    tex_file: str | list[str] | None,
+    force: bool = False,
+    jobs: int | None = None,
+) -> list[Path]:
     """项目级构建入口，支持 --variant all/zh/en。
 
-    - variant="all" 时依次构建 zh 和 en 两个变体；
-    - 指定 tex_file 时直接编译该文件，忽略 variant。
+    - variant="all" 时构建 zh 和 en 两个变体；
+    - 指定 tex_file（可为多个）时直接编译这些文件，忽略 variant；
+    - 多个文件在至多 jobs 个工作进程中并行构建，某个变体失败时其余变体照常完成，
+      最后汇总各变体耗时，再统一抛出失败。
 
     Args:
         project_dir: CV 项目根目录。
         variant: 语种变体（all/zh/en）。
-        tex_file: 显式指定的 TeX 主文件名，优先于 variant。
+        tex_file: 显式指定的 TeX 主文件名（或文件名列表），优先于 variant。
+        force: 忽略构建清单，强制重新编译。
+        jobs: 并发进程数，默认等于 CPU 核数；1 时在当前进程中依次构建。
 
     Returns:
         所有成功生成的 PDF 路径列表。
+
+    Raises:
+        BuildError: 任一变体构建失败（其余变体已构建完成）。
     """
     if tex_file is not None:
-        return [build_single(project_dir, resolve_tex_file(project_dir, tex_file, variant))]
-    variants = ["zh", "en"] if variant == "all" else [variant]
-    return [build_single(project_dir, resolve_tex_file(project_dir, None, name)) for name in variants]
+        tex_files = [tex_file] if isinstance(tex_file, str) else list(tex_file)
+        tex_paths = [resolve_tex_file(project_dir, name, variant) for name in tex_files]
+    else:
+        variants = ["zh", "en"] if variant == "all" else [variant]
+        tex_paths = [resolve_tex_file(project_dir, None, name) for name in variants]
+    tex_paths = list(dict.fromkeys(tex_paths))
+    if len(tex_paths) == 1:
+        return [build_single(project_dir, tex_paths[0], force=force)]
+
+    workers = min(jobs or os.cpu_count() or 1, len(tex_paths))
+    start = time.perf_counter()
+    results: dict[Path, VariantResult] = {}
+    if workers <= 1:
+        for tex_path in tex_paths:
+            results[tex_path] = build_variant(project_dir, tex_path, force)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(build_variant, project_dir, tex_path, force): tex_path for tex_path in tex_paths}
+            for future in as_completed(futures):
+                tex_path = futures[future]
+                try:
+                    results[tex_path] = future.result()
+                except Exception as exc:  # 工作进程异常退出
+                    results[tex_path] = VariantResult(tex_path.stem, 0.0, error=f"{type(exc).__name__}: {exc}")
+    wall_seconds = time.perf_counter() - start
+
+    ordered = [results[tex_path] for tex_path in tex_paths]
+    for result in ordered:
+        if result.error:
+            print(f"✗ {result.tex_stem}: {result.seconds:.1f}s ({result.error.splitlines()[0]})")
+        else:
+            print(f"✓ {result.tex_stem}: {result.seconds:.1f}s")
+    failed = [result for result in ordered if result.error]
+    print(
+        f"{'✗' if failed else '✓'} Variants: {len(ordered) - len(failed)} passed, {len(failed)} failed "
+        f"({workers} worker(s), wall {wall_seconds:.1f}s, sum {sum(result.seconds for result in ordered):.1f}s)"
+    )
+    if failed:
+        raise BuildError("\n\n".join(f"[{result.tex_stem}] {result.error}" for result in failed))
+    return [result.pdf for result in ordered if result.pdf is not None]
 
 
 def clean_project(project_dir: Path, variant: str, tex_file: str | None, remove_pdf: bool) -> None:
@@ -466,7 +593,14 @@ def parse_args() -> argparse.Namespace:
     build_parser = subparsers.add_parser("build", help="渲染 PDF")
     build_parser.add_argument("--project-dir", type=Path, default=None, help="项目目录。")
     build_parser.add_argument("--variant", choices=("zh", "en", "all"), default="all", help="构建语种。")
-    build_parser.add_argument("--tex-file", default=None, help="主 TeX 文件名，默认按 variant 推断。")
+    build_parser.add_argument(
+        "--tex-file",
+        action="append",
+        default=None,
+        help="主 TeX 文件名，可重复指定以并行构建多个文件；默认按 variant 推断。",
+    )
+    build_parser.add_argument("--force", action="store_true", help="忽略构建清单，强制重新编译。")
+    build_parser.add_argument("-j", "--jobs", type=int, default=None, help="并行构建的进程数，默认等于 CPU 核数。")
 
     clean_parser = subparsers.add_parser("clean", help="清理缓存与根目录中间文件")
     clean_parser.add_argument("--project-dir", type=Path, default=None, help="项目目录。")
@@ -494,7 +628,7 @@ def main() -> None:
     project_dir = resolve_project_dir(getattr(args, "project_dir", None))
 
     if args.command == "build":
-        build_project(project_dir, args.variant, args.tex_file)
+        build_project(project_dir, args.variant, args.tex_file, force=args.force, jobs=args.jobs)
         return
 
     if args.command == "clean":
@@ -0,0 +1,654 @@
+#!/usr/bin/env python3
+"""收敛驱动的 LaTeX 编译遍数调度器（各公共包构建工具共用）。
+
+``nsfc_project_tool`` / ``thesis_project_tool`` / ``cv_project_tool`` / ``manuscript_tool``
+原先固定执行 ``xelatex → bibtex/biber → xelatex → xelatex`` 四步。本模块改为按需调度：
+
+- 每遍 xelatex 之后对缓存目录中的交叉引用状态文件（``.aux/.toc/.lof/.lot/.out/.bbl`` 等）
+  计算内容哈希；某一遍读入的状态与它写出的状态一致即达到不动点，停止编译
+- 文献工具仅在引用集合（``.aux`` 中的 ``\\citation/\\bibdata/\\bibstyle``，或 biber 的 ``.bcf``）
+  或 ``.bib`` 等输入内容变化、``.bbl`` 缺失时运行；签名记录在 ``<tex_stem>.bibstamp``
+- 日志中出现 ``Rerun to get ...`` 等提示时视为未收敛，最多编译 ``max_passes`` 遍
+- 收敛且成功后写入构建清单 ``<tex_stem>.manifest.json``：记录 ``-recorder`` 生成的 ``.fls``
+  中 TeX 实际读取的每个文件、文献输入与额外监视路径的内容哈希，以及编译命令、TEXINPUTS
+  与工具版本；下次构建时清单仍然成立（先比对 size/mtime，不一致再比对内容哈希）则直接
+  复用缓存中的 PDF，不启动任何 TeX 进程
+- 可选的预编译导言区格式（:class:`PreambleFormat`）：以 ``xelatex -ini`` 把主文件开头的
+  ``\\documentclass`` 及紧随其后的 ``\\usepackage`` 转储为 ``preamble-format/<tex_stem>.fmt``，
+  之后每遍以 ``-fmt`` 载入，省去 ctex/xeCJK/fontspec 等宏包栈的加载；转储时读取的文件、
+  TEXINPUTS 与引擎记录在 ``<tex_stem>.format.json``，任一变化即重新转储
+
+保留 ``.latex-cache/`` 的增量构建中，未改动任何输入时 0 遍，未改动交叉引用的编辑
+只需 1 遍 xelatex，引用或页码变化时 2 遍。
+
+注意：规范版本位于仓库 ``scripts/latex_build_driver.py``，各公共包
+``packages/<pkg>/scripts/latex_build_driver.py`` 为同步副本（随包单独分发），
+修改后请运行 ``python scripts/sync_build_driver.py`` 同步。
+
+典型用法::
+
+    from latex_build_driver import BibliographyStep, run_latex_passes
+
+    report = run_latex_passes(
+        xelatex_cmd,
+        cwd=project_dir,
+        env=tex_env,
+        cache_dir=cache_dir,
+        tex_stem="main",
+        bibliography=BibliographyStep("bibtex", [bibtex_bin, "main"], cwd=cache_dir,
+                                      inputs=[project_dir / "references"]),
+    )
+    print(report.describe())
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+
+# 驱动版本，写入文献签名与构建清单；驱动逻辑变化时使旧签名/清单失效
+DRIVER_VERSION = "2"
+# 构建清单文件后缀（位于缓存目录，如 main.manifest.json）
+MANIFEST_SUFFIX = ".manifest.json"
+# 预编译导言区格式所在的缓存子目录
+FORMAT_DIRNAME = "preamble-format"
+# 交叉引用状态文件后缀：xelatex 读入并在本遍重写的文件，内容不变即达到不动点
+AUX_STATE_SUFFIXES = (".aux", ".toc", ".lof", ".lot", ".lol", ".out", ".bbl", ".nav", ".snm", ".thm")
+# 收集状态文件时跳过的缓存子目录（由构建工具同步进来的项目输入）
+STATE_IGNORED_DIRS = {"references", "bibtex-style", FORMAT_DIRNAME}
+# 日志中的“需要重新编译”提示（宏包把状态存放在未纳入哈希的文件时的兜底判断）
+RERUN_PATTERN = re.compile(r"Rerun to get|Please rerun LaTeX|Rerun LaTeX|\(rerunfilecheck\).*Rerun")
+# bibtex 读取的 .aux 行：引用集合、数据库与样式
+BIBTEX_AUX_PATTERN = re.compile(r"^\\(?:citation|bibdata|bibstyle)\{.*$", re.MULTILINE)
+# 未收敛时的最大 xelatex 遍数（与 latexmk 默认值一致）
+DEFAULT_MAX_PASSES = 5
+# 可转储的导言区语句：单独成行的 \documentclass，以及紧随其后的单行 \usepackage / \RequirePackage
+PREAMBLE_CLASS_PATTERN = re.compile(r"\s*\\documentclass\s*(?:\[[^\]]*\])?\s*\{[^{}]+\}")
+PREAMBLE_PACKAGE_PATTERN = re.compile(
+    r"\s*\\(?:usepackage|RequirePackage)\s*(?:\[[^\]]*\])?\s*\{[^{}]+\}(?:\s*\[[^\]]*\])?"
+)
+
+Runner = Callable[..., "subprocess.CompletedProcess[str]"]
+
+
+@dataclass
+class BibliographyStep:
+    """文献处理步骤（bibtex 或 biber）。
+
+    Attributes:
+        label: 工具名（``bibtex`` / ``biber``），决定引用集合的来源（``.aux`` / ``.bcf``）。
+        command: 完整命令行。
+        cwd: 运行目录。
+        inputs: 影响 ``.bbl`` 的输入文件或目录（如 ``references/``、``.bst`` 所在目录），按内容哈希。
+        prepare: 运行前的准备动作（同步 ``references/``、规范化 ``.aux`` 等），跳过时不执行。
+    """
+
+    label: str
+    command: list[str]
+    cwd: Path
+    inputs: list[Path] = field(default_factory=list)
+    prepare: Optional[Callable[[], None]] = None
+
+
+@dataclass
+class PreambleFormat:
+    """预编译导言区格式（项目专用 ``.fmt``）。
+
+    XeTeX 无法把 OpenType 字体转储进格式文件，因此只转储主文件开头的 ``\\documentclass``
+    及紧随其后的单行 ``\\usepackage``；其余导言区（含字体设置）在每遍编译时照常执行。
+    某条语句加载了字体导致转储失败时逐条缩短前缀，全部失败则记为不可用并照常编译。
+
+    Attributes:
+        source: 主 ``.tex`` 文件。
+        inputs: 额外监视的文件或目录（如公共包的 ``.sty``），转储失败后它们变化时重试。
+    """
+
+    source: Path
+    inputs: list[Path] = field(default_factory=list)
+
+
+@dataclass
+class PassRecord:
+    """一次工具调用的记录。"""
+
+    label: str
+    result: subprocess.CompletedProcess[str]
+    seconds: float
+
+
+@dataclass
+class BuildReport:
+    """一次编译调度的结果。"""
+
+    passes: list[PassRecord] = field(default_factory=list)
+    latex_runs: int = 0
+    converged: bool = False
+    bib_label: str | None = None
+    bib_status: str = "none"  # none | ran | skipped
+    bib_result: subprocess.CompletedProcess[str] | None = None
+    up_to_date: bool = False  # 构建清单成立，未运行任何工具
+    format_status: str = "none"  # none | reused | dumped | unavailable
+    format_passes: list[PassRecord] = field(default_factory=list)
+
+    @property
+    def seconds(self) -> float:
+        return sum(record.seconds for record in [*self.format_passes, *self.passes])
+
+    def describe(self) -> str:
+        """单行摘要，如 ``xelatex x2 (converged), bibtex skipped (citations and inputs unchanged)``。"""
+        if self.up_to_date:
+            return "up to date (build manifest unchanged)"
+        parts = [f"xelatex x{self.latex_runs} ({'converged' if self.converged else 'max passes reached'})"]
+        if self.bib_status == "ran":
+            parts.append(f"{self.bib_label} ran")
+        elif self.bib_status == "skipped":
+            parts.append(f"{self.bib_label} skipped (citations and inputs unchanged)")
+        if self.format_status != "none":
+            parts.append(f"preamble format {self.format_status}")
+        return ", ".join(parts) + f", {self.seconds:.1f}s"
+
+
+def run_best_effort(
+    args: list[str],
+    *,
+    cwd: Path,
+    env: dict[str, str],
+) -> subprocess.CompletedProcess[str]:
+    """执行子进程并捕获输出，不检查返回码。"""
+    return subprocess.run(
+        args,
+        cwd=cwd,
+        env=env,
+        text=True,
+        capture_output=True,
+        check=False,
+    )
+
+
+def _file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _iter_state_files(cache_dir: Path):
+    if not cache_dir.exists():
+        return
+    for path in cache_dir.rglob("*"):
+        relative = path.relative_to(cache_dir)
+        if relative.parts[0] in STATE_IGNORED_DIRS:
+            continue
+        if path.suffix in AUX_STATE_SUFFIXES and path.is_file():
+            yield relative.as_posix(), path
+
+
+def snapshot_aux_state(cache_dir: Path) -> dict[str, str]:
+    """缓存目录中交叉引用状态文件的内容哈希（相对路径 → sha256）。"""
+    return {name: _file_digest(path) for name, path in _iter_state_files(cache_dir)}
+
+
+def _inputs_digest(inputs: list[Path]) -> str:
+    """输入文件/目录的内容哈希（目录按相对路径排序递归）。"""
+    h = hashlib.sha256()
+    for root in inputs:
+        root = Path(root)
+        h.update(str(root).encode("utf-8") + b"\0")
+        if root.is_file():
+            h.update(_file_digest(root).encode("ascii"))
+        elif root.is_dir():
+            for path in sorted(p for p in root.rglob("*") if p.is_file()):
+                h.update(path.relative_to(root).as_posix().encode("utf-8") + b"\0")
+                h.update(_file_digest(path).encode("ascii"))
+        else:
+            h.update(b"<missing>")
+    return h.hexdigest()
+
+
+def bibliography_signature(cache_dir: Path, tex_stem: str, step: BibliographyStep) -> str | None:
+    """文献处理的输入签名；引用控制文件尚未生成时返回 None（必须运行）。"""
+    h = hashlib.sha256()
+    h.update(f"{DRIVER_VERSION}\0{' '.join(step.command)}\0".encode("utf-8"))
+    if step.label == "biber":
+        control = cache_dir / f"{tex_stem}.bcf"
+        if not control.exists():
+            return None
+        h.update(_file_digest(control).encode("ascii"))
+    else:
+        aux_files = sorted(cache_dir.rglob("*.aux"))
+        if not (cache_dir / f"{tex_stem}.aux").exists():
+            return None
+        for aux in aux_files:
+            if aux.relative_to(cache_dir).parts[0] in STATE_IGNORED_DIRS:
+                continue
+            lines = BIBTEX_AUX_PATTERN.findall(aux.read_text(encoding="utf-8", errors="ignore"))
+            # 规范化 \bibstyle{xxx.bst}，与 normalize_bibtex_aux 前后一致
+            h.update("\n".join(line.replace(".bst}", "}") for line in lines).encode("utf-8"))
+    h.update(_inputs_digest(step.inputs).encode("ascii"))
+    return h.hexdigest()
+
+
+def _log_requests_rerun(cache_dir: Path, tex_stem: str) -> bool:
+    log_path = cache_dir / f"{tex_stem}.log"
+    if not log_path.exists():
+        return False
+    return bool(RERUN_PATTERN.search(log_path.read_text(encoding="utf-8", errors="ignore")))
+
+
+def _stat_key(path: Path) -> list[int]:
+    st = path.stat()
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _fingerprint(path: Path) -> list:
+    """文件指纹：[size, mtime_ns, sha256]。"""
+    return [*_stat_key(path), _file_digest(path)]
+
+
+def _matches(path: Path, fingerprint: list) -> tuple[bool, bool]:
+    """比对文件与指纹，返回 (内容一致, 需要刷新 size/mtime)。size/mtime 相同时不读取内容。"""
+    try:
+        key = _stat_key(path)
+    except OSError:
+        return False, False
+    if key == fingerprint[:2]:
+        return True, False
+    if key[0] != fingerprint[0]:
+        return False, False
+    return _file_digest(path) == fingerprint[2], True
+
+
+def parse_fls_inputs(fls_path: Path) -> list[Path]:
+    """解析 ``-recorder`` 生成的 ``.fls``：TeX 读取过、且不是本次编译自身产物的文件。"""
+    pwd = fls_path.parent
+    inputs: dict[Path, None] = {}
+    outputs: set[Path] = set()
+    for line in fls_path.read_text(encoding="utf-8", errors="surrogateescape").splitlines():
+        kind, _, value = line.partition(" ")
+        if kind == "PWD":
+            pwd = Path(value)
+            continue
+        if kind not in ("INPUT", "OUTPUT") or not value:
+            continue
+        path = Path(os.path.normpath(pwd / value))
+        if kind == "OUTPUT":
+            outputs.add(path)
+        else:
+            inputs.setdefault(path)
+    return [path for path in inputs if path not in outputs and path.is_file()]
+
+
+def _expand_paths(paths: list[Path]) -> list[Path]:
+    files: list[Path] = []
+    for root in paths:
+        root = Path(root)
+        if root.is_file():
+            files.append(root.resolve())
+        elif root.is_dir():
+            files.extend(sorted(p.resolve() for p in root.rglob("*") if p.is_file()))
+    return files
+
+
+def _tool_identity(command: list[str]) -> dict[str, object]:
+    """工具身份：可执行文件真实路径及其 size/mtime（升级 TeX 发行版后随之变化）。"""
+    executable = shutil.which(command[0]) or command[0]
+    real = Path(executable).resolve()
+    try:
+        return {"path": str(real), "stat": _stat_key(real)}
+    except OSError:
+        return {"path": str(real), "stat": None}
+
+
+def _tool_version(command: list[str]) -> str:
+    try:
+        result = subprocess.run([command[0], "--version"], capture_output=True, text=True, timeout=10, check=False)
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    lines = (result.stdout or "").strip().splitlines()
+    return lines[0] if lines else ""
+
+
+def _manifest_header(
+    latex_cmd: list[str],
+    env: dict[str, str],
+    bibliography: BibliographyStep | None,
+) -> dict[str, object]:
+    commands = [latex_cmd] + ([bibliography.command] if bibliography else [])
+    return {
+        "driver_version": DRIVER_VERSION,
+        "command": list(latex_cmd),
+        "bibliography": list(bibliography.command) if bibliography else None,
+        "texinputs": env.get("TEXINPUTS", ""),
+        "tools": [_tool_identity(cmd) for cmd in commands],
+    }
+
+
+def manifest_path(cache_dir: Path, tex_stem: str) -> Path:
+    return cache_dir / f"{tex_stem}{MANIFEST_SUFFIX}"
+
+
+def check_manifest(
+    cache_dir: Path,
+    tex_stem: str,
+    latex_cmd: list[str],
+    env: dict[str, str],
+    bibliography: BibliographyStep | None = None,
+    extra_inputs: list[Path] | None = None,
+) -> bool:
+    """构建清单是否仍然成立（命令、TEXINPUTS、工具、全部输入与缓存 PDF 均未变化）。"""
+    path = manifest_path(cache_dir, tex_stem)
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return False
+    header = _manifest_header(latex_cmd, env, bibliography)
+    if any(manifest.get(key) != value for key, value in header.items()):
+        return False
+    watched = [str(p) for p in _expand_paths([*(bibliography.inputs if bibliography else []), *(extra_inputs or [])])]
+    if manifest.get("watched") != watched:
+        return False
+
+    entries = dict(manifest.get("inputs") or {})
+    entries[str(cache_dir / f"{tex_stem}.pdf")] = manifest.get("pdf")
+    same, refreshed = _entries_unchanged(entries)
+    if same and refreshed:
+        # 内容未变但 size/mtime 变了（如重新检出），刷新指纹以便下次只比对 stat
+        _write_json(path, manifest)
+    return same
+
+
+def _entries_unchanged(entries: dict[str, list]) -> tuple[bool, bool]:
+    """逐个比对 ``{路径: 指纹}``，返回 (全部一致, 有指纹被刷新)；刷新时原地更新 size/mtime。"""
+    refreshed = False
+    for name, fingerprint in entries.items():
+        if not fingerprint:
+            return False, False
+        same, refresh = _matches(Path(name), fingerprint)
+        if not same:
+            return False, False
+        if refresh:
+            fingerprint[:2] = _stat_key(Path(name))
+            refreshed = True
+    return True, refreshed
+
+
+def _write_json(path: Path, data: dict[str, object]) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def write_manifest(
+    cache_dir: Path,
+    tex_stem: str,
+    latex_cmd: list[str],
+    env: dict[str, str],
+    bibliography: BibliographyStep | None = None,
+    extra_inputs: list[Path] | None = None,
+) -> bool:
+    """根据 ``.fls`` 记录构建清单；缺少 ``.fls``（未使用 ``-recorder``）或 PDF 时不写入。"""
+    fls_path = cache_dir / f"{tex_stem}.fls"
+    pdf_path = cache_dir / f"{tex_stem}.pdf"
+    if not fls_path.exists() or not pdf_path.exists():
+        return False
+    watched = _expand_paths([*(bibliography.inputs if bibliography else []), *(extra_inputs or [])])
+    inputs: dict[str, list] = {}
+    for file_path in [*parse_fls_inputs(fls_path), *watched]:
+        inputs.setdefault(str(file_path), _fingerprint(file_path))
+    commands = [latex_cmd] + ([bibliography.command] if bibliography else [])
+    manifest = {
+        **_manifest_header(latex_cmd, env, bibliography),
+        "versions": [_tool_version(cmd) for cmd in commands],
+        "watched": [str(p) for p in watched],
+        "inputs": inputs,
+        "pdf": _fingerprint(pdf_path),
+    }
+    _write_json(manifest_path(cache_dir, tex_stem), manifest)
+    return True
+
+
+def preamble_prefix(source: Path) -> list[str]:
+    """主文件开头可转储的导言区语句：``\\documentclass`` 及紧随其后的单行 ``\\usepackage``。
+
+    跳过空行与注释行，遇到其他内容（``\\input``、宏定义、同一行的多条语句等）即停止；
+    第一条有效语句不是 ``\\documentclass`` 时返回空列表。
+    """
+    statements: list[str] = []
+    for line in source.read_text(encoding="utf-8", errors="ignore").splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("%"):
+            continue
+        match = (PREAMBLE_PACKAGE_PATTERN if statements else PREAMBLE_CLASS_PATTERN).match(line)
+        if match is None or line[match.end():].strip()[:1] not in ("", "%"):
+            break
+        statements.append(match.group(0).strip())
+    return statements
+
+
+def _format_source(statements: list[str]) -> str:
+    """转储源：载入导言区前缀，把 ``\\documentclass`` 改为空操作（运行时跳过主文件中的同一行），然后转储。"""
+    return "\n".join(
+        [
+            "% 由 latex_build_driver 生成的预编译导言区转储源，请勿手动修改",
+            *statements,
+            "\\makeatletter",
+            "\\renewcommand*\\documentclass[2][]{}",
+            "\\makeatother",
+            "\\dump",
+            "",
+        ]
+    )
+
+
+def _format_header(latex_cmd: list[str], env: dict[str, str], statements: list[str]) -> dict[str, object]:
+    return {
+        "driver_version": DRIVER_VERSION,
+        "engine": _tool_identity(latex_cmd),
+        "texinputs": env.get("TEXINPUTS", ""),
+        "preamble": statements,
+    }
+
+
+def prepare_preamble_format(
+    spec: PreambleFormat,
+    latex_cmd: list[str],
+    *,
+    cwd: Path,
+    env: dict[str, str],
+    cache_dir: Path,
+    tex_stem: str,
+    runner: Runner | None = None,
+    force: bool = False,
+) -> tuple[Path | None, str, list[PassRecord]]:
+    """复用或重新转储预编译导言区格式。
+
+    记录 ``<tex_stem>.format.json`` 中的导言区前缀、引擎、TEXINPUTS 与转储时读取的全部文件
+    （``-recorder``）均未变化时直接复用；否则清空 ``preamble-format/`` 后从完整前缀开始转储，
+    失败则逐条缩短。转储全部失败同样记录下来，输入变化前不再重试。
+
+    Returns:
+        (格式文件路径或 None, 状态 reused | dumped | unavailable, 转储调用记录)
+    """
+    run = runner or run_best_effort
+    statements = preamble_prefix(spec.source) if spec.source.exists() else []
+    if not statements:
+        return None, "unavailable", []
+    fmt_dir = cache_dir / FORMAT_DIRNAME
+    stamp_path = fmt_dir / f"{tex_stem}.format.json"
+    fmt_path = fmt_dir / f"{tex_stem}.fmt"
+    header = _format_header(latex_cmd, env, statements)
+    watched = _expand_paths(spec.inputs)
+
+    if not force:
+        try:
+            stamp = json.loads(stamp_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            stamp = {}
+        if stamp and all(stamp.get(key) == value for key, value in header.items()):
+            entries = dict(stamp.get("inputs") or {})
+            if stamp.get("status") == "ok":
+                entries[str(fmt_path)] = stamp.get("fmt")
+            same, refreshed = _entries_unchanged(entries)
+            if same and stamp.get("watched") == [str(p) for p in watched]:
+                if refreshed:
+                    _write_json(stamp_path, stamp)
+                if stamp.get("status") == "ok":
+                    return fmt_path, "reused", []
+                return None, "unavailable", []
+
+    shutil.rmtree(fmt_dir, ignore_errors=True)
+    fmt_dir.mkdir(parents=True, exist_ok=True)
+    source_path = fmt_dir / f"{tex_stem}-preamble.tex"
+    inputs = {str(path): _fingerprint(path) for path in watched}
+    records: list[PassRecord] = []
+    stamp = {**header, "status": "failed", "watched": [str(p) for p in watched]}
+    for count in range(len(statements), 0, -1):
+        source_path.write_text(_format_source(statements[:count]), encoding="utf-8")
+        dump_cmd = [
+            latex_cmd[0],
+            "-ini",
+            "-interaction=nonstopmode",
+            "-halt-on-error",
+            "-recorder",
+            f"-jobname={tex_stem}",
+            f"-output-directory={fmt_dir}",
+            f"&{Path(latex_cmd[0]).stem}",
+            str(source_path),
+        ]
+        start = time.perf_counter()
+        result = run(dump_cmd, cwd=cwd, env=env)
+        records.append(
+            PassRecord(f"format dump ({count}/{len(statements)} preamble lines)", result, time.perf_counter() - start)
+        )
+        fls_path = fmt_dir / f"{tex_stem}.fls"
+        if fls_path.exists():
+            for path in parse_fls_inputs(fls_path):
+                if path != source_path:
+                    inputs.setdefault(str(path), _fingerprint(path))
+        if result.returncode == 0 and fmt_path.exists():
+            stamp.update(status="ok", dumped=count, fmt=_fingerprint(fmt_path))
+            break
+    stamp["inputs"] = inputs
+    _write_json(stamp_path, stamp)
+    if stamp["status"] == "ok":
+        return fmt_path, "dumped", records
+    fmt_path.unlink(missing_ok=True)
+    return None, "unavailable", records
+
+
+def run_latex_passes(
+    latex_cmd: list[str],
+    *,
+    cwd: Path,
+    env: dict[str, str],
+    cache_dir: Path,
+    tex_stem: str,
+    bibliography: BibliographyStep | None = None,
+    max_passes: int = DEFAULT_MAX_PASSES,
+    runner: Runner | None = None,
+    extra_inputs: list[Path] | None = None,
+    force: bool = False,
+    preamble_format: PreambleFormat | None = None,
+) -> BuildReport:
+    """按不动点调度 xelatex 遍数，并按需运行文献工具。
+
+    流程：
+    0. 指定 preamble_format 时先复用或转储预编译格式，可用则各遍以 ``-fmt`` 载入；
+       构建清单仍然成立且未指定 force 时直接返回（``report.up_to_date``）
+    1. 记录编译前的状态文件哈希（增量构建时即上次构建的结果），运行第 1 遍
+    2. 文献签名与 ``<tex_stem>.bibstamp`` 不一致（或 ``.bbl`` 缺失）时运行文献工具
+    3. 若当前状态与最后一遍读入的状态不同（或日志要求重跑），再编译一遍，直到不动点或 ``max_passes``
+    4. 收敛且最后一遍、文献工具均成功时写入构建清单，否则删除旧清单
+
+    Args:
+        latex_cmd: xelatex 命令行（须使用 ``-output-directory`` 指向 cache_dir）。
+        cwd: xelatex 运行目录（项目根目录）。
+        env: 子进程环境变量（含 TEXINPUTS）。
+        cache_dir: 中间文件目录。
+        tex_stem: 主文件名（不含扩展名）。
+        bibliography: 文献处理步骤；None 表示项目不使用参考文献。
+        max_passes: xelatex 最大遍数。
+        runner: 子进程执行函数（签名同 :func:`run_best_effort`），便于构建工具复用自身实现。
+        extra_inputs: 额外监视的文件或目录（如字体目录，XeTeX 经 fontconfig 加载的字体不会记录在 ``.fls``）。
+        force: 忽略构建清单（及预编译格式记录），强制编译。
+        preamble_format: 预编译导言区格式；None 表示不使用。
+
+    Returns:
+        BuildReport：各步骤的输出、耗时与收敛情况。
+    """
+    run = runner or run_best_effort
+    report = BuildReport(bib_label=bibliography.label if bibliography else None)
+    if preamble_format is not None:
+        fmt_path, report.format_status, report.format_passes = prepare_preamble_format(
+            preamble_format,
+            latex_cmd,
+            cwd=cwd,
+            env=env,
+            cache_dir=cache_dir,
+            tex_stem=tex_stem,
+            runner=run,
+            force=force,
+        )
+        if fmt_path is not None:
+            latex_cmd = [latex_cmd[0], f"-fmt={fmt_path.with_suffix('')}", *latex_cmd[1:]]
+            extra_inputs = [*(extra_inputs or []), fmt_path]
+    if not force and check_manifest(cache_dir, tex_stem, latex_cmd, env, bibliography, extra_inputs):
+        report.up_to_date = report.converged = True
+        return report
+    manifest_path(cache_dir, tex_stem).unlink(missing_ok=True)
+
+    def latex_pass() -> dict[str, str]:
+        start = time.perf_counter()
+        result = run(latex_cmd, cwd=cwd, env=env)
+        report.latex_runs += 1
+        report.passes.append(PassRecord(f"xelatex pass {report.latex_runs}", result, time.perf_counter() - start))
+        return snapshot_aux_state(cache_dir)
+
+    consumed = snapshot_aux_state(cache_dir)
+    state = latex_pass()
+
+    if bibliography is not None:
+        stamp_path = cache_dir / f"{tex_stem}.bibstamp"
+        signature = bibliography_signature(cache_dir, tex_stem, bibliography)
+        previous = stamp_path.read_text(encoding="utf-8").strip() if stamp_path.exists() else None
+        bbl_exists = (cache_dir / f"{tex_stem}.bbl").exists()
+        if signature is not None and signature == previous and bbl_exists:
+            report.bib_status = "skipped"
+        else:
+            if bibliography.prepare is not None:
+                bibliography.prepare()
+            start = time.perf_counter()
+            result = run(bibliography.command, cwd=bibliography.cwd, env=env)
+            report.passes.append(PassRecord(bibliography.label, result, time.perf_counter() - start))
+            report.bib_status = "ran"
+            report.bib_result = result
+            if result.returncode == 0 and signature is not None:
+                stamp_path.write_text(signature + "\n", encoding="utf-8")
+            else:
+                stamp_path.unlink(missing_ok=True)
+            # 只更新 .bbl 的哈希：prepare 对 .aux 的规范化不影响排版，不应触发额外一遍
+            for name, path in _iter_state_files(cache_dir):
+                if path.suffix == ".bbl":
+                    state[name] = _file_digest(path)
+
+    while True:
+        if state == consumed and not _log_requests_rerun(cache_dir, tex_stem):
+            report.converged = True
+            break
+        if report.latex_runs >= max_passes:
+            break
+        consumed = state
+        state = latex_pass()
+
+    bib_failed = report.bib_result is not None and report.bib_result.returncode != 0
+    if report.converged and report.passes[-1].result.returncode == 0 and not bib_failed:
+        write_manifest(cache_dir, tex_stem, latex_cmd, env, bibliography, extra_inputs)
+    return report
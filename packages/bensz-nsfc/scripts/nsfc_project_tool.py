@@ -2,7 +2,10 @@
 """NSFC 项目统一 TeX→PDF 渲染工具。
 
 提供 NSFC 标书项目的 PDF 构建、缓存清理与辅助功能。
-编译链路为 ``xelatex → bibtex → xelatex → xelatex``（四遍编译，确保交叉引用与参考文献完全解析）。
+编译链路为 ``xelatex → bibtex → xelatex …``，由 ``latex_build_driver`` 按交叉引用状态的不动点决定
+xelatex 遍数，引用集合与 ``.bib`` 未变时跳过 bibtex（增量构建通常只需 1–2 遍）；
+``.latex-cache/main.manifest.json`` 记录本次编译实际读取的全部输入，未变化时直接复用缓存 PDF；
+``\\documentclass{ctexart}`` 预编译为 ``.latex-cache/preamble-format/main.fmt``，各遍编译不再重复加载 ctex 宏包栈。
 中间文件隔离到项目内 ``.latex-cache/`` 目录，保持项目根目录整洁。
 
 核心特性：
@@ -11,7 +14,7 @@
 - 自动清理项目根目录的 LaTeX 中间产物
 
 子命令：
-  build    渲染 PDF（自动执行完整编译链路）
+  build    渲染 PDF（自动执行完整编译链路；输入未变时复用缓存，``--force`` 强制重编）
   clean    清理缓存与中间文件
 
 典型用法::
@@ -28,6 +31,12 @@ import subprocess
 import sys
 from pathlib import Path
 
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+from latex_build_driver import BibliographyStep, PreambleFormat, run_latex_passes
+
 # bensz-nsfc 公共包根目录（packages/bensz-nsfc）
 PACKAGE_DIR = Path(__file__).resolve().parents[1]
 # bensz-fonts 共享字体包根目录（packages/bensz-fonts），用于注入 TEXINPUTS
@@ -151,7 +160,8 @@ def build_texinputs(prefixes: list[Path], existing: str) -> str:
 def write_runtime_file(cache_dir: Path) -> Path:
     """在缓存目录生成 ``bensz-nsfc-runtime.def``，写入包根目录、资源目录、字体目录与 BibTeX 样式的绝对路径。
 
-    该文件在每次构建前重新生成，确保 LaTeX 编译时能正确定位包内资源。
+    该文件在每次构建前重新生成，确保 LaTeX 编译时能正确定位包内资源；
+    内容未变时不重写，避免 mtime 变化让构建清单退回内容比对。
     """
     runtime_path = cache_dir / "bensz-nsfc-runtime.def"
     package_root = PACKAGE_DIR.resolve().as_posix() + "/"
@@ -161,19 +171,18 @@ def write_runtime_file(cache_dir: Path) -> Path:
     else:
         assets_fonts_dir = assets_dir + "fonts/"
     asset_bib_style_base = assets_dir + "bibtex-style/gbt7714-nsfc"
-    runtime_path.write_text(
-        "\n".join(
-            [
-                "% Auto-generated by packages/bensz-nsfc/scripts/nsfc_project_tool.py. Do not edit manually.",
-                f"\\renewcommand{{\\NSFCPackageRootDir}}{{{package_root}}}",
-                f"\\renewcommand{{\\NSFCAssetsDir}}{{{assets_dir}}}",
-                f"\\renewcommand{{\\NSFCAssetFontsDir}}{{{assets_fonts_dir}}}",
-                f"\\renewcommand{{\\NSFCAssetBibStyleBase}}{{{asset_bib_style_base}}}",
-                "",
-            ]
-        ),
-        encoding="utf-8",
+    content = "\n".join(
+        [
+            "% Auto-generated by packages/bensz-nsfc/scripts/nsfc_project_tool.py. Do not edit manually.",
+            f"\\renewcommand{{\\NSFCPackageRootDir}}{{{package_root}}}",
+            f"\\renewcommand{{\\NSFCAssetsDir}}{{{assets_dir}}}",
+            f"\\renewcommand{{\\NSFCAssetFontsDir}}{{{assets_fonts_dir}}}",
+            f"\\renewcommand{{\\NSFCAssetBibStyleBase}}{{{asset_bib_style_base}}}",
+            "",
+        ]
     )
+    if not runtime_path.exists() or runtime_path.read_text(encoding="utf-8") != content:
+        runtime_path.write_text(content, encoding="utf-8")
     return runtime_path
 
 
@@ -227,7 +236,7 @@ def run_best_effort(
     )
 
 
-def build_project(project_dir: Path, tex_file: str) -> None:
+def build_project(project_dir: Path, tex_file: str, force: bool = False, preamble_format: bool = True) -> None:
     """执行完整的 NSFC 项目 PDF 构建流程。
 
     构建步骤：
@@ -235,13 +244,17 @@ def build_project(project_dir: Path, tex_file: str) -> None:
     2. 生成运行时路径文件 ``bensz-nsfc-runtime.def``
     3. 同步 ``references/`` 目录到缓存
     4. 清理根目录旧中间文件
-    5. 执行四遍编译：``xelatex → bibtex → xelatex → xelatex``
+    5. 按需编译：``xelatex → bibtex → xelatex …``，交叉引用状态达到不动点即停止，
+       引用集合与 ``references/``、BibTeX 样式未变时跳过 bibtex；构建清单成立时跳过编译；
+       导言区开头的文档类预编译为格式文件并在各遍复用
     6. 将 PDF 从缓存目录复制到项目根目录
     7. 再次清理根目录中间文件
 
     Args:
         project_dir: NSFC 项目根目录路径
         tex_file: 主 TeX 文件名（通常为 ``main.tex``）
+        force: 忽略构建清单，强制重新编译
+        preamble_format: 是否使用预编译导言区格式
 
     Raises:
         BuildError: PDF 渲染失败（未找到输出文件）
@@ -268,44 +281,51 @@ def build_project(project_dir: Path, tex_file: str) -> None:
         xelatex_bin,
         "-interaction=nonstopmode",
         "-file-line-error",
+        "-recorder",
         "-synctex=1",
         f"-output-directory={cache_dir}",
         tex_path.name,
     ]
     bibtex_cmd = [bibtex_bin, tex_stem]
 
-    xelatex_run_1 = run_best_effort(xelatex_cmd, cwd=project_dir, env=tex_env)
-    bibtex_run = run_best_effort(bibtex_cmd, cwd=cache_dir, env=tex_env)
-    xelatex_run_2 = run_best_effort(xelatex_cmd, cwd=project_dir, env=tex_env)
-    xelatex_run_3 = run_best_effort(xelatex_cmd, cwd=project_dir, env=tex_env)
+    report = run_latex_passes(
+        xelatex_cmd,
+        cwd=project_dir,
+        env=tex_env,
+        cache_dir=cache_dir,
+        tex_stem=tex_stem,
+        bibliography=BibliographyStep(
+            "bibtex",
+            bibtex_cmd,
+            cwd=cache_dir,
+            inputs=[project_dir / "references", PACKAGE_DIR / "assets" / "bibtex-style"],
+        ),
+        runner=run_best_effort,
+        extra_inputs=[FONTS_PACKAGE_DIR / "fonts"] if FONTS_PACKAGE_DIR.exists() else None,
+        force=force,
+        preamble_format=PreambleFormat(tex_path, inputs=sorted(PACKAGE_DIR.glob("*.sty")))
+        if preamble_format
+        else None,
+    )
 
     pdf_source = cache_dir / f"{tex_stem}.pdf"
     if not pdf_source.exists():
         compiler_logs = "\n\n".join(
-            [
-                summarize_process_output("xelatex pass 1", xelatex_run_1),
-                summarize_process_output("bibtex", bibtex_run),
-                summarize_process_output("xelatex pass 2", xelatex_run_2),
-                summarize_process_output("xelatex pass 3", xelatex_run_3),
-            ]
+            summarize_process_output(record.label, record.result) for record in report.passes
         )
         raise BuildError(
             f"PDF 渲染失败，未找到输出文件：{pdf_source}\n\n{compiler_logs}"
         )
 
-    for label, result in (
-        ("xelatex pass 1", xelatex_run_1),
-        ("bibtex", bibtex_run),
-        ("xelatex pass 2", xelatex_run_2),
-        ("xelatex pass 3", xelatex_run_3),
-    ):
-        if result.returncode != 0:
-            print(f"Warning: {label} exit={result.returncode}", file=sys.stderr)
+    for record in report.passes:
+        if record.result.returncode != 0:
+            print(f"Warning: {record.label} exit={record.result.returncode}", file=sys.stderr)
 
     shutil.copy2(pdf_source, project_dir / f"{tex_stem}.pdf")
     clean_root_artifacts(project_dir, tex_stem)
     print(f"✓ PDF generated: {project_dir / f'{tex_stem}.pdf'}")
     print(f"✓ Build cache: {cache_dir}")
+    print(f"✓ Compile passes: {report.describe()}")
     synctex_path = cache_dir / f"{tex_stem}.synctex.gz"
     if synctex_path.exists():
         print(f"✓ SyncTeX: {synctex_path}")
@@ -354,6 +374,16 @@ def parse_args() -> argparse.Namespace:
         default="main.tex",
         help="主 TeX 文件名，默认 main.tex。",
     )
+    build_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="忽略 .latex-cache/ 中的构建清单，强制重新编译。",
+    )
+    build_parser.add_argument(
+        "--no-format",
+        action="store_true",
+        help="不使用 .latex-cache/preamble-format/ 中的预编译导言区格式。",
+    )
 
     clean_parser = subparsers.add_parser("clean", help="清理缓存与根目录中间文件")
     clean_parser.add_argument(
@@ -383,7 +413,7 @@ def main() -> None:
     project_dir = resolve_project_dir(getattr(args, "project_dir", None))
 
     if args.command == "build":
-        build_project(project_dir, args.tex_file)
+        build_project(project_dir, args.tex_file, force=args.force, preamble_format=not args.no_format)
         return
 
     if args.command == "clean":
@@ -4,7 +4,11 @@
 支持 PDF + DOCX 双输出：
 
 PDF 构建流程：
-  XeLaTeX → Biber → XeLaTeX → XeLaTeX
+  XeLaTeX → Biber → XeLaTeX …
+  由 latex_build_driver 按交叉引用状态的不动点决定 XeLaTeX 遍数，.bcf 与 references/ 未变时跳过 Biber；
+  .latex-cache/main.manifest.json 记录全部输入，未变化时直接复用缓存 PDF（DOCX 仍每次重新生成）。
+  main.tex 开头的 \\documentclass 与紧随其后的 \\usepackage 预编译为 .latex-cache/preamble-format/main.fmt
+  供各遍复用（XeTeX 无法转储字体，含字体设置的宏包转储失败时自动退回到只转储文档类）。
   中间文件隔离到 .latex-cache/，最终 PDF 复制到项目根目录。
 
 DOCX 构建流程（多步转换管线）：
@@ -39,6 +43,7 @@ from dataclasses import dataclass
 from pathlib import Path
 
 from fix_docx_spacing import fix_docx_spacing
+from latex_build_driver import BibliographyStep, PreambleFormat, run_latex_passes
 
 VERSION = "1.3.13"
 DOCX_FRONTMATTER_CENTER_START = "BENSZ_DOCX_FRONTMATTER_CENTER_START"
@@ -1006,11 +1011,13 @@ def build_markdown_for_docx(project_dir: Path) -> str:
     return "\n\n".join(parts).rstrip() + "\n"
 
 
-def build_project(project_dir: Path) -> None:
+def build_project(project_dir: Path, force: bool = False, preamble_format: bool = True) -> None:
     """完整的 PDF + DOCX 构建入口。
 
     构建流程：
-    1. PDF 构建：xelatex → biber → xelatex → xelatex，中间文件隔离到 .latex-cache/。
+    1. PDF 构建：xelatex → biber → xelatex …，交叉引用状态达到不动点即停止，
+       引用未变时跳过 biber，构建清单成立时跳过编译（force=True 时强制重编）；中间文件隔离到 .latex-cache/。
+       preamble_format=True 时导言区开头预编译为格式文件并在各遍复用。
     2. DOCX 构建：
        a. 收集 extraTex/ 下所有正文片段，转为 Markdown。
        b. 通过 HTML5+MathML 中间步骤生成 DOCX（含 CSL 引用处理和 OMML 公式）。
@@ -1043,15 +1050,16 @@ def build_project(project_dir: Path) -> None:
         resolve_executable("xelatex"),
         "-interaction=nonstopmode",
         "-file-line-error",
+        "-recorder",
         "-synctex=1",
         f"-output-directory={cache_dir}",
         "main.tex",
     ]
 
-    xelatex_run_1 = run_best_effort(xelatex_cmd, cwd=project_dir, env=tex_env)
-    biber_run: subprocess.CompletedProcess[str] | None = None
+    bibliography: BibliographyStep | None = None
     if bibliography_enabled:
-        biber_run = run_best_effort(
+        bibliography = BibliographyStep(
+            "biber",
             [
                 resolve_executable("biber"),
                 "--input-directory",
@@ -1061,41 +1069,39 @@ def build_project(project_dir: Path) -> None:
                 "main",
             ],
             cwd=project_dir,
-            env=tex_env,
+            inputs=[project_dir / "references"],
         )
-    xelatex_run_2 = run_best_effort(xelatex_cmd, cwd=project_dir, env=tex_env)
-    xelatex_run_3 = run_best_effort(xelatex_cmd, cwd=project_dir, env=tex_env)
+    package_styles = [path for root in tex_roots for path in sorted(root.glob("*.sty"))]
+    report = run_latex_passes(
+        xelatex_cmd,
+        cwd=project_dir,
+        env=tex_env,
+        cache_dir=cache_dir,
+        tex_stem="main",
+        bibliography=bibliography,
+        runner=run_best_effort,
+        extra_inputs=[root / "fonts" for root in tex_roots if root.name == "bensz-fonts"],
+        force=force,
+        preamble_format=PreambleFormat(main_tex, inputs=package_styles) if preamble_format else None,
+    )
 
     pdf_source = cache_dir / "main.pdf"
     if not pdf_source.exists():
-        compiler_logs = "\n\n".join(
-            [
-                summarize_process_output("xelatex pass 1", xelatex_run_1),
-                summarize_process_output("biber", biber_run)
-                if biber_run is not None
-                else "[biber] skipped (no bibliography commands found in main.tex)",
-                summarize_process_output("xelatex pass 2", xelatex_run_2),
-                summarize_process_output("xelatex pass 3", xelatex_run_3),
-            ]
-        )
+        logs = [summarize_process_output(record.label, record.result) for record in report.passes]
+        if not bibliography_enabled:
+            logs.insert(1, "[biber] skipped (no bibliography commands found in main.tex)")
+        compiler_logs = "\n\n".join(logs)
         raise RuntimeError(
             f"PDF compilation failed. Expected output not found: {pdf_source}\n\n{compiler_logs}"
         )
 
-    process_results: list[tuple[str, subprocess.CompletedProcess[str]]] = [
-        ("xelatex pass 1", xelatex_run_1),
-        ("xelatex pass 2", xelatex_run_2),
-        ("xelatex pass 3", xelatex_run_3),
-    ]
-    if biber_run is not None:
-        process_results.insert(1, ("biber", biber_run))
-
-    for label, result in process_results:
-        if result.returncode != 0:
-            print(f"Warning: {label} exited with code {result.returncode}; output PDF was still generated.")
+    for record in report.passes:
+        if record.result.returncode != 0:
+            print(f"Warning: {record.label} exited with code {record.result.returncode}; output PDF was still generated.")
 
     shutil.copy2(pdf_source, project_dir / "main.pdf")
     print(f"✓ PDF generated: {project_dir / 'main.pdf'}")
+    print(f"✓ Compile passes: {report.describe()}")
 
     print("Building DOCX...")
     manuscript_md = build_markdown_for_docx(project_dir)
@@ -1172,6 +1178,16 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="Project directory. Defaults to the nearest parent containing main.tex.",
     )
+    build_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Ignore the build manifest in .latex-cache/ and recompile the PDF.",
+    )
+    build_parser.add_argument(
+        "--no-format",
+        action="store_true",
+        help="Do not use the precompiled preamble format in .latex-cache/preamble-format/.",
+    )
 
     count_parser = subparsers.add_parser(
         "count-words",
@@ -1192,7 +1208,7 @@ def main() -> None:
     args = parse_args()
     if args.command == "build":
         project_dir = resolve_project_dir(args.project_dir)
-        build_project(project_dir)
+        build_project(project_dir, force=args.force, preamble_format=not args.no_format)
         return
     if args.command == "count-words":
         print_word_count_summary(count_words_for_tex_sources(args.tex_paths))
@@ -2,8 +2,10 @@
 """毕业论文项目统一构建工具。
 
 支持功能：
-- **PDF 构建**：自动执行 xelatex + bibtex/biber + xelatex x2 编译链路，
-  中间文件隔离到 ``.latex-cache/`` 目录，最终 PDF 输出到项目根目录。
+- **PDF 构建**：自动执行 xelatex + bibtex/biber + xelatex 编译链路（遍数按交叉引用
+  状态的不动点决定，引用未变时跳过文献工具），中间文件隔离并保留在 ``.latex-cache/``
+  目录（构建清单记录全部输入，未变化时直接复用缓存 PDF；文档类预编译为
+  ``preamble-format/`` 下的格式文件供各遍复用），最终 PDF 输出到项目根目录。
 - **DOCX 导出**：从同一份 LaTeX 源生成可编辑 Word 初稿，复杂对象以占位符
   和质量报告提示人工复核。
 - **缓存清理**：一键清除 ``.latex-cache/`` 及根目录下的 LaTeX 中间文件。
@@ -43,6 +45,8 @@ SCRIPT_DIR = Path(__file__).resolve().parent
 if str(SCRIPT_DIR) not in sys.path:
     sys.path.insert(0, str(SCRIPT_DIR))
 
+from latex_build_driver import BibliographyStep, PreambleFormat, run_latex_passes
+
 # bensz-thesis 公共包源码根目录（即 packages/bensz-thesis/）
 PACKAGE_DIR = Path(__file__).resolve().parents[1]
 # bensz-fonts 共享字体包目录，构建时注入 TEXINPUTS 以便 xelatex 找到字体文件
@@ -307,18 +311,23 @@ def detect_bibliography_backend(tex_path: Path) -> str | None:
     return None
 
 
-def build_project(project_dir: Path, tex_file: str) -> Path:
+def build_project(project_dir: Path, tex_file: str, force: bool = False, preamble_format: bool = True) -> Path:
     """构建毕业论文 PDF。
 
     编译流程：
-    1. 清理旧缓存目录 ``.latex-cache/`` 并重建。
+    1. 确保缓存目录 ``.latex-cache/`` 存在（保留上次的 aux 状态，供增量构建复用）。
     2. 若检测到 BENSZ_PASSTHROUGH_PDF 指令，直接复制预编译 PDF 并返回。
-    3. 否则执行完整编译链路：xelatex -> bibtex/biber -> xelatex -> xelatex。
+    3. 否则执行编译链路：xelatex -> bibtex/biber -> xelatex …，交叉引用状态达到
+       不动点即停止；引用集合与 ``references/``、``bibtex-style/`` 未变时跳过文献工具；
+       构建清单（``.latex-cache/<tex_stem>.manifest.json``）成立时跳过编译；
+       导言区开头的文档类预编译为 ``.latex-cache/preamble-format/<tex_stem>.fmt`` 并在各遍复用。
     4. 编译完成后将最终 PDF 从缓存目录复制到项目根目录。
 
     Args:
         project_dir: 论文项目根目录（包含 main.tex 和 extraTex/）。
         tex_file: 主 TeX 文件名，默认 ``main.tex``。
+        force: 忽略构建清单，强制重新编译。
+        preamble_format: 是否使用预编译导言区格式。
 
     Returns:
         生成的 PDF 文件绝对路径。
@@ -329,8 +338,6 @@ def build_project(project_dir: Path, tex_file: str) -> Path:
     tex_path = resolve_tex_file(project_dir, tex_file)
     tex_stem = tex_path.stem
     cache_dir = project_dir / CACHE_DIRNAME
-    if cache_dir.exists():
-        shutil.rmtree(cache_dir)
     cache_dir.mkdir(parents=True, exist_ok=True)
     ensure_cache_subdir(cache_dir, "extraTex")
 
@@ -357,17 +364,18 @@ def build_project(project_dir: Path, tex_file: str) -> Path:
         resolve_executable("xelatex"),
         "-interaction=nonstopmode",
         "-file-line-error",
+        "-recorder",
         "-synctex=1",
         f"-output-directory={cache_dir}",
         tex_path.name,
     ]
 
-    xelatex_run_1 = run_best_effort(xelatex_cmd, cwd=project_dir, env=tex_env)
-
     bib_backend = detect_bibliography_backend(tex_path)
-    bib_run: subprocess.CompletedProcess[str] | None = None
+    bibliography: BibliographyStep | None = None
+    bib_inputs = [project_dir / "references", project_dir / "bibtex-style"]
     if bib_backend == "biber":
-        bib_run = run_best_effort(
+        bibliography = BibliographyStep(
+            "biber",
             [
                 resolve_executable("biber"),
                 "--input-directory",
@@ -377,27 +385,44 @@ def build_project(project_dir: Path, tex_file: str) -> Path:
                 tex_stem,
             ],
             cwd=project_dir,
-            env=tex_env,
+            inputs=bib_inputs,
         )
     elif bib_backend == "bibtex":
-        sync_optional_tree(cache_dir, project_dir, "references")
-        sync_optional_tree(cache_dir, project_dir, "bibtex-style")
-        normalize_bibtex_aux(cache_dir, tex_stem)
-        bib_run = run_best_effort([resolve_executable("bibtex"), tex_stem], cwd=cache_dir, env=tex_env)
 
-    xelatex_run_2 = run_best_effort(xelatex_cmd, cwd=project_dir, env=tex_env)
-    xelatex_run_3 = run_best_effort(xelatex_cmd, cwd=project_dir, env=tex_env)
+        def prepare_bibtex() -> None:
+            sync_optional_tree(cache_dir, project_dir, "references")
+            sync_optional_tree(cache_dir, project_dir, "bibtex-style")
+            normalize_bibtex_aux(cache_dir, tex_stem)
+
+        bibliography = BibliographyStep(
+            "bibtex",
+            [resolve_executable("bibtex"), tex_stem],
+            cwd=cache_dir,
+            inputs=bib_inputs,
+            prepare=prepare_bibtex,
+        )
+
+    report = run_latex_passes(
+        xelatex_cmd,
+        cwd=project_dir,
+        env=tex_env,
+        cache_dir=cache_dir,
+        tex_stem=tex_stem,
+        bibliography=bibliography,
+        runner=run_best_effort,
+        extra_inputs=[FONTS_PACKAGE_DIR / "fonts"] if FONTS_PACKAGE_DIR.exists() else None,
+        force=force,
+        preamble_format=PreambleFormat(tex_path, inputs=sorted(PACKAGE_DIR.glob("*.sty")))
+        if preamble_format
+        else None,
+    )
 
     pdf_source = cache_dir / f"{tex_stem}.pdf"
     log_path = cache_dir / f"{tex_stem}.log"
-    if not pdf_source.exists() or (bib_run is not None and bib_run.returncode != 0) or log_has_fatal_errors(log_path):
+    bib_failed = report.bib_result is not None and report.bib_result.returncode != 0
+    if not pdf_source.exists() or bib_failed or log_has_fatal_errors(log_path):
         compiler_logs = "\n\n".join(
-            [
-                summarize_process_output("xelatex pass 1", xelatex_run_1),
-                summarize_process_output(bib_backend or "bibliography skipped", bib_run or xelatex_run_1),
-                summarize_process_output("xelatex pass 2", xelatex_run_2),
-                summarize_process_output("xelatex pass 3", xelatex_run_3),
-            ]
+            summarize_process_output(record.label, record.result) for record in report.passes
         )
         raise BuildError(
             f"PDF 渲染失败：{pdf_source}\n\n{compiler_logs}"
@@ -408,6 +433,7 @@ def build_project(project_dir: Path, tex_file: str) -> Path:
     clean_root_artifacts(project_dir, tex_stem)
     print(f"✓ PDF generated: {output_pdf}")
     print(f"✓ Build cache: {cache_dir}")
+    print(f"✓ Compile passes: {report.describe()}")
     synctex_path = cache_dir / f"{tex_stem}.synctex.gz"
     if synctex_path.exists():
         print(f"✓ SyncTeX: {synctex_path}")
@@ -576,6 +602,8 @@ def parse_args() -> argparse.Namespace:
     build_parser = subparsers.add_parser("build", help="渲染 PDF")
     build_parser.add_argument("--project-dir", type=Path, default=None, help="项目目录。")
     build_parser.add_argument("--tex-file", default="main.tex", help="主 TeX 文件名，默认 main.tex。")
+    build_parser.add_argument("--force", action="store_true", help="忽略构建清单，强制重新编译。")
+    build_parser.add_argument("--no-format", action="store_true", help="不使用预编译导言区格式。")
 
     docx_parser = subparsers.add_parser("docx", help="导出可编辑 Word 初稿")
     docx_parser.add_argument("--project-dir", type=Path, default=None, help="项目目录。")
@@ -618,7 +646,7 @@ def main() -> None:
     project_dir = resolve_project_dir(getattr(args, "project_dir", None))
 
     if args.command == "build":
-        build_project(project_dir, args.tex_file)
+        build_project(project_dir, args.tex_file, force=args.force, preamble_format=not args.no_format)
         return
 
     if args.command == "docx":
@@ -66,6 +66,7 @@ def validate_required_files() -> list[str]:
         "styles/ucas/ucasSilence.sty",
         "README.md",
         "scripts/thesis_project_tool.py",
+        "scripts/latex_build_driver.py",
         "scripts/thesis_docx_tool.py",
         "scripts/package/install.py",
         "scripts/package/build_tds_zip.py",
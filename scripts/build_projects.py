@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""仓库级多项目并行构建工具。
+
+扫描 ``projects/`` 下的全部项目，按目录名前缀（与 ``sync_vscode_configs.infer_project_profile``
+一致）分派给对应的构建入口，在按 CPU 核数定容的进程池中并行执行：
+
+  - nsfc / thesis / cv / paper：``packages/<pkg>/scripts/*_tool.py`` 的 ``build_project``
+  - gdnsf / gxnsf：项目自带的 ``projects/<name>/scripts/<profile>_build.py`` 的 ``build``
+
+每个项目独立运行：进程环境（含 TEXINPUTS）在每次构建前重置为启动时的快照，中间文件
+仍各自位于 ``<project>/.latex-cache/``，子进程输出写入 ``<project>/.latex-cache/build-projects.log``，
+单个项目失败不影响其他项目。xelatex 为单线程，因此默认并发数等于 CPU 核数。
+
+调度采用“最长任务优先”：``--json`` 指向的上次报告中耗时最长的项目最先启动（未记录的项目
+视为最长），缩短整体墙钟时间。
+
+典型用法::
+
+    python scripts/build_projects.py                                # 构建全部项目
+    python scripts/build_projects.py --only 'NSFC_*' --only 'thesis-*' -j 4
+    python scripts/build_projects.py --json build-report.json --junit build-report.xml
+    python scripts/build_projects.py --list                         # 仅列出识别到的项目
+"""
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import importlib.util
+import json
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterator
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+from sync_vscode_configs import infer_project_profile
+
+# 仓库根目录
+REPO_ROOT = SCRIPT_DIR.parent
+# projects/ 目录
+PROJECTS_DIR = REPO_ROOT / "projects"
+# 公共包构建入口：项目类型 → (公共包目录名, 脚本文件名)
+PACKAGE_TOOLS = {
+    "nsfc": ("bensz-nsfc", "nsfc_project_tool.py"),
+    "thesis": ("bensz-thesis", "thesis_project_tool.py"),
+    "cv": ("bensz-cv", "cv_project_tool.py"),
+    "paper": ("bensz-paper", "manuscript_tool.py"),
+}
+# 省级基金项目自带构建 wrapper：项目类型 → projects/<name>/scripts/ 下的脚本文件名
+PROJECT_WRAPPERS = {
+    "gdnsf": "gdnsf_build.py",
+    "gxnsf": "gxnsf_build.py",
+}
+# 每个项目的构建日志（位于项目自身的缓存目录）
+LOG_RELPATH = Path(".latex-cache") / "build-projects.log"
+# 失败时写入报告的日志尾部行数
+LOG_TAIL_LINES = 40
+
+
+@dataclass
+class BuildTask:
+    """单个项目的构建任务。"""
+
+    name: str
+    profile: str
+    project_dir: Path
+    force: bool = False
+    env: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class ProjectResult:
+    """单个项目的构建结果。"""
+
+    name: str
+    profile: str
+    status: str  # passed | failed
+    seconds: float
+    log: str
+    error: str = ""
+
+
+def discover_tasks(patterns: list[str] | None = None, force: bool = False) -> list[BuildTask]:
+    """扫描 ``projects/``，返回可识别类型的项目构建任务（按名称排序）。
+
+    Args:
+        patterns: 项目名 glob 过滤（任一匹配即保留）；为空时保留全部。
+        force: 传给包构建工具，忽略构建清单强制重编。
+    """
+    tasks: list[BuildTask] = []
+    for project_dir in sorted(path for path in PROJECTS_DIR.iterdir() if path.is_dir()):
+        profile = infer_project_profile(project_dir.name)
+        if profile is None:
+            continue
+        if patterns and not any(fnmatch.fnmatch(project_dir.name, pattern) for pattern in patterns):
+            continue
+        tasks.append(BuildTask(project_dir.name, profile, project_dir, force=force))
+    return tasks
+
+
+def _load_module(path: Path, name: str):
+    """按文件路径载入构建脚本（其所在目录加入 sys.path，以便导入同目录的辅助模块）。"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    if str(path.parent) not in sys.path:
+        sys.path.insert(0, str(path.parent))
+    spec = importlib.util.spec_from_file_location(name, path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"无法载入构建脚本：{path}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def invoke_build(task: BuildTask) -> None:
+    """调用项目对应的构建入口；失败时抛出异常。"""
+    if task.profile in PROJECT_WRAPPERS:
+        wrapper_path = task.project_dir / "scripts" / PROJECT_WRAPPERS[task.profile]
+        wrapper = _load_module(wrapper_path, f"build_projects_{task.name}")
+        code = wrapper.build(task.project_dir, "main.tex")
+        if code != 0:
+            raise RuntimeError(f"{wrapper_path.name} exit={code}")
+        return
+
+    package_name, script_name = PACKAGE_TOOLS[task.profile]
+    tool = _load_module(REPO_ROOT / "packages" / package_name / "scripts" / script_name, Path(script_name).stem)
+    if task.profile == "cv":
+        # 进程池已按核数并发，变体在本进程内依次构建，避免嵌套进程池
+        tool.build_project(task.project_dir, "all", None, force=task.force, jobs=1)
+    elif task.profile == "paper":
+        tool.build_project(task.project_dir, force=task.force)
+    else:
+        tool.build_project(task.project_dir, "main.tex", force=task.force)
+
+
+@contextmanager
+def _redirect_output(log_path: Path) -> Iterator[None]:
+    """把 stdout/stderr 重定向到日志：同时替换 Python 流与文件描述符 1/2（覆盖构建工具启动的子进程输出）。"""
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved = [os.dup(1), os.dup(2)]
+    saved_streams = sys.stdout, sys.stderr
+    try:
+        with log_path.open("wb") as fh:
+            os.dup2(fh.fileno(), 1)
+            os.dup2(fh.fileno(), 2)
+            stream = open(fh.fileno(), "w", encoding="utf-8", errors="replace", buffering=1, closefd=False)
+            sys.stdout = sys.stderr = stream
+            try:
+                yield
+            finally:
+                stream.flush()
+                sys.stdout, sys.stderr = saved_streams
+    finally:
+        os.dup2(saved[0], 1)
+        os.dup2(saved[1], 2)
+        for fd in saved:
+            os.close(fd)
+
+
+def _log_tail(log_path: Path) -> str:
+    if not log_path.exists():
+        return ""
+    lines = log_path.read_text(encoding="utf-8", errors="replace").splitlines()
+    return "\n".join(lines[-LOG_TAIL_LINES:])
+
+
+def build_one(task: BuildTask) -> ProjectResult:
+    """构建单个项目（进程池工作函数）。环境变量先重置为任务携带的快照，互不污染。"""
+    if task.env:
+        os.environ.clear()
+        os.environ.update(task.env)
+    log_path = task.project_dir / LOG_RELPATH
+    start = time.perf_counter()
+    error = ""
+    try:
+        with _redirect_output(log_path):
+            invoke_build(task)
+    except KeyboardInterrupt:
+        raise
+    except BaseException as exc:  # 包括构建工具的 SystemExit
+        error = f"{type(exc).__name__}: {exc}"
+    seconds = time.perf_counter() - start
+    if error:
+        tail = _log_tail(log_path)
+        error = f"{error}\n{tail}" if tail else error
+    return ProjectResult(
+        name=task.name,
+        profile=task.profile,
+        status="failed" if error else "passed",
+        seconds=seconds,
+        log=str(log_path),
+        error=error,
+    )
+
+
+def load_previous_timings(report_path: Path | None) -> dict[str, float]:
+    """读取上次 JSON 报告中的各项目耗时；不存在或无法解析时返回空字典。"""
+    if report_path is None or not report_path.exists():
+        return {}
+    try:
+        data = json.loads(report_path.read_text(encoding="utf-8"))
+        return {item["name"]: float(item["seconds"]) for item in data.get("projects", [])}
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+
+
+def order_longest_first(tasks: list[BuildTask], timings: dict[str, float]) -> list[BuildTask]:
+    """按上次耗时降序排列（无记录的项目排在最前），同耗时保持名称顺序。"""
+    return sorted(tasks, key=lambda task: -timings.get(task.name, float("inf")))
+
+
+def run_builds(
+    tasks: list[BuildTask],
+    jobs: int,
+    worker: Callable[[BuildTask], ProjectResult] = build_one,
+    on_result: Callable[[ProjectResult], None] | None = None,
+) -> list[ProjectResult]:
+    """并行执行构建任务，结果按任务顺序返回。
+
+    Args:
+        tasks: 构建任务（按期望的启动顺序排列）。
+        jobs: 并发进程数；1 时在当前进程中串行执行。
+        worker: 单项目构建函数（须可被 pickle）。
+        on_result: 每个项目完成时的回调（用于实时输出进度）。
+    """
+    env = dict(os.environ)
+    for task in tasks:
+        task.env = env
+    results: dict[str, ProjectResult] = {}
+    if jobs <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            results[task.name] = worker(task)
+            if on_result is not None:
+                on_result(results[task.name])
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+            futures = {pool.submit(worker, task): task for task in tasks}
+            for future in as_completed(futures):
+                task = futures[future]
+                try:
+                    result = future.result()
+                except Exception as exc:  # 工作进程异常退出
+                    result = ProjectResult(task.name, task.profile, "failed", 0.0, "", f"{type(exc).__name__}: {exc}")
+                results[task.name] = result
+                if on_result is not None:
+                    on_result(result)
+    return [results[task.name] for task in tasks]
+
+
+def write_json_report(path: Path, results: list[ProjectResult], jobs: int, wall_seconds: float) -> None:
+    """写出 JSON 汇总（含墙钟时间与各项目耗时之和）。"""
+    data = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "jobs": jobs,
+        "wall_seconds": round(wall_seconds, 3),
+        "serial_seconds": round(sum(result.seconds for result in results), 3),
+        "passed": sum(result.status == "passed" for result in results),
+        "failed": sum(result.status == "failed" for result in results),
+        "projects": [{**asdict(result), "seconds": round(result.seconds, 3)} for result in results],
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+
+def write_junit_report(path: Path, results: list[ProjectResult], wall_seconds: float) -> None:
+    """写出 JUnit XML 汇总：每个项目一个 testcase，classname 为项目类型。"""
+    root = ET.Element("testsuites")
+    suite = ET.SubElement(
+        root,
+        "testsuite",
+        name="projects",
+        tests=str(len(results)),
+        failures=str(sum(result.status == "failed" for result in results)),
+        errors="0",
+        time=f"{wall_seconds:.3f}",
+    )
+    for result in results:
+        case = ET.SubElement(suite, "testcase", classname=result.profile, name=result.name, time=f"{result.seconds:.3f}")
+        if result.status == "failed":
+            failure = ET.SubElement(case, "failure", message=result.error.splitlines()[0] if result.error else "")
+            failure.text = result.error
+    path.parent.mkdir(parents=True, exist_ok=True)
+    ET.ElementTree(root).write(path, encoding="utf-8", xml_declaration=True)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="并行构建 projects/ 下的全部项目。")
+    parser.add_argument(
+        "--only",
+        action="append",
+        default=None,
+        metavar="PATTERN",
+        help="只构建名称匹配该 glob 的项目，可重复指定（如 'NSFC_*'）。",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="并发进程数，默认等于 CPU 核数。",
+    )
+    parser.add_argument("--force", action="store_true", help="忽略各项目的构建清单，强制重新编译。")
+    parser.add_argument("--json", type=Path, default=None, help="JSON 汇总输出路径（同时用作下次调度的耗时参考）。")
+    parser.add_argument("--junit", type=Path, default=None, help="JUnit XML 汇总输出路径。")
+    parser.add_argument("--list", action="store_true", help="只列出识别到的项目及其构建入口，不执行构建。")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    tasks = discover_tasks(args.only, force=args.force)
+    if not tasks:
+        print("未找到匹配的项目。", file=sys.stderr)
+        return 1
+    if args.list:
+        for task in tasks:
+            print(f"{task.name}\t{task.profile}")
+        return 0
+
+    tasks = order_longest_first(tasks, load_previous_timings(args.json))
+    jobs = max(1, args.jobs)
+    print(f"Building {len(tasks)} projects with {min(jobs, len(tasks))} worker(s)...")
+
+    def report(result: ProjectResult) -> None:
+        mark = "✓" if result.status == "passed" else "✗"
+        print(f"{mark} {result.name} ({result.profile}) {result.seconds:.1f}s", flush=True)
+
+    start = time.perf_counter()
+    results = run_builds(tasks, jobs, on_result=report)
+    wall_seconds = time.perf_counter() - start
+    results.sort(key=lambda result: result.name)
+
+    if args.json is not None:
+        write_json_report(args.json, results, jobs, wall_seconds)
+    if args.junit is not None:
+        write_junit_report(args.junit, results, wall_seconds)
+
+    failed = [result for result in results if result.status == "failed"]
+    serial_seconds = sum(result.seconds for result in results)
+    print(
+        f"Done: {len(results) - len(failed)} passed, {len(failed)} failed; "
+        f"wall {wall_seconds:.1f}s, serial sum {serial_seconds:.1f}s"
+    )
+    for result in failed:
+        print(f"\n[{result.name}] {result.log}\n{result.error}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""公共包构建驱动同步工具。
+
+``scripts/latex_build_driver.py`` 是 LaTeX 编译调度器的规范版本；各公共包随包分发
+（TDS zip / TEXMF 安装后不再能访问仓库根目录），因此需要在包内保留一份相同的副本：
+
+  - ``packages/bensz-nsfc/scripts/latex_build_driver.py``
+  - ``packages/bensz-thesis/scripts/latex_build_driver.py``
+  - ``packages/bensz-cv/scripts/latex_build_driver.py``
+  - ``packages/bensz-paper/scripts/latex_build_driver.py``
+
+典型用法::
+
+    python sync_build_driver.py            # 同步全部副本
+    python sync_build_driver.py --check    # 只检查漂移，存在差异时返回 1
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+# 仓库根目录
+REPO_ROOT = Path(__file__).resolve().parents[1]
+# 规范版本
+DRIVER_SOURCE = Path(__file__).resolve().parent / "latex_build_driver.py"
+# 需要携带构建驱动副本的公共包
+DRIVER_PACKAGES = ("bensz-nsfc", "bensz-thesis", "bensz-cv", "bensz-paper")
+
+
+def driver_targets() -> list[Path]:
+    """各公共包内的驱动副本路径。"""
+    return [REPO_ROOT / "packages" / name / "scripts" / DRIVER_SOURCE.name for name in DRIVER_PACKAGES]
+
+
+def sync_driver(*, check_only: bool) -> list[str]:
+    """将规范版本同步到各公共包。
+
+    Args:
+        check_only: 若为 True，只检测漂移不实际写入
+
+    Returns:
+        操作消息列表（MISMATCH / UPDATED / OK）
+    """
+    content = DRIVER_SOURCE.read_text(encoding="utf-8")
+    messages: list[str] = []
+    for target in driver_targets():
+        relpath = target.relative_to(REPO_ROOT)
+        current = target.read_text(encoding="utf-8") if target.exists() else None
+        if current == content:
+            messages.append(f"OK {relpath}")
+        elif check_only:
+            messages.append(f"MISMATCH {relpath}")
+        else:
+            target.write_text(content, encoding="utf-8")
+            messages.append(f"UPDATED {relpath}")
+    return messages
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="同步各公共包内的 latex_build_driver.py 副本。")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="只检查是否与 scripts/latex_build_driver.py 一致；若存在漂移则返回非零退出码。",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    messages = sync_driver(check_only=args.check)
+    for message in messages:
+        print(message)
+    if args.check and any(message.startswith("MISMATCH ") for message in messages):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
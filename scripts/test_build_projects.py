@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import json
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from scripts import build_projects
+
+
+def test_discover_tasks_uses_profile_prefixes_and_patterns(tmp_path: Path, monkeypatch):
+    for name in ("NSFC_Young", "GXNSF_General", "thesis-demo", "cv-01", "misc"):
+        (tmp_path / name).mkdir()
+    monkeypatch.setattr(build_projects, "PROJECTS_DIR", tmp_path)
+
+    tasks = build_projects.discover_tasks()
+    assert [(task.name, task.profile) for task in tasks] == [
+        ("GXNSF_General", "gxnsf"),
+        ("NSFC_Young", "nsfc"),
+        ("cv-01", "cv"),
+        ("thesis-demo", "thesis"),
+    ]
+
+    tasks = build_projects.discover_tasks(["NSFC_*", "cv-*"], force=True)
+    assert [task.name for task in tasks] == ["NSFC_Young", "cv-01"]
+    assert all(task.force for task in tasks)
+
+
+def test_order_longest_first_puts_unknown_projects_first():
+    tasks = [build_projects.BuildTask(name, "nsfc", Path(name)) for name in ("a", "b", "c", "d")]
+
+    ordered = build_projects.order_longest_first(tasks, {"a": 1.0, "b": 30.0, "d": 5.0})
+
+    assert [task.name for task in ordered] == ["c", "b", "d", "a"]
+
+
+def test_build_one_captures_output_and_isolates_failures(tmp_path: Path, monkeypatch, capfd):
+    def fake_invoke(task):
+        print(f"building {task.name}")
+        if task.name == "bad":
+            raise SystemExit("PDF 渲染失败")
+
+    monkeypatch.setattr(build_projects, "invoke_build", fake_invoke)
+    tasks = [build_projects.BuildTask(name, "nsfc", tmp_path / name) for name in ("bad", "good")]
+
+    results = build_projects.run_builds(tasks, jobs=1)
+
+    assert [(result.name, result.status) for result in results] == [("bad", "failed"), ("good", "passed")]
+    assert results[0].error.startswith("SystemExit: PDF 渲染失败")
+    assert "building bad" in results[0].error
+    assert (tmp_path / "good" / build_projects.LOG_RELPATH).read_text(encoding="utf-8") == "building good\n"
+    assert "building" not in capfd.readouterr().out
+
+
+def test_reports_include_per_project_timings(tmp_path: Path):
+    results = [
+        build_projects.ProjectResult("NSFC_Young", "nsfc", "passed", 12.5, "a.log"),
+        build_projects.ProjectResult("cv-01", "cv", "failed", 3.25, "b.log", "RuntimeError: boom\ntail"),
+    ]
+
+    build_projects.write_json_report(tmp_path / "report.json", results, jobs=4, wall_seconds=12.75)
+    build_projects.write_junit_report(tmp_path / "report.xml", results, wall_seconds=12.75)
+
+    data = json.loads((tmp_path / "report.json").read_text(encoding="utf-8"))
+    assert (data["passed"], data["failed"], data["serial_seconds"]) == (1, 1, 15.75)
+    assert build_projects.load_previous_timings(tmp_path / "report.json") == {"NSFC_Young": 12.5, "cv-01": 3.25}
+
+    suite = ET.parse(tmp_path / "report.xml").getroot().find("testsuite")
+    assert suite.get("tests") == "2" and suite.get("failures") == "1"
+    cases = {case.get("name"): case for case in suite.iter("testcase")}
+    assert cases["NSFC_Young"].get("time") == "12.500"
+    assert cases["cv-01"].find("failure").get("message") == "RuntimeError: boom"
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import importlib.util
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _load_module(module_name: str, path: Path):
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    assert spec.loader is not None
+    spec.loader.exec_module(module)
+    return module
+
+
+cv_project_tool = _load_module(
+    "project_cv_project_tool",
+    REPO_ROOT / "packages" / "bensz-cv" / "scripts" / "cv_project_tool.py",
+)
+
+
+def _cv_project(tmp_path: Path) -> Path:
+    for name in ("main-zh.tex", "main-en.tex"):
+        (tmp_path / name).write_text("\\documentclass{bensz-cv}\n", encoding="utf-8")
+    return tmp_path
+
+
+def test_prefixed_line_writer_keeps_lines_whole():
+    target = io.StringIO()
+    writer = cv_project_tool.PrefixedLineWriter("[main-zh] ", target)
+
+    writer.write("a\nb")
+    writer.write("c\n")
+    writer.write("tail")
+    writer.flush()
+
+    assert target.getvalue() == "[main-zh] a\n[main-zh] bc\n[main-zh] tail\n"
+
+
+def test_failed_variant_does_not_stop_the_other(tmp_path: Path, monkeypatch, capsys):
+    project_dir = _cv_project(tmp_path)
+    built = []
+
+    def fake_build_single(project_dir: Path, tex_path: Path, force: bool = False) -> Path:
+        built.append(tex_path.stem)
+        print(f"compiling {tex_path.name}")
+        if tex_path.stem == "main-zh":
+            raise cv_project_tool.BuildError("PDF 渲染失败")
+        return project_dir / f"{tex_path.stem}.pdf"
+
+    monkeypatch.setattr(cv_project_tool, "build_single", fake_build_single)
+
+    with pytest.raises(cv_project_tool.BuildError, match=r"\[main-zh\] BuildError: PDF 渲染失败"):
+        cv_project_tool.build_project(project_dir, "all", None, jobs=1)
+
+    out = capsys.readouterr().out
+    assert built == ["main-zh", "main-en"]
+    assert "[main-en] compiling main-en.tex" in out
+    assert "✗ main-zh:" in out and "✓ main-en:" in out
+    assert "1 passed, 1 failed" in out
+
+
+def test_explicit_tex_files_are_built_in_order(tmp_path: Path, monkeypatch):
+    project_dir = _cv_project(tmp_path)
+    monkeypatch.setattr(
+        cv_project_tool,
+        "build_single",
+        lambda project_dir, tex_path, force=False: project_dir / f"{tex_path.stem}.pdf",
+    )
+
+    pdfs = cv_project_tool.build_project(project_dir, "all", ["main-en.tex", "main-zh.tex", "main-en.tex"], jobs=1)
+
+    assert [pdf.name for pdf in pdfs] == ["main-en.pdf", "main-zh.pdf"]
@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from scripts import latex_build_driver as driver
+from scripts import sync_build_driver
+
+
+class FakeTeX:
+    """模拟 xelatex/bibtex：.aux 由源文件决定；unstable 时每遍写入不同的计数器。"""
+
+    def __init__(self, project_dir: Path, cache_dir: Path):
+        self.project_dir = project_dir
+        self.cache_dir = cache_dir
+        self.calls: list[str] = []
+        self.unstable = False
+        self.formats: list[str | None] = []
+
+    def __call__(self, args, *, cwd, env):
+        tool = Path(args[0]).name
+        if "-ini" in args:
+            self.calls.append("dump")
+            return self._dump(args)
+        self.calls.append(tool)
+        if tool == "xelatex":
+            self.formats.append(next((arg for arg in args if arg.startswith("-fmt=")), None))
+            self._latex()
+        elif tool == "bibtex":
+            aux = (self.cache_dir / "main.aux").read_text(encoding="utf-8")
+            keys = [line for line in aux.splitlines() if line.startswith("\\citation")]
+            bib = (self.project_dir / "references" / "refs.bib").read_text(encoding="utf-8")
+            (self.cache_dir / "main.bbl").write_text("\n".join(keys) + bib, encoding="utf-8")
+        return subprocess.CompletedProcess(args, 0, "", "")
+
+    def _latex(self):
+        source = (self.project_dir / "main.tex").read_text(encoding="utf-8")
+        aux_path = self.cache_dir / "main.aux"
+        lines = [f"\\citation{{{word[5:]}}}" for word in source.split() if word.startswith("cite:")]
+        lines.append("\\bibdata{references/refs}")
+        lines.append(f"\\newlabel{{sec}}{{{len(source)}}}")
+        if self.unstable:
+            lines.append(f"\\counter{{{self.calls.count('xelatex')}}}")
+        aux_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        (self.cache_dir / "main.pdf").write_bytes(b"pdf")
+        (self.cache_dir / "main.fls").write_text(
+            "\n".join(
+                [
+                    f"PWD {self.project_dir}",
+                    "INPUT main.tex",
+                    f"INPUT {aux_path}",
+                    f"OUTPUT {aux_path}",
+                    f"OUTPUT {self.cache_dir / 'main.pdf'}",
+                ]
+            )
+            + "\n",
+            encoding="utf-8",
+        )
+
+
+    def _dump(self, args):
+        """模拟 ``xelatex -ini``：导言区前缀加载了 fontpkg 时失败（XeTeX 无法转储字体）。"""
+        out_dir = Path(next(arg for arg in args if arg.startswith("-output-directory="))[len("-output-directory=") :])
+        source = Path(args[-1]).read_text(encoding="utf-8")
+        (out_dir / "main.fls").write_text(
+            f"PWD {self.project_dir}\nINPUT demo.cls\nINPUT {args[-1]}\nOUTPUT {out_dir / 'main.fmt'}\n",
+            encoding="utf-8",
+        )
+        if "fontpkg" in source:
+            return subprocess.CompletedProcess(args, 1, "Can't dump a format with native fonts", "")
+        (out_dir / "main.fmt").write_text(source, encoding="utf-8")
+        return subprocess.CompletedProcess(args, 0, "", "")
+
+
+def _project(tmp_path: Path, text: str = "hello cite:a") -> tuple[Path, Path, FakeTeX]:
+    project_dir = tmp_path / "proj"
+    cache_dir = project_dir / ".latex-cache"
+    (project_dir / "references").mkdir(parents=True)
+    cache_dir.mkdir()
+    (project_dir / "references" / "refs.bib").write_text("@article{a}\n", encoding="utf-8")
+    (project_dir / "main.tex").write_text(text, encoding="utf-8")
+    return project_dir, cache_dir, FakeTeX(project_dir, cache_dir)
+
+
+def _build(
+    project_dir: Path,
+    cache_dir: Path,
+    fake: FakeTeX,
+    *,
+    force: bool = True,
+    env: dict[str, str] | None = None,
+    preamble_format: driver.PreambleFormat | None = None,
+) -> driver.BuildReport:
+    fake.calls.clear()
+    fake.formats.clear()
+    return driver.run_latex_passes(
+        ["xelatex", "main.tex"],
+        cwd=project_dir,
+        env=env or {},
+        cache_dir=cache_dir,
+        tex_stem="main",
+        bibliography=driver.BibliographyStep(
+            "bibtex", ["bibtex", "main"], cwd=cache_dir, inputs=[project_dir / "references"]
+        ),
+        runner=fake,
+        force=force,
+        preamble_format=preamble_format,
+    )
+
+
+def test_cold_build_runs_bibtex_once_and_stops_at_fixed_point(tmp_path: Path):
+    project_dir, cache_dir, fake = _project(tmp_path)
+
+    report = _build(project_dir, cache_dir, fake)
+
+    assert fake.calls == ["xelatex", "bibtex", "xelatex"]
+    assert report.converged
+    assert report.bib_status == "ran"
+    assert [record.label for record in report.passes] == ["xelatex pass 1", "bibtex", "xelatex pass 2"]
+
+
+def test_unchanged_rebuild_needs_a_single_pass(tmp_path: Path):
+    project_dir, cache_dir, fake = _project(tmp_path)
+    _build(project_dir, cache_dir, fake)
+
+    report = _build(project_dir, cache_dir, fake)
+
+    assert fake.calls == ["xelatex"]
+    assert report.converged
+    assert report.bib_status == "skipped"
+
+
+def test_text_edit_reruns_latex_without_bibtex(tmp_path: Path):
+    project_dir, cache_dir, fake = _project(tmp_path)
+    _build(project_dir, cache_dir, fake)
+    (project_dir / "main.tex").write_text("hello world cite:a", encoding="utf-8")
+
+    report = _build(project_dir, cache_dir, fake)
+
+    assert fake.calls == ["xelatex", "xelatex"]
+    assert report.bib_status == "skipped"
+
+
+def test_new_citation_or_bib_change_reruns_bibtex(tmp_path: Path):
+    project_dir, cache_dir, fake = _project(tmp_path)
+    _build(project_dir, cache_dir, fake)
+
+    (project_dir / "main.tex").write_text("hello cite:a cite:b", encoding="utf-8")
+    assert _build(project_dir, cache_dir, fake).bib_status == "ran"
+
+    (project_dir / "references" / "refs.bib").write_text("@article{a}\n@article{b}\n", encoding="utf-8")
+    assert _build(project_dir, cache_dir, fake).bib_status == "ran"
+    assert "\\citation{b}" in (cache_dir / "main.bbl").read_text(encoding="utf-8")
+
+
+def test_non_converging_document_stops_at_max_passes(tmp_path: Path):
+    project_dir, cache_dir, fake = _project(tmp_path)
+    fake.unstable = True
+
+    report = _build(project_dir, cache_dir, fake)
+
+    assert report.latex_runs == driver.DEFAULT_MAX_PASSES
+    assert not report.converged
+
+
+def test_parse_fls_inputs_skips_outputs_and_missing_files(tmp_path: Path):
+    (tmp_path / "main.tex").write_text("x", encoding="utf-8")
+    (tmp_path / "main.aux").write_text("x", encoding="utf-8")
+    fls = tmp_path / "main.fls"
+    fls.write_text(
+        f"PWD {tmp_path}\nINPUT main.tex\nINPUT main.aux\nOUTPUT main.aux\nINPUT missing.sty\nINPUT main.tex\n",
+        encoding="utf-8",
+    )
+
+    assert driver.parse_fls_inputs(fls) == [tmp_path / "main.tex"]
+
+
+def test_manifest_skips_up_to_date_build(tmp_path: Path):
+    project_dir, cache_dir, fake = _project(tmp_path)
+    _build(project_dir, cache_dir, fake, force=False)
+    assert (cache_dir / "main.manifest.json").exists()
+
+    report = _build(project_dir, cache_dir, fake, force=False)
+    assert report.up_to_date and fake.calls == []
+
+    (project_dir / "main.tex").touch()
+    assert _build(project_dir, cache_dir, fake, force=False).up_to_date
+
+
+def test_manifest_detects_input_bib_and_environment_changes(tmp_path: Path):
+    project_dir, cache_dir, fake = _project(tmp_path)
+    _build(project_dir, cache_dir, fake, force=False)
+
+    (project_dir / "main.tex").write_text("hello there cite:a", encoding="utf-8")
+    assert not _build(project_dir, cache_dir, fake, force=False).up_to_date
+
+    (project_dir / "references" / "refs.bib").write_text("@article{a,title={x}}\n", encoding="utf-8")
+    assert _build(project_dir, cache_dir, fake, force=False).bib_status == "ran"
+
+    report = _build(project_dir, cache_dir, fake, force=False, env={"TEXINPUTS": "/elsewhere//:"})
+    assert not report.up_to_date
+    assert _build(project_dir, cache_dir, fake, force=False, env={"TEXINPUTS": "/elsewhere//:"}).up_to_date
+
+
+def test_failed_build_does_not_record_manifest(tmp_path: Path):
+    project_dir, cache_dir, fake = _project(tmp_path)
+    fake.unstable = True
+
+    _build(project_dir, cache_dir, fake, force=False)
+
+    assert not (cache_dir / "main.manifest.json").exists()
+
+
+def test_preamble_prefix_stops_at_first_non_package_statement(tmp_path: Path):
+    source = tmp_path / "main.tex"
+    source.write_text(
+        "%!TEX program = xelatex\n\n\\documentclass[12pt]{ctexart} % 注释\n"
+        "\\usepackage[x]{foo}\n\\usepackage{bar}\\def\\x{}\n\\usepackage{baz}\n",
+        encoding="utf-8",
+    )
+
+    assert driver.preamble_prefix(source) == ["\\documentclass[12pt]{ctexart}", "\\usepackage[x]{foo}"]
+
+    source.write_text("\\RequirePackage{a}\n\\documentclass{article}\n", encoding="utf-8")
+    assert driver.preamble_prefix(source) == []
+
+
+def _format_project(tmp_path: Path, preamble: str) -> tuple[Path, Path, FakeTeX, driver.PreambleFormat]:
+    project_dir, cache_dir, fake = _project(tmp_path)
+    (project_dir / "demo.cls").write_text("% v1\n", encoding="utf-8")
+    (project_dir / "main.tex").write_text(preamble + "\\begin{document}\nhello cite:a\n", encoding="utf-8")
+    return project_dir, cache_dir, fake, driver.PreambleFormat(project_dir / "main.tex")
+
+
+def test_preamble_format_is_dumped_once_and_reused(tmp_path: Path):
+    project_dir, cache_dir, fake, spec = _format_project(tmp_path, "\\documentclass{demo}\n\\usepackage{tikz}\n")
+
+    report = _build(project_dir, cache_dir, fake, force=False, preamble_format=spec)
+    assert report.format_status == "dumped"
+    assert fake.calls[0] == "dump"
+    fmt_arg = f"-fmt={cache_dir / driver.FORMAT_DIRNAME / 'main'}"
+    assert set(fake.formats) == {fmt_arg}
+
+    report = _build(project_dir, cache_dir, fake, force=False, preamble_format=spec)
+    assert report.format_status == "reused" and "dump" not in fake.calls
+
+    (project_dir / "demo.cls").write_text("% v2\n", encoding="utf-8")
+    assert _build(project_dir, cache_dir, fake, force=False, preamble_format=spec).format_status == "dumped"
+
+    (project_dir / "main.tex").write_text("\\documentclass{demo}\n\\begin{document}\nhello\n", encoding="utf-8")
+    assert _build(project_dir, cache_dir, fake, force=False, preamble_format=spec).format_status == "dumped"
+
+
+def test_preamble_format_drops_font_packages_then_gives_up(tmp_path: Path):
+    project_dir, cache_dir, fake, spec = _format_project(
+        tmp_path, "\\documentclass{demo}\n\\usepackage{tikz}\n\\usepackage{fontpkg}\n"
+    )
+
+    report = _build(project_dir, cache_dir, fake, force=False, preamble_format=spec)
+    assert report.format_status == "dumped"
+    assert [record.label for record in report.format_passes] == [
+        "format dump (3/3 preamble lines)",
+        "format dump (2/3 preamble lines)",
+    ]
+    assert "fontpkg" not in (cache_dir / driver.FORMAT_DIRNAME / "main.fmt").read_text(encoding="utf-8")
+
+    (project_dir / "main.tex").write_text("\\documentclass{fontpkg}\n\\begin{document}\n", encoding="utf-8")
+    report = _build(project_dir, cache_dir, fake, force=False, preamble_format=spec)
+    assert report.format_status == "unavailable" and set(fake.formats) == {None}
+    report = _build(project_dir, cache_dir, fake, force=False, preamble_format=spec)
+    assert report.format_status == "unavailable" and "dump" not in fake.calls
+
+
+def test_package_copies_match_canonical_driver():
+    messages = sync_build_driver.sync_driver(check_only=True)
+
+    assert len(messages) == len(sync_build_driver.DRIVER_PACKAGES)
+    assert all(message.startswith("OK ") for message in messages)
@@ -25,6 +25,8 @@ except ImportError:
     print("请运行: pip install PyMuPDF")
     sys.exit(1)
 
+from scripts.core.pdf_structure import load_pdf_structure
+
 # 导入 WorkspaceManager
 try:
     from scripts.core.workspace_manager import WorkspaceManager
@@ -49,7 +51,7 @@ def extract_color_info(color):
 
 def analyze_pdf_fonts(pdf_path):
     """分析 PDF 中的字体使用情况"""
-    doc = fitz.open(pdf_path)
+    structure = load_pdf_structure(pdf_path)
 
     font_stats = defaultdict(lambda: {
         "count": 0,
@@ -58,9 +60,8 @@ def analyze_pdf_fonts(pdf_path):
         "flags": set()
     })
 
-    for page_num in range(len(doc)):
-        page = doc[page_num]
-        blocks = page.get_text("dict")["blocks"]
+    for page in structure.pages:
+        blocks = page["blocks"]
 
         for block in blocks:
             if "lines" not in block:
@@ -89,25 +90,22 @@ def analyze_pdf_fonts(pdf_path):
             "is_bold": bool(2**4 in stats["flags"])  # 16 = bold
         }
 
-    doc.close()
     return result
 
 def analyze_page_layout(pdf_path):
     """分析页面布局信息"""
-    doc = fitz.open(pdf_path)
-    page = doc[0]  # 分析第一页
+    structure = load_pdf_structure(pdf_path)
+    page = structure.page(0)  # 分析第一页
 
     # 获取页面尺寸
-    rect = page.rect
-    width_pt = rect.width
-    height_pt = rect.height
+    width_pt, height_pt = structure.page_size(0)
 
     # 转换为 cm (1 pt = 0.0352778 cm)
     width_cm = round(width_pt * 0.0352778, 2)
     height_cm = round(height_pt * 0.0352778, 2)
 
     # 分析文本边界来确定边距
-    blocks = page.get_text("dict")["blocks"]
+    blocks = page["blocks"]
     if blocks:
         # 找到文本块的边界
         text_left = min(b["bbox"][0] for b in blocks if "lines" in b)
@@ -123,8 +121,6 @@ def analyze_page_layout(pdf_path):
     else:
         margin_left = margin_right = margin_top = margin_bottom = None
 
-    doc.close()
-
     return {
         "page_size_cm": (width_cm, height_cm),
         "margins_cm": {
@@ -137,9 +133,7 @@ def analyze_page_layout(pdf_path):
 
 def analyze_line_spacing(pdf_path, page_num=0):
     """分析行距"""
-    doc = fitz.open(pdf_path)
-    page = doc[page_num]
-    blocks = page.get_text("dict")["blocks"]
+    blocks = load_pdf_structure(pdf_path).page(page_num)["blocks"]
 
     line_heights = []
 
@@ -165,7 +159,6 @@ def analyze_line_spacing(pdf_path, page_num=0):
     else:
         avg_line_spacing = 0
 
-    doc.close()
     return round(avg_line_spacing, 2)
 
 def main():
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+段落匹配基准测试
+
+对比 core.paragraph_alignment 中的索引匹配（match_paragraphs）与旧版贪心匹配
+（match_paragraphs_greedy，默认 max_candidates=50）的耗时与输出差异。
+
+使用方法:
+    # 合成数据：3 页 × 每页 100 段，目标侧含改写/删除/插入/乱序
+    python scripts/benchmark_paragraph_matching.py
+
+    # 真实数据：两份 extract_paragraphs.py 输出
+    python scripts/benchmark_paragraph_matching.py --baseline-json base.json --target-json out.json
+
+结果同时写入 output/benchmark_paragraph_matching.json。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.paragraph_alignment import Paragraph, match_paragraphs, match_paragraphs_greedy  # noqa: E402
+
+
+_VOCAB = (
+    "研究 方法 模型 数据 实验 结果 分析 系统 参数 优化 基金 项目 创新 目标 内容 技术 路线 "
+    "可行性 基础 条件 团队 预期 成果 指标 风险 应对 the of model data method result analysis"
+).split()
+
+
+def synthetic_pages(pages: int, per_page: int, seed: int) -> Tuple[List[Paragraph], List[Paragraph]]:
+    """合成基准/目标段落：约 70% 原样、15% 轻微改写、5% 删除、新增少量插入段，并打乱顺序"""
+    rng = random.Random(seed)
+    baseline: List[Paragraph] = []
+    target: List[Paragraph] = []
+    for page in range(1, pages + 1):
+        texts = [" ".join(rng.choice(_VOCAB) for _ in range(rng.randint(4, 60))) for _ in range(per_page)]
+        # 模板中常见的重复短段（如“（1）”“参考文献”），考验一对一分配
+        for k in range(0, per_page, 17):
+            texts[k] = "（一）研究内容"
+        variants: List[str] = []
+        for text in texts:
+            r = rng.random()
+            if r < 0.70:
+                variants.append(text)
+            elif r < 0.85:
+                words = text.split()
+                words[rng.randrange(len(words))] = rng.choice(_VOCAB)
+                variants.append(" ".join(words))
+            elif r < 0.95:
+                variants.append(text + " " + rng.choice(_VOCAB))
+        variants.extend(" ".join(rng.choice(_VOCAB) for _ in range(20)) for _ in range(per_page // 10))
+        rng.shuffle(variants)
+
+        for i, text in enumerate(texts, 1):
+            baseline.append(Paragraph(page, i, text, (72.0, 20.0 * i, 520.0, 20.0 * i + 12), 1, [], "body"))
+        for i, text in enumerate(variants, 1):
+            target.append(Paragraph(page, i, text, (72.0, 20.0 * i, 520.0, 20.0 * i + 12), 1, [], "body"))
+    return baseline, target
+
+
+def _time(fn: Callable[[], Any], repeat: int) -> Tuple[float, Any]:
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def _pairs(matches: List[Dict[str, Any]]) -> Dict[Tuple[int, int], Tuple[int, float]]:
+    return {
+        (int(m["page_num"]), int(m["baseline"]["paragraph_id"])): (
+            int(m["target"]["paragraph_id"]),
+            float(m["text_similarity"]),
+        )
+        for m in matches
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="段落匹配基准测试（索引匹配 vs 旧版贪心匹配）")
+    parser.add_argument("--baseline-json", type=Path, help="基准段落 JSON（extract_paragraphs.py 输出）")
+    parser.add_argument("--target-json", type=Path, help="目标段落 JSON（extract_paragraphs.py 输出）")
+    parser.add_argument("--pages", type=int, default=3, help="合成数据页数（默认 3）")
+    parser.add_argument("--per-page", type=int, default=100, help="合成数据每页段落数（默认 100）")
+    parser.add_argument("--seed", type=int, default=7, help="合成数据随机种子")
+    parser.add_argument("--min-similarity", type=float, default=0.85, help="文本相似度阈值")
+    parser.add_argument("--repeat", type=int, default=3, help="每种实现重复次数（取中位数）")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path(__file__).parent.parent / "output" / "benchmark_paragraph_matching.json",
+        help="结果 JSON 路径",
+    )
+    args = parser.parse_args()
+
+    if args.baseline_json and args.target_json:
+        from match_paragraphs import _load_paragraphs, to_paragraphs
+
+        baseline = to_paragraphs(_load_paragraphs(args.baseline_json))
+        target = to_paragraphs(_load_paragraphs(args.target_json))
+        source = {"baseline": str(args.baseline_json), "target": str(args.target_json)}
+    else:
+        baseline, target = synthetic_pages(args.pages, args.per_page, args.seed)
+        source = {"synthetic": {"pages": args.pages, "per_page": args.per_page, "seed": args.seed}}
+
+    ms = float(args.min_similarity)
+    legacy_s, legacy = _time(lambda: match_paragraphs_greedy(baseline, target, ms), args.repeat)
+    indexed_s, indexed = _time(lambda: match_paragraphs(baseline, target, ms), args.repeat)
+
+    old_pairs = _pairs(legacy)
+    new_pairs = _pairs(indexed)
+    same = sum(1 for k, v in new_pairs.items() if old_pairs.get(k, (None,))[0] == v[0])
+    result = {
+        "generated_at": datetime.now().isoformat(),
+        "source": source,
+        "baseline_paragraphs": len(baseline),
+        "target_paragraphs": len(target),
+        "min_similarity": ms,
+        "legacy": {
+            "seconds": legacy_s,
+            "matches": len(legacy),
+            "total_similarity": sum(v[1] for v in old_pairs.values()),
+        },
+        "indexed": {
+            "seconds": indexed_s,
+            "matches": len(indexed),
+            "total_similarity": sum(v[1] for v in new_pairs.values()),
+        },
+        "speedup": (legacy_s / indexed_s) if indexed_s else None,
+        "identical_pairs": same,
+        "only_in_indexed": len(set(new_pairs) - set(old_pairs)),
+        "only_in_legacy": len(set(old_pairs) - set(new_pairs)),
+        "reassigned": sum(1 for k in set(new_pairs) & set(old_pairs) if new_pairs[k][0] != old_pairs[k][0]),
+    }
+
+    print("=== 段落匹配基准测试 ===")
+    print(f"段落数: 基准 {len(baseline)} / 目标 {len(target)}，阈值 {ms}")
+    print(f"旧版贪心: {legacy_s * 1000:.1f} ms，匹配 {len(legacy)} 对")
+    print(f"索引匹配: {indexed_s * 1000:.1f} ms，匹配 {len(indexed)} 对")
+    if result["speedup"]:
+        print(f"加速比: {result['speedup']:.1f}x")
+    print(
+        f"相同配对 {same}，仅索引匹配 {result['only_in_indexed']}，仅旧版 {result['only_in_legacy']}，"
+        f"重新分配 {result['reassigned']}"
+    )
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"✅ 结果已保存: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
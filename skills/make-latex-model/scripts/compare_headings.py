@@ -20,7 +20,7 @@ import json
 import re
 import sys
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import warnings
 
@@ -438,16 +438,28 @@ def extract_from_word(doc_file: Path, check_format: bool = False) -> Dict[str, a
     return headings
 
 
-def extract_from_pdf(pdf_file: Path, check_format: bool = False) -> Dict[str, any]:
-    """从 PDF 中提取标题文字（可选：加粗片段、换行点）。"""
+def extract_from_pdf(pdf_file: Path, check_format: bool = False,
+                     cache_dir: Optional[Path] = None) -> Dict[str, any]:
+    """从 PDF 中提取标题文字（可选：加粗片段、换行点）；指定 cache_dir 时按 PDF 内容哈希缓存结果。"""
     try:
         from extract_headings_from_pdf import extract_headings_from_pdf
     except Exception as e:
         raise RuntimeError(f"无法导入 extract_headings_from_pdf.py: {e}")
-    return extract_headings_from_pdf(pdf_file, check_format=check_format)
+    if cache_dir is None:
+        return extract_headings_from_pdf(pdf_file, check_format=check_format)
 
+    from core.raster_cache import RasterCache
 
-def extract_from_source(source_file: Path, check_format: bool = False) -> Dict[str, any]:
+    return RasterCache(cache_dir).cached_meta(
+        pdf_file,
+        "headings",
+        {"check_format": bool(check_format)},
+        lambda: extract_headings_from_pdf(pdf_file, check_format=check_format),
+    )
+
+
+def extract_from_source(source_file: Path, check_format: bool = False,
+                        cache_dir: Optional[Path] = None) -> Dict[str, any]:
     """
     从基准源提取标题（推荐：PDF；兼容：DOCX）。
 
@@ -457,7 +469,7 @@ def extract_from_source(source_file: Path, check_format: bool = False) -> Dict[s
     """
     suf = source_file.suffix.lower()
     if suf == ".pdf":
-        return extract_from_pdf(source_file, check_format=check_format)
+        return extract_from_pdf(source_file, check_format=check_format, cache_dir=cache_dir)
     if suf == ".docx":
         return extract_from_word(source_file, check_format=check_format)
     raise ValueError(f"不支持的基准文件格式: {source_file}")
@@ -1394,12 +1406,14 @@ def main():
     parser.add_argument('--check-format', action='store_true',
                        help='检查格式（加粗）是否一致（默认仅检查文本）')
     parser.add_argument('--fix-file', type=Path, help='输出 LaTeX 修复建议文件路径')
+    parser.add_argument('--cache-dir', type=Path, help='基准 PDF 标题提取结果缓存目录（通常为工作空间 cache/）')
 
     args = parser.parse_args()
 
     # 提取标题
     print(f'📖 正在提取基准标题: {args.source_file}')
-    word_headings = extract_from_source(args.source_file, check_format=args.check_format)
+    word_headings = extract_from_source(args.source_file, check_format=args.check_format,
+                                        cache_dir=args.cache_dir)
 
     print(f'📖 正在提取 LaTeX 标题: {args.latex_file}')
     latex_headings = extract_from_latex(args.latex_file, check_format=args.check_format)
@@ -31,6 +31,8 @@ def main() -> int:
     parser.add_argument("--min-similarity", type=float, default=0.85, help="段落文本匹配阈值")
     parser.add_argument("--page", type=int, default=None, help="仅对比指定页（1-based）")
     parser.add_argument("--output", "-o", type=Path, required=True, help="输出 JSON")
+    parser.add_argument("--previous-fingerprints", type=Path, help="上一轮的页面指纹 JSON；指纹未变化的页面复用其段落指标")
+    parser.add_argument("--fingerprints-out", type=Path, help="保存本轮页面指纹与逐页段落指标")
 
     args = parser.parse_args()
     if not args.baseline_pdf.exists() or not args.target_pdf.exists():
@@ -44,11 +46,30 @@ def main() -> int:
         match_paragraphs,
     )
 
+    # 页面指纹：未变化的目标页面复用上一轮的逐段指标（单页对比时不启用）
+    fingerprints = None
+    fp_context: Dict[str, Any] = {}
+    reused: Dict[int, Any] = {}
+    if (args.fingerprints_out or args.previous_fingerprints) and args.page is None:
+        from core.page_fingerprint import compute_fingerprints, load_reusable_metrics
+        from core.raster_cache import RasterCache
+
+        fingerprints = compute_fingerprints(args.target_pdf)
+        fp_context = {
+            "mode": "paragraph_images",
+            "baseline_digest": RasterCache.pdf_digest(args.baseline_pdf),
+            "dpi": int(args.dpi),
+            "tolerance": int(args.tolerance),
+            "min_similarity": float(args.min_similarity),
+        }
+        reused = load_reusable_metrics(args.previous_fingerprints, fp_context, fingerprints)
+    dirty_pages = [fp.page_num for fp in fingerprints if fp.page_num not in reused] if fingerprints else None
+
     baseline_paras = extract_paragraphs_from_pdf(
         args.baseline_pdf, dpi=args.dpi, page_num=args.page, include_images=True
     )
     target_paras = extract_paragraphs_from_pdf(
-        args.target_pdf, dpi=args.dpi, page_num=args.page, include_images=True
+        args.target_pdf, dpi=args.dpi, page_num=args.page, include_images=True, pages=dirty_pages
     )
 
     matches = match_paragraphs(
@@ -59,24 +80,12 @@ def main() -> int:
     bmap: Dict[Tuple[int, int], Any] = {(p.page_num, p.paragraph_id): p for p in baseline_paras}
     tmap: Dict[Tuple[int, int], Any] = {(p.page_num, p.paragraph_id): p for p in target_paras}
 
-    per_match: List[Dict[str, Any]] = []
-    x0_diffs: List[float] = []
-    y0_diffs: List[float] = []
-    gap_diffs: List[float] = []
-    internal_vars: List[float] = []
-
-    # 先按 baseline 段落顺序排序，方便计算 gap 差异
-    matches_sorted = sorted(
+    # 逐页计算：段落匹配与 gap 差异都限定在同一页内，页面之间互不影响
+    page_metrics: Dict[int, Dict[str, Any]] = {}
+    for m in sorted(
         matches,
         key=lambda m: (int(m.get("page_num") or 1), float(m["baseline"]["bbox"][1]), int(m["baseline"]["paragraph_id"])),
-    )
-
-    prev_b = None
-    prev_t = None
-    total_weight = 0
-    weighted_sum = 0.0
-
-    for m in matches_sorted:
+    ):
         page_num = int(m.get("page_num") or 1)
         b_id = int(m["baseline"]["paragraph_id"])
         t_id = int(m["target"]["paragraph_id"])
@@ -85,9 +94,8 @@ def main() -> int:
         if b is None or t is None:
             continue
 
+        pm = page_metrics.setdefault(page_num, {"matches": [], "gap_diffs": [], "_prev": None})
         ratio, diff_pixels, total_pixels = image_diff_ratio(b.image_rgb, t.image_rgb, tolerance=int(args.tolerance))
-        total_weight += total_pixels
-        weighted_sum += ratio * float(total_pixels)
 
         pos_diff = {
             "x0": float(t.bbox[0] - b.bbox[0]),
@@ -95,20 +103,19 @@ def main() -> int:
             "x1": float(t.bbox[2] - b.bbox[2]),
             "y1": float(t.bbox[3] - b.bbox[3]),
         }
-        x0_diffs.append(pos_diff["x0"])
-        y0_diffs.append(pos_diff["y0"])
 
         iv_b = compute_internal_variance(b)
         iv_t = compute_internal_variance(t)
-        internal_vars.append((float(iv_b["line_height_variance"]) + float(iv_t["line_height_variance"])) / 2.0)
 
-        if prev_b is not None and prev_t is not None and b.page_num == prev_b.page_num and t.page_num == prev_t.page_num:
-            b_gap = float(b.bbox[1] - prev_b.bbox[3])
-            t_gap = float(t.bbox[1] - prev_t.bbox[3])
-            gap_diffs.append(t_gap - b_gap)
-        prev_b, prev_t = b, t
+        if pm["_prev"] is not None:
+            prev_b, prev_t = pm["_prev"]
+            if t.page_num == prev_t.page_num:
+                b_gap = float(b.bbox[1] - prev_b.bbox[3])
+                t_gap = float(t.bbox[1] - prev_t.bbox[3])
+                pm["gap_diffs"].append(t_gap - b_gap)
+        pm["_prev"] = (b, t)
 
-        per_match.append(
+        pm["matches"].append(
             {
                 "page_num": page_num,
                 "baseline_paragraph_id": b.paragraph_id,
@@ -124,6 +131,34 @@ def main() -> int:
                 },
             }
         )
+    for pm in page_metrics.values():
+        pm.pop("_prev", None)
+
+    if fingerprints is not None:
+        for page_num in dirty_pages:
+            page_metrics.setdefault(page_num, {"matches": [], "gap_diffs": []})
+        page_metrics.update(reused)
+        if args.fingerprints_out:
+            from core.page_fingerprint import save_fingerprints
+
+            save_fingerprints(args.fingerprints_out, fp_context, fingerprints, page_metrics, sorted(reused))
+
+    # 汇总（按页序拼接）
+    per_match: List[Dict[str, Any]] = []
+    gap_diffs: List[float] = []
+    for page_num in sorted(page_metrics):
+        per_match.extend(page_metrics[page_num]["matches"])
+        gap_diffs.extend(page_metrics[page_num]["gap_diffs"])
+
+    x0_diffs = [float(m["position_diff"]["x0"]) for m in per_match]
+    y0_diffs = [float(m["position_diff"]["y0"]) for m in per_match]
+    internal_vars = [
+        (float(m["internal_variance"]["baseline"]["line_height_variance"])
+         + float(m["internal_variance"]["target"]["line_height_variance"])) / 2.0
+        for m in per_match
+    ]
+    total_weight = sum(int(m["total_pixels"]) for m in per_match)
+    weighted_sum = sum(float(m["pixel_diff_ratio"]) * float(m["total_pixels"]) for m in per_match)
 
     avg_ratio = (weighted_sum / float(total_weight)) if total_weight else 1.0
 
@@ -143,6 +178,7 @@ def main() -> int:
         "indent_variance": float(_variance(x0_diffs)),
         "avg_internal_line_variance": float(sum(internal_vars) / len(internal_vars)) if internal_vars else 0.0,
         "matches": per_match,
+        "reused_pages": sorted(reused),
     }
 
     args.output.parent.mkdir(parents=True, exist_ok=True)
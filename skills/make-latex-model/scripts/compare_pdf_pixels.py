@@ -11,6 +11,9 @@ PDF 像素对比工具
     # 生成 HTML 报告
     python scripts/compare_pdf_pixels.py baseline.pdf output.pdf --report diff_report.html
 
+    # 金字塔对比：36 DPI 整页初筛，只对差异区域按 --dpi 重新渲染
+    python scripts/compare_pdf_pixels.py baseline.pdf output.pdf --dpi 300 --pyramid
+
     # 只对比第一页
     python scripts/compare_pdf_pixels.py baseline.pdf output.pdf --page 1
 
@@ -19,16 +22,30 @@ PDF 像素对比工具
 
     # 生成差异热图
     python scripts/compare_pdf_pixels.py baseline.pdf output.pdf --heatmap diff.png
+
+    # 指定渲染进程数（默认自动；1 表示串行）
+    python scripts/compare_pdf_pixels.py baseline.pdf output.pdf --workers 4
+
+    # 缓存基准 PDF 的渲染结果（迭代优化时只渲染新的输出 PDF）
+    python scripts/compare_pdf_pixels.py baseline.pdf output.pdf --cache-dir .make_latex_model/cache
+
+    # 页面指纹：与上一轮指纹一致的页面复用上一轮指标，只对比脏页
+    python scripts/compare_pdf_pixels.py baseline.pdf output.pdf \
+        --previous-fingerprints iteration_001/page_fingerprints.json \
+        --fingerprints-out iteration_002/page_fingerprints.json
 """
 
 import argparse
+import hashlib
 import json
+import os
 import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Tuple, Dict
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 import numpy as np
 from datetime import datetime
-import io
 
 
 def check_dependencies():
@@ -48,51 +65,179 @@ def check_dependencies():
     return missing
 
 
-def pdf_to_page_images(pdf_path: Path, dpi: int = 150, page_num: int = None) -> List[np.ndarray]:
-    """
-    将 PDF 页面转换为图像数组
+def _page_indices(page_count: int, page_num: Optional[int] = None) -> List[int]:
+    """确定渲染的页面下标（0 起）；指定页码越界时退回第一页"""
+    if page_num is not None:
+        return [page_num - 1] if page_num <= page_count else [0]
+    return list(range(page_count))
 
-    Args:
-        pdf_path: PDF 文件路径
-        dpi: 分辨率
-        page_num: 页码（None 表示所有页面）
 
-    Returns:
-        图像数组列表
-    """
+def _samples_to_array(height: int, width: int, n: int, stride: int, samples: bytes) -> np.ndarray:
+    """直接以 pixmap 像素缓冲构造 (h, w, n) uint8 视图（无 PPM 编解码、无额外拷贝）"""
+    rows = np.frombuffer(samples, dtype=np.uint8).reshape(height, stride)
+    return rows[:, : width * n].reshape(height, width, n)
+
+
+def _render_page(doc, index: int, dpi: int) -> Tuple[int, int, int, int, bytes]:
+    import fitz
+
+    pix = doc[index].get_pixmap(matrix=fitz.Matrix(dpi / 72, dpi / 72), alpha=False)
+    return pix.height, pix.width, pix.n, pix.stride, pix.samples
+
+
+# 进程池 worker 内按路径复用已打开的文档（进程池随单次对比结束而销毁）
+_WORKER_DOCS: Dict[str, Any] = {}
+
+
+def _render_page_in_worker(pdf_path: str, index: int, dpi: int) -> Tuple[int, int, int, int, bytes]:
+    import fitz
+
+    doc = _WORKER_DOCS.get(pdf_path)
+    if doc is None:
+        doc = _WORKER_DOCS[pdf_path] = fitz.open(pdf_path)
+    return _render_page(doc, index, dpi)
+
+
+def _require_fitz():
     try:
         import fitz
     except ImportError:
         print("错误: 需要安装 PyMuPDF")
         print("安装命令: pip install PyMuPDF")
         sys.exit(1)
+    return fitz
+
+
+def default_workers() -> int:
+    """默认渲染进程数：CPU 核数，最多 4"""
+    return max(1, min(4, os.cpu_count() or 1))
 
+
+def iter_page_images(pdf_path: Path, dpi: int = 150, page_num: int = None) -> Iterator[np.ndarray]:
+    """
+    逐页惰性渲染 PDF，每次只持有当前页
+
+    Args:
+        pdf_path: PDF 文件路径
+        dpi: 分辨率
+        page_num: 页码（None 表示所有页面）
+
+    Yields:
+        (h, w, 3) uint8 图像数组（只读）
+    """
+    fitz = _require_fitz()
     doc = fitz.open(pdf_path)
-    images = []
+    try:
+        for index in _page_indices(len(doc), page_num):
+            yield _samples_to_array(*_render_page(doc, index, dpi))
+    finally:
+        doc.close()
 
-    # 确定页面范围
-    if page_num is not None:
-        pages = [page_num - 1] if page_num <= len(doc) else [0]
-    else:
-        pages = range(len(doc))
 
-    for page_num in pages:
-        page = doc[page_num]
+def pdf_to_page_images(pdf_path: Path, dpi: int = 150, page_num: int = None) -> List[np.ndarray]:
+    """
+    将 PDF 页面转换为图像数组
 
-        # 渲染为图像
-        mat = fitz.Matrix(dpi / 72, dpi / 72)
-        pix = page.get_pixmap(matrix=mat)
+    Args:
+        pdf_path: PDF 文件路径
+        dpi: 分辨率
+        page_num: 页码（None 表示所有页面）
 
-        # 转换为 numpy 数组
-        img_data = pix.tobytes("ppm")
-        from PIL import Image
-        img = Image.open(io.BytesIO(img_data))
-        img_array = np.array(img)
+    Returns:
+        图像数组列表
+    """
+    return list(iter_page_images(pdf_path, dpi, page_num))
+
+
+def page_pairs(baseline_pdf: Path, output_pdf: Path, page_num: int = None) -> List[Tuple[int, int]]:
+    """参与对比的 (基准页下标, 输出页下标) 列表，页数取两者较小值"""
+    fitz = _require_fitz()
+    with fitz.open(baseline_pdf) as doc:
+        baseline_pages = _page_indices(len(doc), page_num)
+    with fitz.open(output_pdf) as doc:
+        output_pages = _page_indices(len(doc), page_num)
+    return list(zip(baseline_pages, output_pages))
+
+
+def iter_page_pairs(
+    baseline_pdf: Path,
+    output_pdf: Path,
+    dpi: int = 150,
+    page_num: int = None,
+    workers: Optional[int] = None,
+    baseline_cache=None,
+    skip_pages: Optional[Set[int]] = None,
+) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """
+    按页惰性产出 (页码, 基准图像, 输出图像)，页数取两者较小值
 
-        images.append(img_array)
+    workers > 1 时两份 PDF 的页面在进程池中并行渲染，按页序产出；
+    同时在途的页对不超过 workers 对，峰值内存与总页数无关。
+    baseline_cache（core.raster_cache.RasterCache）命中时基准页直接从缓存映射，不再渲染。
+    skip_pages 中的页码（1-based）不渲染、不产出。
+    """
+    fitz = _require_fitz()
+    skip_pages = skip_pages or set()
+    pairs = [
+        (i, b_index, o_index)
+        for i, (b_index, o_index) in enumerate(page_pairs(baseline_pdf, output_pdf, page_num), 1)
+        if i not in skip_pages
+    ]
+    digest = baseline_cache.pdf_digest(baseline_pdf) if baseline_cache is not None else None
+
+    def _cached_baseline(index: int) -> Optional[np.ndarray]:
+        return baseline_cache.load_page(digest, index, dpi) if digest else None
+
+    def _baseline_from_samples(index: int, rendered) -> np.ndarray:
+        img = _samples_to_array(*rendered)
+        if digest:
+            baseline_cache.store_page(digest, index, dpi, img)
+        return img
+
+    workers = default_workers() if workers is None or workers <= 0 else workers
+    workers = min(workers, len(pairs))
+    if workers <= 1:
+        b_doc = fitz.open(baseline_pdf)
+        o_doc = fitz.open(output_pdf)
+        try:
+            for i, b_index, o_index in pairs:
+                img1 = _cached_baseline(b_index)
+                if img1 is None:
+                    img1 = _baseline_from_samples(b_index, _render_page(b_doc, b_index, dpi))
+                img2 = _samples_to_array(*_render_page(o_doc, o_index, dpi))
+                yield i, img1, img2
+        finally:
+            b_doc.close()
+            o_doc.close()
+        return
+
+    b_path, o_path = str(baseline_pdf), str(output_pdf)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        todo = iter(pairs)
+
+        def _submit_next() -> None:
+            item = next(todo, None)
+            if item is not None:
+                i, b_index, o_index = item
+                cached = _cached_baseline(b_index)
+                pending.append(
+                    (
+                        i,
+                        b_index,
+                        cached if cached is not None else pool.submit(_render_page_in_worker, b_path, b_index, dpi),
+                        pool.submit(_render_page_in_worker, o_path, o_index, dpi),
+                    )
+                )
 
-    doc.close()
-    return images
+        for _ in range(workers):
+            _submit_next()
+        while pending:
+            i, b_index, baseline, o_future = pending.popleft()
+            img1 = baseline if isinstance(baseline, np.ndarray) else _baseline_from_samples(b_index, baseline.result())
+            img2 = _samples_to_array(*o_future.result())
+            _submit_next()
+            yield i, img1, img2
 
 
 def compare_images(img1: np.ndarray, img2: np.ndarray, tolerance: int = 2) -> Tuple[float, np.ndarray]:
@@ -115,9 +260,16 @@ def compare_images(img1: np.ndarray, img2: np.ndarray, tolerance: int = 2) -> Tu
         img2_pil = img2_pil.resize((img1.shape[1], img1.shape[0]))
         img2 = np.array(img2_pil)
 
-    # 计算像素差异
-    diff = np.abs(img1.astype(int) - img2.astype(int))
-    diff_mask = np.any(diff > tolerance, axis=2)
+    # 计算像素差异（uint8 用 max-min 求绝对差，不做整型提升）
+    if img1.dtype == np.uint8 and img2.dtype == np.uint8:
+        diff = np.maximum(img1, img2)
+        diff -= np.minimum(img1, img2)
+    else:
+        diff = np.abs(img1.astype(np.int16) - img2.astype(np.int16))
+    # 逐通道比较后按位或（比在长度为 3 的末轴上做 np.any 归约快一个数量级）
+    diff_mask = diff[..., 0] > tolerance
+    for c in range(1, diff.shape[2]):
+        diff_mask |= diff[..., c] > tolerance
 
     # 计算差异比例
     total_pixels = diff_mask.size
@@ -127,45 +279,282 @@ def compare_images(img1: np.ndarray, img2: np.ndarray, tolerance: int = 2) -> Tu
     return changed_ratio, diff_mask
 
 
-def extract_diff_features(diff_mask: np.ndarray) -> Dict[str, float]:
+# 金字塔对比：待细化面积超过页面该比例时直接整页高分辨率渲染（逐区域裁剪渲染反而更慢）
+PYRAMID_FULL_REFINE = 0.6
+# 金字塔对比：粗分辨率差异格向外扩展的格数（覆盖高分辨率下的抗锯齿外溢）
+PYRAMID_PAD_CELLS = 3
+# 金字塔对比：变化元素边框向外扩展量（pt；字形越出 span 边框、描边线宽与抗锯齿外溢）
+PYRAMID_ELEMENT_PAD_PT = 1.5
+
+
+def _pixmap_size(page, dpi: int) -> Tuple[int, int]:
+    """整页渲染后的 (高, 宽)，不实际渲染"""
+    import fitz
+
+    irect = (page.rect * fitz.Matrix(dpi / 72, dpi / 72)).irect
+    return irect.height, irect.width
+
+
+def _render_clip(page, dpi: int, box: Tuple[int, int, int, int]) -> np.ndarray:
+    """按整页像素坐标 (x0, y0, x1, y1) 裁剪渲染；像素网格与整页渲染一致"""
+    import fitz
+
+    z = dpi / 72
+    r = page.rect
+    x0, y0, x1, y1 = box
+    clip = fitz.Rect(r.x0 + x0 / z, r.y0 + y0 / z, r.x0 + x1 / z, r.y0 + y1 / z)
+    pix = page.get_pixmap(matrix=fitz.Matrix(z, z), clip=clip, alpha=False)
+    return _samples_to_array(pix.height, pix.width, pix.n, pix.stride, pix.samples)
+
+
+def _runs(flags: np.ndarray) -> List[Tuple[int, int]]:
+    """布尔序列中连续 True 段的 [start, stop) 列表"""
+    padded = np.concatenate(([False], flags, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return list(zip(edges[0::2].tolist(), edges[1::2].tolist()))
+
+
+def _dilate(flags: np.ndarray, pad: int) -> np.ndarray:
+    out = flags.copy()
+    for k in range(1, pad + 1):
+        out[k:] |= flags[:-k]
+        out[:-k] |= flags[k:]
+    return out
+
+
+def coarse_refine_boxes(
+    coarse_mask: np.ndarray, scale: float, fine_shape: Tuple[int, int], pad: int = PYRAMID_PAD_CELLS
+) -> List[Tuple[int, int, int, int]]:
+    """
+    低分辨率差异掩码 → 高分辨率待细化矩形 (x0, y0, x1, y1)
+
+    差异行膨胀 pad 格（抗锯齿外溢）后按连续行分段，每段取差异列（同样膨胀）的范围，
+    再按分辨率比例向外取整映射到高分辨率像素坐标。
+    """
+    fine_h, fine_w = fine_shape
+    boxes: List[Tuple[int, int, int, int]] = []
+    for r0, r1 in _runs(_dilate(coarse_mask.any(axis=1), pad)):
+        cols = np.flatnonzero(_dilate(coarse_mask[r0:r1].any(axis=0), pad))
+        if cols.size == 0:
+            continue
+        c0, c1 = int(cols[0]), int(cols[-1]) + 1
+        boxes.append(
+            (
+                max(0, int(np.floor(c0 * scale))),
+                max(0, int(np.floor(r0 * scale))),
+                min(fine_w, int(np.ceil(c1 * scale))),
+                min(fine_h, int(np.ceil(r1 * scale))),
+            )
+        )
+    return [b for b in boxes if b[2] > b[0] and b[3] > b[1]]
+
+
+def _page_elements(page, blocks: List[Dict[str, Any]]) -> Dict[Any, List[Tuple[float, float, float, float]]]:
+    """
+    页面可见元素 → 边框列表（pt，页面坐标）
+
+    文字按 span（取自共享 PDF 结构层的 blocks）、图片按像素摘要、矢量路径与注释逐个取键；
+    键保留坐标原值，亚像素位移也视为变化。
+    """
+    elements: Dict[Any, List[Tuple[float, float, float, float]]] = {}
+
+    def _add(key: Any, bbox, pad: float = 0.0) -> None:
+        x0, y0, x1, y1 = (float(v) for v in bbox)
+        elements.setdefault(key, []).append((x0 - pad, y0 - pad, x1 + pad, y1 + pad))
+
+    for block in blocks:
+        for line in block.get("lines") or []:
+            for span in line.get("spans") or []:
+                key = (
+                    "text", span.get("text"), span.get("font"), span.get("size"), span.get("flags"),
+                    span.get("color"), tuple(span.get("bbox") or ()), tuple(span.get("origin") or ()),
+                )
+                _add(key, span["bbox"])
+    for image in page.get_image_info(hashes=True):
+        _add(("image", tuple(image["bbox"]), tuple(image["transform"]), image["digest"]), image["bbox"])
+    for path in page.get_drawings():
+        # seqno 是绘制序号：前面插入/删除元素会整体平移，不作为键
+        key = ("path", repr(sorted((k, repr(v)) for k, v in path.items() if k != "seqno")))
+        _add(key, path["rect"], float(path.get("width") or 0.0))
+    for annot in page.annots() or ():
+        _add(("annot", annot.type[0], tuple(annot.rect), repr(annot.colors), repr(annot.border)), annot.rect)
+    return elements
+
+
+def changed_element_cells(
+    b_page, b_blocks: List[Dict[str, Any]], o_page, o_blocks: List[Dict[str, Any]],
+    coarse_dpi: int, coarse_shape: Tuple[int, int],
+) -> np.ndarray:
+    """
+    两页元素集合的差集（计重数）所覆盖的粗分辨率格
+
+    只有变化的元素会改变像素；其边框外扩 PYRAMID_ELEMENT_PAD_PT 后映射到粗分辨率网格，
+    补足低分辨率渲染看不到的变化（亚像素位移、被量化掉的细线等）。
+    """
+    b_elements, o_elements = _page_elements(b_page, b_blocks), _page_elements(o_page, o_blocks)
+    cells = np.zeros(coarse_shape, dtype=bool)
+    z = coarse_dpi / 72.0
+    r = b_page.rect
+    pad = PYRAMID_ELEMENT_PAD_PT
+    for key in b_elements.keys() | o_elements.keys():
+        b_boxes, o_boxes = b_elements.get(key, []), o_elements.get(key, [])
+        if len(b_boxes) == len(o_boxes):
+            continue
+        for x0, y0, x1, y1 in b_boxes + o_boxes:
+            c0 = max(0, int(np.floor((x0 - pad - r.x0) * z)))
+            r0 = max(0, int(np.floor((y0 - pad - r.y0) * z)))
+            c1 = min(coarse_shape[1], int(np.ceil((x1 + pad - r.x0) * z)))
+            r1 = min(coarse_shape[0], int(np.ceil((y1 + pad - r.y0) * z)))
+            if c1 > c0 and r1 > r0:
+                cells[r0:r1, c0:c1] = True
+    return cells
+
+
+def iter_pyramid_page_diffs(
+    baseline_pdf: Path,
+    output_pdf: Path,
+    dpi: int = 150,
+    coarse_dpi: int = 36,
+    tolerance: int = 2,
+    coarse_tolerance: int = 0,
+    page_num: int = None,
+    baseline_cache=None,
+    skip_pages: Optional[Set[int]] = None,
+) -> Iterator[Tuple[int, float, np.ndarray, Dict[str, Any]]]:
+    """
+    金字塔（粗到细）逐页对比：产出 (页码, 差异比例, 高分辨率差异掩码, 细化信息)
+
+    先以 coarse_dpi 渲染整页并对比（coarse_tolerance 默认 0，任何像素变化都会被标记），
+    再并上两页元素集合的差异（文字 span、图片、矢量路径、注释）所覆盖的区域：低分辨率
+    看不到的亚像素位移与细线变化由后者兜底。只对这些区域（外扩 PYRAMID_PAD_CELLS 格）
+    按 dpi 裁剪渲染并以 tolerance 对比；区域外的元素两页完全相同，视为无差异。
+    裁剪渲染与整页渲染的像素网格一致，差异比例仍以整页高分辨率像素为分母。
+    页面尺寸不同、页面旋转、元素提取失败或待细化面积过大时整页高分辨率对比。
+    """
+    fitz = _require_fitz()
+    skip_pages = skip_pages or set()
+    pairs = [
+        (i, b_index, o_index)
+        for i, (b_index, o_index) in enumerate(page_pairs(baseline_pdf, output_pdf, page_num), 1)
+        if i not in skip_pages
+    ]
+    digest = baseline_cache.pdf_digest(baseline_pdf) if baseline_cache is not None else None
+    scale = dpi / float(coarse_dpi)
+    structures = None  # (基准, 输出) 的文本结构层：首次需要元素对比时载入（磁盘缓存，基准 PDF 跨轮复用）
+
+    def _baseline_full(b_page, index: int) -> np.ndarray:
+        img = baseline_cache.load_page(digest, index, dpi) if digest else None
+        if img is None:
+            img = _samples_to_array(*_render_page(b_page.parent, index, dpi))
+            if digest:
+                baseline_cache.store_page(digest, index, dpi, img)
+        return img
+
+    def _baseline_coarse(b_page, index: int) -> np.ndarray:
+        img = baseline_cache.load_page(digest, index, coarse_dpi) if digest else None
+        if img is None:
+            img = _samples_to_array(*_render_page(b_page.parent, index, coarse_dpi))
+            if digest:
+                baseline_cache.store_page(digest, index, coarse_dpi, img)
+        return img
+
+    with fitz.open(baseline_pdf) as b_doc, fitz.open(output_pdf) as o_doc:
+        for i, b_index, o_index in pairs:
+            b_page, o_page = b_doc[b_index], o_doc[o_index]
+            fine_shape = _pixmap_size(b_page, dpi)
+            info: Dict[str, Any] = {
+                "coarse_dpi": int(coarse_dpi),
+                "width": int(fine_shape[1]),
+                "height": int(fine_shape[0]),
+                "level": "full",
+                "boxes": [],
+                "refined_ratio": 1.0,
+            }
+
+            def _full() -> Tuple[float, np.ndarray]:
+                img2 = _samples_to_array(*_render_page(o_doc, o_index, dpi))
+                return compare_images(_baseline_full(b_page, b_index), img2, tolerance)
+
+            if fine_shape != _pixmap_size(o_page, dpi) or b_page.rotation or o_page.rotation:
+                ratio, mask = _full()
+                info["reason"] = "页面尺寸或旋转不同"
+                yield i, float(ratio), mask, info
+                continue
+
+            coarse_ratio, coarse_mask = compare_images(
+                _baseline_coarse(b_page, b_index),
+                _samples_to_array(*_render_page(o_doc, o_index, coarse_dpi)),
+                coarse_tolerance,
+            )
+            info["coarse_ratio"] = float(coarse_ratio)
+            try:
+                if structures is None:
+                    from core.pdf_structure import load_pdf_structure
+
+                    structures = load_pdf_structure(baseline_pdf), load_pdf_structure(output_pdf)
+                refine_cells = coarse_mask | changed_element_cells(
+                    b_page, structures[0].page(b_index)["blocks"], o_page, structures[1].page(o_index)["blocks"],
+                    coarse_dpi, coarse_mask.shape,
+                )
+            except Exception as e:
+                ratio, mask = _full()
+                info["reason"] = f"页面元素提取失败: {e}"
+                yield i, float(ratio), mask, info
+                continue
+            boxes = coarse_refine_boxes(refine_cells, scale, fine_shape)
+            page_area = float(fine_shape[0] * fine_shape[1])
+            refined_area = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in boxes)
+
+            if not boxes:
+                info.update({"level": "none", "refined_ratio": 0.0})
+                yield i, 0.0, np.zeros(fine_shape, dtype=bool), info
+                continue
+            if refined_area > PYRAMID_FULL_REFINE * page_area:
+                ratio, mask = _full()
+                yield i, float(ratio), mask, info
+                continue
+
+            cached = baseline_cache.load_page(digest, b_index, dpi) if digest else None
+            mask = np.zeros(fine_shape, dtype=bool)
+            for box in boxes:
+                x0, y0, x1, y1 = box
+                img1 = cached[y0:y1, x0:x1] if cached is not None else _render_clip(b_page, dpi, box)
+                img2 = _render_clip(o_page, dpi, box)
+                if img1.shape != img2.shape or img1.shape[:2] != (y1 - y0, x1 - x0):
+                    # 裁剪结果与预期网格不一致（罕见）：退回整页对比，保证口径
+                    ratio, mask = _full()
+                    info["reason"] = "裁剪渲染尺寸异常"
+                    break
+                _, sub = compare_images(img1, img2, tolerance)
+                mask[y0:y1, x0:x1] = sub
+            else:
+                info.update(
+                    {"level": "regions", "boxes": [list(b) for b in boxes], "refined_ratio": refined_area / page_area}
+                )
+                ratio = float(np.count_nonzero(mask)) / page_area
+            yield i, float(ratio), mask, info
+
+
+def extract_diff_features(diff_mask: np.ndarray, dpi: Optional[int] = None) -> Dict[str, Any]:
     """
     从差异掩码提取结构化特征（用于后续的根因推断）
+
+    行/列方差与上中下三区比例之外，还包括连通区域方向分布、条纹周期与
+    自上而下的趋势（见 core.diff_regions.analyze_diff_mask）。
     """
-    # 行/列方向差异强度（用于判断“水平条纹/垂直条纹”）
-    h, w = diff_mask.shape[:2]
-    row_sums = (np.sum(diff_mask, axis=1).astype(float) / max(1, w))
-    col_sums = (np.sum(diff_mask, axis=0).astype(float) / max(1, h))
-
-    row_variance = float(np.var(row_sums)) if row_sums.size else 0.0
-    col_variance = float(np.var(col_sums)) if col_sums.size else 0.0
-
-    # 上/中/下三区域差异比例
-    h = diff_mask.shape[0]
-    third = max(1, h // 3)
-    top = diff_mask[:third, :]
-    mid = diff_mask[third: 2 * third, :]
-    bot = diff_mask[2 * third:, :]
-
-    def _ratio(mask: np.ndarray) -> float:
-        return float(np.sum(mask)) / float(mask.size) if mask.size else 0.0
-
-    return {
-        "row_variance": row_variance,
-        "col_variance": col_variance,
-        "region_top_ratio": _ratio(top),
-        "region_middle_ratio": _ratio(mid),
-        "region_bottom_ratio": _ratio(bot),
-    }
-
-
-def generate_diff_heatmap(img1: np.ndarray, img2: np.ndarray, diff_mask: np.ndarray,
+    from core.diff_regions import analyze_diff_mask
+
+    return analyze_diff_mask(diff_mask, dpi)
+
+
+def generate_diff_heatmap(img1: np.ndarray, img2: Optional[np.ndarray], diff_mask: np.ndarray,
                           output_path: Path):
     """
     生成差异热图
 
     Args:
         img1: 第一个图像
-        img2: 第二个图像
+        img2: 第二个图像（热图只以第一个图像为底图，可为 None）
         diff_mask: 差异掩码
         output_path: 输出路径
     """
@@ -180,6 +569,32 @@ def generate_diff_heatmap(img1: np.ndarray, img2: np.ndarray, diff_mask: np.ndar
     img_pil.save(output_path)
 
 
+def _refinement_html(refinement: Optional[Dict[str, Any]]) -> str:
+    """金字塔对比的细化标记：页面缩略框中标出按高分辨率重新渲染的区域"""
+    if not refinement:
+        return ""
+    width = max(1, int(refinement.get("width") or 1))
+    height = max(1, int(refinement.get("height") or 1))
+    level = refinement.get("level")
+    if level == "none":
+        label = "初筛无差异，未细化"
+    elif level == "regions":
+        label = f"细化 {len(refinement.get('boxes') or [])} 个区域"
+    else:
+        label = "整页细化" + (f"（{refinement['reason']}）" if refinement.get("reason") else "")
+    boxes = ""
+    for x0, y0, x1, y1 in refinement.get("boxes") or []:
+        boxes += (
+            f'<div class="refine-box" style="left: {x0 / width:.2%}; top: {y0 / height:.2%}; '
+            f'width: {(x1 - x0) / width:.2%}; height: {(y1 - y0) / height:.2%};"></div>'
+        )
+    css_class = "page-map full" if level == "full" else "page-map"
+    return (
+        f'        <div class="{css_class}" style="aspect-ratio: {width} / {height};">{boxes}</div>\n'
+        f'        <p>{label}，高分辨率渲染面积 {float(refinement.get("refined_ratio", 0.0)):.1%}</p>\n'
+    )
+
+
 def generate_html_report(baseline_pdf: Path, output_pdf: Path, page_results: List[Dict],
                         report_path: Path):
     """生成 HTML 报告"""
@@ -246,6 +661,21 @@ def generate_html_report(baseline_pdf: Path, output_pdf: Path, page_results: Lis
             background: linear-gradient(90deg, #10b981 0%, #f59e0b 50%, #ef4444 100%);
             transition: width 0.3s;
         }}
+        .page-map {{
+            position: relative;
+            width: 160px;
+            border: 1px solid #d1d5db;
+            background: #fafafa;
+            margin: 10px 0;
+        }}
+        .page-map.full {{
+            background: rgba(102, 126, 234, 0.25);
+        }}
+        .refine-box {{
+            position: absolute;
+            background: rgba(102, 126, 234, 0.35);
+            border: 1px solid #667eea;
+        }}
     </style>
 </head>
 <body>
@@ -263,6 +693,19 @@ def generate_html_report(baseline_pdf: Path, output_pdf: Path, page_results: Lis
             <div class="value">{avg_diff:.2%}</div>
             <div>平均差异</div>
         </div>
+"""
+
+    refined = [r["refinement"] for r in page_results if r.get("refinement")]
+    if refined:
+        avg_refined = sum(float(r.get("refined_ratio", 0.0)) for r in refined) / len(refined)
+        html += f"""
+        <div class="stat-card">
+            <div class="value">{avg_refined:.1%}</div>
+            <div>高分辨率细化面积（{refined[0].get("coarse_dpi")} DPI 初筛）</div>
+        </div>
+"""
+
+    html += """
     </div>
 """
 
@@ -278,7 +721,7 @@ def generate_html_report(baseline_pdf: Path, output_pdf: Path, page_results: Lis
         </div>
         <p>差异比例: <strong>{diff_percent:.2f}%</strong></p>
         <p>差异像素: {result["diff_pixels"]} / {result["total_pixels"]}</p>
-    </div>
+{_refinement_html(result.get("refinement"))}    </div>
 """
 
     html += """
@@ -319,6 +762,28 @@ def main():
     parser.add_argument("--tolerance", type=int, default=2, help="像素容差（默认 2）")
     parser.add_argument("--dpi", type=int, default=150, help="渲染分辨率（默认 150）")
     parser.add_argument("--heatmap", type=Path, help="生成差异热图")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="整页模式的渲染进程数（默认 0=自动，最多 4；1=串行）",
+    )
+    parser.add_argument(
+        "--pyramid",
+        action="store_true",
+        help="整页模式的金字塔对比：低分辨率整页初筛并结合页面元素差异，只对差异区域按 --dpi 重新渲染",
+    )
+    parser.add_argument("--coarse-dpi", type=int, default=36, help="金字塔初筛分辨率（默认 36）")
+    parser.add_argument(
+        "--coarse-tolerance",
+        type=int,
+        default=0,
+        help="金字塔初筛容差（默认 0：任何像素变化都细化；调高更快但可能漏掉细微差异）",
+    )
+    parser.add_argument("--cache-dir", type=Path, help="基准 PDF 光栅/段落缓存目录（通常为工作空间 cache/）")
+    parser.add_argument("--cache-max-mb", type=float, default=512, help="缓存总大小上限（MB，默认 512）")
+    parser.add_argument("--previous-fingerprints", type=Path, help="上一轮的页面指纹 JSON；指纹未变化的页面复用其指标")
+    parser.add_argument("--fingerprints-out", type=Path, help="保存本轮页面指纹与逐页指标（供下一轮复用）")
     parser.add_argument("--json-out", type=Path, help="保存对比结果到 JSON（包含 avg_diff_ratio/pages）")
     parser.add_argument("--features-out", type=Path, help="保存差异特征到 JSON（用于 AI/启发式分析）")
 
@@ -343,6 +808,57 @@ def main():
     page_results = []
     page_features = []
 
+    baseline_cache = None
+    if args.cache_dir:
+        try:
+            from core.raster_cache import RasterCache
+
+            baseline_cache = RasterCache(args.cache_dir, max_size_mb=args.cache_max_mb)
+        except Exception as e:
+            print(f"警告: 无法启用基准缓存，将直接渲染: {e}")
+
+    # 页面指纹：与上一轮一致的输出页面复用上一轮指标，只对比脏页（单页对比时不启用）
+    fingerprints = None
+    fp_context = None
+    reused: Dict[int, Any] = {}
+    metrics_by_page: Dict[int, Any] = {}
+    reused_pages: List[int] = []
+    if (args.fingerprints_out or args.previous_fingerprints) and args.page is None:
+        try:
+            from core.page_fingerprint import compute_fingerprints, load_reusable_metrics
+            from core.raster_cache import RasterCache
+
+            fingerprints = compute_fingerprints(args.output_pdf)
+            fp_context = {
+                "mode": str(args.mode),
+                "baseline_digest": RasterCache.pdf_digest(args.baseline_pdf),
+                "dpi": int(args.dpi),
+                "tolerance": int(args.tolerance),
+                "min_similarity": float(args.min_similarity) if args.mode == "paragraph" else None,
+            }
+            if args.pyramid and args.mode == "page":
+                fp_context["pyramid"] = {
+                    "coarse_dpi": int(args.coarse_dpi),
+                    "coarse_tolerance": int(args.coarse_tolerance),
+                    # 细化区域口径（外扩格数 + 元素差异兜底）变化后，旧记录不可复用
+                    "pad_cells": PYRAMID_PAD_CELLS,
+                    "element_diff": True,
+                }
+            reused = load_reusable_metrics(args.previous_fingerprints, fp_context, fingerprints)
+        except Exception as e:
+            print(f"警告: 无法计算页面指纹，将对比全部页面: {e}")
+            fingerprints = None
+        if reused:
+            print(f"  未变化页面: {len(reused)} 页（复用上一轮指标）")
+
+    def _take_reused(page_num: int) -> None:
+        metrics = reused[page_num]
+        metrics_by_page[page_num] = metrics
+        reused_pages.append(page_num)
+        if metrics.get("result") is not None:
+            page_results.append(dict(metrics["result"], reused=True))
+            page_features.append(metrics["features"])
+
     if args.mode == "paragraph":
         print("\n🧩 正在逐段提取与匹配...")
         try:
@@ -356,11 +872,21 @@ def main():
             print(f"错误: 无法导入逐段对齐模块 core/paragraph_alignment.py: {e}")
             sys.exit(1)
 
-        baseline_paras = extract_paragraphs_from_pdf(
-            args.baseline_pdf, dpi=args.dpi, page_num=args.page, include_images=True
+        para_params = {"dpi": args.dpi, "page_num": args.page, "include_images": True}
+        baseline_paras = (
+            baseline_cache.load_paragraphs(args.baseline_pdf, **para_params) if baseline_cache else None
         )
+        if baseline_paras is None:
+            baseline_paras = extract_paragraphs_from_pdf(args.baseline_pdf, **para_params)
+            if baseline_cache:
+                baseline_cache.store_paragraphs(args.baseline_pdf, baseline_paras, **para_params)
+        else:
+            print("  基准段落: 命中缓存")
+        dirty_pages = None
+        if fingerprints is not None:
+            dirty_pages = [fp.page_num for fp in fingerprints if fp.page_num not in reused]
         output_paras = extract_paragraphs_from_pdf(
-            args.output_pdf, dpi=args.dpi, page_num=args.page, include_images=True
+            args.output_pdf, dpi=args.dpi, page_num=args.page, include_images=True, pages=dirty_pages
         )
 
         matches = match_paragraphs(
@@ -485,6 +1011,16 @@ def main():
                     "paragraphs": paragraph_details,
                 }
             )
+            metrics_by_page[int(page_num)] = {"result": page_results[-1], "features": page_features[-1]}
+
+        if fingerprints is not None:
+            # 脏页中没有匹配段落的页面也记录下来，下轮未变化时同样跳过
+            for page_num in dirty_pages:
+                metrics_by_page.setdefault(page_num, {"result": None, "features": None})
+            for page_num in sorted(reused):
+                _take_reused(page_num)
+            page_results.sort(key=lambda r: r["page_num"])
+            page_features.sort(key=lambda r: r["page_num"])
 
         num_pages = len(page_results)
         if num_pages == 0:
@@ -493,32 +1029,38 @@ def main():
 
         avg_diff = sum(r["changed_ratio"] for r in page_results) / len(page_results)
     else:
-        # 转换 PDF 为图像
+        # 逐页渲染并对比（页数取两者较小值）
         print("\n📖 正在渲染 PDF...")
-        baseline_images = pdf_to_page_images(args.baseline_pdf, args.dpi, args.page)
-        output_images = pdf_to_page_images(args.output_pdf, args.dpi, args.page)
-
-        # 确保页数相同
-        num_pages = min(len(baseline_images), len(output_images))
-        print(f"  对比页数: {num_pages}")
-        if num_pages == 0:
-            print("错误: 无可对比页面（PDF 可能为空或渲染失败）")
-            sys.exit(1)
-
-        # 对比每一页
-        for i in range(num_pages):
+        pairs = page_pairs(args.baseline_pdf, args.output_pdf, args.page)
+        num_pages = len(pairs)
+        skip_pages = {p for p in reused if p <= num_pages}
+        if args.pyramid:
+            print(f"  金字塔对比: {args.coarse_dpi} DPI 初筛 → {args.dpi} DPI 细化差异区域")
+            page_diffs = (
+                (page_no, ratio, mask, refinement, None, None)
+                for page_no, ratio, mask, refinement in iter_pyramid_page_diffs(
+                    args.baseline_pdf, args.output_pdf, args.dpi, args.coarse_dpi, args.tolerance,
+                    args.coarse_tolerance, args.page, baseline_cache, skip_pages,
+                )
+            )
+        else:
+            page_diffs = (
+                (page_no, *compare_images(img1, img2, args.tolerance), None, img1, img2)
+                for page_no, img1, img2 in iter_page_pairs(
+                    args.baseline_pdf, args.output_pdf, args.dpi, args.page, args.workers, baseline_cache, skip_pages
+                )
+            )
+        for page_no, changed_ratio, diff_mask, refinement, img1, img2 in page_diffs:
+            i = page_no - 1
             print(f"\n🔍 对比第 {i+1} 页...")
 
-            img1 = baseline_images[i]
-            img2 = output_images[i]
-
-            changed_ratio, diff_mask = compare_images(img1, img2, args.tolerance)
-
             diff_pixels = np.sum(diff_mask)
             total_pixels = diff_mask.size
 
             print(f"  差异比例: {changed_ratio:.2%}")
             print(f"  差异像素: {diff_pixels} / {total_pixels}")
+            if refinement is not None:
+                print(f"  细化: {refinement['level']}（高分辨率渲染面积 {refinement['refined_ratio']:.1%}）")
 
             page_results.append({
                 "page_num": i + 1,
@@ -526,28 +1068,54 @@ def main():
                 "diff_pixels": int(diff_pixels),
                 "total_pixels": int(total_pixels),
             })
+            if refinement is not None:
+                page_results[-1]["refinement"] = refinement
 
-            feats = extract_diff_features(diff_mask)
-            page_features.append(
-                {
-                    "page_num": i + 1,
-                    "changed_ratio": float(changed_ratio),
-                    "row_variance": float(feats["row_variance"]),
-                    "col_variance": float(feats["col_variance"]),
-                    "region_ratios": {
-                        "top": float(feats["region_top_ratio"]),
-                        "middle": float(feats["region_middle_ratio"]),
-                        "bottom": float(feats["region_bottom_ratio"]),
-                    },
-                }
-            )
+            feats = extract_diff_features(diff_mask, args.dpi)
+            page_feature = {
+                "page_num": i + 1,
+                "changed_ratio": float(changed_ratio),
+                "row_variance": float(feats["row_variance"]),
+                "col_variance": float(feats["col_variance"]),
+                "region_ratios": {
+                    "top": float(feats["region_top_ratio"]),
+                    "middle": float(feats["region_middle_ratio"]),
+                    "bottom": float(feats["region_bottom_ratio"]),
+                },
+            }
+            # 连通区域与条纹周期特征（DiffAnalyzer 优先使用）
+            for key in (
+                "row_trend", "row_period_pt", "row_periodicity", "col_period_pt", "col_periodicity",
+                "region_count", "horizontal_area_share", "vertical_area_share", "blob_area_share",
+                "largest_region_ratio", "regions",
+            ):
+                if key in feats:
+                    page_feature[key] = feats[key]
+            page_features.append(page_feature)
+            metrics_by_page[page_no] = {"result": page_results[-1], "features": page_features[-1]}
 
             # 生成热图
             if args.heatmap:
+                if img1 is None:
+                    # 金字塔模式只渲染了差异区域：热图底图单独整页渲染基准页（page_no 是对比序号，需换成基准页码）
+                    img1 = pdf_to_page_images(args.baseline_pdf, args.dpi, pairs[page_no - 1][0] + 1)[0]
                 heatmap_path = args.heatmap.parent / f"{args.heatmap.stem}_page{i+1}{args.heatmap.suffix}"
                 generate_diff_heatmap(img1, img2, diff_mask, heatmap_path)
                 print(f"  热图已保存: {heatmap_path}")
 
+        if baseline_cache:
+            baseline_cache.evict()
+
+        for page_no in sorted(skip_pages):
+            _take_reused(page_no)
+        page_results.sort(key=lambda r: r["page_num"])
+        page_features.sort(key=lambda r: r["page_num"])
+
+        print(f"\n  对比页数: {num_pages}（重新渲染 {num_pages - len(skip_pages)} 页）")
+        if num_pages == 0:
+            print("错误: 无可对比页面（PDF 可能为空或渲染失败）")
+            sys.exit(1)
+
         # 计算平均差异
         avg_diff = sum(r["changed_ratio"] for r in page_results) / len(page_results)
 
@@ -564,6 +1132,11 @@ def main():
     else:
         print("❌ 差异较大，需要仔细检查样式参数")
 
+    if fingerprints is not None and args.fingerprints_out:
+        from core.page_fingerprint import save_fingerprints
+
+        save_fingerprints(args.fingerprints_out, fp_context, fingerprints, metrics_by_page, reused_pages)
+
     # 生成报告
     if args.report:
         print(f"\n📄 正在生成 HTML 报告...")
@@ -581,6 +1154,7 @@ def main():
             "generated_at": datetime.now().isoformat(),
             "pages": page_results,
             "avg_diff_ratio": avg_diff,
+            "reused_pages": sorted(reused_pages),
         }
         args.json_out.parent.mkdir(parents=True, exist_ok=True)
         args.json_out.write_text(
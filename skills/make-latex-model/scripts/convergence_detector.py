@@ -33,6 +33,8 @@ try:
 except ImportError:
     WorkspaceManager = None
 
+from scripts.core.iteration_log import IterationLog, RunSummary
+
 
 class StopReason(Enum):
     """停止原因枚举"""
@@ -77,6 +79,29 @@ class ConvergenceDetector:
         # 加载配置文件
         self._load_config()
 
+        # 迭代日志（工作空间 history.sqlite3，与 EnhancedOptimizer/HistoryMemory 共用）
+        self.log: Optional[IterationLog] = None
+        if self.ws_manager:
+            self.log = IterationLog.for_workspace(self.ws_manager.get_project_workspace(self.project_name))
+            self._backfill_log()
+
+    def _backfill_log(self):
+        """日志中还没有迭代指标时，把已有的 iterations/*/metrics.json 一次性导入为一次运行"""
+        if self.log is None or self.log.latest_run("metrics") is not None:
+            return
+        legacy = self._load_metrics_files()
+        if not legacy:
+            return
+        run_id = self.log.start_run("metrics")
+        for metrics in legacy:
+            self.log.append(
+                "metrics",
+                metrics,
+                iteration=metrics.get("iteration"),
+                changed_ratio=metrics.get("changed_ratio"),
+                run_id=run_id,
+            )
+
     def _load_config(self):
         """从配置文件加载设置"""
         config_path = self.skill_root / "config.yaml"
@@ -115,11 +140,21 @@ class ConvergenceDetector:
 
     def load_all_iterations(self) -> List[Dict[str, Any]]:
         """
-        加载所有迭代的指标数据
+        加载最近一次优化运行的全部迭代指标（来自迭代日志，一次查询）
 
         Returns:
             指标数据列表
         """
+        if self.log is None:
+            return self._load_metrics_files()
+        return self.log.records("metrics")
+
+    def summary(self) -> Optional[RunSummary]:
+        """最近一次优化运行的增量汇总（最佳差异、连续无改善轮数等），无需读取历史记录"""
+        return self.log.summary("metrics") if self.log is not None else None
+
+    def _load_metrics_files(self) -> List[Dict[str, Any]]:
+        """逐个读取 iterations/*/metrics.json（仅用于导入旧工作空间）"""
         iterations = []
 
         if not self.ws_manager:
@@ -217,37 +252,37 @@ class ConvergenceDetector:
         """
         综合判断是否应该停止迭代
 
+        只读取最近一次运行的汇总（O(1)），current_metrics 在汇总上增量推演，不重新加载历史。
+
         Args:
             current_metrics: 当前指标（可选）
 
         Returns:
             (停止原因, 详细说明)
         """
-        # 加载所有迭代历史
-        iterations = self.load_all_iterations()
-        current_iteration = len(iterations)
+        summary = self.summary()
+        if summary is None:
+            summary = RunSummary(run_id="", kind="metrics", started_at="")
 
-        # 如果提供了当前指标，加入列表
+        # 如果提供了当前指标，在汇总上追加一轮
         if current_metrics:
-            iterations.append(current_metrics)
-            current_iteration += 1
+            summary = summary.advance(current_metrics.get("changed_ratio"))
+        current_iteration = summary.count
 
         # 检查 1：编译状态
         if current_metrics and current_metrics.get("compilation_failed"):
             return StopReason.COMPILATION_FAILED, "编译失败，立即停止"
 
-        # 检查 2：收敛阈值
-        if iterations:
-            latest = iterations[-1]
-            if "changed_ratio" in latest:
-                converged, msg = self.check_convergence(latest["changed_ratio"])
-                if converged:
-                    return StopReason.CONVERGED, msg
+        # 检查 2：收敛阈值（最新一轮）
+        if summary.last_ratio is not None:
+            converged, msg = self.check_convergence(summary.last_ratio)
+            if converged:
+                return StopReason.CONVERGED, msg
 
         # 检查 3：连续无改善
-        should_stop, no_imp_count = self.check_no_improvement(iterations)
-        if should_stop:
-            return StopReason.NO_IMPROVEMENT, f"连续 {no_imp_count} 轮无改善"
+        limit = self.config.get("no_improvement_limit", 3)
+        if summary.ratio_count >= 2 and summary.streak >= limit:
+            return StopReason.NO_IMPROVEMENT, f"连续 {summary.streak} 轮无改善"
 
         # 检查 4：最大迭代次数
         max_reached, msg = self.check_max_iterations(current_iteration)
@@ -263,8 +298,10 @@ class ConvergenceDetector:
         Returns:
             最佳迭代的指标数据
         """
-        iterations = self.load_all_iterations()
+        if self.log is not None:
+            return self.log.best("metrics")
 
+        iterations = self._load_metrics_files()
         if not iterations:
             return None
 
@@ -308,17 +345,26 @@ class ConvergenceDetector:
                 "timestamp": it.get("timestamp", None),
             })
 
-        # 提取所有 changed_ratio
+        # 汇总指标直接取自迭代日志的运行汇总
+        summary = self.summary()
         ratios = [it["changed_ratio"] for it in iterations if "changed_ratio" in it]
+        if summary is not None and summary.ratio_count:
+            initial, best, worst = summary.first_ratio, summary.best_ratio, summary.worst_ratio
+            final = ratios[-1]
+            best_num = summary.best_iteration or self._find_best_iteration_num(ratios)
+        elif ratios:
+            initial, final, best, worst = ratios[0], ratios[-1], min(ratios), max(ratios)
+            best_num = self._find_best_iteration_num(ratios)
 
         if ratios:
             report["summary"] = {
-                "initial_ratio": ratios[0],
-                "final_ratio": ratios[-1],
-                "best_ratio": min(ratios),
-                "worst_ratio": max(ratios),
-                "improvement": ratios[0] - ratios[-1],
-                "improvement_percent": (ratios[0] - ratios[-1]) / ratios[0] * 100 if ratios[0] > 0 else 0,
+                "initial_ratio": initial,
+                "final_ratio": final,
+                "best_ratio": best,
+                "worst_ratio": worst,
+                "best_iteration": best_num,
+                "improvement": initial - final,
+                "improvement_percent": (initial - final) / initial * 100 if initial > 0 else 0,
             }
 
             # 生成建议
@@ -327,11 +373,11 @@ class ConvergenceDetector:
             if stop_reason == StopReason.CONVERGED:
                 report["recommendation"] = f"✅ 优化已收敛: {msg}"
             elif stop_reason == StopReason.NO_IMPROVEMENT:
-                report["recommendation"] = f"⚠️ 建议停止: {msg}。最佳结果在迭代 {self._find_best_iteration_num(ratios)}"
+                report["recommendation"] = f"⚠️ 建议停止: {msg}。最佳结果在迭代 {best_num}"
             elif stop_reason == StopReason.MAX_ITERATIONS:
                 report["recommendation"] = f"⚠️ 已达上限: {msg}"
             else:
-                report["recommendation"] = f"💡 可以继续优化，当前最佳差异比例: {min(ratios):.4f}"
+                report["recommendation"] = f"💡 可以继续优化，当前最佳差异比例: {best:.4f}"
 
         return report
 
@@ -7,7 +7,7 @@ AI 驱动优化引擎（最小可用版）
 - Analyzer：DiffAnalyzer（基于像素对比特征）
 - Reasoner：DecisionReasoner（启发式 / 文件交互）
 - Executor：ParameterExecutor（可回滚应用）
-- Memory：HistoryMemory（JSONL 记录）
+- Memory：HistoryMemory（工作空间迭代日志 history.sqlite3）
 
 说明：
 - 由于“脚本内部直连宿主 AI”缺少通用标准接口，本实现默认启发式；
@@ -15,12 +15,14 @@ AI 驱动优化引擎（最小可用版）
 """
 
 from pathlib import Path
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from .diff_analyzer import DiffAnalyzer
 from .decision_reasoner import DecisionReasoner, ReasonerConfig
 from .parameter_executor import ParameterExecutor, ExecutionResult
+from .parameter_sweep import ParameterSweep
 from .history_memory import HistoryMemory
+from .iteration_log import IterationLog
 from .workspace_manager import WorkspaceManager
 
 
@@ -55,7 +57,7 @@ class AIOptimizer:
         )
 
         self.executor = ParameterExecutor(evaluate_after_apply=evaluate_after_apply)
-        self.memory = HistoryMemory(ws_dir / "cache" / "ai_memory.jsonl")
+        self.memory = HistoryMemory(ws_dir / "cache" / "ai_memory.jsonl", log=IterationLog.for_workspace(ws_dir))
 
     def optimize_iteration(
         self,
@@ -64,7 +66,14 @@ class AIOptimizer:
         config_path: Path,
         compile_func: Callable[[], bool],
         compare_func: Callable[[], Optional[float]],
+        sweep: Optional[ParameterSweep] = None,
     ) -> ExecutionResult:
+        """
+        执行一轮“分析→决策→应用→验证”
+
+        传入 sweep 时不再只试一个调整：由决策派生多组候选，在隔离副本中并行编译/对比，
+        只把最佳候选写回项目（compile_func/compare_func 不再调用）。
+        """
         features_path = self.workspace_dir / "iterations" / f"iteration_{iteration:03d}" / "diff_features.json"
         diff_context = self.analyzer.analyze(
             diff_ratio=current_ratio,
@@ -75,13 +84,17 @@ class AIOptimizer:
         history = self.memory.get_recent(n=5)
         decision = self.reasoner.reason(diff_context=diff_context, history=history, current_config=config_path.read_text(encoding="utf-8"))
 
-        result = self.executor.execute(
-            decision=decision,
-            config_path=config_path,
-            compile_func=compile_func,
-            compare_func=compare_func,
-            current_ratio=current_ratio,
-        )
+        trials: Optional[List[Dict[str, Any]]] = None
+        if sweep is not None and self.executor.evaluate_after_apply:
+            result, trials = sweep.run(self.executor, decision, current_ratio)
+        else:
+            result = self.executor.execute(
+                decision=decision,
+                config_path=config_path,
+                compile_func=compile_func,
+                compare_func=compare_func,
+                current_ratio=current_ratio,
+            )
 
         # 落盘记录（尽量可复盘）
         self.memory.record(
@@ -101,6 +114,7 @@ class AIOptimizer:
                 "rollback": result.rollback,
                 "reason": result.reason,
                 "applied": result.applied,
+                **({"sweep": trials} if trials is not None else {}),
             },
         )
 
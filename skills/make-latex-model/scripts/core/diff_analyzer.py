@@ -151,6 +151,29 @@ class DiffAnalyzer:
             }
         )
 
+        # 连通区域特征（compare_pdf_pixels 新版输出；旧特征文件中没有这些键）
+        h_share = p0.get("horizontal_area_share")
+        v_share = p0.get("vertical_area_share")
+        has_regions = h_share is not None and v_share is not None
+        if has_regions:
+            h_share = float(h_share)
+            v_share = float(v_share)
+            evidence["page_1"].update(
+                {
+                    "region_count": p0.get("region_count"),
+                    "horizontal_area_share": h_share,
+                    "vertical_area_share": v_share,
+                    "blob_area_share": float(p0.get("blob_area_share", 0.0)),
+                    "row_trend": float(p0.get("row_trend", 0.0)),
+                    "row_period_pt": p0.get("row_period_pt"),
+                    "row_periodicity": float(p0.get("row_periodicity", 0.0)),
+                    "largest_regions": [
+                        {"bbox": r.get("bbox"), "kind": r.get("kind"), "area_ratio": r.get("area_ratio")}
+                        for r in (p0.get("regions") or [])[:5]
+                    ],
+                }
+            )
+
         top = float(region.get("top", 0.0))
         middle = float(region.get("middle", 0.0))
         bottom = float(region.get("bottom", 0.0))
@@ -165,12 +188,27 @@ class DiffAnalyzer:
         root_cause = "unknown"
         confidence = 0.4
 
+        row_trend = float(p0.get("row_trend", 0.0))
+        periodic = float(p0.get("row_periodicity", 0.0)) >= 0.3
+
+        # 区域以水平条带为主：逐行错位；差异自上而下增强时为行距/段距累积偏移
+        if has_regions and h_share >= 0.5 and h_share > v_share * 2.0 and diff_ratio >= 0.01:
+            if row_trend >= 0.5 and (middle + bottom) > top:
+                root_cause = "vertical_offset"
+                confidence = 0.8 if periodic else 0.7
+            else:
+                root_cause = "line_break_mismatch"
+                confidence = 0.8 if periodic else 0.75
+        # 区域以垂直条带为主：边距/缩进导致的横向错位
+        elif has_regions and v_share >= 0.5 and v_share > h_share * 2.0 and diff_ratio >= 0.01:
+            root_cause = "margin_mismatch"
+            confidence = 0.8
         # 强水平条纹：多为换行/行距导致的行位差异
-        if row_var > col_var * 2.0 and diff_ratio >= 0.01:
+        elif not has_regions and row_var > col_var * 2.0 and diff_ratio >= 0.01:
             root_cause = "line_break_mismatch"
             confidence = 0.75
         # 强垂直条纹：多为边距/缩进导致的横向错位
-        elif col_var > row_var * 2.0 and diff_ratio >= 0.01:
+        elif not has_regions and col_var > row_var * 2.0 and diff_ratio >= 0.01:
             root_cause = "margin_mismatch"
             confidence = 0.75
         # 顶部差异显著：可能标题区/提纲提示语对齐问题
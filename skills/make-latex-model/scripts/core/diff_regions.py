@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+差异连通区域分析（diff regions）
+
+对一页像素差异掩码做一次性的向量化分析，供 compare_pdf_pixels.extract_diff_features、
+IntelligentAdjuster 与 DiffAnalyzer 共用：
+
+- 行/列差异剖面：方差、上中下三区比例、自上而下的趋势（行距累积偏移时差异随 y 增大）
+- 条纹周期：行/列剖面自相关（FFT）的主峰位置与强度，水平条纹周期≈行距时说明逐行错位
+- 连通区域：掩码按 CELL 像素分块后做水平方向闭运算（把同一行的字形连成一片），
+  再用 scipy.ndimage.label 标记；每个区域的 bbox、面积、方向（二阶矩主轴角）、
+  伸长度均由 bincount 一次算出，不逐区域循环
+
+scipy 不可用时只输出剖面与周期特征（regions 为空，region_count 为 None）。
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+CELL = 4              # 分块边长（像素）；150 DPI 下约 0.7pt
+MERGE_CELLS = 3       # 水平闭运算宽度（分块数），把同一行内相邻字形合并
+MIN_REGION_CELLS = 2  # 小于该分块数的区域视为噪点
+MAX_REGIONS = 40      # 输出的区域数上限（按面积取前 N）
+ELONGATED = 3.0       # 伸长度阈值：>= 该值才判定为水平/垂直条带
+
+
+@dataclass
+class DiffRegion:
+    bbox: Tuple[int, int, int, int]  # 像素坐标 (x0, y0, x1, y1)，右/下开区间
+    area: int                         # 差异像素所在分块数 × CELL²（近似像素面积）
+    area_ratio: float                 # 占整页比例
+    centroid: Tuple[float, float]     # (x, y) 像素
+    orientation_deg: float            # 主轴与水平方向夹角（-90~90）
+    elongation: float                 # 主/次轴长度比
+    kind: str                         # horizontal | vertical | blob
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "bbox": list(self.bbox),
+            "area": self.area,
+            "area_ratio": self.area_ratio,
+            "centroid": list(self.centroid),
+            "orientation_deg": self.orientation_deg,
+            "elongation": self.elongation,
+            "kind": self.kind,
+        }
+
+
+def _profile_period(profile: np.ndarray, min_lag: int) -> Tuple[float, float]:
+    """
+    剖面的主周期（像素）与周期强度（自相关主峰 / 零滞后，0~1）
+
+    没有明显周期时返回 (0.0, 0.0)。
+    """
+    n = profile.size
+    if n < 4 * max(1, min_lag):
+        return 0.0, 0.0
+    x = profile.astype(np.float64) - float(profile.mean())
+    energy = float(np.dot(x, x))
+    if energy <= 0.0:
+        return 0.0, 0.0
+    size = 1 << int(np.ceil(np.log2(2 * n)))
+    spec = np.fft.rfft(x, size)
+    acf = np.fft.irfft(spec * np.conj(spec), size)[:n] / energy
+
+    hi = n // 2
+    if hi <= min_lag:
+        return 0.0, 0.0
+    window = acf[min_lag:hi]
+    # 只认局部极大值，避免把零滞后附近的单调下降段当成周期
+    peaks = np.nonzero((window[1:-1] > window[:-2]) & (window[1:-1] >= window[2:]))[0] + 1
+    if peaks.size == 0:
+        return 0.0, 0.0
+    best = int(peaks[np.argmax(window[peaks])])
+    strength = float(window[best])
+    if strength <= 0.0:
+        return 0.0, 0.0
+    return float(best + min_lag), strength
+
+
+def _downsample(mask: np.ndarray) -> np.ndarray:
+    """按 CELL×CELL 分块做“任一像素有差异”归约（跨步切片按位或，避免 4D any 归约）"""
+    hc, wc = mask.shape[0] // CELL, mask.shape[1] // CELL
+    m = mask[: hc * CELL, : wc * CELL]
+    rows = m[0::CELL].copy()
+    for k in range(1, CELL):
+        rows |= m[k::CELL]
+    cells = rows[:, 0::CELL].copy()
+    for k in range(1, CELL):
+        cells |= rows[:, k::CELL]
+    return cells
+
+
+def _close_horizontal(cells: np.ndarray, width: int) -> np.ndarray:
+    """水平方向闭运算（先膨胀后腐蚀），用切片实现，结果再并上原图"""
+    r = max(0, width // 2)
+    dilated = cells.copy()
+    for k in range(1, r + 1):
+        dilated[:, k:] |= cells[:, :-k]
+        dilated[:, :-k] |= cells[:, k:]
+    closed = dilated.copy()
+    for k in range(1, r + 1):
+        closed[:, k:] &= dilated[:, :-k]
+        closed[:, :-k] &= dilated[:, k:]
+    return closed | cells
+
+
+def _label_regions(cells: np.ndarray, page_area: int) -> Optional[Tuple[List[DiffRegion], Dict[str, Any]]]:
+    """
+    标记连通区域
+
+    Returns:
+        (按面积降序的前 MAX_REGIONS 个区域, 全部区域的汇总统计)；scipy 不可用时返回 None
+    """
+    try:
+        from scipy import ndimage
+    except ImportError:
+        return None
+
+    summary: Dict[str, Any] = {"count": 0, "horizontal": 0.0, "vertical": 0.0, "blob": 0.0}
+    merged = _close_horizontal(cells, MERGE_CELLS)
+    labels, n = ndimage.label(merged)
+    if n == 0:
+        return [], summary
+
+    # 只统计原始差异分块（闭运算补出的空隙不计面积）
+    lab = labels[cells]
+    ys, xs = np.nonzero(cells)
+    count = np.bincount(lab, minlength=n + 1).astype(np.float64)
+    keep = np.nonzero(count >= MIN_REGION_CELLS)[0]
+    keep = keep[keep > 0]
+    if keep.size == 0:
+        return [], summary
+
+    safe = np.maximum(count, 1.0)
+    cy = np.bincount(lab, weights=ys, minlength=n + 1) / safe
+    cx = np.bincount(lab, weights=xs, minlength=n + 1) / safe
+    dy = ys - cy[lab]
+    dx = xs - cx[lab]
+    # 二阶中心矩（+1/12 为单个分块自身的方差，避免单行/单列区域退化）
+    mu20 = np.bincount(lab, weights=dx * dx, minlength=n + 1) / safe + 1.0 / 12
+    mu02 = np.bincount(lab, weights=dy * dy, minlength=n + 1) / safe + 1.0 / 12
+    mu11 = np.bincount(lab, weights=dx * dy, minlength=n + 1) / safe
+    common = np.sqrt(((mu20 - mu02) / 2.0) ** 2 + mu11 ** 2)
+    lam1 = (mu20 + mu02) / 2.0 + common
+    lam2 = np.maximum((mu20 + mu02) / 2.0 - common, 1e-9)
+    elong = np.sqrt(lam1 / lam2)
+    angle = np.degrees(0.5 * np.arctan2(2.0 * mu11, mu20 - mu02))
+
+    # 方向分类：0=blob 1=horizontal 2=vertical
+    kinds = np.where(elong >= ELONGATED, np.where(np.abs(angle) < 45.0, 1, 2), 0)
+    kept_area = count[keep]
+    total = float(kept_area.sum())
+    summary = {
+        "count": int(keep.size),
+        "blob": float(kept_area[kinds[keep] == 0].sum()) / total,
+        "horizontal": float(kept_area[kinds[keep] == 1].sum()) / total,
+        "vertical": float(kept_area[kinds[keep] == 2].sum()) / total,
+    }
+
+    names = ("blob", "horizontal", "vertical")
+    order = keep[np.argsort(-kept_area, kind="stable")][:MAX_REGIONS]
+    slices = ndimage.find_objects(labels)
+    out: List[DiffRegion] = []
+    for k in order:
+        sl = slices[k - 1]
+        area = int(count[k]) * CELL * CELL
+        out.append(
+            DiffRegion(
+                bbox=(sl[1].start * CELL, sl[0].start * CELL, sl[1].stop * CELL, sl[0].stop * CELL),
+                area=area,
+                area_ratio=area / float(page_area),
+                centroid=(float(cx[k] + 0.5) * CELL, float(cy[k] + 0.5) * CELL),
+                orientation_deg=round(float(angle[k]), 2),
+                elongation=round(float(elong[k]), 3),
+                kind=names[int(kinds[k])],
+            )
+        )
+    return out, summary
+
+
+def analyze_diff_mask(diff_mask: np.ndarray, dpi: Optional[float] = None) -> Dict[str, Any]:
+    """
+    一次性提取整页差异特征
+
+    Args:
+        diff_mask: 布尔差异掩码 (H, W)
+        dpi: 渲染 DPI；给出时额外输出以 pt 为单位的条纹周期
+
+    Returns:
+        特征字典（键见下方 features；regions 为按面积降序的区域列表）
+    """
+    mask = np.asarray(diff_mask, dtype=bool)
+    h, w = mask.shape[:2]
+    page_area = max(1, h * w)
+
+    row_counts = np.count_nonzero(mask, axis=1)
+    col_counts = np.count_nonzero(mask, axis=0)
+    row_profile = row_counts.astype(np.float64) / max(1, w)
+    col_profile = col_counts.astype(np.float64) / max(1, h)
+
+    third = max(1, h // 3)
+    csum = np.concatenate(([0], np.cumsum(row_counts)))
+
+    def _band(y0: int, y1: int) -> float:
+        y1 = min(h, y1)
+        return float(csum[y1] - csum[y0]) / float(max(1, (y1 - y0) * w)) if y1 > y0 else 0.0
+
+    # 自上而下的趋势：差异行比例与 y 的相关系数（行距/段距累积偏移时为正）
+    trend = 0.0
+    if h > 1 and row_profile.std() > 0:
+        trend = float(np.corrcoef(np.arange(h, dtype=np.float64), row_profile)[0, 1])
+
+    min_lag = max(2, int(round((dpi or 150) / 72.0 * 4)))  # 小于约 4pt 的周期视为字形噪声
+    row_period, row_strength = _profile_period(row_profile, min_lag)
+    col_period, col_strength = _profile_period(col_profile, min_lag)
+
+    labeled = None
+    if h >= CELL and w >= CELL:
+        labeled = _label_regions(_downsample(mask), page_area)
+
+    features: Dict[str, Any] = {
+        "row_variance": float(np.var(row_profile)) if row_profile.size else 0.0,
+        "col_variance": float(np.var(col_profile)) if col_profile.size else 0.0,
+        "region_top_ratio": _band(0, third),
+        "region_middle_ratio": _band(third, 2 * third),
+        "region_bottom_ratio": _band(2 * third, h),
+        "row_trend": trend,
+        "row_period_px": row_period,
+        "row_periodicity": row_strength,
+        "col_period_px": col_period,
+        "col_periodicity": col_strength,
+        "region_count": None,
+        "regions": [],
+    }
+    if dpi:
+        features["row_period_pt"] = row_period * 72.0 / float(dpi)
+        features["col_period_pt"] = col_period * 72.0 / float(dpi)
+
+    if labeled is not None:
+        regions, summary = labeled
+        features["region_count"] = summary["count"]
+        if regions:
+            features.update(
+                {
+                    "horizontal_area_share": summary["horizontal"],
+                    "vertical_area_share": summary["vertical"],
+                    "blob_area_share": summary["blob"],
+                    "largest_region_ratio": regions[0].area_ratio,
+                    "regions": [r.to_dict() for r in regions],
+                }
+            )
+    return features
+
+
+def band_features(features: Dict[str, Any], y0: float, y1: float) -> Dict[str, Any]:
+    """
+    取质心落在 [y0, y1) 的区域，重新计算方向面积占比（用于上/中/下分区分类）
+
+    row_trend 等整页特征原样保留；没有区域特征时返回原特征。
+    """
+    if features.get("region_count") is None:
+        return features
+    sub = dict(features)
+    picked = [r for r in features.get("regions") or [] if y0 <= r["centroid"][1] < y1]
+    sub["regions"] = picked
+    sub["region_count"] = len(picked)
+    total = float(sum(r["area"] for r in picked))
+    for kind in ("horizontal", "vertical", "blob"):
+        key = f"{kind}_area_share"
+        if total > 0:
+            sub[key] = sum(r["area"] for r in picked if r["kind"] == kind) / total
+        else:
+            sub.pop(key, None)
+    return sub
+
+
+def classify_regions(features: Dict[str, Any], diff_ratio: float) -> str:
+    """
+    依据区域方向分布给出差异类别（与 IntelligentAdjuster.DifferenceType 取值一致）
+
+    没有区域特征时退回行/列方差比较。
+    """
+    h_share = features.get("horizontal_area_share")
+    v_share = features.get("vertical_area_share")
+    if h_share is not None and v_share is not None:
+        if h_share >= 0.5 and h_share > 2 * v_share:
+            # 水平条带：逐行错位；若差异自上而下增强则为垂直累积偏移
+            return "vertical_offset" if features.get("row_trend", 0.0) >= 0.5 else "line_break"
+        if v_share >= 0.5 and v_share > 2 * h_share:
+            return "margin"
+    else:
+        row_var = float(features.get("row_variance", 0.0))
+        col_var = float(features.get("col_variance", 0.0))
+        if row_var > col_var * 2:
+            return "line_break"
+        if col_var > row_var * 2:
+            return "margin"
+
+    if diff_ratio < 0.05:
+        return "spacing"
+    return "unknown"
@@ -4,7 +4,8 @@
 历史记忆库（HistoryMemory）
 
 将每轮优化的上下文/决策/结果落盘，避免重复“试错”。
-实现保持极简：JSONL 追加写 + 最近 N 条读取。
+传入 IterationLog 时记录写入工作空间的迭代日志（kind=memory，最近 N 条走索引读取），
+与 ConvergenceDetector/EnhancedOptimizer 共用一份存储；否则退回 JSONL 追加写。
 """
 
 import json
@@ -13,6 +14,10 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from .iteration_log import IterationLog
+
+MEMORY_KIND = "memory"
+
 
 @dataclass
 class IterationRecord:
@@ -24,11 +29,20 @@ class IterationRecord:
 
 
 class HistoryMemory:
-    """基于 JSONL 文件的历史记忆库"""
+    """历史记忆库（迭代日志或 JSONL 文件）"""
 
-    def __init__(self, storage_path: Path):
+    def __init__(self, storage_path: Path, log: Optional[IterationLog] = None):
+        """
+        Args:
+            storage_path: JSONL 路径（未传 log 时的存储；传入 log 时其中的旧记录会一次性导入日志）
+            log: 共享的迭代日志
+        """
         self.storage_path = Path(storage_path)
         self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+        self.log = log
+        if self.log is not None and self.storage_path.exists() and self.log.count(MEMORY_KIND) == 0:
+            for rec in self._read_jsonl():
+                self.log.append(MEMORY_KIND, rec, iteration=rec.get("iteration"))
 
     def record(
         self,
@@ -44,28 +58,38 @@ class HistoryMemory:
             decision=decision,
             result=result,
         )
+        if self.log is not None:
+            self.log.append(MEMORY_KIND, rec.__dict__, iteration=iteration, changed_ratio=result.get("new_ratio"))
+            return
         with open(self.storage_path, "a", encoding="utf-8") as f:
             f.write(json.dumps(rec.__dict__, ensure_ascii=False) + "\n")
 
     def get_recent(self, n: int = 5) -> List[Dict[str, Any]]:
-        if n <= 0 or not self.storage_path.exists():
+        if n <= 0:
             return []
+        if self.log is not None:
+            return self.log.recent(MEMORY_KIND, n)
+        return self._read_jsonl()[-n:]
 
-        # 反向读取最后 N 行（文件通常不大；这里保持简单）
+    def _read_jsonl(self) -> List[Dict[str, Any]]:
+        if not self.storage_path.exists():
+            return []
         try:
             lines = self.storage_path.read_text(encoding="utf-8").splitlines()
         except Exception:
             return []
 
-        recent = []
-        for line in lines[-n:]:
+        records = []
+        for line in lines:
             try:
-                recent.append(json.loads(line))
+                records.append(json.loads(line))
             except Exception:
                 continue
-        return recent
+        return records
 
     def clear(self) -> None:
+        if self.log is not None:
+            self.log.clear(MEMORY_KIND)
         if self.storage_path.exists():
             self.storage_path.unlink()
 
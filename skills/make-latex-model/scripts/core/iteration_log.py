@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+迭代日志（IterationLog）
+
+ConvergenceDetector 每次 should_stop/get_best_iteration 都重新读取全部 iterations/*/metrics.json，
+HistoryMemory 另有一份 JSONL，EnhancedOptimizer 的报告又只看内存中的本次历史。
+本模块把三者收敛为工作空间下的一个只追加、带索引的 SQLite 日志（<workspace>/history.sqlite3）：
+
+- iterations 表：每条记录一行（kind 区分迭代指标 metrics 与决策记忆 memory），payload 为 JSON
+- runs 表：每次优化运行一行，追加时增量维护汇总（最佳差异、首/末差异、连续无改善轮数等）
+
+最佳结果、连续无改善轮数按运行汇总直接读出，最近 N 条走 (kind, seq) 索引倒序取，
+查询耗时与历史总量无关。
+
+使用方法:
+    from scripts.core.iteration_log import IterationLog
+
+    log = IterationLog.for_workspace(ws_dir)
+    run_id = log.start_run("metrics")
+    log.append("metrics", metrics, iteration=1, changed_ratio=0.05, run_id=run_id)
+    summary = log.summary("metrics")        # 最近一次运行
+    best = log.best("metrics")
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+
+LOG_FILENAME = "history.sqlite3"
+IMPROVEMENT_EPS = 0.001  # 差异下降超过该值才算“有明显改善”（与 ConvergenceDetector 一致）
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS iterations (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    iteration INTEGER,
+    timestamp TEXT NOT NULL,
+    changed_ratio REAL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_iterations_kind_seq ON iterations (kind, seq);
+CREATE INDEX IF NOT EXISTS idx_iterations_run_seq ON iterations (run_id, seq);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    ratio_count INTEGER NOT NULL DEFAULT 0,
+    first_ratio REAL,
+    last_ratio REAL,
+    best_ratio REAL,
+    worst_ratio REAL,
+    best_seq INTEGER,
+    best_iteration INTEGER,
+    streak INTEGER NOT NULL DEFAULT 0,
+    streak_ref REAL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_kind_started ON runs (kind, started_at);
+"""
+
+
+@dataclass
+class RunSummary:
+    """一次运行的增量汇总"""
+    run_id: str
+    kind: str
+    started_at: str
+    count: int = 0               # 记录数（含无差异比例的记录）
+    ratio_count: int = 0         # 含差异比例的记录数
+    first_ratio: Optional[float] = None
+    last_ratio: Optional[float] = None  # 最后一条记录的差异比例（最后一条没有时为 None）
+    best_ratio: Optional[float] = None
+    worst_ratio: Optional[float] = None
+    best_seq: Optional[int] = None
+    best_iteration: Optional[int] = None
+    streak: int = 0              # 连续无明显改善轮数
+    streak_ref: Optional[float] = None  # 最近一次明显改善时的差异比例
+
+    def advance(self, ratio: Optional[float], seq: Optional[int] = None, iteration: Optional[int] = None) -> "RunSummary":
+        """追加一条记录后的汇总（不修改自身）"""
+        nxt = replace(self, count=self.count + 1, last_ratio=ratio)
+        if ratio is None:
+            return nxt
+        nxt.ratio_count += 1
+        if nxt.first_ratio is None:
+            nxt.first_ratio = ratio
+            nxt.streak_ref = ratio
+        elif ratio < nxt.streak_ref - IMPROVEMENT_EPS:
+            nxt.streak_ref = ratio
+            nxt.streak = 0
+        else:
+            nxt.streak += 1
+        if nxt.best_ratio is None or ratio < nxt.best_ratio:
+            nxt.best_ratio, nxt.best_seq, nxt.best_iteration = ratio, seq, iteration
+        if nxt.worst_ratio is None or ratio > nxt.worst_ratio:
+            nxt.worst_ratio = ratio
+        return nxt
+
+
+class IterationLog:
+    """工作空间级的只追加迭代日志（SQLite）"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @classmethod
+    def for_workspace(cls, workspace_dir: Path) -> "IterationLog":
+        """工作空间根目录下的日志（不放在 cache/，避免被过期缓存清理删除）"""
+        return cls(Path(workspace_dir) / LOG_FILENAME)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """一次事务：正常退出提交、异常回滚，随后关闭连接"""
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # ---------- 写入 ----------
+
+    def start_run(self, kind: str = "metrics") -> str:
+        """登记一次新运行，返回 run_id"""
+        run_id = f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO runs (run_id, kind, started_at) VALUES (?, ?, ?)",
+                (run_id, kind, datetime.now().isoformat()),
+            )
+        return run_id
+
+    def append(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        iteration: Optional[int] = None,
+        changed_ratio: Optional[float] = None,
+        run_id: Optional[str] = None,
+    ) -> int:
+        """
+        追加一条记录并增量更新所属运行的汇总
+
+        Args:
+            kind: 记录类型（metrics=迭代指标，memory=决策记忆）
+            payload: 记录内容（JSON 可序列化）
+            iteration: 迭代编号
+            changed_ratio: 差异比例（参与最佳/无改善统计）
+            run_id: 所属运行；为空时归入该 kind 的默认运行
+
+        Returns:
+            记录序号
+        """
+        run_id = run_id or f"default-{kind}"
+        ratio = float(changed_ratio) if changed_ratio is not None else None
+        timestamp = str(payload.get("timestamp") or datetime.now().isoformat())
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT OR IGNORE INTO runs (run_id, kind, started_at) VALUES (?, ?, ?)",
+                (run_id, kind, datetime.now().isoformat()),
+            )
+            seq = conn.execute(
+                "INSERT INTO iterations (kind, run_id, iteration, timestamp, changed_ratio, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, run_id, iteration, timestamp, ratio, json.dumps(payload, ensure_ascii=False)),
+            ).lastrowid
+            summary = _row_to_summary(conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone())
+            s = summary.advance(ratio, seq=seq, iteration=iteration)
+            conn.execute(
+                "UPDATE runs SET count = ?, ratio_count = ?, first_ratio = ?, last_ratio = ?, best_ratio = ?, "
+                "worst_ratio = ?, best_seq = ?, best_iteration = ?, streak = ?, streak_ref = ? WHERE run_id = ?",
+                (
+                    s.count, s.ratio_count, s.first_ratio, s.last_ratio, s.best_ratio,
+                    s.worst_ratio, s.best_seq, s.best_iteration, s.streak, s.streak_ref, run_id,
+                ),
+            )
+        return int(seq)
+
+    def clear(self, kind: Optional[str] = None) -> None:
+        with self._connect() as conn:
+            if kind is None:
+                conn.execute("DELETE FROM iterations")
+                conn.execute("DELETE FROM runs")
+            else:
+                conn.execute("DELETE FROM iterations WHERE kind = ?", (kind,))
+                conn.execute("DELETE FROM runs WHERE kind = ?", (kind,))
+
+    # ---------- 查询 ----------
+
+    def latest_run(self, kind: str = "metrics") -> Optional[str]:
+        """该类型最近一次有记录的运行"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT run_id FROM iterations WHERE kind = ? ORDER BY seq DESC LIMIT 1", (kind,)
+            ).fetchone()
+        return row["run_id"] if row else None
+
+    def summary(self, kind: str = "metrics", run_id: Optional[str] = None) -> Optional[RunSummary]:
+        """运行汇总（默认最近一次运行）；没有记录时返回 None"""
+        run_id = run_id or self.latest_run(kind)
+        if run_id is None:
+            return None
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return _row_to_summary(row) if row else None
+
+    def best(self, kind: str = "metrics", run_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """差异比例最小的记录（默认最近一次运行）"""
+        summary = self.summary(kind, run_id)
+        if summary is None or summary.best_seq is None:
+            return None
+        with self._connect() as conn:
+            row = conn.execute("SELECT payload FROM iterations WHERE seq = ?", (summary.best_seq,)).fetchone()
+        return json.loads(row["payload"]) if row else None
+
+    def recent(self, kind: str, n: int = 5, run_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """最近 n 条记录（按时间正序）；run_id 为空时跨运行"""
+        if n <= 0:
+            return []
+        with self._connect() as conn:
+            if run_id is None:
+                rows = conn.execute(
+                    "SELECT payload FROM iterations WHERE kind = ? ORDER BY seq DESC LIMIT ?", (kind, n)
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT payload FROM iterations WHERE run_id = ? AND kind = ? ORDER BY seq DESC LIMIT ?",
+                    (run_id, kind, n),
+                ).fetchall()
+        return [json.loads(r["payload"]) for r in reversed(rows)]
+
+    def records(self, kind: str = "metrics", run_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """某次运行的全部记录（默认最近一次运行，按时间正序）"""
+        run_id = run_id or self.latest_run(kind)
+        if run_id is None:
+            return []
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT payload FROM iterations WHERE run_id = ? AND kind = ? ORDER BY seq", (run_id, kind)
+            ).fetchall()
+        return [json.loads(r["payload"]) for r in rows]
+
+    def count(self, kind: Optional[str] = None) -> int:
+        with self._connect() as conn:
+            if kind is None:
+                return int(conn.execute("SELECT COUNT(*) FROM iterations").fetchone()[0])
+            return int(conn.execute("SELECT COUNT(*) FROM iterations WHERE kind = ?", (kind,)).fetchone()[0])
+
+
+def _row_to_summary(row: sqlite3.Row) -> RunSummary:
+    return RunSummary(
+        run_id=row["run_id"],
+        kind=row["kind"],
+        started_at=row["started_at"],
+        count=int(row["count"]),
+        ratio_count=int(row["ratio_count"]),
+        first_ratio=row["first_ratio"],
+        last_ratio=row["last_ratio"],
+        best_ratio=row["best_ratio"],
+        worst_ratio=row["worst_ratio"],
+        best_seq=row["best_seq"],
+        best_iteration=row["best_iteration"],
+        streak=int(row["streak"]),
+        streak_ref=row["streak_ref"],
+    )
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+页面指纹（page fingerprint）
+
+迭代优化中一次参数微调往往只让少数几页重排。本模块为输出 PDF 的每一页计算廉价指纹，
+与上一轮对比后只把“脏页”交给全分辨率渲染/逐段对比，未变化的页面直接复用上一轮的指标。
+
+指纹由两部分组成：
+- text_hash：文本层哈希（逐 span 的文字、字体、字号、颜色与取整到 0.01pt 的 bbox）
+- phash：低分辨率灰度缩略图的均值哈希（16×16），覆盖线条/图片等非文本变化
+
+上一轮记录只在“对比上下文”（基准 PDF 哈希、DPI、容差、模式等）一致时复用。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+FINGERPRINT_SCHEMA = 1
+THUMB_WIDTH = 64  # 缩略图宽度（像素）
+HASH_SIZE = 16    # 均值哈希边长
+
+
+@dataclass
+class PageFingerprint:
+    page_num: int  # 1-based
+    text_hash: str
+    phash: str
+
+
+def _text_layer_hash(blocks: List[Dict[str, Any]]) -> str:
+    h = hashlib.sha1()
+    for block in blocks:
+        for line in block.get("lines") or []:
+            for span in line.get("spans") or []:
+                bbox = ",".join(f"{float(v):.2f}" for v in span.get("bbox") or ())
+                h.update(
+                    f"{span.get('text', '')}\x1f{span.get('font', '')}\x1f{float(span.get('size') or 0):.2f}"
+                    f"\x1f{span.get('color', 0)}\x1f{bbox}\x1e".encode("utf-8")
+                )
+        if block.get("type") == 1:  # 图片块
+            h.update(f"img:{','.join(f'{float(v):.2f}' for v in block.get('bbox') or ())}\x1e".encode("utf-8"))
+    return h.hexdigest()
+
+
+def _average_hash(page) -> str:
+    import fitz
+
+    scale = THUMB_WIDTH / max(1.0, float(page.rect.width))
+    pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale), colorspace=fitz.csGRAY, alpha=False)
+    gray = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.stride)[:, : pix.width]
+
+    # 均值池化到 HASH_SIZE×HASH_SIZE（按行/列分桶，尺寸不必整除）
+    rows = np.linspace(0, gray.shape[0], HASH_SIZE + 1).astype(int)
+    cols = np.linspace(0, gray.shape[1], HASH_SIZE + 1).astype(int)
+    pooled = np.add.reduceat(np.add.reduceat(gray.astype(np.float32), rows[:-1], axis=0), cols[:-1], axis=1)
+    pooled /= np.outer(np.diff(rows), np.diff(cols))
+    bits = pooled > pooled.mean()
+    return np.packbits(bits.reshape(-1)).tobytes().hex()
+
+
+def compute_fingerprints(pdf_path: Path) -> List[PageFingerprint]:
+    """
+    计算 PDF 每一页的指纹（缩略图约 6 DPI，远快于全分辨率渲染）
+
+    文本层取自共享的 PDF 结构层，后续段落提取可直接复用，不再重复解析。
+    """
+    import fitz
+
+    from .pdf_structure import load_pdf_structure
+
+    structure = load_pdf_structure(pdf_path)
+    out: List[PageFingerprint] = []
+    with fitz.open(pdf_path) as doc:
+        for index, page in enumerate(doc):
+            out.append(
+                PageFingerprint(
+                    page_num=index + 1,
+                    text_hash=_text_layer_hash(structure.page(index)["blocks"]),
+                    phash=_average_hash(page),
+                )
+            )
+    return out
+
+
+def load_reusable_metrics(
+    previous_path: Optional[Path],
+    context: Dict[str, Any],
+    current: List[PageFingerprint],
+) -> Dict[int, Any]:
+    """
+    读取上一轮记录，返回指纹未变化页面的指标 {page_num: metrics}
+
+    上下文不一致、文件缺失或损坏时返回空字典（全部视为脏页）。
+    """
+    if previous_path is None or not Path(previous_path).exists():
+        return {}
+    try:
+        data = json.loads(Path(previous_path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if data.get("schema_version") != FINGERPRINT_SCHEMA or data.get("context") != context:
+        return {}
+
+    previous = {int(p["page_num"]): p for p in data.get("pages", []) if "metrics" in p}
+    reusable: Dict[int, Any] = {}
+    for fp in current:
+        prev = previous.get(fp.page_num)
+        if prev and prev.get("text_hash") == fp.text_hash and prev.get("phash") == fp.phash:
+            reusable[fp.page_num] = prev["metrics"]
+    return reusable
+
+
+def save_fingerprints(
+    path: Path,
+    context: Dict[str, Any],
+    fingerprints: List[PageFingerprint],
+    metrics_by_page: Dict[int, Any],
+    reused_pages: Optional[List[int]] = None,
+) -> None:
+    """保存本轮指纹与逐页指标（没有指标的页面不写 metrics，下轮视为脏页）"""
+    pages = []
+    for fp in fingerprints:
+        item: Dict[str, Any] = asdict(fp)
+        if fp.page_num in metrics_by_page:
+            item["metrics"] = metrics_by_page[fp.page_num]
+        pages.append(item)
+    payload = {
+        "schema_version": FINGERPRINT_SCHEMA,
+        "context": context,
+        "reused_pages": sorted(reused_pages or []),
+        "pages": pages,
+    }
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
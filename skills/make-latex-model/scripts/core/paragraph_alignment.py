@@ -11,7 +11,9 @@ from __future__ import annotations
 
 import difflib
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .pdf_structure import load_pdf_structure
 
 
 @dataclass
@@ -67,54 +69,54 @@ def extract_paragraphs_from_pdf(
     include_images: bool = False,
     y_gap_factor: float = 1.2,
     x0_tolerance: float = 2.0,
+    pages: Optional[Iterable[int]] = None,
 ) -> List[Paragraph]:
     """
     从 PDF 提取段落（基于“行聚合”启发式）。
 
     include_images=True 时，会将每个段落裁剪为 RGB numpy array 存入 image_rgb。
+    pages 为 1-based 页码集合（如只处理脏页）；与 page_num 同时给出时以 page_num 为准。
     """
-    import fitz  # PyMuPDF
-    import numpy as np
-    from PIL import Image
-    import io
-
-    doc = fitz.open(pdf_path)
+    structure = load_pdf_structure(pdf_path)
+    n_pages = len(structure)
+    if page_num is not None:
+        page_indices = [page_num - 1] if 1 <= page_num <= n_pages else [0]
+    elif pages is not None:
+        page_indices = sorted({int(p) - 1 for p in pages if 1 <= int(p) <= n_pages})
+    else:
+        page_indices = list(range(n_pages))
+
+    # 文本结构来自共享的 PDF 结构层；只有裁剪段落图像时才需要打开 PDF
+    doc = None
+    if include_images:
+        import fitz  # PyMuPDF
+
+        doc = fitz.open(pdf_path)
     try:
-        if page_num is not None:
-            pages = [page_num - 1] if 1 <= page_num <= len(doc) else [0]
-        else:
-            pages = list(range(len(doc)))
-
         out: List[Paragraph] = []
-        for pidx in pages:
-            page = doc[pidx]
-            data = page.get_text("dict")
-
+        for pidx in page_indices:
             # 收集行
             pdf_lines: List[ParagraphLine] = []
-            for block in data.get("blocks", []):
-                if not block.get("lines"):
+            for line in structure.iter_lines(pidx):
+                spans = line.get("spans") or []
+                if not spans:
                     continue
-                for line in block["lines"]:
-                    spans = line.get("spans") or []
-                    if not spans:
-                        continue
-                    txt = "".join((s.get("text") or "") for s in spans)
-                    if not txt or not txt.strip():
-                        continue
-                    bbox = tuple(line.get("bbox") or (0, 0, 0, 0))
-                    x0, y0, x1, y1 = float(bbox[0]), float(bbox[1]), float(bbox[2]), float(bbox[3])
-                    s0 = spans[0]
-                    pdf_lines.append(
-                        ParagraphLine(
-                            bbox=(x0, y0, x1, y1),
-                            text=" ".join(str(txt).split()),
-                            x0=x0,
-                            y0=y0,
-                            y1=y1,
-                            font_size=float(s0.get("size") or 0.0),
-                        )
+                txt = "".join((s.get("text") or "") for s in spans)
+                if not txt or not txt.strip():
+                    continue
+                bbox = tuple(line.get("bbox") or (0, 0, 0, 0))
+                x0, y0, x1, y1 = float(bbox[0]), float(bbox[1]), float(bbox[2]), float(bbox[3])
+                s0 = spans[0]
+                pdf_lines.append(
+                    ParagraphLine(
+                        bbox=(x0, y0, x1, y1),
+                        text=" ".join(str(txt).split()),
+                        x0=x0,
+                        y0=y0,
+                        y1=y1,
+                        font_size=float(s0.get("size") or 0.0),
                     )
+                )
 
             # 按阅读顺序排序
             pdf_lines.sort(key=lambda l: (l.y0, l.x0))
@@ -158,10 +160,15 @@ def extract_paragraphs_from_pdf(
                     type=_classify_paragraph(text, len(group)),
                 )
 
-                if include_images:
+                if doc is not None:
+                    import io
+
+                    import numpy as np
+                    from PIL import Image
+
                     mat = fitz.Matrix(dpi / 72, dpi / 72)
                     rect = fitz.Rect(*bbox)
-                    pix = page.get_pixmap(matrix=mat, clip=rect)
+                    pix = doc[pidx].get_pixmap(matrix=mat, clip=rect)
                     img_data = pix.tobytes("ppm")
                     img = Image.open(io.BytesIO(img_data)).convert("RGB")
                     p.image_rgb = np.array(img)
@@ -170,18 +177,219 @@ def extract_paragraphs_from_pdf(
 
         return out
     finally:
-        doc.close()
+        if doc is not None:
+            doc.close()
+
+
+NGRAM_SIZE = 2
+# ratio >= 该阈值的两段文本必然共享至少一个 NGRAM_SIZE 字符片段（见 match_paragraphs 说明）
+_INDEX_EXACT_MIN_SIMILARITY = 0.8
+
+
+def _match_record(b: Paragraph, t: Paragraph, sim: float) -> Dict[str, Any]:
+    return {
+        "page_num": b.page_num,
+        "text_similarity": float(sim),
+        "baseline": {
+            "paragraph_id": b.paragraph_id,
+            "text": b.text,
+            "bbox": list(b.bbox),
+            "type": b.type,
+            "line_count": b.line_count,
+        },
+        "target": {
+            "paragraph_id": t.paragraph_id,
+            "text": t.text,
+            "bbox": list(t.bbox),
+            "type": t.type,
+            "line_count": t.line_count,
+        },
+    }
+
+
+def _ngram_counts(text: str, n: int = NGRAM_SIZE) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for i in range(len(text) - n + 1):
+        g = text[i: i + n]
+        counts[g] = counts.get(g, 0) + 1
+    return counts
+
+
+class _PageIndex:
+    """
+    单页目标段落的字符/字符 n-gram 计数矩阵（段落文本只规范化一次）
+
+    矩阵的列即倒排索引的词表：对某个基准段落只取其出现过的列，
+    一次向量化运算即可得到与全部目标段落的共享 n-gram 数与 quick_ratio 上界。
+    """
+
+    def __init__(self, paragraphs: List[Paragraph]):
+        import numpy as np
+
+        self.paragraphs: List[Paragraph] = []
+        self.norms: List[str] = []
+        gram_rows: List[Dict[str, int]] = []
+        char_rows: List[Dict[str, int]] = []
+        for p in paragraphs:
+            norm = _normalize_text_for_match(p.text)
+            if not norm:
+                continue
+            self.paragraphs.append(p)
+            self.norms.append(norm)
+            gram_rows.append(_ngram_counts(norm))
+            char_rows.append(_ngram_counts(norm, 1))
+
+        self.gram_ids = {g: k for k, g in enumerate(sorted({g for row in gram_rows for g in row}))}
+        self.char_ids = {c: k for k, c in enumerate(sorted({c for row in char_rows for c in row}))}
+        n = len(self.paragraphs)
+        self.grams = np.zeros((n, len(self.gram_ids)), dtype=np.int32)
+        self.chars = np.zeros((n, len(self.char_ids)), dtype=np.int32)
+        for j, (grow, crow) in enumerate(zip(gram_rows, char_rows)):
+            for g, c in grow.items():
+                self.grams[j, self.gram_ids[g]] = c
+            for ch, c in crow.items():
+                self.chars[j, self.char_ids[ch]] = c
+        self.lengths = np.array([len(t) for t in self.norms], dtype=np.float64)
+        self.gram_sizes = self.grams.sum(axis=1).astype(np.float64)
+        self.short = self.gram_sizes == 0  # 不足一个 n-gram 的段落，无法通过索引召回
+        self._matchers: Dict[int, difflib.SequenceMatcher] = {}
+
+    def matcher(self, j: int) -> difflib.SequenceMatcher:
+        # seq2 固定为目标段落：SequenceMatcher 会缓存对 seq2 的分析，换基准段落只需 set_seq1
+        sm = self._matchers.get(j)
+        if sm is None:
+            sm = self._matchers[j] = difflib.SequenceMatcher(a="", b=self.norms[j])
+        return sm
+
+    def _intersection(self, matrix, ids: Dict[str, int], counts: Dict[str, int]):
+        import numpy as np
+
+        cols = [(ids[k], c) for k, c in counts.items() if k in ids]
+        if not cols:
+            return np.zeros(matrix.shape[0])
+        idx = np.fromiter((k for k, _ in cols), dtype=np.intp, count=len(cols))
+        vals = np.fromiter((c for _, c in cols), dtype=np.int32, count=len(cols))
+        return np.minimum(matrix[:, idx], vals).sum(axis=1).astype(np.float64)
+
+    def ranked_candidates(self, norm: str, min_similarity: float, scan_all: bool) -> List[int]:
+        """
+        返回可能达到阈值的候选下标，按 n-gram Dice 系数从高到低排序
+
+        quick_ratio（字符多重集交集）是 SequenceMatcher.ratio 的上界，低于阈值的直接剔除；
+        scan_all=False 时还要求与基准段落共享至少一个 n-gram（极短段落除外）。
+        """
+        import numpy as np
+
+        gram_counts = _ngram_counts(norm)
+        shared = self._intersection(self.grams, self.gram_ids, gram_counts)
+        common_chars = self._intersection(self.chars, self.char_ids, _ngram_counts(norm, 1))
+        quick = 2.0 * common_chars / (len(norm) + self.lengths)
+        mask = quick >= min_similarity
+        if gram_counts and not scan_all:
+            mask &= (shared > 0) | self.short
+        idx = np.nonzero(mask)[0]
+        dice = 2.0 * shared[idx] / (sum(gram_counts.values()) + self.gram_sizes[idx] + 1e-12)
+        order = np.lexsort((idx, -dice))
+        return [int(j) for j in idx[order]]
+
+
+def _assign(edges: List[Tuple[int, int, float, float]], n_rows: int, n_cols: int) -> List[Tuple[int, int]]:
+    """
+    按总权重最大求解一对一匹配。edges: (基准下标, 目标下标, 相似度, 权重)。
+
+    有 scipy 时用 linear_sum_assignment 求全局最优；否则按权重从高到低贪心。
+    """
+    if not edges:
+        return []
+    try:
+        import numpy as np
+        from scipy.optimize import linear_sum_assignment
+    except ImportError:
+        used_rows: set = set()
+        used_cols: set = set()
+        out = []
+        for i, j, _, _ in sorted(edges, key=lambda e: (-e[3], e[0], e[1])):
+            if i not in used_rows and j not in used_cols:
+                used_rows.add(i)
+                used_cols.add(j)
+                out.append((i, j))
+        return out
+
+    weights = np.zeros((n_rows, n_cols))
+    valid = np.zeros((n_rows, n_cols), dtype=bool)
+    for i, j, _, w in edges:
+        weights[i, j] = w
+        valid[i, j] = True
+    rows, cols = linear_sum_assignment(weights, maximize=True)
+    return [(int(i), int(j)) for i, j in zip(rows, cols) if valid[i, j]]
 
 
 def match_paragraphs(
     baseline: List[Paragraph],
     target: List[Paragraph],
     min_similarity: float = 0.85,
-    max_candidates: int = 50,
+    max_candidates: Optional[int] = None,
 ) -> List[Dict[str, Any]]:
     """
     基于文本相似度（辅以页面约束）匹配段落。
-    返回 match dict 列表（用于 JSON 序列化）。
+    返回 match dict 列表（用于 JSON 序列化），按基准段落顺序排列。
+
+    - 每个段落只规范化一次；每页目标段落建立字符 2-gram 倒排索引，按 Dice 系数排序候选
+    - 精确相似度仍为 difflib.SequenceMatcher.ratio()，先以向量化的 quick_ratio 上界剪枝
+    - min_similarity > 0.8 时只比较与基准段落共享 2-gram 的目标段落：若所有匹配块长度都为 1，
+      相邻块之间至少隔一个未匹配字符，ratio <= 2M/(3M-1)（M>=2 时最大 0.8），M=1 时超过 0.8
+      只可能是两个单字符文本（极短段落始终参与比较），因此不会漏掉达到阈值的配对；
+      阈值不高于 0.8 时退回逐一比较
+    - 每页在所有达到阈值的配对上求总相似度最大的一对一匹配（相同相似度时优先纵向位置接近者）
+    - max_candidates 限制每个基准段落精确比较的候选数（按廉价得分截断；None 不限制）
+    """
+    tgt_by_page: Dict[int, List[Paragraph]] = {}
+    for p in target:
+        tgt_by_page.setdefault(p.page_num, []).append(p)
+    base_by_page: Dict[int, List[Tuple[int, Paragraph, str]]] = {}
+    for order, b in enumerate(baseline):
+        b_norm = _normalize_text_for_match(b.text)
+        if b_norm and b.page_num in tgt_by_page:
+            base_by_page.setdefault(b.page_num, []).append((order, b, b_norm))
+
+    scan_all = float(min_similarity) <= _INDEX_EXACT_MIN_SIMILARITY
+    ordered: List[Tuple[int, Dict[str, Any]]] = []
+    for page_num, items in base_by_page.items():
+        index = _PageIndex(tgt_by_page[page_num])
+        edges: List[Tuple[int, int, float, float]] = []
+        sims: Dict[Tuple[int, int], float] = {}
+        for i, (_, b, b_norm) in enumerate(items):
+            candidates = index.ranked_candidates(b_norm, float(min_similarity), scan_all)
+            if max_candidates is not None:
+                candidates = candidates[:max_candidates]
+            for j in candidates:
+                sm = index.matcher(j)
+                sm.set_seq1(b_norm)
+                sim = sm.ratio()
+                if sim >= min_similarity:
+                    t = index.paragraphs[j]
+                    # 纵向距离只作为同分时的微小扰动
+                    edges.append((i, j, sim, sim - 1e-9 * abs(float(t.bbox[1]) - float(b.bbox[1]))))
+                    sims[(i, j)] = sim
+
+        for i, j in _assign(edges, len(items), len(index.paragraphs)):
+            order, b, _ = items[i]
+            ordered.append((order, _match_record(b, index.paragraphs[j], sims[(i, j)])))
+
+    ordered.sort(key=lambda x: x[0])
+    return [m for _, m in ordered]
+
+
+def match_paragraphs_greedy(
+    baseline: List[Paragraph],
+    target: List[Paragraph],
+    min_similarity: float = 0.85,
+    max_candidates: int = 50,
+) -> List[Dict[str, Any]]:
+    """
+    旧版贪心匹配：按基准段落顺序逐个取同页前 max_candidates 个目标段落中相似度最高者。
+
+    保留用于 benchmark_paragraph_matching.py 对比；新代码请使用 match_paragraphs。
     """
     tgt_by_page: Dict[int, List[Paragraph]] = {}
     for p in target:
@@ -217,26 +425,7 @@ def match_paragraphs(
         sim, best = scored[0]
         used_target.add((best.page_num, best.paragraph_id))
 
-        matches.append(
-            {
-                "page_num": b.page_num,
-                "text_similarity": float(sim),
-                "baseline": {
-                    "paragraph_id": b.paragraph_id,
-                    "text": b.text,
-                    "bbox": list(b.bbox),
-                    "type": b.type,
-                    "line_count": b.line_count,
-                },
-                "target": {
-                    "paragraph_id": best.paragraph_id,
-                    "text": best.text,
-                    "bbox": list(best.bbox),
-                    "type": best.type,
-                    "line_count": best.line_count,
-                },
-            }
-        )
+        matches.append(_match_record(b, best, sim))
 
     return matches
 
@@ -7,6 +7,7 @@
 - 安全应用参数调整到 @config.tex
 - 可选：编译 + 像素对比验证
 - 恶化时自动回滚
+- 参数扫描：由一次决策派生多组候选调整并物化为候选配置（供 core.parameter_sweep 并行评估）
 
 注意：本模块只对 @config.tex 做最小化、可回滚修改，不接触正文文件。
 """
@@ -17,6 +18,10 @@ from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
 
+# 参数扫描时对决策步长的缩放倍数（负数表示反向试探）
+SWEEP_SCALES = (1.0, 0.5, 2.0, -1.0)
+
+
 @dataclass
 class ExecutionResult:
     status: str  # success | neutral | failed | error
@@ -77,43 +82,121 @@ class ParameterExecutor:
                 config_path.write_text(backup, encoding="utf-8")
                 return ExecutionResult(status="failed", rollback=True, reason="像素对比失败，已回滚", applied=applied)
 
-            improvement = current_ratio - new_ratio
-
-            # 恶化：相对增幅超过阈值
-            if new_ratio > current_ratio * (1.0 + self.worsen_ratio_threshold):
+            result = self.judge(current_ratio, new_ratio, applied)
+            if result.rollback:
                 config_path.write_text(backup, encoding="utf-8")
-                return ExecutionResult(
-                    status="failed",
-                    new_ratio=new_ratio,
-                    improvement=improvement,
-                    rollback=True,
-                    reason=f"差异恶化超过阈值（>{self.worsen_ratio_threshold:.0%}），已回滚",
-                    applied=applied,
-                )
-
-            # 明显改善
-            if new_ratio < current_ratio * (1.0 - self.improve_ratio_threshold):
-                return ExecutionResult(
-                    status="success",
-                    new_ratio=new_ratio,
-                    improvement=improvement,
-                    rollback=False,
-                    reason="差异显著改善",
-                    applied=applied,
-                )
+            return result
+
+        except Exception as e:
+            config_path.write_text(backup, encoding="utf-8")
+            return ExecutionResult(status="error", rollback=True, reason=f"执行异常，已回滚: {e}")
+
+    def judge(self, current_ratio: float, new_ratio: float, applied: List[Dict[str, Any]]) -> ExecutionResult:
+        """
+        按阈值判定一次调整的结果（不读写文件）
+
+        rollback=True 表示调用方应恢复原配置。
+        """
+        improvement = current_ratio - new_ratio
+
+        # 恶化：相对增幅超过阈值
+        if new_ratio > current_ratio * (1.0 + self.worsen_ratio_threshold):
+            return ExecutionResult(
+                status="failed",
+                new_ratio=new_ratio,
+                improvement=improvement,
+                rollback=True,
+                reason=f"差异恶化超过阈值（>{self.worsen_ratio_threshold:.0%}），已回滚",
+                applied=applied,
+            )
 
+        # 明显改善
+        if new_ratio < current_ratio * (1.0 - self.improve_ratio_threshold):
             return ExecutionResult(
-                status="neutral",
+                status="success",
                 new_ratio=new_ratio,
                 improvement=improvement,
                 rollback=False,
-                reason="差异变化不明显（可能为噪音）",
+                reason="差异显著改善",
                 applied=applied,
             )
 
-        except Exception as e:
-            config_path.write_text(backup, encoding="utf-8")
-            return ExecutionResult(status="error", rollback=True, reason=f"执行异常，已回滚: {e}")
+        return ExecutionResult(
+            status="neutral",
+            new_ratio=new_ratio,
+            improvement=improvement,
+            rollback=False,
+            reason="差异变化不明显（可能为噪音）",
+            applied=applied,
+        )
+
+    def candidate_decisions(
+        self,
+        decision: Dict[str, Any],
+        max_candidates: int = 8,
+        scales: Tuple[float, ...] = SWEEP_SCALES,
+    ) -> List[Dict[str, Any]]:
+        """
+        由一次决策派生参数扫描的候选决策
+
+        - 第 1 个候选即原决策（全部 adjustments 一起应用）
+        - 其后对 adjustments 与 fallback 中的每个参数单独按 scales 缩放步长
+        - 按 (参数, 步长) 去重，最多 max_candidates 个
+        """
+        adjustments = [a for a in (decision.get("adjustments") or []) if isinstance(a, dict)]
+        fallback = [a for a in (decision.get("fallback") or []) if isinstance(a, dict)]
+
+        out: List[Dict[str, Any]] = []
+        seen = set()
+
+        def _add(adjs: List[Dict[str, Any]], label: str) -> None:
+            key = tuple((str(a.get("parameter")), a.get("delta"), a.get("new_value")) for a in adjs)
+            if not adjs or key in seen or len(out) >= max_candidates:
+                return
+            seen.add(key)
+            out.append({**decision, "adjustments": adjs, "fallback": [], "sweep_label": label})
+
+        _add(adjustments, "decision")
+        for source in (adjustments, fallback):
+            for adj in source:
+                for scale in scales:
+                    scaled = self._scale_adjustment(adj, scale)
+                    if scaled is not None:
+                        _add([scaled], f"{scaled.get('parameter')}×{scale:g}")
+        return out
+
+    def _scale_adjustment(self, adj: Dict[str, Any], scale: float) -> Optional[Dict[str, Any]]:
+        try:
+            delta = float(adj.get("delta"))
+        except (TypeError, ValueError):
+            return dict(adj) if scale == 1.0 else None
+
+        out = dict(adj)
+        out["delta"] = round(delta * scale, 6)
+        cur = adj.get("current_value")
+        if adj.get("new_value") is not None and isinstance(cur, (int, float)):
+            out["new_value"] = round(float(cur) + out["delta"], 6)
+        else:
+            out["new_value"] = None
+        return out
+
+    def materialize_candidates(
+        self, content: str, decisions: List[Dict[str, Any]]
+    ) -> List[Tuple[Dict[str, Any], str, List[Dict[str, Any]]]]:
+        """
+        把候选决策应用到配置文本上，返回 [(decision, new_content, applied)]
+
+        未命中任何参数或与已有候选结果相同的配置会被剔除。
+        """
+        out: List[Tuple[Dict[str, Any], str, List[Dict[str, Any]]]] = []
+        seen = {content}
+        for d in decisions:
+            new_content, applied = self._apply_adjustments_to_content(content, d.get("adjustments") or [])
+            if not applied or new_content in seen:
+                continue
+            seen.add(new_content)
+            out.append((d, new_content, applied))
+        return out
 
     def _apply_adjustments_to_content(
         self, content: str, adjustments: List[Dict[str, Any]]
@@ -235,7 +318,8 @@ class ParameterExecutor:
             new_val = cur + d
 
         new_val = max(0.5, min(5.0, new_val))
-        new_body = re.sub(kv_pattern, rf"\1{new_val:.2f}cm", body, count=1)
+        # 使用函数式替换，避免 \1 与数值拼接成 \13 之类的无效分组引用
+        new_body = re.sub(kv_pattern, lambda g: f"{g.group(1)}{new_val:.2f}cm", body, count=1)
         return content[: m.start(2)] + new_body + content[m.end(2) :]
 
     def _apply_parskip(self, content: str, delta: Any, new_value: Any) -> str:
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+并行参数扫描（ParameterSweep）
+
+逐轮“应用一个调整 → 编译 → 对比 → 决策”的迭代在 N 轮内要做 N 次串行 xelatex 编译。
+参数扫描把一次决策派生为多组候选调整（ParameterExecutor.candidate_decisions），
+每组候选在独立的项目副本（沙箱）中写入 @config.tex、编译并与基准做像素对比，
+候选之间在进程池中并行执行，最后只把差异最小的候选写回真实项目。
+
+- 沙箱位于工作空间 cache/sweep/ 下，复制项目时跳过工作空间（按 workspace.root 实际位置）、
+  构建缓存与 main.pdf
+- 判定沿用 ParameterExecutor.judge()：最佳候选恶化超过阈值时不修改项目
+- 最佳候选的 main.pdf 与对比产物会拷回项目/迭代目录，下一轮无需重复编译
+
+使用方法:
+    from core.parameter_sweep import ParameterSweep, SweepSettings
+
+    sweep = ParameterSweep(project_path, config_path, sandbox_root, settings, workers=4)
+    result, trials = sweep.run(executor, decision, current_ratio)
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .parameter_executor import ExecutionResult, ParameterExecutor
+from .validator_base import LATEX_COMPILE_STEPS
+
+
+# 复制项目到沙箱时跳过的顶层目录/文件（工作空间按实际路径排除，见 _copy_project）
+_SANDBOX_IGNORED = {".latex-cache", ".pdf_structure", ".git", "__pycache__", "main.pdf"}
+
+
+@dataclass
+class SweepSettings:
+    """单个候选的编译与对比设置（需可 pickle，传给子进程）"""
+
+    baseline_pdf: Path
+    compare_script: Path
+    compare_args: List[str] = field(default_factory=list)  # --dpi/--tolerance/--mode 等
+    compile_steps: List[List[str]] = field(default_factory=lambda: [list(c) for c in LATEX_COMPILE_STEPS])
+    step_timeout: int = 60
+
+
+@dataclass
+class SweepTask:
+    index: int
+    label: str
+    project_path: Path
+    sandbox: Path
+    config_relpath: str
+    config_content: str
+    settings: SweepSettings
+    excluded: Tuple[Path, ...] = ()
+
+
+@dataclass
+class SweepTrial:
+    index: int
+    label: str
+    status: str  # ok | compile_failed | compare_failed | error
+    ratio: Optional[float] = None
+    seconds: float = 0.0
+    reason: str = ""
+    applied: Optional[List[Dict[str, Any]]] = None
+
+
+def default_sweep_workers(n_candidates: int) -> int:
+    """并行候选数：每个 xelatex 进程基本单线程，按 CPU 核数，不超过候选数"""
+    return max(1, min(n_candidates, os.cpu_count() or 1))
+
+
+def _copy_project(project_path: Path, sandbox: Path, excluded: Tuple[Path, ...] = ()) -> None:
+    """
+    复制项目到沙箱。
+
+    excluded 为需整体跳过的目录（工作空间根目录、本轮沙箱根目录）；沙箱自身总会被跳过，
+    因此即使 workspace.root 配置为项目内任意路径，copytree 也不会递归复制自身。
+    """
+    if sandbox.exists():
+        shutil.rmtree(sandbox)
+    project_path = project_path.resolve()
+    skip = {Path(p).resolve() for p in excluded} | {sandbox.resolve()}
+
+    def _ignore(directory: str, names: List[str]) -> List[str]:
+        d = Path(directory)
+        ignored = [n for n in names if n in _SANDBOX_IGNORED] if d == project_path else []
+        return ignored + [n for n in names if n not in ignored and d / n in skip]
+
+    shutil.copytree(project_path, sandbox, symlinks=True, ignore=_ignore)
+
+
+def _compile(project_dir: Path, settings: SweepSettings) -> bool:
+    for cmd in settings.compile_steps:
+        result = subprocess.run(
+            cmd, cwd=project_dir, capture_output=True, text=True, timeout=settings.step_timeout
+        )
+        if result.returncode != 0 and cmd[0] == "xelatex":
+            return False
+    return (project_dir / "main.pdf").exists()
+
+
+def evaluate_candidate(task: SweepTask) -> SweepTrial:
+    """在沙箱中写入候选配置、编译并对比（进程池任务，必须为模块级函数）"""
+    start = time.perf_counter()
+    trial = SweepTrial(index=task.index, label=task.label, status="error")
+    try:
+        _copy_project(task.project_path, task.sandbox, task.excluded)
+        (task.sandbox / task.config_relpath).write_text(task.config_content, encoding="utf-8")
+
+        if not _compile(task.sandbox, task.settings):
+            trial.status, trial.reason = "compile_failed", "编译失败"
+            return trial
+
+        json_out = task.sandbox / "pixel_compare.json"
+        cmd = [
+            sys.executable,
+            str(task.settings.compare_script),
+            str(task.settings.baseline_pdf),
+            str(task.sandbox / "main.pdf"),
+            *task.settings.compare_args,
+            "--workers", "1",  # 候选之间已并行，避免嵌套进程池
+            "--json-out", str(json_out),
+            "--features-out", str(task.sandbox / "diff_features.json"),
+        ]
+        r = subprocess.run(cmd, capture_output=True, text=True)
+        if r.returncode != 0 or not json_out.exists():
+            trial.status, trial.reason = "compare_failed", (r.stderr or "").strip()[-500:]
+            return trial
+
+        import json
+
+        data = json.loads(json_out.read_text(encoding="utf-8"))
+        trial.ratio = float(data.get("avg_diff_ratio", 1.0))
+        trial.status = "ok"
+        return trial
+    except subprocess.TimeoutExpired:
+        trial.reason = "编译超时"
+        return trial
+    except Exception as e:
+        trial.reason = str(e)
+        return trial
+    finally:
+        trial.seconds = time.perf_counter() - start
+
+
+class ParameterSweep:
+    """在隔离副本中并行评估多组候选调整，保留最佳结果"""
+
+    def __init__(
+        self,
+        project_path: Path,
+        config_path: Path,
+        sandbox_root: Path,
+        settings: SweepSettings,
+        workers: int = 0,
+        max_candidates: int = 6,
+        keep_sandboxes: bool = False,
+        artifacts_dir: Optional[Path] = None,
+        workspace_root: Optional[Path] = None,
+    ):
+        """
+        Args:
+            project_path: 项目根目录
+            config_path: 项目内的 @config.tex
+            sandbox_root: 沙箱根目录（通常为 <workspace>/cache/sweep/iteration_NNN）
+            settings: 编译与对比设置
+            workers: 并行候选数（0=自动，1=串行）
+            max_candidates: 每轮最多评估的候选数
+            keep_sandboxes: 是否保留沙箱（调试用）
+            artifacts_dir: 最佳候选的对比产物拷贝目录（通常为当前迭代目录）
+            workspace_root: 工作空间根目录（位于项目内时复制沙箱会整体跳过）
+        """
+        self.project_path = Path(project_path).resolve()
+        self.config_path = Path(config_path).resolve()
+        self.sandbox_root = Path(sandbox_root)
+        self.settings = settings
+        self.workers = int(workers)
+        self.max_candidates = int(max_candidates)
+        self.keep_sandboxes = keep_sandboxes
+        self.artifacts_dir = Path(artifacts_dir) if artifacts_dir else None
+        self.workspace_root = Path(workspace_root) if workspace_root else None
+
+    def _sandbox(self, index: int) -> Path:
+        return self.sandbox_root / f"candidate_{index:02d}"
+
+    def run(
+        self,
+        executor: ParameterExecutor,
+        decision: Dict[str, Any],
+        current_ratio: float,
+    ) -> Tuple[ExecutionResult, List[Dict[str, Any]]]:
+        """
+        派生候选 → 并行编译/对比 → 写回最佳候选
+
+        Returns:
+            (最佳候选的执行结果, 全部候选的评估记录)
+        """
+        if not self.config_path.exists():
+            return ExecutionResult(status="error", reason=f"配置文件不存在: {self.config_path}"), []
+
+        original = self.config_path.read_text(encoding="utf-8")
+        candidates = executor.materialize_candidates(
+            original, executor.candidate_decisions(decision, max_candidates=self.max_candidates)
+        )
+        if not candidates:
+            return ExecutionResult(status="neutral", reason="未命中可修改的参数（无匹配项）", applied=[]), []
+
+        config_relpath = str(self.config_path.relative_to(self.project_path))
+        excluded = tuple(p for p in (self.workspace_root, self.sandbox_root) if p is not None)
+        tasks = [
+            SweepTask(
+                index=i,
+                label=str(d.get("sweep_label", i)),
+                project_path=self.project_path,
+                sandbox=self._sandbox(i),
+                config_relpath=config_relpath,
+                config_content=content,
+                settings=self.settings,
+                excluded=excluded,
+            )
+            for i, (d, content, _) in enumerate(candidates)
+        ]
+
+        self.sandbox_root.mkdir(parents=True, exist_ok=True)
+        workers = self.workers if self.workers > 0 else default_sweep_workers(len(tasks))
+        try:
+            if workers <= 1 or len(tasks) == 1:
+                trials = [evaluate_candidate(t) for t in tasks]
+            else:
+                with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+                    trials = list(pool.map(evaluate_candidate, tasks))
+
+            for trial, (_, _, applied) in zip(trials, candidates):
+                trial.applied = applied
+
+            scored = [t for t in trials if t.status == "ok" and t.ratio is not None]
+            if not scored:
+                return (
+                    ExecutionResult(status="failed", rollback=True, reason="全部候选编译/对比失败，配置未修改", applied=[]),
+                    [asdict(t) for t in trials],
+                )
+
+            best = min(scored, key=lambda t: (t.ratio, t.index))
+            result = executor.judge(current_ratio, float(best.ratio), best.applied or [])
+            result.reason = f"{result.reason}（扫描 {len(trials)} 个候选，最佳: {best.label}）"
+            if not result.rollback:
+                self._adopt(best.index, candidates[best.index][1])
+            return result, [asdict(t) for t in trials]
+        finally:
+            if not self.keep_sandboxes:
+                shutil.rmtree(self.sandbox_root, ignore_errors=True)
+
+    def _adopt(self, index: int, content: str) -> None:
+        """写回最佳候选的配置，并复用其编译结果与对比产物"""
+        sandbox = self._sandbox(index)
+        self.config_path.write_text(content, encoding="utf-8")
+        shutil.copy2(sandbox / "main.pdf", self.project_path / "main.pdf")
+        if self.artifacts_dir is not None:
+            self.artifacts_dir.mkdir(parents=True, exist_ok=True)
+            for name in ("pixel_compare", "diff_features"):
+                src = sandbox / f"{name}.json"
+                if src.exists():
+                    shutil.copy2(src, self.artifacts_dir / f"{name}_post.json")
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF 结构层（PdfStructure）
+
+analyze_pdf、extract_headings_from_pdf、段落提取、页面指纹与视觉验证器都要遍历
+同一份 PDF 的 get_text("dict")。本模块对每份 PDF 只解析一次文本结构
+（页面尺寸 + block/line/span 及其 bbox、字体、字号、颜色、flags），
+并按内容哈希缓存：
+
+- 进程内：按 PDF 内容哈希复用同一个 PdfStructure
+- 磁盘：序列化到 PDF 同目录的 .pdf_structure/<stem>.<hash>.json，
+  同名 PDF 内容变化后旧文件自动清理（目录不可写时只用进程内缓存）
+
+块结构与 page.get_text("dict")["blocks"] 相同，只去掉图片块的像素数据，
+调用方原有的 blocks → lines → spans 遍历逻辑无需改写。
+
+使用方法:
+    from core.pdf_structure import load_pdf_structure
+
+    structure = load_pdf_structure(pdf_path)
+    for page in structure.pages:
+        for block in page["blocks"]:
+            ...
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+STRUCTURE_SCHEMA = 1
+STRUCTURE_DIRNAME = ".pdf_structure"
+MEMO_LIMIT = 8  # 进程内最多保留的 PDF 结构数
+
+_SPAN_KEYS = ("text", "font", "size", "flags", "color", "bbox", "origin")
+
+# 进程内缓存：内容哈希 -> PdfStructure（按插入顺序淘汰）
+_MEMO: Dict[str, "PdfStructure"] = {}
+# 同一进程内按 (路径, mtime, size) 复用哈希，避免重复读整份 PDF
+_DIGEST_MEMO: Dict[Tuple[str, int, int], str] = {}
+
+
+def pdf_digest(pdf_path) -> str:
+    """PDF 内容的 sha256（前 32 位十六进制）"""
+    p = Path(pdf_path).resolve()
+    st = p.stat()
+    memo_key = (str(p), st.st_mtime_ns, st.st_size)
+    digest = _DIGEST_MEMO.get(memo_key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(p, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        digest = _DIGEST_MEMO[memo_key] = h.hexdigest()[:32]
+    return digest
+
+
+class PdfStructure:
+    """一份 PDF 的文本结构（只读）"""
+
+    def __init__(self, digest: str, pages: List[Dict[str, Any]]):
+        self.digest = digest
+        self.pages = pages
+
+    def __len__(self) -> int:
+        return len(self.pages)
+
+    def page(self, index: int) -> Dict[str, Any]:
+        """0-based 页面：{"width", "height", "blocks"}"""
+        return self.pages[index]
+
+    def page_size(self, index: int = 0) -> Tuple[float, float]:
+        p = self.pages[index]
+        return float(p["width"]), float(p["height"])
+
+    def text_blocks(self, index: int) -> List[Dict[str, Any]]:
+        return [b for b in self.pages[index]["blocks"] if b.get("lines")]
+
+    def iter_lines(self, index: int) -> Iterator[Dict[str, Any]]:
+        """按 block 顺序遍历某页的行（与 get_text("dict") 顺序一致）"""
+        for block in self.text_blocks(index):
+            for line in block["lines"]:
+                yield line
+
+    def page_text_lines(self, index: int) -> List[str]:
+        """某页逐行文本（等价于 get_text("text") 按换行切分）"""
+        return ["".join(s.get("text") or "" for s in line.get("spans") or []) for line in self.iter_lines(index)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"schema_version": STRUCTURE_SCHEMA, "digest": self.digest, "pages": self.pages}
+
+
+def _extract_pages(pdf_path: Path) -> List[Dict[str, Any]]:
+    import fitz  # PyMuPDF
+
+    pages: List[Dict[str, Any]] = []
+    with fitz.open(pdf_path) as doc:
+        for page in doc:
+            data = page.get_text("dict")
+            blocks: List[Dict[str, Any]] = []
+            for block in data.get("blocks", []):
+                item: Dict[str, Any] = {"type": int(block.get("type", 0)), "bbox": list(block.get("bbox") or ())}
+                lines = block.get("lines")
+                if lines:
+                    item["lines"] = [
+                        {
+                            "bbox": list(line.get("bbox") or ()),
+                            "spans": [
+                                {k: (list(s[k]) if isinstance(s[k], tuple) else s[k]) for k in _SPAN_KEYS if k in s}
+                                for s in line.get("spans") or []
+                            ],
+                        }
+                        for line in lines
+                    ]
+                blocks.append(item)
+            pages.append({"width": float(page.rect.width), "height": float(page.rect.height), "blocks": blocks})
+    return pages
+
+
+def _disk_path(pdf_path: Path, digest: str) -> Path:
+    return pdf_path.parent / STRUCTURE_DIRNAME / f"{pdf_path.stem}.{digest}.json"
+
+
+def _load_from_disk(path: Path, digest: str) -> Optional[PdfStructure]:
+    if not path.exists():
+        return None
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if data.get("schema_version") != STRUCTURE_SCHEMA or data.get("digest") != digest:
+        return None
+    return PdfStructure(digest, data.get("pages") or [])
+
+
+def _store_to_disk(pdf_path: Path, structure: PdfStructure) -> None:
+    path = _disk_path(pdf_path, structure.digest)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(structure.to_dict(), ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, path)
+        # 同名 PDF 的旧版本结构不再有用（如每轮迭代覆盖的 main.pdf）
+        for old in path.parent.glob(f"{pdf_path.stem}.*.json"):
+            if old != path and old.name[len(pdf_path.stem) + 1:-len(".json")].isalnum():
+                old.unlink()
+    except OSError:
+        pass
+
+
+def load_pdf_structure(pdf_path, use_disk_cache: bool = True) -> PdfStructure:
+    """
+    读取 PDF 文本结构：进程内缓存 → 磁盘缓存 → PyMuPDF 解析
+
+    Args:
+        pdf_path: PDF 路径
+        use_disk_cache: 是否读写 PDF 同目录下的 .pdf_structure/ 缓存
+    """
+    pdf_path = Path(pdf_path)
+    digest = pdf_digest(pdf_path)
+    structure = _MEMO.get(digest)
+    if structure is not None:
+        return structure
+
+    if use_disk_cache:
+        structure = _load_from_disk(_disk_path(pdf_path, digest), digest)
+    if structure is None:
+        structure = PdfStructure(digest, _extract_pages(pdf_path))
+        if use_disk_cache:
+            _store_to_disk(pdf_path, structure)
+
+    _MEMO[digest] = structure
+    while len(_MEMO) > MEMO_LIMIT:
+        _MEMO.pop(next(iter(_MEMO)))
+    return structure
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+光栅缓存（RasterCache）
+
+迭代优化时基准 PDF 不变，只有 LaTeX 输出在变。本模块把基准 PDF 的渲染结果与
+提取出的段落/标题元数据缓存在工作空间 cache/ 下，后续迭代直接复用：
+
+- 键：PDF 内容哈希（sha256）+ 页码 + DPI；元数据另加提取参数
+- 像素：每页一个 .npy，读取时以 mmap 方式映射，不整份载入内存
+- 元数据：JSON；段落图像拼接为一个扁平 .npy，按偏移切片还原
+- 淘汰：总大小超过上限时按最近使用时间（读取会刷新 mtime）删除最旧的文件
+
+使用方法:
+    from core.raster_cache import RasterCache
+
+    cache = RasterCache(ws_manager.get_cache_path(project), max_size_mb=512)
+    digest = cache.pdf_digest(baseline_pdf)
+    img = cache.load_page(digest, page_index=0, dpi=150)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from .pdf_structure import pdf_digest
+
+
+def _param_tag(params: Dict[str, Any]) -> str:
+    raw = json.dumps(params, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:12]
+
+
+class RasterCache:
+    """按 PDF 内容哈希缓存页面像素与提取元数据的磁盘缓存"""
+
+    def __init__(self, cache_dir: Path, max_size_mb: float = 512):
+        """
+        Args:
+            cache_dir: 缓存根目录（通常为 WorkspaceManager.get_cache_path()）
+            max_size_mb: 缓存总大小上限（MB），<=0 表示不限制
+        """
+        self.root = Path(cache_dir) / "raster"
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(float(max_size_mb) * 1024 * 1024)
+
+    # ------------------------------------------------------------------
+    # 键
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def pdf_digest(pdf_path: Path) -> str:
+        """PDF 内容的 sha256（前 32 位十六进制；同一进程内按路径/mtime/size 复用）"""
+        return pdf_digest(pdf_path)
+
+    def _entry_dir(self, digest: str) -> Path:
+        return self.root / digest
+
+    def _page_file(self, digest: str, page_index: int, dpi: int) -> Path:
+        return self._entry_dir(digest) / f"page{page_index:04d}_{int(dpi)}dpi.npy"
+
+    # ------------------------------------------------------------------
+    # 读写
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _atomic_write(path: Path, writer: Callable[[Any], None], mode: str = "wb") -> None:
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        for attempt in range(2):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                with open(tmp, mode, **({} if "b" in mode else {"encoding": "utf-8"})) as f:
+                    writer(f)
+                os.replace(tmp, path)
+                return
+            except FileNotFoundError:
+                # 目录刚被并发淘汰的其他进程清理（空目录 rmdir）：重建后再试一次
+                if attempt:
+                    raise
+            finally:
+                if tmp.exists():
+                    tmp.unlink()
+
+    def _load_npy(self, path: Path) -> Optional[np.ndarray]:
+        if not path.exists():
+            return None
+        try:
+            arr = np.load(path, mmap_mode="r", allow_pickle=False)
+        except (OSError, ValueError):
+            return None
+        self._touch(path)
+        return arr
+
+    def load_page(self, digest: str, page_index: int, dpi: int) -> Optional[np.ndarray]:
+        """读取缓存的页面像素（只读 mmap 数组）；未命中返回 None"""
+        return self._load_npy(self._page_file(digest, page_index, dpi))
+
+    def store_page(self, digest: str, page_index: int, dpi: int, image: np.ndarray) -> None:
+        """写入页面像素（原子替换）"""
+        self._atomic_write(
+            self._page_file(digest, page_index, dpi),
+            lambda f: np.save(f, np.ascontiguousarray(image), allow_pickle=False),
+        )
+
+    def load_meta(self, digest: str, name: str, params: Dict[str, Any]) -> Optional[Any]:
+        """读取元数据（JSON）；params 为提取参数，参与缓存键"""
+        path = self._entry_dir(digest) / f"{name}_{_param_tag(params)}.json"
+        if not path.exists():
+            return None
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        self._touch(path)
+        return data
+
+    def store_meta(self, digest: str, name: str, params: Dict[str, Any], data: Any) -> None:
+        path = self._entry_dir(digest) / f"{name}_{_param_tag(params)}.json"
+        self._atomic_write(path, lambda f: json.dump(data, f, ensure_ascii=False), mode="w")
+
+    def cached_meta(self, pdf_path: Path, name: str, params: Dict[str, Any], compute: Callable[[], Any]) -> Any:
+        """元数据未命中时调用 compute() 并写入缓存"""
+        digest = self.pdf_digest(pdf_path)
+        data = self.load_meta(digest, name, params)
+        if data is None:
+            data = compute()
+            self.store_meta(digest, name, params, data)
+            self.evict()
+        return data
+
+    # ------------------------------------------------------------------
+    # 段落（元数据 + 段落图像）
+    # ------------------------------------------------------------------
+
+    def load_paragraphs(self, pdf_path: Path, **params: Any) -> Optional[List[Any]]:
+        """读取缓存的段落列表（core.paragraph_alignment.Paragraph）；未命中返回 None"""
+        from .paragraph_alignment import Paragraph, ParagraphLine
+
+        digest = self.pdf_digest(pdf_path)
+        meta = self.load_meta(digest, "paragraphs", params)
+        if meta is None:
+            return None
+        images = None
+        if meta.get("has_images"):
+            images = self._load_npy(self._entry_dir(digest) / f"paragraph_images_{_param_tag(params)}.npy")
+            if images is None:
+                return None
+
+        out = []
+        for item in meta["paragraphs"]:
+            p = Paragraph(
+                page_num=item["page_num"],
+                paragraph_id=item["paragraph_id"],
+                text=item["text"],
+                bbox=tuple(item["bbox"]),
+                line_count=item["line_count"],
+                lines=[
+                    ParagraphLine(
+                        bbox=tuple(ln["bbox"]),
+                        text=ln["text"],
+                        x0=ln["x0"],
+                        y0=ln["y0"],
+                        y1=ln["y1"],
+                        font_size=ln["font_size"],
+                    )
+                    for ln in item["lines"]
+                ],
+                type=item["type"],
+            )
+            shape = item.get("image_shape")
+            if images is not None and shape:
+                offset = item["image_offset"]
+                size = int(np.prod(shape))
+                p.image_rgb = images[offset: offset + size].reshape(shape)
+            out.append(p)
+        return out
+
+    def store_paragraphs(self, pdf_path: Path, paragraphs: List[Any], **params: Any) -> None:
+        digest = self.pdf_digest(pdf_path)
+        items = []
+        chunks = []
+        offset = 0
+        for p in paragraphs:
+            item = {
+                "page_num": p.page_num,
+                "paragraph_id": p.paragraph_id,
+                "text": p.text,
+                "bbox": list(p.bbox),
+                "line_count": p.line_count,
+                "lines": [
+                    {
+                        "bbox": list(ln.bbox),
+                        "text": ln.text,
+                        "x0": ln.x0,
+                        "y0": ln.y0,
+                        "y1": ln.y1,
+                        "font_size": ln.font_size,
+                    }
+                    for ln in p.lines
+                ],
+                "type": p.type,
+            }
+            if p.image_rgb is not None:
+                img = np.ascontiguousarray(p.image_rgb, dtype=np.uint8)
+                item["image_shape"] = list(img.shape)
+                item["image_offset"] = offset
+                chunks.append(img.reshape(-1))
+                offset += img.size
+            items.append(item)
+
+        if chunks:
+            flat = np.concatenate(chunks)
+            self._atomic_write(
+                self._entry_dir(digest) / f"paragraph_images_{_param_tag(params)}.npy",
+                lambda f: np.save(f, flat, allow_pickle=False),
+            )
+        self.store_meta(digest, "paragraphs", params, {"has_images": bool(chunks), "paragraphs": items})
+        self.evict()
+
+    # ------------------------------------------------------------------
+    # 淘汰
+    # ------------------------------------------------------------------
+
+    def _iter_entries(self):
+        """
+        遍历缓存文件，产出 (mtime_ns, size, path)
+
+        多个比较进程可能共享同一缓存目录并同时淘汰：遍历期间被其他进程删除的
+        文件或目录直接跳过（os.walk 默认忽略目录读取错误）。
+        """
+        for dirpath, _dirnames, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.endswith(".tmp"):
+                    continue
+                f = Path(dirpath) / name
+                try:
+                    st = f.stat()
+                except OSError:
+                    continue
+                yield st.st_mtime_ns, st.st_size, f
+
+    def size_bytes(self) -> int:
+        return sum(size for _, size, _ in self._iter_entries())
+
+    def evict(self) -> int:
+        """
+        总大小超过上限时按 mtime 从旧到新删除文件
+
+        并发安全：其他进程抢先删除的文件/目录视为已淘汰，跳过而不中断比较。
+
+        Returns:
+            删除的文件数量
+        """
+        if self.max_bytes <= 0:
+            return 0
+        files = list(self._iter_entries())
+        total = sum(size for _, size, _ in files)
+        if total <= self.max_bytes:
+            return 0
+
+        removed = 0
+        for _, size, f in sorted(files, key=lambda x: x[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                f.unlink()
+            except FileNotFoundError:
+                # 已被其他进程淘汰：空间同样已释放
+                total -= size
+                continue
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        try:
+            subdirs = [d for d in self.root.iterdir() if d.is_dir()]
+        except OSError:
+            return removed
+        for d in subdirs:
+            try:
+                if not any(d.iterdir()):
+                    d.rmdir()
+            except OSError:
+                # 其他进程已删除该目录，或刚写入了新文件
+                continue
+        return removed
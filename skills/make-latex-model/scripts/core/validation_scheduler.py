@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+验证调度器（ValidationScheduler）
+
+run_validators 原先按优先级逐个执行验证器，CompilationValidator.compile_latex 还会自行启动 xelatex。
+调度器把一次验证拆成两步：
+
+1. 解析共享编译产物（CompileArtifacts）：PDF 不早于任何源文件时直接复用
+   （例如 enhanced_optimize.step_compile_latex 刚编译过），过期且允许编译时只编译一次
+2. 产物写入 ValidationContext 后，各验证器只读共享产物、互不依赖，在线程池中并发执行；
+   结果仍按优先级输出，并记录每个验证器的耗时
+
+使用方法:
+    from scripts.core.validation_scheduler import ValidationScheduler, ensure_compiled
+
+    context.artifacts = ensure_compiled(project_path, compile_if_stale=True)
+    runs = ValidationScheduler(validators, workers=0).run(context)
+"""
+
+from __future__ import annotations
+
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from .validator_base import LATEX_COMPILE_STEPS, CompileArtifacts, ValidationContext, ValidationResult, ValidatorBase
+
+
+@dataclass
+class ValidatorRun:
+    """单个验证器的执行记录"""
+    name: str
+    priority: int
+    result: ValidationResult
+    seconds: float
+    error: str = ""
+
+
+def ensure_compiled(
+    project_path: Path,
+    compile_if_stale: bool = True,
+    steps: Optional[List[List[str]]] = None,
+    step_timeout: int = 60,
+) -> CompileArtifacts:
+    """
+    解析项目的编译产物；过期（或缺失）且 compile_if_stale 时按编译序列编译一次
+
+    Args:
+        project_path: 项目根目录
+        compile_if_stale: 产物过期时是否编译
+        steps: 编译序列（默认 xelatex -> bibtex -> xelatex -> xelatex）
+        step_timeout: 单步超时（秒）
+
+    Returns:
+        CompileArtifacts（编译失败时 compile_error 非空）
+    """
+    project_path = Path(project_path)
+    artifacts = CompileArtifacts.from_project(project_path)
+    if not compile_if_stale or artifacts.is_fresh(project_path):
+        return artifacts
+    if not (project_path / "main.tex").exists():
+        artifacts.compile_error = "主文件不存在: main.tex"
+        return artifacts
+
+    start = time.perf_counter()
+    try:
+        for cmd in steps or LATEX_COMPILE_STEPS:
+            result = subprocess.run(cmd, cwd=project_path, capture_output=True, text=True, timeout=step_timeout)
+            if result.returncode != 0 and cmd[0] == "xelatex":
+                artifacts.compile_error = f"编译失败: {' '.join(cmd)}"
+                break
+    except subprocess.TimeoutExpired as e:
+        artifacts.compile_error = f"编译超时: {e.cmd[0] if isinstance(e.cmd, list) else e.cmd}"
+    except FileNotFoundError as e:
+        artifacts.compile_error = f"未找到编译命令: {e.filename}"
+    artifacts.compiled = True
+    artifacts.compile_seconds = time.perf_counter() - start
+    return artifacts
+
+
+class ValidationScheduler:
+    """并发执行验证器，按优先级汇总结果"""
+
+    def __init__(self, validators: List[ValidatorBase], workers: int = 0):
+        """
+        Args:
+            validators: 已按优先级排序的验证器实例（ValidatorRegistry.load_all 的返回值）
+            workers: 并发线程数（0=每个验证器一个线程，1=串行）
+        """
+        self.validators = list(validators)
+        self.workers = int(workers)
+        self.wall_seconds = 0.0
+
+    @staticmethod
+    def _run_one(validator: ValidatorBase, context: ValidationContext) -> ValidatorRun:
+        start = time.perf_counter()
+        error = ""
+        try:
+            result = validator.validate(context)
+        except Exception as e:
+            # 单个验证器异常不影响其他验证器
+            error = str(e)
+            result = ValidationResult(passed=[], warnings=[], failed=[])
+            result.add_fail(f"验证器异常: {e}")
+        return ValidatorRun(
+            name=validator.get_name(),
+            priority=validator.get_priority(),
+            result=result,
+            seconds=time.perf_counter() - start,
+            error=error,
+        )
+
+    def run(self, context: ValidationContext) -> List[ValidatorRun]:
+        """
+        执行全部验证器
+
+        Returns:
+            执行记录（按优先级排序，同优先级保持注册顺序）
+        """
+        context.compile_artifacts()  # 派发前解析共享产物，避免线程中重复初始化
+        start = time.perf_counter()
+        workers = self.workers if self.workers > 0 else len(self.validators)
+        if workers <= 1 or len(self.validators) <= 1:
+            runs = [self._run_one(v, context) for v in self.validators]
+        else:
+            with ThreadPoolExecutor(max_workers=min(workers, len(self.validators))) as pool:
+                runs = list(pool.map(lambda v: self._run_one(v, context), self.validators))
+        self.wall_seconds = time.perf_counter() - start
+        order = {id(run): i for i, run in enumerate(runs)}
+        return sorted(runs, key=lambda r: (r.priority, order[id(r)]))
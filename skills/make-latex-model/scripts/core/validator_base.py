@@ -4,10 +4,82 @@
 验证器基类 - 验证插件抽象基类
 """
 
+import threading
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional, List
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+
+# 编译序列: xelatex -> bibtex -> xelatex -> xelatex（验证调度器与参数扫描共用）
+LATEX_COMPILE_STEPS: List[List[str]] = [
+    ["xelatex", "-interaction=nonstopmode", "main.tex"],
+    ["bibtex", "main"],
+    ["xelatex", "-interaction=nonstopmode", "main.tex"],
+    ["xelatex", "-interaction=nonstopmode", "main.tex"],
+]
+
+# 判断编译产物是否过期时检查的源文件后缀
+SOURCE_SUFFIXES = (".tex", ".sty", ".cls", ".bib", ".bst", ".cfg", ".def")
+# 判断过期时跳过的目录（工作空间、构建缓存等）
+_IGNORED_DIRS = {".make_latex_model", ".latex-cache", ".pdf_structure", ".git", "__pycache__"}
+
+
+@dataclass
+class CompileArtifacts:
+    """
+    一次编译的产物（PDF/log/aux/bbl），由验证调度器解析一次后在验证器之间共享
+
+    日志文本按需读取并缓存，多个验证器并发读取时只读一次。
+    """
+    pdf: Path
+    log: Path
+    aux: Path
+    bbl: Path
+    compiled: bool = False        # 是否由本次验证调度器编译
+    compile_seconds: float = 0.0
+    compile_error: str = ""
+    _log_text: Optional[str] = field(default=None, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @classmethod
+    def from_project(cls, project_path: Path, jobname: str = "main") -> "CompileArtifacts":
+        project_path = Path(project_path)
+        return cls(
+            pdf=project_path / f"{jobname}.pdf",
+            log=project_path / f"{jobname}.log",
+            aux=project_path / f"{jobname}.aux",
+            bbl=project_path / f"{jobname}.bbl",
+        )
+
+    def log_text(self) -> Optional[str]:
+        """编译日志全文；日志不存在时返回 None"""
+        with self._lock:
+            if self._log_text is None and self.log.exists():
+                self._log_text = self.log.read_text(encoding="utf-8", errors="ignore")
+            return self._log_text
+
+    def is_fresh(self, project_path: Path) -> bool:
+        """PDF 存在且不早于项目内任何源文件（.tex/.sty/.cls/.bib 等）"""
+        if not self.pdf.exists():
+            return False
+        built = self.pdf.stat().st_mtime
+        for path in _iter_sources(Path(project_path)):
+            try:
+                if path.stat().st_mtime > built:
+                    return False
+            except OSError:
+                continue
+        return True
+
+
+def _iter_sources(root: Path):
+    for child in root.iterdir():
+        if child.is_dir():
+            if child.name not in _IGNORED_DIRS and not child.is_symlink():
+                yield from _iter_sources(child)
+        elif child.suffix in SOURCE_SUFFIXES:
+            yield child
 
 
 @dataclass
@@ -17,6 +89,13 @@ class ValidationContext:
     template_config: Dict[str, Any]
     tolerance: Dict[str, Any]
     verbose: bool = False
+    artifacts: Optional[CompileArtifacts] = None  # 共享编译产物（调度器填充）
+
+    def compile_artifacts(self) -> CompileArtifacts:
+        """共享编译产物；未经调度器填充时按项目默认路径解析"""
+        if self.artifacts is None:
+            self.artifacts = CompileArtifacts.from_project(self.project_path)
+        return self.artifacts
 
 
 @dataclass
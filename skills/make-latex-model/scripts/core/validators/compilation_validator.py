@@ -5,7 +5,6 @@
 """
 
 import re
-import subprocess
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 from ..validator_base import ValidatorBase, ValidationContext, ValidationResult
@@ -32,9 +31,10 @@ class CompilationValidator(ValidatorBase):
         """
         result = ValidationResult(passed=[], warnings=[], failed=[])
 
-        project_path = context.project_path
-        pdf_file = project_path / "main.pdf"
-        log_file = project_path / "main.log"
+        artifacts = context.compile_artifacts()
+        pdf_file = artifacts.pdf
+        if artifacts.compile_error:
+            result.add_fail(artifacts.compile_error)
 
         # 1. 检查 PDF 文件是否存在
         if pdf_file.exists():
@@ -51,8 +51,9 @@ class CompilationValidator(ValidatorBase):
             return result
 
         # 2. 检查编译日志
-        if log_file.exists():
-            errors, warnings = self._parse_log_file(log_file)
+        log_content = artifacts.log_text()
+        if log_content is not None:
+            errors, warnings = self._parse_log_text(log_content)
 
             if errors:
                 result.add_fail(f"发现 {len(errors)} 个编译错误")
@@ -72,8 +73,7 @@ class CompilationValidator(ValidatorBase):
             result.add_warning("编译日志不存在，跳过日志检查")
 
         # 3. 检查参考文献（可选）
-        bbl_file = project_path / "main.bbl"
-        if bbl_file.exists():
+        if artifacts.bbl.exists():
             result.add_pass("参考文献编译成功")
         else:
             result.add_warning("参考文献文件不存在，可能未运行 bibtex")
@@ -84,6 +84,19 @@ class CompilationValidator(ValidatorBase):
         """
         解析 LaTeX 编译日志
 
+        Returns:
+            (错误列表, 警告列表)
+        """
+        try:
+            log_content = log_file.read_text(encoding="utf-8", errors="ignore")
+        except Exception as e:
+            return [], [f"无法解析日志文件: {e}"]
+        return self._parse_log_text(log_content)
+
+    def _parse_log_text(self, log_content: str) -> tuple[List[str], List[str]]:
+        """
+        解析 LaTeX 编译日志文本
+
         Returns:
             (错误列表, 警告列表)
         """
@@ -91,9 +104,6 @@ class CompilationValidator(ValidatorBase):
         warnings = []
 
         try:
-            with open(log_file, "r", encoding="utf-8", errors="ignore") as f:
-                log_content = f.read()
-
             # 常见错误模式
             error_patterns = [
                 r"^! (.*)",  # LaTeX 错误
@@ -148,29 +158,15 @@ class CompilationValidator(ValidatorBase):
         """
         执行 LaTeX 编译（可选功能）
 
+        编译产物不早于源文件时直接复用（例如 enhanced_optimize 刚编译过），不再启动 xelatex。
+
         Args:
             project_path: 项目路径
 
         Returns:
             是否编译成功
         """
-        main_tex = project_path / "main.tex"
-        if not main_tex.exists():
-            return False
+        from ..validation_scheduler import ensure_compiled
 
-        try:
-            # 执行 xelatex 编译
-            result = subprocess.run(
-                ["xelatex", "-interaction=nonstopmode", "main.tex"],
-                cwd=project_path,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
-
-            return result.returncode == 0
-
-        except subprocess.TimeoutExpired:
-            return False
-        except Exception:
-            return False
+        artifacts = ensure_compiled(project_path)
+        return artifacts.pdf.exists() and not artifacts.compile_error
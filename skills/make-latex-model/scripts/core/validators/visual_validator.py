@@ -8,6 +8,7 @@ import re
 from pathlib import Path
 from typing import Dict, Any, List
 from ..validator_base import ValidatorBase, ValidationContext, ValidationResult
+from ..pdf_structure import load_pdf_structure
 
 
 class VisualValidator(ValidatorBase):
@@ -30,8 +31,7 @@ class VisualValidator(ValidatorBase):
         """
         result = ValidationResult(passed=[], warnings=[], failed=[])
 
-        project_path = context.project_path
-        pdf_file = project_path / "main.pdf"
+        pdf_file = context.compile_artifacts().pdf
 
         if not pdf_file.exists():
             result.add_fail(f"PDF 文件不存在: {pdf_file}")
@@ -61,15 +61,13 @@ class VisualValidator(ValidatorBase):
             return
 
         try:
-            doc = fitz.open(pdf_file)
-            if len(doc) == 0:
+            structure = load_pdf_structure(pdf_file)
+            if len(structure) == 0:
                 result.add_fail("PDF 文件为空")
                 return
 
             # 获取第一页尺寸
-            page = doc[0]
-            width_pt = page.rect.width
-            height_pt = page.rect.height
+            width_pt, height_pt = structure.page_size(0)
 
             # 转换为 cm (1 pt = 0.0352778 cm)
             width_cm = width_pt * 0.0352778
@@ -89,8 +87,6 @@ class VisualValidator(ValidatorBase):
                     f"(A4 标准: {a4_width} cm x {a4_height} cm)"
                 )
 
-            doc.close()
-
         except Exception as e:
             result.add_warning(f"无法读取 PDF 页面尺寸: {e}")
 
@@ -102,16 +98,12 @@ class VisualValidator(ValidatorBase):
             return
 
         try:
-            doc = fitz.open(pdf_file)
-            if len(doc) == 0:
+            structure = load_pdf_structure(pdf_file)
+            if len(structure) == 0:
                 return
 
-            # 统计第一页的文本
-            page = doc[0]
-            text = page.get_text("text")
-
-            # 按行分割
-            lines = [line.strip() for line in text.split("\n") if line.strip()]
+            # 统计第一页的文本（逐行）
+            lines = [line.strip() for line in structure.page_text_lines(0) if line.strip()]
 
             if lines:
                 # 统计每行字数
@@ -138,7 +130,5 @@ class VisualValidator(ValidatorBase):
                 result.add_warning("  3. 对比 LaTeX 生成的 PDF 与 Word PDF")
                 result.add_warning("  4. 检查每行字数、换行位置是否一致")
 
-            doc.close()
-
         except Exception as e:
             result.add_warning(f"无法统计 PDF 文本: {e}")
@@ -18,6 +18,9 @@
 
     # 跳过预处理（已有基准）
     python scripts/enhanced_optimize.py --project NSFC_Young --skip-baseline
+
+    # 并行参数扫描：每轮在隔离副本中同时编译/对比多组候选调整
+    python scripts/enhanced_optimize.py --project NSFC_Young --sweep --sweep-workers 4
 """
 
 import argparse
@@ -44,6 +47,25 @@ except ImportError:
     print("警告: 无法导入 AIOptimizer")
     AIOptimizer = None
 
+try:
+    from scripts.core.validator_base import LATEX_COMPILE_STEPS
+    from scripts.core.parameter_sweep import ParameterSweep, SweepSettings
+except ImportError:
+    print("警告: 无法导入 ParameterSweep")
+    ParameterSweep = None
+    LATEX_COMPILE_STEPS = [
+        ["xelatex", "-interaction=nonstopmode", "main.tex"],
+        ["bibtex", "main"],
+        ["xelatex", "-interaction=nonstopmode", "main.tex"],
+        ["xelatex", "-interaction=nonstopmode", "main.tex"],
+    ]
+
+try:
+    from scripts.core.iteration_log import IterationLog
+except ImportError:
+    print("警告: 无法导入 IterationLog")
+    IterationLog = None
+
 try:
     from scripts.intelligent_adjust import IntelligentAdjuster
 except ImportError:
@@ -108,10 +130,24 @@ class EnhancedOptimizer:
         # 加载配置文件
         self._load_config()
 
+        # 参数扫描依赖 AIOptimizer 的决策链：未指定 --ai 时以启发式模式创建
+        if self.ai_optimizer is None and AIOptimizer and ParameterSweep and self._sweep_config().get("enabled"):
+            self.ai_optimizer = AIOptimizer(
+                skill_root=self.skill_root,
+                project_name=self.project_name,
+                mode=self.config.get("ai_mode", "heuristic"),
+            )
+
         # 状态跟踪
         self.iteration_history = []
         self.best_config = None
         self.best_ratio = float('inf')
+        self._last_page_fingerprints: Optional[Path] = None
+
+        # 迭代日志（工作空间 history.sqlite3，与 ConvergenceDetector/HistoryMemory 共用）；
+        # 首次保存迭代时登记本次运行
+        self.iteration_log = IterationLog.for_workspace(self.workspace) if IterationLog else None
+        self.run_id: Optional[str] = None
 
     def _resolve_project_path(self, project_arg: str) -> Path:
         """
@@ -380,16 +416,8 @@ class EnhancedOptimizer:
 
         main_tex = self.project_path / "main.tex"
 
-        # 编译序列: xelatex -> bibtex -> xelatex -> xelatex
-        compile_steps = [
-            ["xelatex", "-interaction=nonstopmode", "main.tex"],
-            ["bibtex", "main"],
-            ["xelatex", "-interaction=nonstopmode", "main.tex"],
-            ["xelatex", "-interaction=nonstopmode", "main.tex"],
-        ]
-
         try:
-            for cmd in compile_steps:
+            for cmd in LATEX_COMPILE_STEPS:
                 result = subprocess.run(
                     cmd,
                     cwd=self.project_path,
@@ -464,36 +492,116 @@ class EnhancedOptimizer:
 
         json_out = iter_dir / f"pixel_compare{suffix}.json"
         features_out = iter_dir / f"diff_features{suffix}.json"
+        fingerprints_out = iter_dir / f"page_fingerprints{suffix}.json"
 
-        pc = self.config.get("pixel_comparison", {}) if isinstance(self.config.get("pixel_comparison", {}), dict) else {}
-        dpi = pc.get("dpi", self.config.get("pixel_dpi", 150))
-        tol = pc.get("tolerance", self.config.get("pixel_tolerance", 2))
-        mode = pc.get("mode", pc.get("comparison_mode", "page"))
-        min_sim = pc.get("min_similarity", 0.85)
-
+        pc = self._pixel_comparison_config()
         cmd = [
             str(baseline_pdf),
             str(output_pdf),
-            "--dpi", str(dpi),
-            "--tolerance", str(tol),
-            "--mode", str(mode),
-            "--min-similarity", str(min_sim),
+            *self._compare_pixel_args(),
+            "--workers", str(pc.get("workers", 0)),
             "--json-out", str(json_out),
             "--features-out", str(features_out),
         ]
 
+        if pc.get("page_fingerprints", True):
+            # 与上一次对比的指纹一致的页面直接复用指标，只重新对比脏页
+            cmd += ["--fingerprints-out", str(fingerprints_out)]
+            if self._last_page_fingerprints is not None and self._last_page_fingerprints.exists():
+                cmd += ["--previous-fingerprints", str(self._last_page_fingerprints)]
+
         result = self.run_script("compare_pdf_pixels.py", cmd)
 
         if result.returncode != 0:
             self.log(f"像素对比失败: {result.stderr}", "warning")
             return None
 
+        if fingerprints_out.exists():
+            self._last_page_fingerprints = fingerprints_out
+
         try:
             data = json.loads(json_out.read_text(encoding="utf-8"))
             return float(data.get("avg_diff_ratio", None))
         except Exception:
             return None
 
+    def _pixel_comparison_config(self) -> Dict[str, Any]:
+        pc = self.config.get("pixel_comparison", {})
+        return pc if isinstance(pc, dict) else {}
+
+    def _compare_pixel_args(self) -> List[str]:
+        """compare_pdf_pixels.py 的对比参数（DPI/容差/模式/缓存/金字塔），主流程与参数扫描共用"""
+        pc = self._pixel_comparison_config()
+        dpi = pc.get("dpi", self.config.get("pixel_dpi", 150))
+        tol = pc.get("tolerance", self.config.get("pixel_tolerance", 2))
+        mode = pc.get("mode", pc.get("comparison_mode", "page"))
+        min_sim = pc.get("min_similarity", 0.85)
+        args = [
+            "--dpi", str(dpi),
+            "--tolerance", str(tol),
+            "--mode", str(mode),
+            "--min-similarity", str(min_sim),
+        ]
+        if pc.get("cache", True):
+            if self.ws_manager:
+                cache_dir = self.ws_manager.get_cache_path(self.project_path)
+            else:
+                cache_dir = self.workspace / "cache"
+            args += ["--cache-dir", str(cache_dir), "--cache-max-mb", str(pc.get("cache_max_mb", 512))]
+        if pc.get("pyramid", False):
+            args += [
+                "--pyramid",
+                "--coarse-dpi", str(pc.get("coarse_dpi", 36)),
+                "--coarse-tolerance", str(pc.get("coarse_tolerance", 0)),
+            ]
+        return args
+
+    def _sweep_config(self) -> Dict[str, Any]:
+        """参数扫描配置：config.yaml 的 iteration.parameter_sweep，命令行 --sweep/--sweep-workers 覆盖"""
+        sc = self.config.get("parameter_sweep", {})
+        sc = dict(sc) if isinstance(sc, dict) else {}
+        if self.config.get("sweep"):
+            sc["enabled"] = True
+        if self.config.get("sweep_workers") is not None:
+            sc["workers"] = int(self.config["sweep_workers"])
+        return sc
+
+    def build_parameter_sweep(self, iteration: int) -> Optional["ParameterSweep"]:
+        """
+        构造本轮的参数扫描器；未启用或缺少基准/配置时返回 None（回退为逐个调整）
+        """
+        sc = self._sweep_config()
+        if not ParameterSweep or not sc.get("enabled"):
+            return None
+        baseline_pdf = self._get_baseline_pdf()
+        config_path = self.project_path / "extraTex" / "@config.tex"
+        if not baseline_pdf or not config_path.exists():
+            return None
+        baseline_pdf = self._ensure_workspace_baseline(baseline_pdf)
+
+        compare_args = self._compare_pixel_args()
+        if self._last_page_fingerprints is not None and self._last_page_fingerprints.exists():
+            # 候选与本轮输出通常只有少数页不同：复用本轮逐页指标，只对比脏页
+            compare_args += ["--previous-fingerprints", str(self._last_page_fingerprints)]
+
+        cache_dir = self.ws_manager.get_cache_path(self.project_path) if self.ws_manager else self.workspace / "cache"
+        return ParameterSweep(
+            project_path=self.project_path,
+            config_path=config_path,
+            sandbox_root=cache_dir / "sweep" / f"iteration_{iteration:03d}",
+            settings=SweepSettings(
+                baseline_pdf=baseline_pdf,
+                compare_script=self.scripts_dir / "compare_pdf_pixels.py",
+                compare_args=compare_args,
+                compile_steps=[list(c) for c in LATEX_COMPILE_STEPS],
+            ),
+            workers=int(sc.get("workers", 0) or 0),
+            max_candidates=int(sc.get("max_candidates", 6) or 6),
+            keep_sandboxes=bool(sc.get("keep_sandboxes", False)),
+            artifacts_dir=self.workspace / "iterations" / f"iteration_{iteration:03d}",
+            workspace_root=self.workspace,
+        )
+
     def step_check_convergence(self, current_ratio: float) -> tuple:
         """
         检查是否收敛
@@ -544,6 +652,16 @@ class EnhancedOptimizer:
             )
 
         self.iteration_history.append(metrics)
+        if self.iteration_log is not None:
+            if self.run_id is None:
+                self.run_id = self.iteration_log.start_run("metrics")
+            self.iteration_log.append(
+                "metrics",
+                metrics,
+                iteration=iteration,
+                changed_ratio=metrics.get("changed_ratio"),
+                run_id=self.run_id,
+            )
 
         # 更新最佳配置
         if metrics.get("changed_ratio", float('inf')) < self.best_ratio:
@@ -597,7 +715,22 @@ class EnhancedOptimizer:
             "recommendation": ""
         }
 
-        if self.iteration_history:
+        summary = None
+        if self.iteration_log is not None and self.run_id is not None:
+            summary = self.iteration_log.summary("metrics", self.run_id)
+
+        if summary is not None and summary.ratio_count:
+            # 本次运行的汇总由迭代日志增量维护，无需遍历历史
+            report["run_id"] = self.run_id
+            report["summary"] = {
+                "initial_ratio": summary.first_ratio,
+                "final_ratio": summary.last_ratio if summary.last_ratio is not None else summary.best_ratio,
+                "best_ratio": summary.best_ratio,
+                "best_iteration": summary.best_iteration,
+                "improvement": summary.first_ratio - summary.best_ratio,
+                "no_improvement_streak": summary.streak,
+            }
+        elif self.iteration_history:
             ratios = [h.get("changed_ratio", 1.0) for h in self.iteration_history]
             report["summary"] = {
                 "initial_ratio": ratios[0],
@@ -783,12 +916,17 @@ class EnhancedOptimizer:
                     def _compare():
                         return self.step_compare_pixels_with_artifacts(iteration=iteration, tag="post")
 
+                    sweep = self.build_parameter_sweep(iteration)
+                    if sweep is not None:
+                        self.log("  参数扫描：并行评估多组候选调整...", "info")
+
                     result = self.ai_optimizer.optimize_iteration(
                         iteration=iteration,
                         current_ratio=ratio,
                         config_path=config_path,
                         compile_func=_compile,
                         compare_func=_compare,
+                        sweep=sweep,
                     )
 
                     self.log(f"  AI 优化器: {result.status}（{result.reason}）", "info")
@@ -853,6 +991,10 @@ def main():
                        help="AI 优化器决策模式（默认 heuristic，可离线）")
     parser.add_argument("--ai-no-eval", action="store_true",
                        help="AI 优化器只应用调整，不做即时编译/像素对比回滚（不推荐）")
+    parser.add_argument("--sweep", action="store_true",
+                       help="并行参数扫描：每轮在隔离副本中同时编译/对比多组候选调整，保留最佳（隐含启用 AI 优化器）")
+    parser.add_argument("--sweep-workers", type=int, default=None,
+                       help="参数扫描并行数（默认取 config.yaml，0=按 CPU 核数）")
 
     args = parser.parse_args()
 
@@ -862,6 +1004,8 @@ def main():
         "use_ai_optimizer": bool(args.ai),
         "ai_mode": args.ai_mode,
         "ai_no_eval": bool(args.ai_no_eval),
+        "sweep": bool(args.sweep),
+        "sweep_workers": args.sweep_workers,
     }
 
     # 创建优化器
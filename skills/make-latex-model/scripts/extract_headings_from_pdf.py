@@ -25,6 +25,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+sys.path.insert(0, str(Path(__file__).parent))
+
 
 MSBLUE_RGB = (0, 112, 192)
 
@@ -91,44 +93,37 @@ class _PdfLine:
 
 def _iter_pdf_lines(pdf_path: Path) -> Iterable[_PdfLine]:
     try:
-        import fitz  # PyMuPDF
+        import fitz  # noqa: F401  PyMuPDF
     except ImportError:
         print("错误: 需要安装 PyMuPDF (fitz)")
         print("安装命令: pip install PyMuPDF")
         sys.exit(1)
 
-    doc = fitz.open(pdf_path)
-    try:
-        for page_idx in range(len(doc)):
-            page = doc[page_idx]
-            data = page.get_text("dict")
-            for block in data.get("blocks", []):
-                lines = block.get("lines")
-                if not lines:
-                    continue
-                for line in lines:
-                    spans = list(line.get("spans") or [])
-                    if not spans:
-                        continue
-                    txt = "".join((s.get("text") or "") for s in spans)
-                    if not txt or not txt.strip():
-                        continue
-                    # 使用 line 的 bbox（更适合做段/行聚合）
-                    bbox = tuple(line.get("bbox") or (0, 0, 0, 0))
-                    # 使用第一个 span 的主特征作为行级特征
-                    s0 = spans[0]
-                    color_rgb = _extract_color_rgb(s0.get("color"))
-                    size = float(s0.get("size") or 0.0)
-                    yield _PdfLine(
-                        page=page_idx,
-                        bbox=(float(bbox[0]), float(bbox[1]), float(bbox[2]), float(bbox[3])),
-                        text=_normalize_ws(txt),
-                        spans=spans,
-                        color_rgb=color_rgb,
-                        size=size,
-                    )
-    finally:
-        doc.close()
+    from core.pdf_structure import load_pdf_structure
+
+    structure = load_pdf_structure(pdf_path)
+    for page_idx in range(len(structure)):
+        for line in structure.iter_lines(page_idx):
+            spans = list(line.get("spans") or [])
+            if not spans:
+                continue
+            txt = "".join((s.get("text") or "") for s in spans)
+            if not txt or not txt.strip():
+                continue
+            # 使用 line 的 bbox（更适合做段/行聚合）
+            bbox = tuple(line.get("bbox") or (0, 0, 0, 0))
+            # 使用第一个 span 的主特征作为行级特征
+            s0 = spans[0]
+            color_rgb = _extract_color_rgb(s0.get("color"))
+            size = float(s0.get("size") or 0.0)
+            yield _PdfLine(
+                page=page_idx,
+                bbox=(float(bbox[0]), float(bbox[1]), float(bbox[2]), float(bbox[3])),
+                text=_normalize_ws(txt),
+                spans=spans,
+                color_rgb=color_rgb,
+                size=size,
+            )
 
 
 def _looks_like_heading_start(text: str) -> Tuple[bool, Optional[str]]:
@@ -131,6 +131,8 @@ class IntelligentAdjuster:
         """
         分析像素差异区域
 
+        整页只做一次连通区域分析（core.diff_regions），再按质心把区域分到上中下三区分类。
+
         Args:
             diff_mask: 差异掩码（numpy 数组）
             img_shape: 图像尺寸 (height, width)
@@ -138,10 +140,11 @@ class IntelligentAdjuster:
         Returns:
             差异区域列表
         """
-        import numpy as np
+        from scripts.core.diff_regions import analyze_diff_mask, band_features, classify_regions
 
         regions = []
         height, width = img_shape
+        features = analyze_diff_mask(diff_mask)
 
         # 将图像分为上中下三个区域
         region_height = height // 3
@@ -150,12 +153,17 @@ class IntelligentAdjuster:
             start_y = i * region_height
             end_y = (i + 1) * region_height if i < 2 else height
 
-            region_mask = diff_mask[start_y:end_y, :]
-            diff_ratio = np.sum(region_mask) / region_mask.size
+            diff_ratio = float(features[f"region_{location}_ratio"])
 
             if diff_ratio > 0.01:  # 差异超过 1%
                 # 分析差异特征
-                diff_type = self._classify_difference(region_mask, diff_ratio)
+                if features.get("region_count") is None:
+                    # scipy 不可用：退回逐区方差比较
+                    diff_type = self._classify_difference(diff_mask[start_y:end_y, :], diff_ratio)
+                else:
+                    diff_type = DifferenceType(
+                        classify_regions(band_features(features, start_y, end_y), diff_ratio)
+                    )
                 regions.append(DifferenceRegion(
                     type=diff_type,
                     location=location,
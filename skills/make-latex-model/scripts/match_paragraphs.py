@@ -25,6 +25,40 @@ def _load_paragraphs(path: Path) -> List[Dict[str, Any]]:
     raise ValueError(f"无法识别的段落 JSON 格式: {path}")
 
 
+def to_paragraphs(items: List[Dict[str, Any]]) -> List[Any]:
+    """将 extract_paragraphs.py 的 JSON 条目还原为 core.paragraph_alignment.Paragraph 列表"""
+    from core.paragraph_alignment import Paragraph, ParagraphLine
+
+    out: List[Paragraph] = []
+    for it in items:
+        lines = []
+        for ln in it.get("lines", []):
+            bbox = tuple(float(x) for x in ln.get("bbox", [0, 0, 0, 0]))
+            lines.append(
+                ParagraphLine(
+                    bbox=bbox,
+                    text=str(ln.get("text") or ""),
+                    x0=float(bbox[0]),
+                    y0=float(bbox[1]),
+                    y1=float(bbox[3]),
+                    font_size=0.0,
+                )
+            )
+        out.append(
+            Paragraph(
+                page_num=int(it.get("page_num") or 1),
+                paragraph_id=int(it.get("paragraph_id") or 1),
+                text=str(it.get("text") or ""),
+                bbox=tuple(float(x) for x in it.get("bbox", [0, 0, 0, 0])),
+                line_count=int(it.get("line_count") or len(lines)),
+                lines=lines,
+                type=str(it.get("type") or "unknown"),
+                image_rgb=None,
+            )
+        )
+    return out
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="匹配两份 PDF 的段落（文本相似度）")
     parser.add_argument("baseline_json", type=Path, help="baseline 段落 JSON（extract_paragraphs.py 输出）")
@@ -37,45 +71,14 @@ def main() -> int:
         print("❌ 输入文件不存在")
         return 1
 
-    # 将 JSON 结构还原为 core.paragraph_alignment 的 Paragraph 对象列表
-    from core.paragraph_alignment import Paragraph, ParagraphLine, match_paragraphs
-
-    def to_obj(items: List[Dict[str, Any]]) -> List[Paragraph]:
-        out: List[Paragraph] = []
-        for it in items:
-            lines = []
-            for ln in it.get("lines", []):
-                bbox = tuple(float(x) for x in ln.get("bbox", [0, 0, 0, 0]))
-                lines.append(
-                    ParagraphLine(
-                        bbox=bbox,
-                        text=str(ln.get("text") or ""),
-                        x0=float(bbox[0]),
-                        y0=float(bbox[1]),
-                        y1=float(bbox[3]),
-                        font_size=0.0,
-                    )
-                )
-            out.append(
-                Paragraph(
-                    page_num=int(it.get("page_num") or 1),
-                    paragraph_id=int(it.get("paragraph_id") or 1),
-                    text=str(it.get("text") or ""),
-                    bbox=tuple(float(x) for x in it.get("bbox", [0, 0, 0, 0])),
-                    line_count=int(it.get("line_count") or len(lines)),
-                    lines=lines,
-                    type=str(it.get("type") or "unknown"),
-                    image_rgb=None,
-                )
-            )
-        return out
+    from core.paragraph_alignment import match_paragraphs
 
     baseline_items = _load_paragraphs(args.baseline_json)
     target_items = _load_paragraphs(args.target_json)
 
     matches = match_paragraphs(
-        to_obj(baseline_items),
-        to_obj(target_items),
+        to_paragraphs(baseline_items),
+        to_paragraphs(target_items),
         min_similarity=float(args.min_similarity),
     )
 
@@ -123,6 +123,12 @@ def main():
         cfg_dpi = 150
         cfg_tol = 2
         cfg_min_sim = 0.85
+        cfg_cache = True
+        cfg_cache_max_mb = 512.0
+        cfg_fingerprints = True
+        cfg_pyramid = False
+        cfg_coarse_dpi = 36
+        cfg_coarse_tol = 0
         try:
             if config_path.exists():
                 full_cfg = yaml.safe_load(config_path.read_text(encoding="utf-8")) or {}
@@ -132,6 +138,12 @@ def main():
                     cfg_dpi = int(pc.get("dpi", cfg_dpi))
                     cfg_tol = int(pc.get("tolerance", cfg_tol))
                     cfg_min_sim = float(pc.get("min_similarity", cfg_min_sim))
+                    cfg_cache = bool(pc.get("cache", cfg_cache))
+                    cfg_cache_max_mb = float(pc.get("cache_max_mb", cfg_cache_max_mb))
+                    cfg_fingerprints = bool(pc.get("page_fingerprints", cfg_fingerprints))
+                    cfg_pyramid = bool(pc.get("pyramid", cfg_pyramid))
+                    cfg_coarse_dpi = int(pc.get("coarse_dpi", cfg_coarse_dpi))
+                    cfg_coarse_tol = int(pc.get("coarse_tolerance", cfg_coarse_tol))
         except Exception:
             pass
 
@@ -158,6 +170,15 @@ def main():
             "--features-out",
             str(features_out),
         ]
+        if cfg_cache:
+            cmd += ["--cache-dir", str(ws_root / "cache"), "--cache-max-mb", str(cfg_cache_max_mb)]
+        if cfg_pyramid:
+            cmd += ["--pyramid", "--coarse-dpi", str(cfg_coarse_dpi), "--coarse-tolerance", str(cfg_coarse_tol)]
+        if cfg_fingerprints:
+            cmd += ["--fingerprints-out", str(iter_dir / "page_fingerprints.json")]
+            prev_fp = ws_root / "iterations" / f"iteration_{args.iteration - 1:03d}" / "page_fingerprints.json"
+            if prev_fp.exists():
+                cmd += ["--previous-fingerprints", str(prev_fp)]
         r = subprocess.run(cmd, capture_output=True, text=True)
         if r.returncode != 0:
             return None
@@ -2,6 +2,9 @@
 # -*- coding: utf-8 -*-
 """
 验证器运行器 - 执行所有验证器并生成报告
+
+编译产物（PDF/log/aux/bbl）只解析一次并通过 ValidationContext 共享；PDF 不早于源文件时
+直接复用（--compile 时过期才编译一次）。各验证器并发执行，报告按优先级输出并附带耗时。
 """
 
 import argparse
@@ -17,6 +20,7 @@ sys.path.insert(0, str(SKILL_DIR))
 
 from scripts.core.config_loader import ConfigLoader
 from scripts.core.validator_base import ValidatorRegistry, ValidationContext
+from scripts.core.validation_scheduler import ValidationScheduler, ensure_compiled
 from scripts.core.validators import CompilationValidator, StyleValidator, HeadingValidator, VisualValidator
 
 # 注册验证器
@@ -26,8 +30,20 @@ ValidatorRegistry.register(HeadingValidator)
 ValidatorRegistry.register(VisualValidator)
 
 
-def run_validators(project_path: Path, template: str = None, verbose: bool = False):
-    """运行所有验证器"""
+def run_validators(
+    project_path: Path,
+    template: str = None,
+    verbose: bool = False,
+    workers: int = 0,
+    compile_if_stale: bool = False,
+):
+    """
+    运行所有验证器
+
+    Args:
+        workers: 并发线程数（0=每个验证器一个线程，1=串行）
+        compile_if_stale: 编译产物缺失或早于源文件时先编译一次
+    """
 
     # 加载配置（分层合并：skill 默认配置 + 模板配置 + 项目本地配置）
     loader = ConfigLoader(skill_dir=SKILL_DIR, project_path=project_path, template_name=template)
@@ -43,7 +59,8 @@ def run_validators(project_path: Path, template: str = None, verbose: bool = Fal
         project_path=project_path,
         template_config=config,
         tolerance=tolerance,
-        verbose=verbose
+        verbose=verbose,
+        artifacts=ensure_compiled(project_path, compile_if_stale=compile_if_stale),
     )
 
     # 加载所有启用的验证器
@@ -59,19 +76,29 @@ def run_validators(project_path: Path, template: str = None, verbose: bool = Fal
     print(f"项目路径: {project_path}")
     print(f"模板: {template or '<自动检测>'}")
     print(f"启用的验证器: {len(validators)}")
+    artifacts = context.artifacts
+    if artifacts.compiled:
+        print(f"编译产物: 已重新编译（{artifacts.compile_seconds:.1f}s）")
+    elif artifacts.is_fresh(project_path):
+        print("编译产物: 复用已有 main.pdf（不早于源文件）")
+    else:
+        print("编译产物: main.pdf 缺失或早于源文件（可用 --compile 重新编译）")
     print()
 
-    # 执行验证
+    # 执行验证（并发执行，按优先级输出）
+    scheduler = ValidationScheduler(validators, workers=workers)
+    runs = scheduler.run(context)
+
     all_passed = []
     all_warnings = []
     all_failed = []
 
-    for validator in validators:
+    for run in runs:
         print(f"\n{'-'*60}")
-        print(f"运行验证器: {validator.get_name()} (优先级: {validator.get_priority()})")
+        print(f"运行验证器: {run.name} (优先级: {run.priority}，耗时: {run.seconds * 1000:.0f} ms)")
         print(f"{'-'*60}")
 
-        result = validator.validate(context)
+        result = run.result
 
         all_passed.extend(result.passed)
         all_warnings.extend(result.warnings)
@@ -96,6 +123,14 @@ def run_validators(project_path: Path, template: str = None, verbose: bool = Fal
     print(f"  ❌ 失败: {len(all_failed)}")
     print()
 
+    print("验证器耗时:")
+    if artifacts.compiled:
+        print(f"  {'编译':<14}{artifacts.compile_seconds * 1000:>10.0f} ms")
+    for run in runs:
+        print(f"  {run.name:<14}{run.seconds * 1000:>10.0f} ms")
+    print(f"  {'合计（并发）':<12}{scheduler.wall_seconds * 1000:>10.0f} ms")
+    print()
+
     if len(all_failed) == 0:
         print("✅ 所有核心检查通过！")
         if len(all_warnings) > 0:
@@ -111,6 +146,8 @@ def main():
     parser.add_argument("--project", type=Path, required=True, help="项目名称或路径（必须位于 projects/ 下）")
     parser.add_argument("--template", type=str, default=None, help="模板名称")
     parser.add_argument("--verbose", "-v", action="store_true", help="详细输出")
+    parser.add_argument("--workers", type=int, default=0, help="并发验证线程数（默认 0=每个验证器一个线程；1=串行）")
+    parser.add_argument("--compile", action="store_true", help="main.pdf 缺失或早于源文件时先编译一次（各验证器共享产物）")
 
     args = parser.parse_args()
 
@@ -136,7 +173,7 @@ def main():
         print(f"❌ 错误: 项目必须位于 {PROJECTS_ROOT} 下: {project_path}")
         sys.exit(2)
 
-    success = run_validators(project_path, args.template, args.verbose)
+    success = run_validators(project_path, args.template, args.verbose, args.workers, args.compile)
     sys.exit(0 if success else 1)
 
 
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import importlib.util
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+
+SKILL_ROOT = Path(__file__).resolve().parents[1]
+SCRIPT = SKILL_ROOT / "scripts" / "compare_pdf_pixels.py"
+HAS_DEPS = all(importlib.util.find_spec(name) for name in ("fitz", "PIL", "numpy"))
+
+if HAS_DEPS:
+    import fitz
+    import numpy as np
+
+    sys.path.insert(0, str(SKILL_ROOT / "scripts"))
+    SPEC = importlib.util.spec_from_file_location("compare_pdf_pixels", SCRIPT)
+    assert SPEC and SPEC.loader
+    MODULE = importlib.util.module_from_spec(SPEC)
+    sys.modules[SPEC.name] = MODULE
+    SPEC.loader.exec_module(MODULE)
+
+
+def write_pdf(path: Path, pages) -> None:
+    """pages: 每页 (底色, [(x, y, 文字), ...])"""
+    doc = fitz.open()
+    for fill, lines in pages:
+        page = doc.new_page(width=300, height=400)
+        page.draw_rect(fitz.Rect(20, 200, 280, 380), color=None, fill=fill)
+        for x, y, text in lines:
+            page.insert_text((x, y), text, fontsize=10)
+    doc.save(str(path))
+
+
+@unittest.skipUnless(HAS_DEPS, "需要 PyMuPDF / Pillow / numpy")
+class PyramidCompareTests(unittest.TestCase):
+    def assert_matches_single_dpi(self, baseline: Path, output: Path, dpi: int) -> None:
+        full_ratio, full_mask = MODULE.compare_images(
+            MODULE.pdf_to_page_images(baseline, dpi)[0], MODULE.pdf_to_page_images(output, dpi)[0], 2
+        )
+        (_, ratio, mask, info), = list(MODULE.iter_pyramid_page_diffs(baseline, output, dpi=dpi))
+        self.assertGreater(full_ratio, 0.0)
+        self.assertEqual(ratio, float(full_ratio))
+        self.assertTrue(np.array_equal(mask, full_mask))
+        self.assertEqual(info["level"], "regions")
+
+    def test_sub_point_shift_invisible_at_coarse_dpi_is_still_counted(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            baseline, output = Path(tmpdir) / "baseline.pdf", Path(tmpdir) / "output.pdf"
+            lines = [(30, 40 + 14 * k, f"line {k} of the reference layout") for k in range(8)]
+            write_pdf(baseline, [((0.9, 0.9, 0.9), lines)])
+            shifted = list(lines)
+            shifted[3] = (30.08, shifted[3][1], shifted[3][2])
+            write_pdf(output, [((0.9, 0.9, 0.9), shifted)])
+
+            self.assert_matches_single_dpi(baseline, output, dpi=150)
+
+    def test_changes_in_separate_areas_are_all_refined(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            baseline, output = Path(tmpdir) / "baseline.pdf", Path(tmpdir) / "output.pdf"
+            lines = [(30, 40 + 14 * k, f"paragraph line number {k}") for k in range(10)]
+            write_pdf(baseline, [((0.9, 0.9, 0.9), lines)])
+            changed = list(lines)
+            changed[0] = (30, 40, "paragraph line number 0.")
+            changed[9] = (30.03, changed[9][1], changed[9][2])
+            write_pdf(output, [((0.9, 0.9, 0.9), changed)])
+
+            self.assert_matches_single_dpi(baseline, output, dpi=150)
+
+    def test_pyramid_heatmap_uses_the_selected_baseline_page(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            baseline, output = tmp / "baseline.pdf", tmp / "output.pdf"
+            write_pdf(baseline, [((1, 0, 0), [(30, 40, "page one")]), ((0, 0, 1), [(30, 40, "page two")])])
+            write_pdf(output, [((1, 0, 0), [(30, 40, "page one")]), ((0, 0, 1), [(30, 40, "page 2")])])
+
+            subprocess.run(
+                [
+                    sys.executable, str(SCRIPT), str(baseline), str(output),
+                    "--page", "2", "--pyramid", "--dpi", "72", "--heatmap", str(tmp / "heat.png"),
+                ],
+                check=True,
+                capture_output=True,
+            )
+
+            from PIL import Image
+
+            heatmap = np.array(Image.open(tmp / "heat_page1.png").convert("RGB"))
+            # 底色区域（无差异）应取自基准第 2 页的蓝色，而不是第 1 页的红色
+            self.assertEqual(tuple(heatmap[300, 150]), (0, 0, 255))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import importlib.util
+import sys
+import unittest
+from collections import deque
+from pathlib import Path
+from unittest import mock
+
+
+SKILL_ROOT = Path(__file__).resolve().parents[1]
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+HAS_SCIPY = importlib.util.find_spec("scipy") is not None
+
+if HAS_NUMPY:
+    import numpy as np
+
+    sys.path.insert(0, str(SKILL_ROOT / "scripts"))
+    from core import diff_regions  # noqa: E402
+    from core.diff_regions import CELL, analyze_diff_mask, classify_regions  # noqa: E402
+
+
+def synthetic_mask(lines_only: bool = False):
+    """10 行“文字”（字形间隔 4px，行距 24px）+ 一条竖直边距条 + 一个方块 + 一个孤立噪点"""
+    mask = np.zeros((800, 600), dtype=bool)
+    for k in range(10):
+        y = 100 + 24 * k
+        for x in range(100, 500, 8):
+            mask[y: y + 8, x: x + 4] = True
+    if lines_only:
+        return mask
+    mask[200:600, 20:28] = True
+    mask[680:720, 400:440] = True
+    mask[10, 590] = True
+    return mask
+
+
+def flood_fill_regions(cells):
+    """逐格 BFS 标记 4 连通区域，返回 {bbox(像素): 原始差异分块数}"""
+    closed = diff_regions._close_horizontal(cells, diff_regions.MERGE_CELLS)
+    seen = np.zeros_like(closed)
+    out = {}
+    for y0, x0 in zip(*np.nonzero(closed)):
+        if seen[y0, x0]:
+            continue
+        queue, members = deque([(y0, x0)]), []
+        seen[y0, x0] = True
+        while queue:
+            y, x = queue.popleft()
+            members.append((y, x))
+            for ny, nx in ((y + 1, x), (y - 1, x), (y, x + 1), (y, x - 1)):
+                if 0 <= ny < closed.shape[0] and 0 <= nx < closed.shape[1] and closed[ny, nx] and not seen[ny, nx]:
+                    seen[ny, nx] = True
+                    queue.append((ny, nx))
+        ys, xs = zip(*members)
+        count = sum(1 for y, x in members if cells[y, x])
+        if count >= diff_regions.MIN_REGION_CELLS:
+            bbox = (min(xs) * CELL, min(ys) * CELL, (max(xs) + 1) * CELL, (max(ys) + 1) * CELL)
+            out[bbox] = count
+    return out
+
+
+@unittest.skipUnless(HAS_NUMPY, "需要 numpy")
+class AnalyzeDiffMaskTests(unittest.TestCase):
+    def test_downsample_is_any_reduction_over_cells(self) -> None:
+        rng = np.random.default_rng(3)
+        mask = rng.random((37, 53)) < 0.02
+        hc, wc = 37 // CELL, 53 // CELL
+        expected = mask[: hc * CELL, : wc * CELL].reshape(hc, CELL, wc, CELL).any(axis=(1, 3))
+        self.assertTrue(np.array_equal(diff_regions._downsample(mask), expected))
+
+    @unittest.skipUnless(HAS_SCIPY, "需要 scipy")
+    def test_regions_match_flood_fill_labeling(self) -> None:
+        mask = synthetic_mask()
+        features = analyze_diff_mask(mask, dpi=150)
+
+        reference = flood_fill_regions(diff_regions._downsample(mask))
+        regions = features["regions"]
+        self.assertEqual(features["region_count"], len(reference))
+        self.assertEqual({tuple(r["bbox"]): r["area"] // (CELL * CELL) for r in regions}, reference)
+        self.assertEqual([r["area"] for r in regions], sorted((r["area"] for r in regions), reverse=True))
+
+        by_bbox = {tuple(r["bbox"]): r for r in regions}
+        self.assertEqual(by_bbox[(20, 200, 28, 600)]["kind"], "vertical")
+        self.assertEqual(by_bbox[(400, 680, 440, 720)]["kind"], "blob")
+        self.assertEqual(by_bbox[(100, 100, 496, 108)]["kind"], "horizontal")
+        self.assertEqual(sum(r["kind"] == "horizontal" for r in regions), 10)
+        self.assertAlmostEqual(by_bbox[(400, 680, 440, 720)]["centroid"][0], 420.0)
+        self.assertAlmostEqual(
+            features["horizontal_area_share"] + features["vertical_area_share"] + features["blob_area_share"], 1.0
+        )
+        self.assertEqual(features["largest_region_ratio"], regions[0]["area_ratio"])
+        self.assertEqual(classify_regions(features, 0.02), "line_break")
+
+    def test_without_scipy_only_profile_features_are_reported(self) -> None:
+        mask = synthetic_mask()
+        with mock.patch.dict(sys.modules, {"scipy": None, "scipy.ndimage": None}):
+            plain = analyze_diff_mask(mask, dpi=150)
+
+        self.assertIsNone(plain["region_count"])
+        self.assertEqual(plain["regions"], [])
+        self.assertNotIn("horizontal_area_share", plain)
+        self.assertEqual(plain["row_period_px"], 24.0)
+        self.assertAlmostEqual(plain["row_period_pt"], 24.0 * 72 / 150)
+        self.assertGreater(plain["row_periodicity"], 0.5)
+        # 无区域特征时按行/列方差分类：只有逐行错位时行方差占优
+        with mock.patch.dict(sys.modules, {"scipy": None, "scipy.ndimage": None}):
+            lines = analyze_diff_mask(synthetic_mask(lines_only=True), dpi=150)
+        self.assertIsNone(lines["region_count"])
+        self.assertEqual(classify_regions(lines, 0.02), "line_break")
+
+        if HAS_SCIPY:
+            labeled = analyze_diff_mask(mask, dpi=150)
+            shared = {k: v for k, v in labeled.items() if k in plain and k not in ("region_count", "regions")}
+            self.assertEqual(shared, {k: plain[k] for k in shared})
+
+    def test_empty_and_tiny_masks(self) -> None:
+        empty = analyze_diff_mask(np.zeros((100, 80), dtype=bool))
+        self.assertEqual(empty["row_variance"], 0.0)
+        self.assertEqual(empty["regions"], [])
+        if HAS_SCIPY:
+            self.assertEqual(empty["region_count"], 0)
+
+        tiny = analyze_diff_mask(np.ones((2, 3), dtype=bool))
+        self.assertIsNone(tiny["region_count"])
+        self.assertEqual(tiny["region_top_ratio"], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+SKILL_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SKILL_ROOT))
+
+# 仓库根目录的测试可能已把根目录 scripts/ 作为 scripts 包载入：导入期间临时移开，结束后恢复
+_shadowed = {k: sys.modules.pop(k) for k in list(sys.modules) if k == "scripts" or k.startswith("scripts.")}
+try:
+    from scripts import convergence_detector as detector_module  # noqa: E402
+    from scripts.convergence_detector import ConvergenceDetector, StopReason  # noqa: E402
+    from scripts.core.history_memory import HistoryMemory  # noqa: E402
+    from scripts.core.iteration_log import IterationLog  # noqa: E402
+finally:
+    if _shadowed:
+        for _name in [k for k in sys.modules if k == "scripts" or k.startswith("scripts.")]:
+            del sys.modules[_name]
+        sys.modules.update(_shadowed)
+
+
+CONFIG = {"max_iterations": 12, "convergence_threshold": 0.01, "no_improvement_limit": 3}
+
+
+def legacy_should_stop(detector: ConvergenceDetector, iterations: list, current_metrics=None):
+    """改用迭代日志之前 should_stop() 的列表实现（逐条重放全部历史）"""
+    iterations = list(iterations)
+    current_iteration = len(iterations)
+    if current_metrics:
+        iterations.append(current_metrics)
+        current_iteration += 1
+    if current_metrics and current_metrics.get("compilation_failed"):
+        return StopReason.COMPILATION_FAILED, "编译失败，立即停止"
+    if iterations:
+        latest = iterations[-1]
+        if "changed_ratio" in latest:
+            converged, msg = detector.check_convergence(latest["changed_ratio"])
+            if converged:
+                return StopReason.CONVERGED, msg
+    should_stop, no_imp_count = detector.check_no_improvement(iterations)
+    if should_stop:
+        return StopReason.NO_IMPROVEMENT, f"连续 {no_imp_count} 轮无改善"
+    max_reached, msg = detector.check_max_iterations(current_iteration)
+    if max_reached:
+        return StopReason.MAX_ITERATIONS, msg
+    return StopReason.CONTINUE, f"继续迭代（第 {current_iteration + 1} 轮）"
+
+
+def legacy_best(iterations: list):
+    return min([it for it in iterations if "changed_ratio" in it], key=lambda x: x["changed_ratio"], default=None)
+
+
+def random_sequence(rng: random.Random, n: int) -> list:
+    """差异比例随机游走：步长取 0.0005 的整数倍（覆盖 0.001 改善阈值边界）、含平台与缺失比例的轮次"""
+    ratio = rng.choice([0.012, 0.05, 0.2])
+    records = []
+    for i in range(1, n + 1):
+        ratio = max(0.0, round(ratio + 0.0005 * rng.randint(-6, 4), 4))
+        metrics = {"iteration": i, "timestamp": f"2026-01-01T00:00:{i:02d}"}
+        if rng.random() > 0.1:
+            metrics["changed_ratio"] = ratio
+        if rng.random() < 0.05:
+            metrics["compilation_failed"] = True
+        records.append(metrics)
+    return records
+
+
+class IterationLogParityTests(unittest.TestCase):
+    def make_detector(self, log: IterationLog) -> ConvergenceDetector:
+        with mock.patch.object(detector_module, "WorkspaceManager", None):
+            detector = ConvergenceDetector("parity", config=CONFIG)
+        detector.config.update(CONFIG)
+        detector.log = log
+        return detector
+
+    def test_replayed_runs_give_identical_decisions(self) -> None:
+        rng = random.Random(20)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for case in range(40):
+                records = random_sequence(rng, rng.randint(1, 16))
+                log = IterationLog(Path(tmpdir) / f"history_{case}.sqlite3")
+                detector = self.make_detector(log)
+                run_id = log.start_run("metrics")
+
+                for k in range(len(records) + 1):
+                    history = records[:k]
+                    nxt = records[k] if k < len(records) else None
+                    with self.subTest(case=case, k=k):
+                        self.assertEqual(detector.should_stop(), legacy_should_stop(detector, history))
+                        if nxt is not None:
+                            self.assertEqual(detector.should_stop(nxt), legacy_should_stop(detector, history, nxt))
+                        self.assertEqual(detector.get_best_iteration(), legacy_best(history))
+                        ratios = [it["changed_ratio"] for it in history if "changed_ratio" in it]
+                        summary = detector.summary()
+                        if history:
+                            self.assertEqual(summary.streak, detector.check_no_improvement(history)[1])
+                            self.assertEqual(summary.best_ratio, min(ratios, default=None))
+                    if nxt is not None:
+                        log.append("metrics", nxt, iteration=nxt["iteration"], changed_ratio=nxt.get("changed_ratio"), run_id=run_id)
+
+    def test_decisions_follow_the_latest_run_only(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            log = IterationLog(Path(tmpdir) / "history.sqlite3")
+            detector = self.make_detector(log)
+            old_run = log.start_run("metrics")
+            for i, ratio in enumerate([0.3, 0.004], 1):
+                log.append("metrics", {"iteration": i, "changed_ratio": ratio}, iteration=i, changed_ratio=ratio, run_id=old_run)
+            new_run = log.start_run("metrics")
+            history = [{"iteration": i, "changed_ratio": r} for i, r in enumerate([0.2, 0.2, 0.2, 0.2], 1)]
+            for metrics in history:
+                log.append("metrics", metrics, iteration=metrics["iteration"], changed_ratio=metrics["changed_ratio"], run_id=new_run)
+
+            self.assertEqual(detector.should_stop(), legacy_should_stop(detector, history))
+            self.assertEqual(detector.should_stop()[0], StopReason.NO_IMPROVEMENT)
+            self.assertEqual(detector.get_best_iteration(), legacy_best(history))
+
+    def test_history_memory_recent_matches_jsonl_storage(self) -> None:
+        rng = random.Random(7)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            jsonl = HistoryMemory(Path(tmpdir) / "ai_memory.jsonl")
+            logged = HistoryMemory(Path(tmpdir) / "unused.jsonl", log=IterationLog(Path(tmpdir) / "history.sqlite3"))
+            for i in range(1, 25):
+                args = (i, {"ratio": rng.random()}, {"adjustments": [{"parameter": "parskip", "delta": i}]}, {"new_ratio": rng.random()})
+                jsonl.record(*args)
+                logged.record(*args)
+
+            def strip(records):
+                return [{k: v for k, v in r.items() if k != "timestamp"} for r in records]
+
+            for n in (0, 1, 5, 24, 30):
+                self.assertEqual(strip(logged.get_recent(n)), strip(jsonl.get_recent(n)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import difflib
+import functools
+import importlib.util
+import random
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+SKILL_ROOT = Path(__file__).resolve().parents[1]
+HAS_DEPS = importlib.util.find_spec("numpy") is not None
+HAS_SCIPY = importlib.util.find_spec("scipy") is not None
+
+if HAS_DEPS:
+    sys.path.insert(0, str(SKILL_ROOT / "scripts"))
+    from core import paragraph_alignment as alignment  # noqa: E402
+    from core.paragraph_alignment import Paragraph, match_paragraphs  # noqa: E402
+
+
+THRESHOLDS = (0.5, 0.8, 0.85, 0.95)
+
+
+def make_paragraph(page: int, pid: int, text: str, y: float) -> "Paragraph":
+    return Paragraph(
+        page_num=page, paragraph_id=pid, text=text, bbox=(50.0, y, 500.0, y + 12.0),
+        line_count=1, lines=[], type="body",
+    )
+
+
+def mutate(rng: random.Random, text: str, alphabet: str) -> str:
+    chars = list(text)
+    for _ in range(rng.randint(0, 4)):
+        op = rng.random()
+        k = rng.randrange(len(chars) + 1)
+        if op < 0.4 and chars:
+            chars[min(k, len(chars) - 1)] = rng.choice(alphabet)
+        elif op < 0.7:
+            chars.insert(k, rng.choice(alphabet))
+        elif chars:
+            del chars[min(k, len(chars) - 1)]
+    return "".join(chars)
+
+
+def random_pages(rng: random.Random):
+    """小字母表的随机段落：目标段落多为基准段落的少量编辑，使相似度密集分布在阈值附近"""
+    alphabet = rng.choice(["ab", "abc", "abcde", "研究方法结果的"])
+    baseline, target = [], []
+    for page in (1, 2):
+        texts = ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 24))) for _ in range(rng.randint(1, 5))]
+        for pid, text in enumerate(texts, 1):
+            baseline.append(make_paragraph(page, pid, text + rng.choice(["", " ", "。"]), 100.0 + 20 * pid))
+        targets = [mutate(rng, rng.choice(texts), alphabet) for _ in range(rng.randint(1, 5))]
+        targets += ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 6))) for _ in range(rng.randint(0, 2))]
+        for pid, text in enumerate(targets, 1):
+            target.append(make_paragraph(page, pid, text, 100.0 + 20 * pid + rng.random()))
+    return baseline, target
+
+
+def brute_force(baseline, target, min_similarity: float):
+    """逐对比较 + 穷举全部一对一分配，返回每页的 (达标边集合, 最优总权重)"""
+    out = {}
+    for page in sorted({p.page_num for p in baseline}):
+        bs = [b for b in baseline if b.page_num == page and alignment._normalize_text_for_match(b.text)]
+        ts = [t for t in target if t.page_num == page and alignment._normalize_text_for_match(t.text)]
+        edges = {}
+        for i, b in enumerate(bs):
+            for j, t in enumerate(ts):
+                sim = difflib.SequenceMatcher(
+                    a=alignment._normalize_text_for_match(b.text), b=alignment._normalize_text_for_match(t.text)
+                ).ratio()
+                if sim >= min_similarity:
+                    edges[(i, j)] = sim - 1e-9 * abs(t.bbox[1] - b.bbox[1])
+
+        @functools.lru_cache(maxsize=None)
+        def best_from(i: int, used: int) -> float:
+            # 穷举：第 i 个基准段落不匹配，或匹配任一未占用的目标段落
+            if i == len(bs):
+                return 0.0
+            options = [best_from(i + 1, used)]
+            for j in range(len(ts)):
+                if (i, j) in edges and not used & (1 << j):
+                    options.append(edges[(i, j)] + best_from(i + 1, used | (1 << j)))
+            return max(options)
+
+        best = best_from(0, 0)
+        out[page] = ({(bs[i].paragraph_id, ts[j].paragraph_id) for i, j in edges}, best)
+    return out
+
+
+@unittest.skipUnless(HAS_DEPS, "需要 numpy")
+class MatchParagraphsTests(unittest.TestCase):
+    def test_index_pruning_keeps_every_pair_above_threshold(self) -> None:
+        rng = random.Random(14)
+        for case in range(150):
+            baseline, target = random_pages(rng)
+            for threshold in THRESHOLDS:
+                reference = brute_force(baseline, target, threshold)
+                found = {page: set() for page in reference}
+                for page in reference:
+                    index = alignment._PageIndex([t for t in target if t.page_num == page])
+                    for b in baseline:
+                        norm = alignment._normalize_text_for_match(b.text)
+                        if b.page_num != page or not norm:
+                            continue
+                        scan_all = threshold <= alignment._INDEX_EXACT_MIN_SIMILARITY
+                        for j in index.ranked_candidates(norm, threshold, scan_all):
+                            sim = difflib.SequenceMatcher(a=norm, b=index.norms[j]).ratio()
+                            if sim >= threshold:
+                                found[page].add((b.paragraph_id, index.paragraphs[j].paragraph_id))
+                with self.subTest(case=case, threshold=threshold):
+                    self.assertEqual(found, {page: edges for page, (edges, _) in reference.items()})
+
+    @unittest.skipUnless(HAS_SCIPY, "需要 scipy")
+    def test_assignment_matches_brute_force_optimum(self) -> None:
+        rng = random.Random(41)
+        for case in range(150):
+            baseline, target = random_pages(rng)
+            for threshold in THRESHOLDS:
+                reference = brute_force(baseline, target, threshold)
+                matches = match_paragraphs(baseline, target, min_similarity=threshold)
+                with self.subTest(case=case, threshold=threshold):
+                    for page, (edges, best) in reference.items():
+                        page_matches = [m for m in matches if m["page_num"] == page]
+                        pairs = [(m["baseline"]["paragraph_id"], m["target"]["paragraph_id"]) for m in page_matches]
+                        self.assertEqual(len({b for b, _ in pairs}), len(pairs))
+                        self.assertEqual(len({t for _, t in pairs}), len(pairs))
+                        self.assertTrue(set(pairs) <= edges)
+                        total = sum(
+                            m["text_similarity"] - 1e-9 * abs(m["target"]["bbox"][1] - m["baseline"]["bbox"][1])
+                            for m in page_matches
+                        )
+                        self.assertAlmostEqual(total, best, places=12)
+                    # 输出按基准段落顺序排列
+                    keys = [(m["page_num"], m["baseline"]["paragraph_id"]) for m in matches]
+                    self.assertEqual(keys, sorted(keys))
+
+    def test_greedy_fallback_without_scipy_is_one_to_one(self) -> None:
+        baseline = [make_paragraph(1, 1, "abcabcabca", 100.0), make_paragraph(1, 2, "abcabcabcb", 120.0)]
+        target = [make_paragraph(1, 1, "abcabcabcb", 100.0), make_paragraph(1, 2, "abcabcabca", 120.0)]
+        with mock.patch.dict(sys.modules, {"scipy.optimize": None}):
+            matches = match_paragraphs(baseline, target, min_similarity=0.85)
+        self.assertEqual(
+            [(m["baseline"]["paragraph_id"], m["target"]["paragraph_id"]) for m in matches], [(1, 2), (2, 1)]
+        )
+        self.assertEqual([m["text_similarity"] for m in matches], [1.0, 1.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+SKILL_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SKILL_ROOT / "scripts"))
+
+from core import parameter_sweep as sweep_module  # noqa: E402
+from core.parameter_executor import ParameterExecutor  # noqa: E402
+from core.parameter_sweep import ParameterSweep, SweepSettings, SweepTrial  # noqa: E402
+
+
+CONFIG = (
+    "\\renewcommand{\\baselinestretch}{1.500}\n"
+    "\\geometry{left=3.00cm,right=3.00cm,top=2.50cm,bottom=2.50cm}\n"
+)
+
+DECISION = {
+    "reason": "行距偏大",
+    "adjustments": [
+        {"parameter": "baselinestretch", "delta": -0.02, "current_value": 1.5, "new_value": 1.48},
+    ],
+    "fallback": [
+        {"parameter": "margin_left", "delta": 0.1},
+        {"parameter": "baselinestretch", "delta": -0.02, "current_value": 1.5, "new_value": 1.48},
+    ],
+}
+
+
+class CandidateDecisionTests(unittest.TestCase):
+    def test_original_decision_first_then_scaled_single_adjustments(self) -> None:
+        candidates = ParameterExecutor().candidate_decisions(DECISION, max_candidates=20)
+
+        self.assertEqual(candidates[0]["sweep_label"], "decision")
+        self.assertEqual(candidates[0]["adjustments"], DECISION["adjustments"])
+        self.assertEqual(candidates[0]["reason"], DECISION["reason"])
+        self.assertTrue(all(c["fallback"] == [] for c in candidates))
+
+        # 原决策与 ×1 缩放完全相同，fallback 中的重复参数也只保留一次
+        labels = [c["sweep_label"] for c in candidates]
+        self.assertEqual(
+            labels,
+            [
+                "decision",
+                "baselinestretch×0.5", "baselinestretch×2", "baselinestretch×-1",
+                "margin_left×1", "margin_left×0.5", "margin_left×2", "margin_left×-1",
+            ],
+        )
+        halved = candidates[1]["adjustments"][0]
+        self.assertEqual((halved["delta"], halved["new_value"]), (-0.01, 1.49))
+        self.assertIsNone(candidates[4]["adjustments"][0]["new_value"])
+
+    def test_max_candidates_and_non_numeric_delta(self) -> None:
+        executor = ParameterExecutor()
+        self.assertEqual(len(executor.candidate_decisions(DECISION, max_candidates=3)), 3)
+
+        decision = {"adjustments": [{"parameter": "parskip", "delta": "auto"}]}
+        candidates = executor.candidate_decisions(decision, max_candidates=8)
+        self.assertEqual([c["sweep_label"] for c in candidates], ["decision"])
+        self.assertEqual(executor.candidate_decisions({"adjustments": []}), [])
+
+    def test_materialize_drops_unmatched_and_duplicate_configs(self) -> None:
+        executor = ParameterExecutor()
+        decisions = [
+            {"adjustments": [{"parameter": "baselinestretch", "new_value": 1.48}], "sweep_label": "a"},
+            {"adjustments": [{"parameter": "baselinestretch", "delta": -0.02}], "sweep_label": "same-as-a"},
+            {"adjustments": [{"parameter": "parskip", "delta": 1}], "sweep_label": "no-match"},
+            {"adjustments": [{"parameter": "baselinestretch", "delta": 0.0}], "sweep_label": "unchanged"},
+            {"adjustments": [{"parameter": "margin_left", "delta": 0.1}], "sweep_label": "b"},
+        ]
+
+        out = executor.materialize_candidates(CONFIG, decisions)
+
+        self.assertEqual([d["sweep_label"] for d, _, _ in out], ["a", "b"])
+        self.assertIn("{1.480}", out[0][1])
+        self.assertEqual(out[0][2], [{"parameter": "baselinestretch", "delta": None, "new_value": 1.48}])
+        self.assertIn("left=3.10cm", out[1][1])
+
+
+class ParameterSweepRunTests(unittest.TestCase):
+    def make_project(self, root: Path) -> tuple[Path, Path]:
+        project = root / "project"
+        (project / "extraTex").mkdir(parents=True)
+        config = project / "extraTex" / "@config.tex"
+        config.write_text(CONFIG, encoding="utf-8")
+        (project / "main.tex").write_text("\\input{extraTex/@config.tex}\n", encoding="utf-8")
+        (project / "main.pdf").write_bytes(b"old")
+        return project, config
+
+    def run_sweep(self, root: Path, ratios: dict, current_ratio: float):
+        project, config = self.make_project(root)
+
+        def fake_evaluate(task):
+            (task.sandbox).mkdir(parents=True, exist_ok=True)
+            (task.sandbox / "main.pdf").write_bytes(task.label.encode("utf-8"))
+            ratio = ratios.get(task.label)
+            status = "ok" if ratio is not None else "compile_failed"
+            return SweepTrial(index=task.index, label=task.label, status=status, ratio=ratio)
+
+        sweep = ParameterSweep(
+            project,
+            config,
+            root / "sandboxes",
+            SweepSettings(baseline_pdf=root / "baseline.pdf", compare_script=root / "compare.py"),
+            workers=1,
+            max_candidates=4,
+        )
+        decision = {"adjustments": [{"parameter": "baselinestretch", "delta": -0.02, "current_value": 1.5, "new_value": 1.48}]}
+        with mock.patch.object(sweep_module, "evaluate_candidate", fake_evaluate):
+            result, trials = sweep.run(ParameterExecutor(), decision, current_ratio)
+        return project, config, result, trials
+
+    def test_best_candidate_is_adopted(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            ratios = {"decision": 0.20, "baselinestretch×0.5": 0.12, "baselinestretch×2": 0.12, "baselinestretch×-1": 0.5}
+            project, config, result, trials = self.run_sweep(Path(tmpdir), ratios, current_ratio=0.2)
+
+            self.assertEqual([t["label"] for t in trials], list(ratios))
+            self.assertEqual(result.status, "success")
+            self.assertEqual(result.new_ratio, 0.12)
+            self.assertIn("最佳: baselinestretch×0.5", result.reason)  # 并列时取靠前的候选
+            self.assertIn("{1.490}", config.read_text(encoding="utf-8"))
+            self.assertEqual((project / "main.pdf").read_bytes(), "baselinestretch×0.5".encode("utf-8"))
+            self.assertFalse((Path(tmpdir) / "sandboxes").exists())
+
+    def test_worsening_best_candidate_leaves_project_untouched(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            ratios = {"decision": 0.30, "baselinestretch×2": 0.25}
+            project, config, result, trials = self.run_sweep(Path(tmpdir), ratios, current_ratio=0.2)
+
+            self.assertTrue(result.rollback)
+            self.assertEqual(result.status, "failed")
+            self.assertEqual(config.read_text(encoding="utf-8"), CONFIG)
+            self.assertEqual((project / "main.pdf").read_bytes(), b"old")
+            self.assertEqual(sum(t["status"] == "ok" for t in trials), 2)
+
+    def test_all_candidates_failing_is_reported(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            _, config, result, trials = self.run_sweep(Path(tmpdir), {}, current_ratio=0.2)
+
+            self.assertEqual(result.status, "failed")
+            self.assertEqual(len(trials), 4)
+            self.assertEqual(config.read_text(encoding="utf-8"), CONFIG)
+
+
+class CopyProjectTests(unittest.TestCase):
+    def make_project(self, root: Path) -> tuple[Path, Path, Path]:
+        project = root / "project"
+        (project / "extraTex").mkdir(parents=True)
+        (project / "main.tex").write_text("x", encoding="utf-8")
+        (project / "main.pdf").write_bytes(b"pdf")
+        (project / "extraTex" / "@config.tex").write_text(CONFIG, encoding="utf-8")
+        (project / ".git").mkdir()
+        # 自定义 workspace.root: build/ws（与普通文件共用 build/ 目录）
+        workspace = project / "build" / "ws"
+        (workspace / "iterations").mkdir(parents=True)
+        (project / "build" / "notes.txt").write_text("keep", encoding="utf-8")
+        sandbox_root = workspace / "cache" / "sweep" / "iteration_001"
+        (sandbox_root / "candidate_01").mkdir(parents=True)
+        return project, workspace, sandbox_root
+
+    @staticmethod
+    def copied(sandbox: Path) -> list[str]:
+        return sorted(p.relative_to(sandbox).as_posix() for p in sandbox.rglob("*"))
+
+    def test_custom_workspace_root_is_skipped(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            project, workspace, sandbox_root = self.make_project(Path(tmpdir))
+            sandbox = sandbox_root / "candidate_00"
+
+            sweep_module._copy_project(project, sandbox, (workspace, sandbox_root))
+
+            self.assertEqual(
+                self.copied(sandbox),
+                ["build", "build/notes.txt", "extraTex", "extraTex/@config.tex", "main.tex"],
+            )
+
+    def test_sandbox_is_never_copied_into_itself(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            project, _, sandbox_root = self.make_project(Path(tmpdir))
+            sandbox = sandbox_root / "candidate_00"
+
+            sweep_module._copy_project(project, sandbox)
+
+            copied = self.copied(sandbox)
+            self.assertIn("build/ws/cache/sweep/iteration_001/candidate_01", copied)
+            self.assertFalse(any("candidate_00" in p for p in copied))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+import textwrap
+import unittest
+from pathlib import Path
+
+
+SKILL_ROOT = Path(__file__).resolve().parents[1]
+
+
+class ParagraphCacheTests(unittest.TestCase):
+    def run_isolated(self, code: str) -> subprocess.CompletedProcess:
+        # 只把技能根目录放进 sys.path：模块需按 scripts.core.* 包路径导入，不能依赖顶层 core
+        return subprocess.run(
+            [sys.executable, "-I", "-c", textwrap.dedent(code)],
+            cwd=SKILL_ROOT,
+            capture_output=True,
+            text=True,
+        )
+
+    def test_paragraph_round_trip_under_package_import(self) -> None:
+        result = self.run_isolated(
+            """
+            import sys, tempfile
+            from pathlib import Path
+            sys.path.insert(0, ".")
+            import numpy as np
+            from scripts.core.paragraph_alignment import Paragraph, ParagraphLine
+            from scripts.core.raster_cache import RasterCache
+
+            with tempfile.TemporaryDirectory() as tmpdir:
+                pdf = Path(tmpdir) / "baseline.pdf"
+                pdf.write_bytes(b"%PDF-1.4 test")
+                line = ParagraphLine(bbox=(1.0, 2.0, 3.0, 4.0), text="ab", x0=1.0, y0=2.0, y1=4.0, font_size=12.0)
+                para = Paragraph(page_num=1, paragraph_id=1, text="ab", bbox=(1.0, 2.0, 3.0, 4.0),
+                                 line_count=1, lines=[line], type="body",
+                                 image_rgb=np.arange(12, dtype=np.uint8).reshape(2, 2, 3))
+                cache = RasterCache(Path(tmpdir) / "cache")
+                cache.store_paragraphs(pdf, [para], dpi=150)
+                (loaded,) = cache.load_paragraphs(pdf, dpi=150)
+                assert isinstance(loaded, Paragraph), type(loaded)
+                assert isinstance(loaded.lines[0], ParagraphLine)
+                assert loaded.text == "ab" and loaded.lines[0].font_size == 12.0
+                assert np.array_equal(loaded.image_rgb, para.image_rgb)
+                assert "core.paragraph_alignment" not in sys.modules
+            """
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
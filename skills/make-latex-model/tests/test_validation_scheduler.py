@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+SKILL_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SKILL_ROOT / "scripts"))
+
+from core import validation_scheduler as scheduler_module  # noqa: E402
+from core.parameter_sweep import SweepSettings  # noqa: E402
+from core.validation_scheduler import ValidationScheduler, ensure_compiled  # noqa: E402
+from core.validator_base import (  # noqa: E402
+    LATEX_COMPILE_STEPS,
+    ValidationContext,
+    ValidationResult,
+    ValidatorBase,
+)
+
+
+def make_project(root: Path) -> Path:
+    project = root / "project"
+    (project / "extraTex").mkdir(parents=True)
+    (project / "main.tex").write_text("\\input{extraTex/@config.tex}\n", encoding="utf-8")
+    (project / "extraTex" / "@config.tex").write_text("% config\n", encoding="utf-8")
+    (project / "main.pdf").write_bytes(b"pdf")
+    set_mtime(project / "main.tex", 100)
+    set_mtime(project / "extraTex" / "@config.tex", 100)
+    set_mtime(project / "main.pdf", 200)
+    return project
+
+
+def set_mtime(path: Path, mtime: float) -> None:
+    os.utime(path, (mtime, mtime))
+
+
+class FakeCompiler:
+    """记录编译命令；fail 中的命令返回非零退出码"""
+
+    def __init__(self, fail=()):
+        self.fail = {tuple(c) for c in fail}
+        self.calls: list[list[str]] = []
+
+    def __call__(self, cmd, **kwargs):
+        self.calls.append(list(cmd))
+        return subprocess.CompletedProcess(cmd, 1 if tuple(cmd) in self.fail else 0, "", "")
+
+
+class EnsureCompiledTests(unittest.TestCase):
+    def ensure(self, project: Path, compiler: FakeCompiler, **kwargs):
+        with mock.patch.object(scheduler_module.subprocess, "run", compiler):
+            return ensure_compiled(project, **kwargs)
+
+    def test_fresh_pdf_is_reused_without_compiling(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            project = make_project(Path(tmpdir))
+            compiler = FakeCompiler()
+
+            artifacts = self.ensure(project, compiler)
+
+            self.assertEqual(compiler.calls, [])
+            self.assertFalse(artifacts.compiled)
+            self.assertEqual(artifacts.compile_error, "")
+            self.assertEqual(artifacts.pdf, project / "main.pdf")
+
+    def test_newer_source_in_subdirectory_triggers_one_full_compile(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            project = make_project(Path(tmpdir))
+            set_mtime(project / "extraTex" / "@config.tex", 300)
+            compiler = FakeCompiler()
+
+            artifacts = self.ensure(project, compiler)
+
+            self.assertEqual(compiler.calls, LATEX_COMPILE_STEPS)
+            self.assertTrue(artifacts.compiled)
+            self.assertEqual(artifacts.compile_error, "")
+
+    def test_workspace_files_and_non_sources_do_not_make_pdf_stale(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            project = make_project(Path(tmpdir))
+            for rel in (".make_latex_model/backup/main.tex", ".latex-cache/x.tex", "notes.txt", "figure.png"):
+                path = project / rel
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text("x", encoding="utf-8")
+                set_mtime(path, 300)
+            compiler = FakeCompiler()
+
+            self.ensure(project, compiler)
+
+            self.assertEqual(compiler.calls, [])
+
+    def test_missing_pdf_or_stale_pdf_without_compile_permission(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            project = make_project(Path(tmpdir))
+            set_mtime(project / "main.tex", 300)
+            compiler = FakeCompiler()
+
+            artifacts = self.ensure(project, compiler, compile_if_stale=False)
+            self.assertEqual(compiler.calls, [])
+            self.assertFalse(artifacts.compiled)
+
+            (project / "main.pdf").unlink()
+            self.ensure(project, compiler)
+            self.assertEqual(len(compiler.calls), len(LATEX_COMPILE_STEPS))
+
+    def test_failed_xelatex_short_circuits_remaining_steps(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            project = make_project(Path(tmpdir))
+            set_mtime(project / "main.tex", 300)
+
+            compiler = FakeCompiler(fail=[LATEX_COMPILE_STEPS[0]])
+            artifacts = self.ensure(project, compiler)
+            self.assertEqual(compiler.calls, LATEX_COMPILE_STEPS[:1])
+            self.assertIn("编译失败", artifacts.compile_error)
+
+            # bibtex 失败（如无引用）不中断编译
+            compiler = FakeCompiler(fail=[LATEX_COMPILE_STEPS[1]])
+            artifacts = self.ensure(project, compiler)
+            self.assertEqual(compiler.calls, LATEX_COMPILE_STEPS)
+            self.assertEqual(artifacts.compile_error, "")
+
+    def test_missing_main_tex_or_compiler_is_reported(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            project = make_project(Path(tmpdir))
+            (project / "main.pdf").unlink()
+
+            def missing(cmd, **kwargs):
+                raise FileNotFoundError(2, "not found", cmd[0])
+
+            with mock.patch.object(scheduler_module.subprocess, "run", missing):
+                artifacts = ensure_compiled(project)
+            self.assertIn("xelatex", artifacts.compile_error)
+
+            (project / "main.tex").unlink()
+            artifacts = self.ensure(project, FakeCompiler())
+            self.assertIn("main.tex", artifacts.compile_error)
+
+    def test_compile_steps_are_shared_with_parameter_sweep(self) -> None:
+        settings = SweepSettings(baseline_pdf=Path("b.pdf"), compare_script=Path("c.py"))
+        self.assertEqual(settings.compile_steps, LATEX_COMPILE_STEPS)
+        self.assertIsNot(settings.compile_steps, LATEX_COMPILE_STEPS)
+
+
+class StubValidator(ValidatorBase):
+    def __init__(self, name: str, priority: int, delay: float, finished: list, error: str = ""):
+        self.name, self.priority, self.delay, self.finished, self.error = name, priority, delay, finished, error
+        self.seen_artifacts = None
+        self.thread = None
+
+    def get_name(self) -> str:
+        return self.name
+
+    def get_priority(self) -> int:
+        return self.priority
+
+    def validate(self, context: ValidationContext):
+        self.seen_artifacts = context.artifacts
+        self.thread = threading.current_thread().name
+        time.sleep(self.delay)
+        self.finished.append(self.name)
+        if self.error:
+            raise RuntimeError(self.error)
+        result = ValidationResult(passed=[], warnings=[], failed=[])
+        result.add_pass(self.name)
+        return result
+
+
+class ValidationSchedulerTests(unittest.TestCase):
+    def make_validators(self, finished: list) -> list:
+        # 已按优先级注册；越靠前越慢，使并发完成顺序与注册顺序相反
+        return [
+            StubValidator("compilation", 1, 0.20, finished),
+            StubValidator("heading", 2, 0.15, finished),
+            StubValidator("style", 2, 0.10, finished, error="boom"),
+            StubValidator("visual", 3, 0.05, finished),
+        ]
+
+    def test_concurrent_runs_are_reported_in_priority_order(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            context = ValidationContext(project_path=Path(tmpdir), template_config={}, tolerance={})
+            finished: list = []
+            validators = self.make_validators(finished)
+            scheduler = ValidationScheduler(validators, workers=0)
+
+            runs = scheduler.run(context)
+
+        self.assertEqual(finished, ["visual", "style", "heading", "compilation"])
+        self.assertEqual([r.name for r in runs], ["compilation", "heading", "style", "visual"])
+        self.assertLess(scheduler.wall_seconds, 0.45)
+        self.assertEqual(len({v.thread for v in validators}), 4)
+        self.assertTrue(all(r.seconds >= v.delay for r, v in zip(runs, validators)))
+
+        # 单个验证器异常只记录为失败，不影响其他验证器
+        style = runs[2]
+        self.assertEqual(style.error, "boom")
+        self.assertEqual(style.result.failed, ["验证器异常: boom"])
+        self.assertTrue(all(r.result.is_success() for r in runs if r.name != "style"))
+
+        # 共享产物在派发前解析一次，所有验证器拿到同一对象
+        self.assertIsNotNone(context.artifacts)
+        self.assertTrue(all(v.seen_artifacts is context.artifacts for v in validators))
+
+    def test_serial_mode_matches_concurrent_results(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            results = {}
+            for workers in (1, 0):
+                context = ValidationContext(project_path=Path(tmpdir), template_config={}, tolerance={})
+                finished: list = []
+                runs = ValidationScheduler(self.make_validators(finished), workers=workers).run(context)
+                results[workers] = [(r.name, r.priority, r.result, r.error) for r in runs]
+                if workers == 1:
+                    self.assertEqual(finished, ["compilation", "heading", "style", "visual"])
+
+        self.assertEqual(results[1], results[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import importlib.util
+import json
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+
+SKILL_ROOT = Path(__file__).resolve().parents[1]
+SCRIPT = SKILL_ROOT / "scripts" / "api_cache.py"
+SPEC = importlib.util.spec_from_file_location("api_cache", SCRIPT)
+assert SPEC and SPEC.loader
+MODULE = importlib.util.module_from_spec(SPEC)
+sys.modules[SPEC.name] = MODULE
+SPEC.loader.exec_module(MODULE)
+
+
+class SqliteCacheStorageTests(unittest.TestCase):
+    def test_roundtrip_and_ttl_expiry(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = MODULE.CacheStorage(cache_dir=Path(tmpdir), ttl=60)
+            storage.set("https://api.example/works", {"q": "crispr"}, {"results": [1, 2]})
+            self.assertEqual(storage.get("https://api.example/works", {"q": "crispr"}), {"results": [1, 2]})
+
+            storage.ttl = -1
+            self.assertIsNone(storage.get("https://api.example/works", {"q": "crispr"}))
+            self.assertEqual(storage.count(), 0)
+            storage.close()
+
+    def test_lru_eviction_keeps_recently_accessed_entries(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = MODULE.CacheStorage(cache_dir=Path(tmpdir), ttl=3600, max_bytes=0)
+            for i in range(5):
+                storage.set(f"https://api.example/{i}", None, {"blob": f"{i}" * 2000 + str(time.time())})
+            storage.get("https://api.example/0", None)
+
+            storage.max_bytes = storage.total_bytes() // 2
+            self.assertGreater(storage.evict(), 0)
+            self.assertIsNotNone(storage.get("https://api.example/0", None))
+            self.assertIsNone(storage.get("https://api.example/1", None))
+            storage.close()
+
+    def test_legacy_json_directory_is_migrated_once(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_dir = Path(tmpdir)
+            url, params = "https://api.example/legacy", {"doi": "10.1/x"}
+            key = MODULE.CacheStorage(cache_dir=None)._get_cache_key(url, params)
+            (cache_dir / f"{key}.json").write_text(json.dumps({"abstract": "old"}), encoding="utf-8")
+            (cache_dir / "cache_meta.json").write_text(
+                json.dumps({"version": "v1", "entries": {key: {"timestamp": "2026-01-01T00:00:00", "url": url}}}),
+                encoding="utf-8",
+            )
+
+            storage = MODULE.CacheStorage(cache_dir=cache_dir, ttl=10**9)
+            self.assertEqual(storage.get(url, params), {"abstract": "old"})
+            self.assertFalse((cache_dir / "cache_meta.json").exists())
+            self.assertFalse((cache_dir / f"{key}.json").exists())
+            storage.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
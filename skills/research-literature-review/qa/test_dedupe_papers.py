@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import importlib.util
+import sys
+import unittest
+from pathlib import Path
+
+
+SKILL_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SKILL_ROOT / "scripts"))
+SCRIPT = SKILL_ROOT / "scripts" / "dedupe_papers.py"
+SPEC = importlib.util.spec_from_file_location("dedupe_papers", SCRIPT)
+assert SPEC and SPEC.loader
+MODULE = importlib.util.module_from_spec(SPEC)
+sys.modules[SPEC.name] = MODULE
+SPEC.loader.exec_module(MODULE)
+
+
+def run_dedupe(papers):
+    return MODULE.dedupe(
+        papers,
+        title_similarity_threshold=0.92,
+        token_jaccard_threshold=0.80,
+        year_window=1,
+    )
+
+
+class DedupeIndexTests(unittest.TestCase):
+    def test_titles_differing_in_first_words_are_still_merged(self) -> None:
+        papers = [
+            {"title": "Single-cell transcriptomic atlas of the human tumor immune microenvironment", "year": 2021},
+            {
+                "title": "Review: single-cell transcriptomic atlas of the human tumor immune microenvironment",
+                "year": 2022,
+                "doi": "10.1000/atlas",
+                "venue": "Nature",
+            },
+        ]
+        canonical, edges = run_dedupe(papers)
+
+        self.assertEqual(len(canonical), 1)
+        self.assertEqual(canonical[0]["doi"], "10.1000/atlas")
+        self.assertEqual([(e.canonical_index, e.merged_index, e.reason) for e in edges], [(0, 1, "fuzzy_title_year")])
+
+    def test_year_window_and_doi_rules_are_preserved(self) -> None:
+        title = "Deep learning for protein structure prediction"
+        papers = [
+            {"title": title, "year": 2018, "doi": "10.1/a"},
+            {"title": title, "year": 2021},
+            {"title": title.upper(), "year": 2018, "doi": "10.1/b"},
+            {"title": "Unrelated", "year": 2018, "doi": "10.1/A"},
+        ]
+        canonical, edges = run_dedupe(papers)
+
+        self.assertEqual(len(canonical), 3)
+        self.assertEqual([(e.merged_index, e.reason) for e in edges], [(3, "same_doi")])
+
+    def test_similarity_keeps_incoming_vs_candidate_orientation(self) -> None:
+        # SequenceMatcher.ratio() 不对称：同一对标题交换方向后得分不同，合并决策也随之不同
+        title_x = "atlas method protein data atlas"
+        title_y = "atlas method protein data salta"
+        y_vs_x = MODULE.SequenceMatcher(a=title_y, b=title_x).ratio()
+        x_vs_y = MODULE.SequenceMatcher(a=title_x, b=title_y).ratio()
+        self.assertLess(y_vs_x, 0.92)
+        self.assertGreaterEqual(x_vs_y, 0.92)
+
+        # 先 x 后 y：得分取 ratio(a=y, b=x)，低于阈值不合并
+        canonical, edges = run_dedupe([{"title": title_x, "year": 2020}, {"title": title_y, "year": 2020}])
+        self.assertEqual((len(canonical), edges), (2, []))
+
+        # 先 y 后 x：得分取 ratio(a=x, b=y)，合并
+        canonical, edges = run_dedupe([{"title": title_y, "year": 2020}, {"title": title_x, "year": 2020}])
+        self.assertEqual(len(canonical), 1)
+        self.assertEqual([(e.canonical_index, e.merged_index, e.reason) for e in edges], [(0, 1, "fuzzy_title_year")])
+        self.assertEqual(edges[0].similarity, x_vs_y)
+
+
+if __name__ == "__main__":
+    unittest.main()
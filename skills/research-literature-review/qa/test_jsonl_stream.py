@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import importlib.util
+import json
+import math
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+
+SKILL_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SKILL_ROOT / "scripts"))
+
+
+def _load(name: str):
+    spec = importlib.util.spec_from_file_location(name, SKILL_ROOT / "scripts" / f"{name}.py")
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+STREAM = _load("jsonl_stream")
+RUNNER = _load("pipeline_runner")
+
+
+class IterJsonlTests(unittest.TestCase):
+    def test_non_finite_numbers_written_by_json_dumps_are_kept(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "papers.jsonl"
+            rows = [{"title": "a", "score": float("nan")}, {"title": "b", "score": float("inf")}, {"title": "c"}]
+            path.write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+
+            records = list(STREAM.iter_jsonl(path))
+
+        self.assertEqual([r["title"] for r in records], ["a", "b", "c"])
+        self.assertTrue(math.isnan(records[0]["score"]))
+        self.assertEqual(records[1]["score"], float("inf"))
+
+    def test_invalid_lines_raise_unless_skipping_is_requested(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "papers.jsonl"
+            path.write_text('{"title": "a"}\n{broken\n[1, 2]\n{"title": "b"}\n', encoding="utf-8")
+
+            with self.assertRaises(ValueError):
+                list(STREAM.iter_jsonl(path))
+            records = list(STREAM.iter_jsonl(path, skip_invalid=True))
+
+        self.assertEqual([r["title"] for r in records], ["a", "b"])
+
+
+class StreamedWriteStageTests(unittest.TestCase):
+    def run_stage_5(self, work_dir: Path, in_process: bool) -> tuple[str, str]:
+        runner = RUNNER.PipelineRunner(
+            topic="stream test",
+            domain="general",
+            config_path=SKILL_ROOT / "config.yaml",
+            work_dir=work_dir,
+            review_level="basic",
+            output_stem="stream-test",
+        )
+        runner.in_process = in_process
+        runner.config["search"]["abstract_enrichment"]["enabled"] = False
+        selected = runner.artifacts_dir / "selected_papers_stream-test.jsonl"
+        rows = [
+            {"title": "Graph neural networks", "year": 2021, "doi": "10.1/A", "score": 9.5, "subtopic": "GNN"},
+            {"title": "Graph neural networks", "year": 2022, "doi": "", "id": "W2", "score": float("nan")},
+            {"title": "Protein folding", "year": 2020, "doi": "10.1/b", "abstract": "x" * 900},
+            {"title": "No key", "year": 2019},
+        ]
+        selected.write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+        runner.state.input_files["selected_papers"] = str(selected)
+
+        runner.run_stage_5_write()
+
+        cards = (runner.artifacts_dir / "evidence_cards_stream-test.jsonl").read_text(encoding="utf-8")
+        return cards, runner.data_extraction_table.read_text(encoding="utf-8")
+
+    def test_streamed_hand_off_matches_per_script_outputs(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            streamed = self.run_stage_5(Path(tmpdir) / "streamed", in_process=True)
+            scripted = self.run_stage_5(Path(tmpdir) / "scripted", in_process=False)
+
+        self.assertEqual(streamed, scripted)
+        self.assertEqual(len(streamed[0].splitlines()), 4)
+        self.assertIn("| 9.5 | GNN | 10.1/a |", streamed[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
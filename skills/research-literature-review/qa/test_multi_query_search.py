@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import importlib.util
+import sys
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+
+SKILL_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SKILL_ROOT / "scripts"))
+
+SPEC = importlib.util.spec_from_file_location("multi_query_search", SKILL_ROOT / "scripts" / "multi_query_search.py")
+assert SPEC and SPEC.loader
+MODULE = importlib.util.module_from_spec(SPEC)
+sys.modules[SPEC.name] = MODULE
+SPEC.loader.exec_module(MODULE)
+
+
+QUERIES = [
+    {"query": "graph neural networks", "rationale": "core"},
+    {"query": "message passing", "rationale": "method"},
+    {"query": "citation graphs", "rationale": "data"},
+    {"query": "node classification", "rationale": "task"},
+    {"query": "", "rationale": "empty"},
+    {"query": "over smoothing", "rationale": "limitation"},
+    {"query": "graph transformers", "rationale": "variant"},
+]
+OPENALEX_INTERVAL = 0.05
+
+
+def search_config() -> dict:
+    return {
+        "provider_priority": ["openalex"],
+        "fallback": {"enabled": False},
+        "concurrency": {"enabled": True, "max_workers": 4},
+        "abstract_enrichment": {"enabled": False},
+        "rate_limit_protection": {
+            "enabled": True,
+            # 全局额度恰好等于非空查询数：每次请求必须且只能消耗一个令牌
+            "global": {"enabled": True, "max_calls_per_minute": len([q for q in QUERIES if q["query"]])},
+            "openalex": {"polite_delay": OPENALEX_INTERVAL},
+            "shared": {"enabled": False},
+        },
+    }
+
+
+class StubProviders:
+    """按查询决定耗时的假 provider：越靠前的查询越慢，确保并发模式下乱序完成。"""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.calls: list[tuple[str, str, float]] = []  # (provider, query, 开始时间)
+        self.finished: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def papers(self, provider: str, query: str, max_results: int) -> list[dict]:
+        with self.lock:
+            self.calls.append((provider, query, time.monotonic()))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        order = [q["query"] for q in QUERIES].index(query)
+        time.sleep(0.08 * (len(QUERIES) - order))
+        with self.lock:
+            self.in_flight -= 1
+            self.finished.append(query)
+        # 相邻查询共享一篇论文，使 unique 统计依赖合并顺序
+        return [
+            {"title": f"{query} paper {k}", "year": 2020 + k, "doi": f"10.1/{order + k}", "provider": provider}
+            for k in range(min(max_results, 2))
+        ]
+
+    def openalex(self, *, query: str, max_results: int, **kwargs) -> list[dict]:
+        return self.papers("openalex", query, max_results)
+
+
+class ConcurrentMultiSearchTests(unittest.TestCase):
+    def run_search(self, workers: int):
+        stub = StubProviders()
+        limiters: list = []
+        real_limiter = MODULE.GlobalRateLimiter
+
+        def make_global_limiter(**kwargs):
+            limiter = real_limiter(**kwargs)
+            limiters.append(limiter)
+            return limiter
+
+        with mock.patch.object(MODULE, "_load_search_config", search_config), \
+                mock.patch.object(MODULE, "search_openalex", stub.openalex), \
+                mock.patch.object(MODULE, "GlobalRateLimiter", side_effect=make_global_limiter), \
+                redirect_stdout(StringIO()):
+            papers, logs, _, _ = MODULE.multi_search(
+                QUERIES,
+                max_results_per_query=5,
+                mailto=None,
+                min_year=None,
+                max_year=None,
+                polite_delay=(0.0, 0.0),
+                workers=workers,
+            )
+        return papers, [MODULE.asdict(log) for log in logs], stub, limiters[0]
+
+    def test_concurrent_results_match_sequential_mode(self) -> None:
+        seq_papers, seq_logs, seq_stub, _ = self.run_search(workers=1)
+        par_papers, par_logs, par_stub, _ = self.run_search(workers=4)
+
+        non_empty = [q["query"] for q in QUERIES if q["query"]]
+        self.assertEqual(seq_stub.finished, non_empty)
+        self.assertNotEqual(par_stub.finished, non_empty)  # 确实乱序完成
+        self.assertGreater(par_stub.max_in_flight, 1)
+        self.assertLessEqual(par_stub.max_in_flight, 4)
+
+        self.assertEqual(par_papers, seq_papers)
+        self.assertEqual(par_logs, seq_logs)
+        self.assertEqual([log["query"] for log in par_logs], [q["query"] for q in QUERIES])
+        self.assertEqual([log["unique"] for log in par_logs], [2, 1, 1, 1, 0, 2, 1])
+        self.assertEqual({log["provider_used"] for log in par_logs if log["query"]}, {"openalex"})
+
+    def test_shared_budget_holds_across_threads(self) -> None:
+        _, _, stub, global_limiter = self.run_search(workers=4)
+
+        # 每个非空查询恰好消耗一个全局令牌，额度用尽后不再放行
+        self.assertEqual(len(stub.calls), len(global_limiter._all_calls))
+        self.assertFalse(global_limiter.can_request().can_request)
+
+        # 同一 provider 的请求被共享令牌桶摊开到配置的最小间隔上
+        starts = sorted(t for provider, _, t in stub.calls if provider == "openalex")
+        self.assertEqual(len(starts), 6)
+        gaps = [b - a for a, b in zip(starts, starts[1:])]
+        self.assertGreaterEqual(min(gaps), OPENALEX_INTERVAL * 0.8)
+
+
+if __name__ == "__main__":
+    unittest.main()
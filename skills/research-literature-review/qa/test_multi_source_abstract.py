@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import importlib.util
+import json
+import sys
+import unittest
+import urllib.parse
+from pathlib import Path
+
+
+SKILL_ROOT = Path(__file__).resolve().parents[1]
+SCRIPT = SKILL_ROOT / "scripts" / "multi_source_abstract.py"
+SPEC = importlib.util.spec_from_file_location("multi_source_abstract", SCRIPT)
+assert SPEC and SPEC.loader
+MODULE = importlib.util.module_from_spec(SPEC)
+sys.modules[SPEC.name] = MODULE
+SPEC.loader.exec_module(MODULE)
+
+
+ABSTRACT = "A sufficiently long abstract about gene editing outcomes in model organisms."
+
+
+class FakeApi:
+    """按 URL 路由的假 HTTP 层：crossref 命中前 20 个 DOI，S2 命中接下来 20 个，OpenAlex 命中其余一半。"""
+
+    def __init__(self, dois: list[str], *, crossref_down: bool = False) -> None:
+        self.crossref = set(dois[:20])
+        self.s2 = set(dois[20:40])
+        self.openalex = set(dois[40:45])
+        self.crossref_down = crossref_down
+        self.calls: list[str] = []
+
+    def __call__(self, url, timeout, headers=None, *, method="GET", body=None, on_request=None):
+        if on_request is not None:
+            on_request()
+        self.calls.append(url)
+        parts = urllib.parse.urlsplit(url)
+        query = urllib.parse.parse_qs(parts.query)
+        if parts.netloc == "api.crossref.org":
+            if self.crossref_down:
+                return None
+            if parts.path == "/works":
+                dois = [f.split(":", 1)[1] for f in query["filter"][0].split(",")]
+                items = [{"DOI": d.upper(), "abstract": f"<jats:p>{ABSTRACT}</jats:p>"} for d in dois if d in self.crossref]
+                return json.dumps({"message": {"items": items}}).encode()
+            doi = urllib.parse.unquote(parts.path[len("/works/"):])
+            message = {"abstract": ABSTRACT} if doi in self.crossref else {}
+            return json.dumps({"message": message}).encode()
+        if parts.path.endswith("/paper/batch"):
+            ids = json.loads(body)["ids"]
+            return json.dumps(
+                [{"abstract": ABSTRACT} if i[len("DOI:"):] in self.s2 else None for i in ids]
+            ).encode()
+        if parts.path.endswith("/paper/search"):
+            return json.dumps({"data": []}).encode()
+        if parts.path.endswith("esearch.fcgi"):
+            return json.dumps({"esearchresult": {"idlist": []}}).encode()
+        if parts.netloc == "api.openalex.org":
+            dois = [v[len("https://doi.org/"):] for v in query["filter"][0][len("doi:"):].split("|")]
+            results = [
+                {"doi": f"https://doi.org/{d}", "abstract_inverted_index": {w: [i] for i, w in enumerate(ABSTRACT.split())}}
+                for d in dois
+                if d in self.openalex
+            ]
+            return json.dumps({"results": results}).encode()
+        return None
+
+
+class BatchedAbstractFetchTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._orig = MODULE._http_request
+        self.dois = [f"10.1000/test.{i}" for i in range(50)]
+        self.papers = [{"doi": d, "title": f"Paper {i}", "abstract": ""} for i, d in enumerate(self.dois)]
+
+    def tearDown(self) -> None:
+        MODULE._http_request = self._orig
+
+    def test_batched_cascade_only_forwards_missing_dois(self) -> None:
+        api = FakeApi(self.dois)
+        MODULE._http_request = api
+        fetcher = MODULE.AbstractFetcher(timeout=1, batch_size=50)
+
+        enriched = fetcher.fetch_batch(self.papers, topic="robotics")
+
+        self.assertEqual([p["doi"] for p in enriched], self.dois)
+        self.assertEqual(sum(1 for p in enriched if p["abstract"]), 45)
+        stats = fetcher.get_statistics()
+        self.assertEqual(stats.crossref_success, 20)
+        self.assertEqual(stats.semantic_scholar_success, 20)
+        self.assertEqual(stats.openalex_fallback_success, 5)
+        self.assertEqual(stats.total_papers, 50)
+        self.assertEqual(stats.total_failed, 5)
+        # 每个来源 1 个批量请求；5 篇未命中的只剩标题兜底
+        self.assertEqual(
+            stats.requests_by_provider,
+            {"crossref": 1, "semantic_scholar": 1 + 5, "pubmed": 1, "openalex": 1},
+        )
+        s2_body_dois = [c for c in api.calls if c.endswith("/paper/batch?fields=abstract")]
+        self.assertEqual(len(s2_body_dois), 1)
+
+    def test_failed_batch_falls_back_to_single_lookups_for_that_provider(self) -> None:
+        api = FakeApi(self.dois, crossref_down=True)
+        MODULE._http_request = api
+        fetcher = MODULE.AbstractFetcher(timeout=1, batch_size=50)
+
+        enriched = fetcher.fetch_batch(self.papers, topic="robotics")
+
+        # crossref 批量失败：其余来源照常批量；仍缺的 DOI 只重试 crossref，不会重复请求已答复的来源
+        self.assertEqual(sum(1 for p in enriched if p["abstract"]), 25)
+        stats = fetcher.get_statistics()
+        self.assertEqual(stats.requests_by_provider["crossref"], 1 + 25)
+        self.assertEqual(stats.requests_by_provider["openalex"], 1)
+        self.assertEqual(stats.requests_by_provider["pubmed"], 1)
+
+    def test_batch_size_one_keeps_per_doi_lookups(self) -> None:
+        MODULE._http_request = FakeApi(self.dois)
+        fetcher = MODULE.AbstractFetcher(timeout=1, batch_size=1)
+
+        enriched = fetcher.fetch_batch(self.papers[:3], topic="robotics")
+
+        self.assertTrue(all(p["abstract"] for p in enriched))
+        self.assertEqual(fetcher.get_statistics().requests_by_provider, {"crossref": 3})
+
+
+@unittest.skipUnless(importlib.util.find_spec("requests"), "requests 未安装")
+class SessionPoolTests(unittest.TestCase):
+    def test_sessions_are_per_thread_and_honour_proxy_environment(self) -> None:
+        import threading
+
+        pool = MODULE._SessionPool()
+        pool.reserve(8)
+        main_session = pool.session()
+        self.assertIs(pool.session(), main_session)
+        self.assertTrue(main_session.trust_env)
+        self.assertEqual(main_session.get_adapter("https://api.crossref.org/works")._pool_maxsize, 8)
+
+        other: list = []
+        thread = threading.Thread(target=lambda: other.append(pool.session()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], main_session)
+
+
+if __name__ == "__main__":
+    unittest.main()
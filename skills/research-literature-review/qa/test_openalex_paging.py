@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import importlib.util
+import sys
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+
+SKILL_ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS_DIR = SKILL_ROOT / "scripts"
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+SCRIPT = SCRIPTS_DIR / "openalex_search.py"
+SPEC = importlib.util.spec_from_file_location("openalex_search", SCRIPT)
+assert SPEC and SPEC.loader
+MODULE = importlib.util.module_from_spec(SPEC)
+sys.modules[SPEC.name] = MODULE
+SPEC.loader.exec_module(MODULE)
+
+
+def _work(i: int) -> dict:
+    words = f"abstract number {i} about cursor paging".split()
+    return {
+        "id": f"https://openalex.org/W{i}",
+        "doi": f"https://doi.org/10.1000/w{i}",
+        "title": f"Work {i}",
+        "publication_year": 2020,
+        "primary_location": {"source": {"display_name": "Venue"}},
+        "authorships": [{"author": {"display_name": "A. Author"}}],
+        "abstract_inverted_index": {w: [j] for j, w in enumerate(words)},
+    }
+
+
+class FakeSession:
+    """假 OpenAlex：每页 200 条，共 5 页；记录请求参数。"""
+
+    latency = 0.05
+
+    def __init__(self) -> None:
+        self.headers: dict = {}
+        self.calls: list[dict] = []
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append(dict(params or {}))
+        time.sleep(self.latency)
+        page = 0 if params["cursor"] == "*" else int(params["cursor"])
+        results = [_work(page * 200 + i) for i in range(200)]
+        next_cursor = str(page + 1) if page < 4 else None
+        data = {"results": results, "meta": {"next_cursor": next_cursor}}
+        return SimpleNamespace(status_code=200, headers={}, json=lambda: data, raise_for_status=lambda: None)
+
+
+class OpenAlexPagingTests(unittest.TestCase):
+    def test_reconstruct_abstract_matches_positions(self) -> None:
+        aii = {"b": [1, 3], "a": [0], "c": [2], "dup": [1]}
+        self.assertEqual(MODULE._reconstruct_abstract(aii), "a b c b")
+        self.assertEqual(MODULE._reconstruct_abstract({"x": [0], "y": [5]}), "x y")
+        self.assertEqual(MODULE._reconstruct_abstract(None), "")
+
+    def test_cursor_paging_projects_fields_and_keeps_order(self) -> None:
+        session = FakeSession()
+        fake_requests = SimpleNamespace(Session=lambda: session)
+        with patch.dict(sys.modules, {"requests": fake_requests}):
+            papers = MODULE.search_openalex(
+                query="cursor paging",
+                max_results=1000,
+                mailto=None,
+                min_year=None,
+                max_year=None,
+                enrich_abstracts=False,
+            )
+
+        self.assertEqual(len(papers), 1000)
+        self.assertEqual([p["title"] for p in papers[:3]], ["Work 0", "Work 1", "Work 2"])
+        self.assertEqual(papers[-1]["doi"], "10.1000/w999")
+        self.assertEqual(papers[7]["abstract"], "abstract number 7 about cursor paging")
+        self.assertEqual(len(session.calls), 5)
+        for params in session.calls:
+            self.assertEqual(params["select"], ",".join(MODULE.OPENALEX_SELECT_FIELDS))
+        self.assertEqual([c["cursor"] for c in session.calls], ["*", "1", "2", "3", "4"])
+
+
+if __name__ == "__main__":
+    unittest.main()
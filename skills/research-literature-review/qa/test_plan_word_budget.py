@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import importlib.util
+import sys
+import unittest
+from pathlib import Path
+
+
+SKILL_ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS_DIR = SKILL_ROOT / "scripts"
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+SCRIPT = SCRIPTS_DIR / "plan_word_budget.py"
+SPEC = importlib.util.spec_from_file_location("plan_word_budget", SCRIPT)
+assert SPEC and SPEC.loader
+MODULE = importlib.util.module_from_spec(SPEC)
+sys.modules[SPEC.name] = MODULE
+SPEC.loader.exec_module(MODULE)
+
+
+def _csv_values(rows):
+    return [(pid, sec, int(round(z)), int(round(s))) for pid, sec, z, s in rows]
+
+
+@unittest.skipIf(MODULE.np is None, "numpy not installed")
+class VectorizedPlannerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.papers = [MODULE.Paper(f"p{i}", f"topic-{i % 3}", (i * 7) % 10 + 0.5) for i in range(30)]
+        self.papers.append(MODULE.Paper("p0", "topic-0", 9.0))  # 重复 ID：与旧实现一样合并求均值
+        self.sections = MODULE.load_outline(None, sorted({p.subtopic for p in self.papers}))
+        self.sections.append(MODULE.Section("empty", "空引用段", True, 2.0, "missing"))
+        self.cfg = {"noise_strength": 0.5}
+        self.seeds = [17, 23, 43]
+
+    def test_seeded_runs_match_pure_python_planner(self) -> None:
+        expected_runs = [MODULE.run_once(self.sections, self.papers, 15000, self.cfg, s) for s in self.seeds]
+        expected_final = MODULE.align_and_average(expected_runs)
+
+        runs, final = MODULE.plan_budget(self.sections, self.papers, 15000, self.cfg, self.seeds)
+
+        self.assertEqual(len(runs), 3)
+        for got, want in zip(runs, expected_runs):
+            self.assertEqual(_csv_values(got), _csv_values(want))
+        self.assertEqual(_csv_values(final), _csv_values(expected_final))
+        self.assertEqual(final[-1][:2], ("", "空引用段"))
+
+    def test_monte_carlo_runs_are_chunked_and_preserve_totals(self) -> None:
+        runs, final = MODULE.plan_budget(
+            self.sections, self.papers, 15000, self.cfg, self.seeds, monte_carlo_runs=1000, chunk_size=128
+        )
+        _, again = MODULE.plan_budget(
+            self.sections, self.papers, 15000, self.cfg, self.seeds, monte_carlo_runs=1000, chunk_size=1000
+        )
+
+        self.assertEqual(len(runs), 3)
+        _, seeded_only = MODULE.plan_budget(self.sections, self.papers, 15000, self.cfg, self.seeds)
+        self.assertEqual([r[:2] for r in final], [r[:2] for r in seeded_only])
+        # 分块大小不影响结果（同一随机流）
+        for a, b in zip(final, again):
+            self.assertAlmostEqual(a[2], b[2], places=9)
+
+    def test_monte_carlo_average_converges_for_tied_scores(self) -> None:
+        papers = [MODULE.Paper(f"q{i}", "tie", 6.0) for i in range(5)]
+        sections = [MODULE.Section("tie", "并列", True, None, "tie")]
+        cfg = {"noise_strength": 1.0, "ratio": {"cited": 1.0, "non_cited": 0.0}}
+
+        _, seeded_only = MODULE.plan_budget(sections, papers, 10000, cfg, self.seeds)
+        _, stable = MODULE.plan_budget(sections, papers, 10000, cfg, self.seeds, monte_carlo_runs=4000)
+
+        def spread(rows):
+            totals = [z + s for _, _, z, s in rows]
+            return max(totals) / min(totals)
+
+        self.assertLess(spread(stable), 1.03)
+        self.assertLess(spread(stable), spread(seeded_only))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -66,6 +66,68 @@ class ResumeStateTests(unittest.TestCase):
             self.assertFalse(runner.run(resume_from=5))
             self.assertEqual(state_path.read_text(encoding="utf-8"), original)
 
+    def run_with_spy(self, runner, resume_from: int) -> list:
+        calls = []
+        original = runner._run_script
+
+        def spy(script_name, args):
+            calls.append(script_name)
+            return original(script_name, args)
+
+        with patch.object(runner, "_run_script", side_effect=spy):
+            runner.run(resume_from=resume_from)
+        return calls
+
+    def test_resume_from_search_keeps_existing_candidate_pool(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            runner = self.make_runner(Path(tmpdir) / "run")
+            papers = runner.artifacts_dir / "papers_checkpoint-test.jsonl"
+            papers.write_text(json.dumps({"title": "A paper", "year": 2024}) + "\n", encoding="utf-8")
+            MODULE.PipelineState(
+                topic="checkpoint test",
+                domain="general",
+                started_at="2026-08-08T00:00:00",
+                current_stage="2_dedupe",
+                completed_stages=["0_setup", "1_search", "2_dedupe"],
+                input_files={"papers": str(papers)},
+                stage_fingerprints={"1_search": "stale", "2_dedupe": "stale"},
+            ).to_json(runner._state_file())
+
+            calls = self.run_with_spy(runner, resume_from=1)
+
+            self.assertEqual(runner.state.input_files["papers"], str(papers))
+            self.assertNotIn("multi_query_search.py", calls)
+            self.assertIn("dedupe_papers.py", calls)
+
+    def test_resume_from_write_keeps_enriched_papers_and_evidence_cards(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            runner = self.make_runner(Path(tmpdir) / "run")
+            runner.config["search"]["abstract_enrichment"].update({"enabled": True, "stage": "post_selection"})
+            a = runner.artifacts_dir
+            row = json.dumps({"title": "A paper", "year": 2024, "doi": "10.1/a"}) + "\n"
+            selected = a / "selected_papers_checkpoint-test.jsonl"
+            enriched = a / "selected_papers_enriched_checkpoint-test.jsonl"
+            cards = a / "evidence_cards_checkpoint-test.jsonl"
+            for path in (selected, enriched, cards):
+                path.write_text(row, encoding="utf-8")
+            MODULE.PipelineState(
+                topic="checkpoint test",
+                domain="general",
+                started_at="2026-08-08T00:00:00",
+                current_stage="5_write",
+                completed_stages=["0_setup", "1_search", "2_dedupe", "3_score", "4_select", "4.5_word_budget", "5_write"],
+                input_files={"selected_papers": str(selected)},
+                stage_fingerprints={"5_write": "stale"},
+            ).to_json(runner._state_file())
+
+            calls = self.run_with_spy(runner, resume_from=6)
+
+            self.assertEqual(enriched.read_text(encoding="utf-8"), row)
+            self.assertEqual(cards.read_text(encoding="utf-8"), row)
+            self.assertEqual(runner.state.input_files["selected_papers"], str(enriched))
+            self.assertNotIn("multi_source_abstract.py", calls)
+            self.assertNotIn("build_evidence_cards.py", calls)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import importlib.util
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+
+SKILL_ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS_DIR = SKILL_ROOT / "scripts"
+SCRIPT = SCRIPTS_DIR / "shared_rate_limiter.py"
+SPEC = importlib.util.spec_from_file_location("shared_rate_limiter", SCRIPT)
+assert SPEC and SPEC.loader
+MODULE = importlib.util.module_from_spec(SPEC)
+sys.modules[SPEC.name] = MODULE
+SPEC.loader.exec_module(MODULE)
+
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+
+class SharedTokenBucketTests(unittest.TestCase):
+    def test_reservations_from_separate_processes_share_one_queue(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "rl.sqlite3"
+            bucket = MODULE.SharedTokenBucket(path)
+            bucket.configure("semantic_scholar", rate=10.0, capacity=1)
+
+            code = (
+                "import json, sys; sys.path.insert(0, sys.argv[1]);"
+                "from shared_rate_limiter import SharedTokenBucket;"
+                "b = SharedTokenBucket(sys.argv[2]);"
+                "print(json.dumps([b.reserve('semantic_scholar') for _ in range(5)]))"
+            )
+            child = subprocess.run(
+                [sys.executable, "-c", code, str(SCRIPTS_DIR), str(path)],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            child_waits = json.loads(child.stdout)
+            own_waits = [bucket.reserve("semantic_scholar") for _ in range(5)]
+
+            # 子进程取走 5 个令牌后，本进程的请求排在其后：第 6..10 个令牌约在 0.4..0.9 秒后可用
+            self.assertAlmostEqual(child_waits[0], 0.0, delta=0.05)
+            self.assertGreater(own_waits[0], 0.3)
+            self.assertAlmostEqual(own_waits[-1] - own_waits[0], 0.4, delta=0.05)
+
+            metrics = bucket.metrics()["semantic_scholar"]
+            self.assertEqual(metrics["acquires"], 10.0)
+            self.assertGreater(metrics["wait_seconds_max"], 0.8)
+            bucket.close()
+
+    def test_retry_after_throttles_rate_and_queues_next_request(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            bucket = MODULE.SharedTokenBucket(Path(tmpdir) / "rl.sqlite3")
+            bucket.configure("openalex", rate=4.0, capacity=1)
+
+            bucket.observe("openalex", 429, {"Retry-After": "3"})
+
+            wait = bucket.reserve("openalex")
+            self.assertGreater(wait, 2.9)
+            metrics = bucket.metrics()["openalex"]
+            self.assertEqual(metrics["rate_per_minute"], 120.0)
+            self.assertEqual(metrics["throttled"], 1.0)
+
+            # 正常响应后按配置速率的 10% 逐步回升，且不超过配置上限
+            for _ in range(10):
+                bucket.observe("openalex", 200, {})
+            self.assertEqual(bucket.metrics()["openalex"]["rate_per_minute"], 240.0)
+            bucket.close()
+
+    def test_rate_limit_headers_adjust_rate_within_configured_ceiling(self) -> None:
+        hint = MODULE.parse_rate_limit_headers({"X-Rate-Limit-Limit": "50", "X-Rate-Limit-Interval": "1s"})
+        self.assertEqual((hint.limit, hint.interval), (50.0, 1.0))
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            bucket = MODULE.SharedTokenBucket(Path(tmpdir) / "rl.sqlite3")
+            bucket.configure("semantic_scholar", rate=2.0, capacity=1)
+
+            bucket.observe("semantic_scholar", 200, {"x-ratelimit-remaining": "30", "x-ratelimit-reset": "60"})
+            self.assertEqual(bucket.metrics()["semantic_scholar"]["rate_per_minute"], 30.0)
+
+            bucket.observe("semantic_scholar", 200, {"X-RateLimit-Limit": "1000", "X-Rate-Limit-Interval": "1s"})
+            self.assertEqual(bucket.metrics()["semantic_scholar"]["rate_per_minute"], 120.0)
+            bucket.close()
+
+
+class RateLimiterSharedModeTests(unittest.TestCase):
+    def test_rate_limiter_delegates_to_shared_bucket_and_reports_waits(self) -> None:
+        from rate_limiter import RateLimiter
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cfg = {
+                "semantic_scholar": {"max_calls_per_minute": 600},
+                "shared": {"enabled": True, "path": str(Path(tmpdir) / "rl.sqlite3")},
+            }
+            first = RateLimiter(cfg)
+            second = RateLimiter(cfg)
+            self.assertIsNotNone(first.shared)
+
+            waits = [first.reserve("semantic_scholar"), second.reserve("semantic_scholar"), first.reserve("semantic_scholar")]
+
+            self.assertAlmostEqual(waits[1], 0.1, delta=0.03)
+            self.assertAlmostEqual(waits[2], 0.2, delta=0.03)
+            summary = first.summary()["semantic_scholar"]
+            self.assertEqual(summary["token_acquires"], 2.0)
+            self.assertEqual(summary["shared_rate_per_minute"], 600.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
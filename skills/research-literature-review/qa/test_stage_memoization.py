@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import importlib.util
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+
+SKILL_ROOT = Path(__file__).resolve().parents[1]
+SCRIPT = SKILL_ROOT / "scripts" / "pipeline_runner.py"
+SPEC = importlib.util.spec_from_file_location("pipeline_runner", SCRIPT)
+assert SPEC and SPEC.loader
+MODULE = importlib.util.module_from_spec(SPEC)
+sys.modules[SPEC.name] = MODULE
+SPEC.loader.exec_module(MODULE)
+
+
+class StageMemoizationTests(unittest.TestCase):
+    def make_runner(self, work_dir: Path):
+        runner = MODULE.PipelineRunner(
+            topic="memo test",
+            domain="general",
+            config_path=SKILL_ROOT / "config.yaml",
+            work_dir=work_dir,
+            review_level="basic",
+            output_stem="memo-test",
+        )
+        runner.memoize = True
+        return runner
+
+    def seed_papers(self, runner) -> Path:
+        papers = runner.artifacts_dir / "papers_memo-test.jsonl"
+        rows = [{"title": f"Paper {i % 3} on memoization", "year": 2024, "doi": ""} for i in range(6)]
+        papers.write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+        runner.state.input_files["papers"] = str(papers)
+        return papers
+
+    def dedupe_calls(self, runner) -> int:
+        calls = []
+        original = runner._run_script
+
+        def spy(script_name, args):
+            calls.append(script_name)
+            return original(script_name, args)
+
+        with patch.object(runner, "_run_script", side_effect=spy):
+            # 阶段 3（AI 评分）尚无评分文件，会在此停下
+            self.assertFalse(runner.run(resume_from=None))
+        return calls.count("dedupe_papers.py")
+
+    def test_unchanged_stages_are_skipped_and_config_change_recomputes(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            work_dir = Path(tmpdir) / "run"
+            runner = self.make_runner(work_dir)
+            self.seed_papers(runner)
+            self.assertEqual(self.dedupe_calls(runner), 1)
+            self.assertIn("2_dedupe", runner.state.stage_fingerprints)
+
+            rerun = self.make_runner(work_dir)
+            self.assertEqual(self.dedupe_calls(rerun), 0)
+
+            changed = self.make_runner(work_dir)
+            changed.config["dedupe"]["title_similarity_threshold"] = 0.5
+            self.assertEqual(self.dedupe_calls(changed), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+
+SKILL_ROOT = Path(__file__).resolve().parents[1]
+SCRIPT = SKILL_ROOT / "scripts" / "validate_citation_distribution.py"
+SPEC = importlib.util.spec_from_file_location("validate_citation_distribution", SCRIPT)
+assert SPEC and SPEC.loader
+MODULE = importlib.util.module_from_spec(SPEC)
+sys.modules[SPEC.name] = MODULE
+SPEC.loader.exec_module(MODULE)
+
+
+TEX = "\n".join(
+    [
+        "\\section{Intro}",
+        "First paragraph \\cite{a} and \\cite{b,c}.",
+        "% dropped \\cite{z}",
+        "",
+        "\\item list entry \\cite{d}",
+        "",
+        "Second paragraph without citations.",
+        "continues here \\cite{broken",
+        "key}",
+        "",
+        "Third \\cite{a}.",
+    ]
+)
+
+
+class CitationIndexTests(unittest.TestCase):
+    def test_single_pass_index_matches_paragraphs_and_citations(self) -> None:
+        index = MODULE.build_citation_index(TEX)
+
+        self.assertEqual(
+            [(c[0], c[2]) for c in index.citations],
+            [("\\cite{a}", 2), ("\\cite{b,c}", 2), ("\\cite{d}", 5), ("\\cite{a}", 11)],
+        )
+        self.assertEqual([p["line_start"] for p in index.paragraphs], [2, 7, 11])
+        self.assertEqual([p["line_end"] for p in index.paragraphs], [3, 9, 11])
+        # 段内注释行计入段落引用数；跨行 \cite 按整段文本计数
+        self.assertEqual([p["cite_count"] for p in index.paragraphs], [3, 1, 1])
+        self.assertEqual(index.paragraph_keys[0], {"a": [2], "b": [2], "c": [2], "z": [3]})
+        self.assertEqual(index.key_freq["a"], 2)
+        self.assertEqual(index.key_lines("a"), [2, 11])
+
+        self.assertEqual(MODULE.parse_paragraphs(TEX), index.paragraphs)
+        self.assertEqual(MODULE.extract_citations(TEX), index.citations)
+
+    def test_diversity_check_reuses_index(self) -> None:
+        index = MODULE.build_citation_index(TEX)
+        with patch.object(MODULE, "build_citation_index", side_effect=AssertionError("rescanned")):
+            result = MODULE.check_citation_diversity(TEX, index.citations, {"a", "b", "c", "d"}, index=index)
+            zero = MODULE.find_zero_cite_paragraphs(TEX, index=index)
+        self.assertEqual(result["diversity_metrics"]["total_paragraphs"], 3)
+        self.assertEqual(result["diversity_metrics"]["reference_utilization"], 100.0)
+        self.assertEqual(zero, [])
+
+
+class BibKeyCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        MODULE._BIB_KEY_MEMO.clear()
+
+    def test_cache_hits_on_touch_and_refreshes_on_edit(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            bib = Path(tmpdir) / "refs.bib"
+            cache_dir = Path(tmpdir) / "cache"
+            bib.write_text("@article{a,\n title={A}}\n@book{b,\n title={B}}\n", encoding="utf-8")
+
+            self.assertEqual(MODULE.load_bib_keys(bib, cache_dir), {"a", "b"})
+            stored = json.loads((cache_dir / MODULE.BIB_KEY_CACHE_NAME).read_text(encoding="utf-8"))
+            self.assertEqual(stored[str(bib.resolve())]["keys"], ["a", "b"])
+
+            # 新进程（清空内存缓存）+ mtime 变化但内容相同：按哈希命中，不重新解析
+            MODULE._BIB_KEY_MEMO.clear()
+            st = bib.stat()
+            os.utime(bib, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+            with patch.object(MODULE, "extract_bib_keys", side_effect=AssertionError("reparsed")):
+                self.assertEqual(MODULE.load_bib_keys(bib, cache_dir), {"a", "b"})
+
+            bib.write_text("@article{a,\n title={A}}\n@misc{c,\n title={C}}\n", encoding="utf-8")
+            self.assertEqual(MODULE.load_bib_keys(bib, cache_dir), {"a", "c"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,8 +7,9 @@ P0-4: API 调用缓存 - 减少重复请求，提高效率，避免速率限制
 功能：
   - 自动缓存 API 请求结果（基于 URL + 参数的哈希）
   - 支持缓存过期时间（TTL）
-  - 磁盘持久化缓存
+  - 磁盘持久化缓存（单文件 SQLite/WAL，多进程安全；TTL 索引 + LRU 体积上限；zlib 压缩）
   - 缓存命中率统计
+  - 旧版 JSON 缓存目录一次性迁移（migrate_json_cache / --migrate）
 
 使用示例：
     from scripts.api_cache import cached_api, CacheStats
@@ -31,8 +32,11 @@ import hashlib
 import json
 import logging
 import os
+import sqlite3
+import threading
 import time
-from datetime import datetime, timedelta
+import zlib
+from datetime import datetime
 from functools import wraps
 from pathlib import Path
 from typing import Any, Callable, Dict, Optional
@@ -60,7 +64,9 @@ def _get_default_cache_dir() -> Optional[Path]:
 
 DEFAULT_CACHE_DIR = _get_default_cache_dir()
 DEFAULT_TTL = 86400  # 24小时（秒）
-CACHE_VERSION = 'v1'  # 缓存格式版本
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 压缩后总体积上限（512MB）
+CACHE_VERSION = 'v2'  # 缓存格式版本（v2: SQLite 单文件后端）
+LEGACY_META_NAME = 'cache_meta.json'  # v1 JSON 目录的索引文件
 
 
 # ============================================================================
@@ -127,15 +133,29 @@ class CacheStats:
 # ============================================================================
 
 class CacheStorage:
-    """缓存存储管理器"""
+    """
+    缓存存储管理器（单文件 SQLite 后端）
+
+    - 所有条目存放在 cache_dir/cache.sqlite3 中（WAL 模式），多进程可安全并发读写
+    - 过期判断基于带索引的 created 列；淘汰按 accessed（LRU）进行，总体积受 max_bytes 约束
+    - payload 为 zlib 压缩后的紧凑 JSON
+    - 旧版“每条一个 JSON + cache_meta.json”目录在首次打开时自动迁移（见 migrate_json_cache）
+    """
 
-    def __init__(self, cache_dir: Optional[Path] = None, ttl: int = DEFAULT_TTL):
+    DB_NAME = 'cache.sqlite3'
+    # 每写入多少次检查一次总体积（避免每次 set 都做全表 SUM）
+    EVICTION_CHECK_INTERVAL = 64
+
+    def __init__(self, cache_dir: Optional[Path] = None, ttl: int = DEFAULT_TTL,
+                 max_bytes: int = DEFAULT_MAX_BYTES, auto_migrate: bool = True):
         """
         初始化缓存存储
 
         Args:
             cache_dir: 缓存目录路径，None 时尝试使用环境变量或禁用缓存
             ttl: 缓存过期时间（秒）
+            max_bytes: 压缩后 payload 的总体积上限（字节），<=0 表示不限制
+            auto_migrate: 发现旧版 JSON 缓存目录时是否自动迁移
         """
         # 优先使用传入的 cache_dir，其次使用环境变量，最后禁用缓存
         if cache_dir is None:
@@ -148,40 +168,84 @@ class CacheStorage:
             self.enabled = False
             self.cache_dir = None
             self.ttl = ttl
+            self.max_bytes = max_bytes
             return
 
         self.enabled = True
         self.cache_dir = Path(cache_dir)
         self.ttl = ttl
+        self.max_bytes = int(max_bytes)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
 
-        # 创建元数据文件
-        self.meta_file = self.cache_dir / 'cache_meta.json'
-        self.meta = self._load_meta()
+        self.db_file = self.cache_dir / self.DB_NAME
+        self._lock = threading.RLock()
+        self._writes_since_check = 0
+        self._conn = self._connect()
 
-    def _load_meta(self) -> Dict[str, Any]:
-        """加载缓存元数据"""
-        if self.meta_file.exists():
+        # 旧版 JSON 目录：一次性迁移
+        if auto_migrate and (self.cache_dir / LEGACY_META_NAME).exists():
             try:
-                with open(self.meta_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                migrated = migrate_json_cache(self.cache_dir, storage=self)
+                if migrated:
+                    logger.info(f"✓ 已迁移 {migrated} 条旧版 JSON 缓存到 {self.db_file.name}")
             except Exception as e:
-                logger.warning(f"加载缓存元数据失败: {e}")
-        return {'version': CACHE_VERSION, 'entries': {}}
+                logger.warning(f"迁移旧版缓存失败: {e}")
+
+    def _connect(self) -> sqlite3.Connection:
+        """打开（必要时初始化）SQLite 数据库"""
+        conn = sqlite3.connect(
+            str(self.db_file),
+            timeout=30.0,
+            isolation_level=None,  # autocommit；需要原子性时显式 BEGIN
+            check_same_thread=False,
+        )
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA busy_timeout=30000')
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key      TEXT PRIMARY KEY,
+                url      TEXT NOT NULL DEFAULT '',
+                created  REAL NOT NULL,
+                accessed REAL NOT NULL,
+                size     INTEGER NOT NULL,
+                payload  BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_entries_created ON entries(created);
+            CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed);
+            CREATE TABLE IF NOT EXISTS meta (
+                name  TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            """
+        )
+        conn.execute(
+            "INSERT OR IGNORE INTO meta(name, value) VALUES ('version', ?)",
+            (CACHE_VERSION,),
+        )
+        return conn
 
-    def _save_meta(self):
-        """保存缓存元数据"""
-        with open(self.meta_file, 'w', encoding='utf-8') as f:
-            json.dump(self.meta, f, ensure_ascii=False, indent=2)
+    def close(self):
+        """关闭数据库连接"""
+        if self.enabled and self._conn is not None:
+            with self._lock:
+                self._conn.close()
+                self._conn = None
 
     def _get_cache_key(self, url: str, params: Optional[Dict] = None) -> str:
         """生成缓存键"""
         key_data = f"{url}{json.dumps(params, sort_keys=True) if params else ''}"
         return hashlib.md5(key_data.encode()).hexdigest()
 
-    def _get_cache_file(self, cache_key: str) -> Path:
-        """获取缓存文件路径"""
-        return self.cache_dir / f"{cache_key}.json"
+    @staticmethod
+    def _encode(data: Any) -> bytes:
+        raw = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        return zlib.compress(raw, 6)
+
+    @staticmethod
+    def _decode(payload: bytes) -> Any:
+        return json.loads(zlib.decompress(payload).decode('utf-8'))
 
     def get(self, url: str, params: Optional[Dict] = None) -> Optional[Any]:
         """
@@ -199,26 +263,28 @@ class CacheStorage:
             return None
 
         cache_key = self._get_cache_key(url, params)
-        cache_file = self._get_cache_file(cache_key)
+        now = time.time()
 
-        if not cache_file.exists():
-            CacheStats.record_miss()
-            return None
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    'SELECT created, payload FROM entries WHERE key = ?', (cache_key,)
+                ).fetchone()
+                if row is None:
+                    CacheStats.record_miss()
+                    return None
 
-        # 检查是否过期
-        if cache_key in self.meta['entries']:
-            cached_time = self.meta['entries'][cache_key].get('timestamp')
-            if cached_time:
-                cached_datetime = datetime.fromisoformat(cached_time)
-                if datetime.now() - cached_datetime > timedelta(seconds=self.ttl):
+                created, payload = row
+                # 检查是否过期
+                if now - created > self.ttl:
                     logger.debug(f"缓存已过期: {cache_key[:8]}")
-                    self.delete(cache_key)
+                    self._conn.execute('DELETE FROM entries WHERE key = ?', (cache_key,))
                     CacheStats.record_miss()
                     return None
 
-        try:
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+                self._conn.execute('UPDATE entries SET accessed = ? WHERE key = ?', (now, cache_key))
+
+            data = self._decode(payload)
             CacheStats.record_hit()
             logger.debug(f"✓ 缓存命中: {cache_key[:8]}")
             return data
@@ -240,62 +306,169 @@ class CacheStorage:
             return
 
         cache_key = self._get_cache_key(url, params)
-        cache_file = self._get_cache_file(cache_key)
 
         try:
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-
-            # 更新元数据
-            self.meta['entries'][cache_key] = {
-                'timestamp': datetime.now().isoformat(),
-                'url': url[:100],  # 只保留前100个字符
-                'params': bool(params)
-            }
-            self._save_meta()
-
+            payload = self._encode(data)
+            self._put(cache_key, url, payload, created=time.time())
             logger.debug(f"✓ 缓存已保存: {cache_key[:8]}")
         except Exception as e:
             logger.warning(f"保存缓存失败: {e}")
             CacheStats.record_error()
 
+    def _put(self, cache_key: str, url: str, payload: bytes, *, created: float):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO entries(key, url, created, accessed, size, payload) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (cache_key, url[:100], created, created, len(payload), sqlite3.Binary(payload)),
+            )
+            self._writes_since_check += 1
+            if self._writes_since_check >= self.EVICTION_CHECK_INTERVAL:
+                self._writes_since_check = 0
+                self.evict()
+
     def delete(self, cache_key: str):
         """删除缓存条目"""
-        cache_file = self._get_cache_file(cache_key)
-        if cache_file.exists():
-            cache_file.unlink()
-
-        if cache_key in self.meta['entries']:
-            del self.meta['entries'][cache_key]
-            self._save_meta()
+        if not self.enabled:
+            return
+        with self._lock:
+            self._conn.execute('DELETE FROM entries WHERE key = ?', (cache_key,))
 
     def clear(self):
         """清空所有缓存"""
-        for cache_file in self.cache_dir.glob('*.json'):
-            if cache_file != self.meta_file:
-                cache_file.unlink()
-
-        self.meta['entries'] = {}
-        self._save_meta()
+        if not self.enabled:
+            return
+        with self._lock:
+            self._conn.execute('DELETE FROM entries')
+            self._conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            self._conn.execute('VACUUM')
         logger.info("✓ 缓存已清空")
 
     def cleanup_expired(self):
         """清理过期缓存"""
-        now = datetime.now()
-        expired_keys = []
+        if not self.enabled:
+            return
+        with self._lock:
+            cur = self._conn.execute('DELETE FROM entries WHERE created < ?', (time.time() - self.ttl,))
+            removed = cur.rowcount
+        if removed:
+            logger.info(f"✓ 清理了 {removed} 个过期缓存")
+
+    def total_bytes(self) -> int:
+        """压缩后 payload 总体积（字节）"""
+        if not self.enabled:
+            return 0
+        with self._lock:
+            row = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()
+        return int(row[0])
+
+    def evict(self) -> int:
+        """
+        过期清理 + LRU 淘汰：总体积超过 max_bytes 时，按最近访问时间从旧到新删除，
+        直到回落到上限的 90%。返回被淘汰的条目数（不含过期清理）。
+        """
+        if not self.enabled:
+            return 0
+        with self._lock:
+            self._conn.execute('DELETE FROM entries WHERE created < ?', (time.time() - self.ttl,))
+            if self.max_bytes <= 0:
+                return 0
+            total = self.total_bytes()
+            if total <= self.max_bytes:
+                return 0
+
+            target = int(self.max_bytes * 0.9)
+            victims: list[str] = []
+            for key, size in self._conn.execute('SELECT key, size FROM entries ORDER BY accessed ASC'):
+                if total <= target:
+                    break
+                victims.append(key)
+                total -= int(size)
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.executemany('DELETE FROM entries WHERE key = ?', [(k,) for k in victims])
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        if victims:
+            logger.info(f"✓ LRU 淘汰了 {len(victims)} 个缓存条目")
+        return len(victims)
+
+    def count(self) -> int:
+        """缓存条目数"""
+        if not self.enabled:
+            return 0
+        with self._lock:
+            return int(self._conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0])
 
-        for cache_key, entry in self.meta['entries'].items():
-            cached_time = entry.get('timestamp')
-            if cached_time:
-                cached_datetime = datetime.fromisoformat(cached_time)
-                if now - cached_datetime > timedelta(seconds=self.ttl):
-                    expired_keys.append(cache_key)
+    def recent_entries(self, limit: int = 10) -> list[Dict[str, Any]]:
+        """最近写入的缓存条目（key/url/timestamp）"""
+        if not self.enabled:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT key, url, created FROM entries ORDER BY created DESC LIMIT ?', (int(limit),)
+            ).fetchall()
+        return [
+            {'key': k, 'url': u, 'timestamp': datetime.fromtimestamp(c).isoformat()}
+            for k, u, c in rows
+        ]
+
+
+def migrate_json_cache(cache_dir: Path, storage: Optional[CacheStorage] = None,
+                       remove_legacy: bool = True) -> int:
+    """
+    把旧版缓存目录（每条一个 <md5>.json + cache_meta.json 索引）迁移到 SQLite 后端。
+
+    - 保留原始写入时间（cache_meta.json 中的 timestamp），TTL 语义不变
+    - 缓存键算法未变，迁移后的条目可直接命中
+    - remove_legacy=True 时迁移成功后删除旧 JSON 文件与索引
+
+    Returns:
+        迁移的条目数
+    """
+    cache_dir = Path(cache_dir)
+    meta_file = cache_dir / LEGACY_META_NAME
+    if not meta_file.exists():
+        return 0
+    if storage is None:
+        storage = CacheStorage(cache_dir=cache_dir, auto_migrate=False)
+
+    try:
+        with open(meta_file, 'r', encoding='utf-8') as f:
+            entries = (json.load(f) or {}).get('entries', {}) or {}
+    except Exception as e:
+        logger.warning(f"加载旧版缓存元数据失败: {e}")
+        entries = {}
+
+    migrated = 0
+    legacy_files = [p for p in cache_dir.glob('*.json') if p.name != LEGACY_META_NAME]
+    for cache_file in legacy_files:
+        cache_key = cache_file.stem
+        entry = entries.get(cache_key, {}) if isinstance(entries.get(cache_key), dict) else {}
+        created = cache_file.stat().st_mtime
+        ts = entry.get('timestamp')
+        if ts:
+            try:
+                created = datetime.fromisoformat(ts).timestamp()
+            except ValueError:
+                pass
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning(f"跳过无法解析的旧缓存 {cache_file.name}: {e}")
+            continue
+        storage._put(cache_key, str(entry.get('url') or ''), storage._encode(data), created=created)
+        migrated += 1
 
-        for key in expired_keys:
-            self.delete(key)
+    if remove_legacy:
+        for cache_file in legacy_files:
+            cache_file.unlink(missing_ok=True)
+        meta_file.unlink(missing_ok=True)
 
-        if expired_keys:
-            logger.info(f"✓ 清理了 {len(expired_keys)} 个过期缓存")
+    return migrated
 
 
 # ============================================================================
@@ -449,12 +622,20 @@ if __name__ == '__main__':
     parser.add_argument('--clear', action='store_true', help='清空缓存')
     parser.add_argument('--cleanup', action='store_true', help='清理过期缓存')
     parser.add_argument('--stats', action='store_true', help='显示缓存统计')
+    parser.add_argument('--migrate', action='store_true', help='把旧版 JSON 缓存目录迁移到 SQLite（运行时打开缓存也会自动迁移）')
+    parser.add_argument('--max-mb', type=int, default=None, help='缓存体积上限（MB），配合 --cleanup 立即执行 LRU 淘汰')
     parser.add_argument('--cache-dir', type=Path, default=DEFAULT_CACHE_DIR,
                        help='缓存目录路径')
 
     args = parser.parse_args()
 
-    storage = CacheStorage(cache_dir=args.cache_dir)
+    storage = CacheStorage(cache_dir=args.cache_dir, auto_migrate=False)
+
+    if args.migrate and args.cache_dir is not None:
+        migrated = migrate_json_cache(args.cache_dir, storage=storage)
+        print(f"✓ 已迁移 {migrated} 条旧版 JSON 缓存" if migrated else "未发现旧版 JSON 缓存，无需迁移")
+    if args.max_mb is not None:
+        storage.max_bytes = int(args.max_mb) * 1024 * 1024
 
     if args.clear:
         storage.clear()
@@ -462,18 +643,18 @@ if __name__ == '__main__':
 
     if args.cleanup:
         storage.cleanup_expired()
+        storage.evict()
 
     if args.stats:
         # 显示缓存统计
-        total_entries = len(storage.meta.get('entries', {}))
+        total_entries = storage.count()
         print(f"缓存目录: {args.cache_dir}")
         print(f"缓存条目: {total_entries}")
+        print(f"缓存体积: {storage.total_bytes() / 1024:.1f} KB（压缩后）")
         print(f"缓存统计: {CacheStats.get_summary()}")
 
         # 显示最近的缓存条目
         if total_entries > 0:
             print("\n最近缓存条目:")
-            entries = list(storage.meta.get('entries', {}).items())
-            entries.sort(key=lambda x: x[1].get('timestamp', ''), reverse=True)
-            for key, entry in entries[:10]:
-                print(f"  {key[:8]}: {entry.get('url', 'N/A')[:60]}")
+            for entry in storage.recent_entries(10):
+                print(f"  {entry['key'][:8]}: {(entry.get('url') or 'N/A')[:60]}")
@@ -10,6 +10,7 @@ api_health_monitor.py - API 健康监控与黑名单
 
 from __future__ import annotations
 
+import threading
 import time
 from dataclasses import dataclass
 from typing import Dict, Optional
@@ -35,37 +36,41 @@ class APIHealthMonitor:
 
         self._failures: Dict[str, list[float]] = {}
         self._blacklist_until: Dict[str, float] = {}
+        self._lock = threading.RLock()
 
     def record_failure(self, provider: str) -> None:
         if not self.config.enabled:
             return
-        now = time.time()
-        bucket = self._failures.setdefault(provider, [])
-        bucket.append(now)
-        # 清理窗口外失败
-        self._failures[provider] = [t for t in bucket if now - t <= self.config.failure_window]
+        with self._lock:
+            now = time.time()
+            bucket = self._failures.setdefault(provider, [])
+            bucket.append(now)
+            # 清理窗口外失败
+            self._failures[provider] = [t for t in bucket if now - t <= self.config.failure_window]
 
-        if len(self._failures[provider]) >= self.config.failure_threshold:
-            self._blacklist_until[provider] = now + self.config.recovery_check_interval
+            if len(self._failures[provider]) >= self.config.failure_threshold:
+                self._blacklist_until[provider] = now + self.config.recovery_check_interval
 
     def record_success(self, provider: str) -> None:
         if not self.config.enabled:
             return
-        self._failures.pop(provider, None)
+        with self._lock:
+            self._failures.pop(provider, None)
         # 成功不强制解禁：由 is_available 的到期判断控制
 
     def is_available(self, provider: str) -> bool:
         if not self.config.enabled:
             return True
-        until = self._blacklist_until.get(provider)
-        if until is None:
-            return True
-        if time.time() >= until:
-            # 到期后允许恢复尝试
-            self._blacklist_until.pop(provider, None)
-            self._failures.pop(provider, None)
-            return True
-        return False
+        with self._lock:
+            until = self._blacklist_until.get(provider)
+            if until is None:
+                return True
+            if time.time() >= until:
+                # 到期后允许恢复尝试
+                self._blacklist_until.pop(provider, None)
+                self._failures.pop(provider, None)
+                return True
+            return False
 
     def blacklist_remaining(self, provider: str) -> int:
         until = self._blacklist_until.get(provider)
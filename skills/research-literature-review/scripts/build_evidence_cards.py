@@ -10,26 +10,13 @@ build_evidence_cards.py - 从 selected_papers.jsonl 生成“证据卡”（evid
 from __future__ import annotations
 
 import argparse
+import itertools
 import json
 import re
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
-
-def _read_jsonl(path: Path) -> List[Dict[str, Any]]:
-    items: List[Dict[str, Any]] = []
-    with path.open("r", encoding="utf-8", errors="replace") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                obj = json.loads(line)
-            except Exception:
-                continue
-            if isinstance(obj, dict):
-                items.append(obj)
-    return items
+from jsonl_stream import iter_jsonl, write_jsonl
 
 
 def _bib_key_from_title(title: str, year: str) -> str:
@@ -67,48 +54,47 @@ def _truncate(s: str, max_chars: int) -> str:
     return s[: max_chars - 3].rstrip() + "..."
 
 
-def main() -> int:
+def iter_cards(papers: Iterable[Dict[str, Any]], abstract_max_chars: int) -> Iterator[Dict[str, Any]]:
+    """逐条把 paper 转为证据卡（生成器；bibkey 去重状态在迭代过程中累积）。"""
+    used_lower: set[str] = set()
+    for p in papers:
+        title = str(p.get("title") or "")
+        year = str(p.get("year") or "")
+        bibkey = _make_unique_key(_bib_key_from_title(title, year), used_lower)
+
+        abstract = p.get("abstract") or ""
+        abstract_short = _truncate(str(abstract), int(abstract_max_chars))
+
+        yield {
+            "bibkey": bibkey,
+            "title": _norm_ws(title),
+            "year": _norm_ws(year),
+            "venue": _norm_ws(str(p.get("venue") or p.get("journal") or "")),
+            "doi": _norm_ws(str(p.get("doi") or "")),
+            "score": p.get("score"),
+            "subtopic": p.get("subtopic"),
+            "do_not_cite": bool(p.get("do_not_cite", False)),
+            "quality_warnings": p.get("quality_warnings") or [],
+            "abstract": abstract_short,
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
     parser = argparse.ArgumentParser(description="Build evidence cards from selected_papers.jsonl")
     parser.add_argument("--input", required=True, type=Path, help="selected_papers.jsonl (or enriched variant)")
     parser.add_argument("--output", required=True, type=Path, help="evidence_cards.jsonl")
     parser.add_argument("--abstract-max-chars", type=int, default=800, help="Max chars for abstract (default: 800)")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
-    papers = _read_jsonl(args.input)
-    if not papers:
+    # 流式：读 → 转换 → 写，内存占用与文献数无关
+    papers = iter_jsonl(args.input, skip_invalid=True)
+    first = next(papers, None)
+    if first is None:
         raise SystemExit(f"no papers loaded: {args.input}")
 
-    used_lower: set[str] = set()
-    cards: list[dict[str, Any]] = []
-    for p in papers:
-        title = str(p.get("title") or "")
-        year = str(p.get("year") or "")
-        bibkey = _make_unique_key(_bib_key_from_title(title, year), used_lower)
+    count = write_jsonl(args.output, iter_cards(itertools.chain([first], papers), int(args.abstract_max_chars)))
 
-        abstract = p.get("abstract") or ""
-        abstract_short = _truncate(str(abstract), int(args.abstract_max_chars))
-
-        cards.append(
-            {
-                "bibkey": bibkey,
-                "title": _norm_ws(title),
-                "year": _norm_ws(year),
-                "venue": _norm_ws(str(p.get("venue") or p.get("journal") or "")),
-                "doi": _norm_ws(str(p.get("doi") or "")),
-                "score": p.get("score"),
-                "subtopic": p.get("subtopic"),
-                "do_not_cite": bool(p.get("do_not_cite", False)),
-                "quality_warnings": p.get("quality_warnings") or [],
-                "abstract": abstract_short,
-            }
-        )
-
-    args.output.parent.mkdir(parents=True, exist_ok=True)
-    with args.output.open("w", encoding="utf-8") as f:
-        for c in cards:
-            f.write(json.dumps(c, ensure_ascii=False) + "\n")
-
-    print(json.dumps({"cards": len(cards), "output": str(args.output)}, ensure_ascii=False))
+    print(json.dumps({"cards": count, "output": str(args.output)}, ensure_ascii=False))
     return 0
 
 
@@ -97,6 +97,7 @@ def search_crossref(
     cache_dir: Optional[Path] = None,
     retry: Optional[ExponentialBackoffRetry] = None,
     mailto: Optional[str] = None,
+    rate_limiter: Optional[Any] = None,
 ) -> List[Dict[str, Any]]:
     if not query.strip():
         return []
@@ -128,6 +129,8 @@ def search_crossref(
                 if cached is not None:
                     return cached
             resp = requests.get(doi_endpoint, params=params, headers=headers, timeout=timeout)
+            if rate_limiter is not None:
+                rate_limiter.observe_response("crossref", resp.status_code, resp.headers)
             resp.raise_for_status()
             data = resp.json()
             if cache is not None:
@@ -153,6 +156,8 @@ def search_crossref(
                 return cached
 
         resp = requests.get(endpoint, params=params, headers=headers, timeout=timeout)
+        if rate_limiter is not None:
+            rate_limiter.observe_response("crossref", resp.status_code, resp.headers)
         resp.raise_for_status()
         data = resp.json()
         if cache is not None:
@@ -5,6 +5,7 @@ dedupe_papers.py - 候选文献去重（标题规范化 + year + 模糊匹配）
 目标（与 SKILL.md 对齐）：
   - DOI 优先去重
   - DOI 缺失时：标题规范化 + 年份窗口 + 模糊匹配（SequenceMatcher + token Jaccard）
+  - 候选生成：token 前缀过滤倒排索引（无损召回满足 Jaccard 阈值的配对），10 万级记录秒级完成
   - 记录“合并映射 / 选择正式版本”的证据，便于在 {主题}_工作条件.md 中追溯
 
 输入：
@@ -20,13 +21,16 @@ from __future__ import annotations
 
 import argparse
 import json
+import math
 import re
+from collections import Counter, defaultdict
 from dataclasses import dataclass, asdict
 from datetime import datetime
 from difflib import SequenceMatcher
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+from jsonl_stream import iter_jsonl, write_jsonl as _write_jsonl_stream
 from path_scope import get_effective_scope_root, resolve_and_check
 
 
@@ -78,7 +82,7 @@ def _jaccard(a: set[str], b: set[str]) -> float:
     if not a or not b:
         return 0.0
     inter = len(a & b)
-    union = len(a | b)
+    union = len(a) + len(b) - inter
     return inter / union if union else 0.0
 
 
@@ -158,13 +162,7 @@ class MergeEdge:
 
 def load_papers(path: Path) -> list[Dict[str, Any]]:
     if path.suffix.lower() == ".jsonl":
-        out: list[Dict[str, Any]] = []
-        for line in path.read_text(encoding="utf-8", errors="replace").splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            out.append(json.loads(line))
-        return out
+        return list(iter_jsonl(path))
     data = json.loads(path.read_text(encoding="utf-8", errors="replace"))
     if isinstance(data, list):
         return [x for x in data if isinstance(x, dict)]
@@ -172,10 +170,77 @@ def load_papers(path: Path) -> list[Dict[str, Any]]:
 
 
 def write_jsonl(path: Path, papers: Iterable[Dict[str, Any]]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        for p in papers:
-            f.write(json.dumps(p, ensure_ascii=False) + "\n")
+    _write_jsonl_stream(path, papers)
+
+
+def _jaccard_prefix_len(n_tokens: int, threshold: float) -> int:
+    """
+    前缀过滤长度：在全局 token 顺序下，Jaccard >= threshold 的两个集合
+    必然在各自前 |x| - ceil(threshold * |x|) + 1 个 token 中至少共享一个。
+    """
+    if n_tokens <= 0:
+        return 0
+    if threshold <= 0:
+        return n_tokens
+    return max(1, n_tokens - math.ceil(threshold * n_tokens - 1e-9) + 1)
+
+
+class _TitleCandidateIndex:
+    """
+    标题近重复候选索引（按年份分区的前缀过滤倒排索引）。
+
+    - token 全局顺序：文档频率升序（稀有 token 在前），使前缀短且区分度高
+    - 只把每个 canonical 的“前缀 token”写入 (year, token) 倒排表；查询时只探测年份窗口内的分区
+    - 长度过滤：Jaccard >= t 要求 t*|x| <= |y| <= |x|/t
+    - 对 Jaccard 阈值而言这些过滤是无损的：凡满足 token Jaccard 阈值的配对必然被召回，
+      不再依赖旧实现“标题前 24 字符完全一致”的分桶
+    """
+
+    def __init__(self, token_sets: Iterable[set[str]], threshold: float, year_window: int):
+        df: Counter[str] = Counter()
+        for tokens in token_sets:
+            df.update(tokens)
+        self._rank = {t: i for i, (t, _) in enumerate(sorted(df.items(), key=lambda kv: (kv[1], kv[0])))}
+        self._threshold = threshold
+        self._year_window = year_window
+        self._postings: dict[Tuple[Optional[int], str], list[Tuple[int, int]]] = defaultdict(list)
+
+    def _prefix(self, tokens: set[str]) -> list[str]:
+        rank = self._rank
+        ordered = sorted(tokens, key=lambda t: (rank.get(t, -1), t))
+        return ordered[: _jaccard_prefix_len(len(ordered), self._threshold)]
+
+    def _years(self, year: Optional[int]) -> list[Optional[int]]:
+        # 与旧版按 year 分桶的语义一致：年份缺失只与年份缺失比较
+        if year is None:
+            return [None]
+        return list(range(year - self._year_window, year + self._year_window + 1))
+
+    def add(self, ci: int, tokens: set[str], year: Optional[int]) -> None:
+        size = len(tokens)
+        for t in self._prefix(tokens):
+            self._postings[(year, t)].append((ci, size))
+
+    def candidates(self, tokens: set[str], year: Optional[int]) -> list[int]:
+        n = len(tokens)
+        t = self._threshold
+        lo = t * n if t > 0 else 0.0
+        hi = n / t if t > 0 else float("inf")
+        out: set[int] = set()
+        postings = self._postings
+        prefix = self._prefix(tokens)
+        for yy in self._years(year):
+            for tok in prefix:
+                for ci, size in postings.get((yy, tok), ()):
+                    if lo - 1e-9 <= size <= hi + 1e-9:
+                        out.add(ci)
+        return sorted(out)
+
+
+def _similarity_upper_bound(len_a: int, len_b: int) -> float:
+    """SequenceMatcher.ratio() 的长度上界：2*min/(a+b)。"""
+    total = len_a + len_b
+    return (2.0 * min(len_a, len_b) / total) if total else 1.0
 
 
 def dedupe(
@@ -189,56 +254,87 @@ def dedupe(
     返回：
       - 去重后的 papers（canonical 列表）
       - 合并边（原始 index -> canonical index）
+
+    实现要点（可扩展到 10 万级记录）：
+      - 标题规范化 / token 集合 / 年份 / DOI 只对每条记录计算一次
+      - 候选由前缀过滤倒排索引（_TitleCandidateIndex）给出
+      - 先做廉价检查（年份窗口、token Jaccard、长度上界、quick_ratio），
+        最后才计算 SequenceMatcher.ratio()
     """
     canonical: list[Dict[str, Any]] = []
     edges: list[MergeEdge] = []
 
+    norm_cache: dict[str, str] = {}
+
+    def normalize(title: str) -> str:
+        norm = norm_cache.get(title)
+        if norm is None:
+            norm = norm_cache[title] = _normalize_title(title)
+        return norm
+
+    # 每条输入记录的特征：只计算一次
+    in_norm: list[str] = []
+    in_tokens: list[set[str]] = []
+    for p in papers:
+        norm = normalize(p.get("title") or "") if isinstance(p, dict) else ""
+        in_norm.append(norm)
+        in_tokens.append(_tokenize(norm))
+
+    index = _TitleCandidateIndex(in_tokens, token_jaccard_threshold, year_window)
+
+    # canonical 的缓存特征（canonical 被合并/替换后刷新）
+    c_norm: list[str] = []
+    c_tokens: list[set[str]] = []
+    c_year: list[Optional[int]] = []
+    c_doi: list[str] = []
+    c_preprint: list[bool] = []
+
+    def refresh(ci: int, *, norm: Optional[str] = None) -> None:
+        """刷新 canonical 特征；标题或年份变化时把新版本写入索引（旧条目仅多产生候选，不影响正确性）。"""
+        c = canonical[ci]
+        if norm is None:
+            norm = normalize(c.get("title") or "")
+        year = _as_int_year(c.get("year"))
+        if ci == len(c_norm):
+            c_norm.append("")
+            c_tokens.append(set())
+            c_year.append(None)
+            c_doi.append("")
+            c_preprint.append(False)
+            changed = True
+        else:
+            changed = norm != c_norm[ci] or year != c_year[ci]
+        if changed:
+            c_norm[ci] = norm
+            c_tokens[ci] = _tokenize(norm)
+            c_year[ci] = year
+            if norm:
+                index.add(ci, c_tokens[ci], year)
+        c_doi[ci] = _normalize_doi(c.get("doi") or "")
+        c_preprint[ci] = _looks_preprint(c)
+
+    def years_compatible(y: Optional[int], c_y: Optional[int]) -> bool:
+        # 与旧版按 year 分桶的语义一致：年份缺失只与年份缺失比较
+        if y is None or c_y is None:
+            return y is None and c_y is None
+        return abs(y - c_y) <= year_window
+
     # DOI 直达索引
     doi_to_canonical: dict[str, int] = {}
 
-    # 对无 DOI 的候选，按 (year_bucket, prefix) 做粗分桶，降低比较次数
-    bucket: dict[Tuple[Optional[int], str], list[int]] = {}
-
-    def bucket_key(p: Dict[str, Any]) -> Tuple[Optional[int], str]:
-        y = _as_int_year(p.get("year"))
-        norm = _normalize_title(p.get("title") or "")
-        prefix = (norm[:24] if norm else "") or "untitled"
-        return y, prefix
-
-    def candidate_indices(p: Dict[str, Any]) -> list[int]:
-        y = _as_int_year(p.get("year"))
-        norm = _normalize_title(p.get("title") or "")
-        prefix = (norm[:24] if norm else "") or "untitled"
-
-        keys: list[Tuple[Optional[int], str]] = []
-        if y is None:
-            keys.append((None, prefix))
-        else:
-            for yy in range(y - year_window, y + year_window + 1):
-                keys.append((yy, prefix))
-        out: list[int] = []
-        for k in keys:
-            out.extend(bucket.get(k, []))
-        # fallback：不带 prefix 的桶（避免 prefix 微小差异导致完全错过）
-        if y is not None:
-            out.extend(bucket.get((y, "untitled"), []))
-        else:
-            out.extend(bucket.get((None, "untitled"), []))
-        # 去重
-        return list(dict.fromkeys(out))
-
     for idx, p in enumerate(papers):
         if not isinstance(p, dict):
             continue
 
         doi = _normalize_doi(p.get("doi") or "")
-        title_norm = _normalize_title(p.get("title") or "")
+        title_norm = in_norm[idx]
 
         # 1) DOI 优先：同 DOI 直接合并
         if doi:
             if doi in doi_to_canonical:
                 ci = doi_to_canonical[doi]
                 canonical[ci] = _merge_fields(canonical[ci], p)
+                refresh(ci)
                 edges.append(
                     MergeEdge(
                         canonical_index=ci,
@@ -246,9 +342,9 @@ def dedupe(
                         reason="same_doi",
                         similarity=1.0,
                         jaccard=1.0,
-                        year_a=_as_int_year(canonical[ci].get("year")),
+                        year_a=c_year[ci],
                         year_b=_as_int_year(p.get("year")),
-                        doi_a=_normalize_doi(canonical[ci].get("doi") or ""),
+                        doi_a=c_doi[ci],
                         doi_b=doi,
                     )
                 )
@@ -261,40 +357,54 @@ def dedupe(
         best_reason = ""
 
         if title_norm:
-            tokens = _tokenize(title_norm)
+            tokens = in_tokens[idx]
             y = _as_int_year(p.get("year"))
+            p_preprint = _looks_preprint(p)
 
-            for ci in candidate_indices(p):
-                c = canonical[ci]
-                c_title_norm = _normalize_title(c.get("title") or "")
+            for ci in index.candidates(tokens, y):
+                c_title_norm = c_norm[ci]
                 if not c_title_norm:
                     continue
-
-                c_y = _as_int_year(c.get("year"))
-                if y is not None and c_y is not None and abs(y - c_y) > year_window:
+                if not years_compatible(y, c_year[ci]):
                     continue
 
-                sim = SequenceMatcher(a=title_norm, b=c_title_norm).ratio()
-                j = _jaccard(tokens, _tokenize(c_title_norm))
-
-                c_doi = _normalize_doi(c.get("doi") or "")
-                cross_doi_merge = bool(doi and c_doi and doi != c_doi)
+                cross_doi_merge = bool(doi and c_doi[ci] and doi != c_doi[ci])
 
                 # 默认：允许“至少一方无 DOI”的合并；两方都有 DOI 时需要更高置信度且偏向“预印本->正式版”
                 if cross_doi_merge:
-                    if not (_looks_preprint(p) or _looks_preprint(c)):
-                        continue
-                    if sim < 0.97:
+                    if not (p_preprint or c_preprint[ci]):
                         continue
+                    min_sim = max(title_similarity_threshold, 0.97)
                     reason = "cross_doi_preprint_to_published"
                 else:
+                    min_sim = title_similarity_threshold
                     reason = "fuzzy_title_year"
 
-                if sim >= title_similarity_threshold and j >= token_jaccard_threshold and sim > best_sim:
+                j = _jaccard(tokens, c_tokens[ci])
+                if j < token_jaccard_threshold:
+                    continue
+
+                if c_title_norm == title_norm:
+                    # 多次检索返回的同一条目：规范化后完全相同，无需 SequenceMatcher
+                    sim = 1.0
+                else:
+                    # 廉价上界：不可能超过阈值或当前最优时跳过 ratio()
+                    floor = max(min_sim, best_sim)
+                    if _similarity_upper_bound(len(title_norm), len(c_title_norm)) < floor:
+                        continue
+                    # ratio() 不对称：保持 a=当前记录、b=候选 的方向，与合并证据口径一致
+                    matcher = SequenceMatcher(a=title_norm, b=c_title_norm)
+                    if matcher.real_quick_ratio() < floor or matcher.quick_ratio() < floor:
+                        continue
+                    sim = matcher.ratio()
+
+                if sim >= min_sim and sim > best_sim:
                     best_ci = ci
                     best_sim = sim
                     best_j = j
                     best_reason = reason
+                    if best_sim >= 1.0:
+                        break  # 不可能再出现严格更优的候选
 
         if best_ci is not None:
             # 2.1) 选择 canonical：用“更正式版本”启发式比较
@@ -309,10 +419,10 @@ def dedupe(
                 chosen = canonical[ci]
             else:
                 canonical[ci] = _merge_fields(chosen, p)
+            refresh(ci)
 
-            doi_new = _normalize_doi(chosen.get("doi") or "")
-            if doi_new:
-                doi_to_canonical[doi_new] = ci
+            if c_doi[ci]:
+                doi_to_canonical[c_doi[ci]] = ci
 
             edges.append(
                 MergeEdge(
@@ -324,7 +434,7 @@ def dedupe(
                     year_a=_as_int_year(chosen.get("year")),
                     year_b=_as_int_year(p.get("year")),
                     doi_a=_normalize_doi(chosen.get("doi") or ""),
-                    doi_b=_normalize_doi(p.get("doi") or ""),
+                    doi_b=doi,
                 )
             )
             continue
@@ -332,14 +442,14 @@ def dedupe(
         # 3) 新 canonical
         ci = len(canonical)
         canonical.append(p)
+        refresh(ci, norm=title_norm)
         if doi:
             doi_to_canonical[doi] = ci
-        bucket[bucket_key(p)] = bucket.get(bucket_key(p), []) + [ci]
 
     return canonical, edges
 
 
-def main() -> int:
+def main(argv: Optional[List[str]] = None) -> int:
     parser = argparse.ArgumentParser(description="Dedupe candidate papers and write merge map (JSONL + JSON).")
     parser.add_argument("--input", "-i", required=True, type=Path, help="Input papers (.jsonl or .json)")
     parser.add_argument("--output", "-o", required=True, type=Path, help="Output deduped papers (.jsonl)")
@@ -353,7 +463,7 @@ def main() -> int:
     parser.add_argument("--title-sim", type=float, default=0.92, help="Title similarity threshold (default: 0.92)")
     parser.add_argument("--token-jaccard", type=float, default=0.80, help="Token Jaccard threshold (default: 0.80)")
     parser.add_argument("--year-window", type=int, default=1, help="Year window for matching (default: 1)")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     scope_root = get_effective_scope_root(args.scope_root)
     if scope_root is not None:
@@ -5,6 +5,7 @@ exponential_backoff_retry.py - 指数退避重试
 用途：
   - 避免“立即重试风暴”放大故障与限流
   - 为短暂网络抖动/偶发 5xx 提供更稳健的恢复能力
+  - 响应带 Retry-After（429/503）时，至少等待服务端要求的时间（仍受 max_delay 上限约束）
 """
 
 from __future__ import annotations
@@ -16,6 +17,20 @@ from typing import Any, Callable, Optional, TypeVar
 T = TypeVar("T")
 
 
+def _retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """从 requests.HTTPError 等携带 response 的异常中读取 Retry-After（秒）。"""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    value = headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
 @dataclass
 class RetryConfig:
     enabled: bool = True
@@ -48,10 +63,11 @@ class ExponentialBackoffRetry:
                 last_exc = e
                 if attempt >= self.config.max_retries:
                     raise
-                delay = min(
-                    self.config.base_delay * (self.config.backoff_factor ** attempt),
-                    self.config.max_delay,
-                )
+                delay = self.config.base_delay * (self.config.backoff_factor ** attempt)
+                retry_after = _retry_after_seconds(e)
+                if retry_after is not None:
+                    delay = max(delay, retry_after)
+                delay = min(delay, self.config.max_delay)
                 time.sleep(delay)
 
         # 理论上不会到达这里
@@ -8,13 +8,18 @@ global_rate_limiter.py - 全局速率限制（跨所有 API 的总请求量保
 
 说明：
   - 该 limiter 以“单次 HTTP 请求”为粒度更合理；但在本技能中也可用于更粗粒度的调用保护。
+  - 传入 shared（SharedTokenBucket）时，acquire() 改为从跨进程共享的 "__global__" 令牌桶取令牌，
+    多个进程合计不超过 max_per_minute。
 """
 
 from __future__ import annotations
 
+import threading
 import time
 from dataclasses import dataclass
-from typing import Optional, Tuple
+from typing import Any, Optional, Tuple
+
+GLOBAL_BUCKET = "__global__"
 
 
 @dataclass
@@ -27,15 +32,26 @@ class GlobalLimitStatus:
 class GlobalRateLimiter:
     """全局速率限制器（跨 provider 汇总统计）"""
 
-    def __init__(self, *, max_per_minute: int = 120, cooldown_on_limit: int = 30):
+    def __init__(self, *, max_per_minute: int = 120, cooldown_on_limit: int = 30, shared: Optional[Any] = None):
         self.max_per_minute = int(max_per_minute)
         self.cooldown_on_limit = int(cooldown_on_limit)
+        self.shared = shared
+        if self.shared is not None:
+            try:
+                self.shared.configure(GLOBAL_BUCKET, rate=self.max_per_minute / 60.0, capacity=1.0)
+            except Exception:
+                self.shared = None
 
         self._all_calls: list[float] = []
         self._in_cooldown = False
         self._cooldown_until = 0.0
+        self._lock = threading.RLock()
 
     def can_request(self) -> GlobalLimitStatus:
+        with self._lock:
+            return self._can_request_locked()
+
+    def _can_request_locked(self) -> GlobalLimitStatus:
         now = time.time()
 
         if self._in_cooldown:
@@ -64,5 +80,33 @@ class GlobalRateLimiter:
         return GlobalLimitStatus(can_request=True)
 
     def record_request(self) -> None:
-        self._all_calls.append(time.time())
+        with self._lock:
+            self._all_calls.append(time.time())
+
+    def acquire(self) -> float:
+        """
+        阻塞直到一分钟窗口内有空余额度，并原子地记录本次请求；返回实际等待秒数。
+
+        与 can_request() + 固定冷却不同：这里把窗口当作共享令牌桶，
+        只等待到“最早一次请求滑出窗口”为止，适合并发检索的多个线程共用。
+        """
+        if self.shared is not None:
+            try:
+                waited = self.shared.acquire(GLOBAL_BUCKET)
+            except Exception:
+                waited = None
+            if waited is not None:
+                self.record_request()
+                return waited
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.time()
+                self._all_calls = [t for t in self._all_calls if now - t < 60]
+                if len(self._all_calls) < self.max_per_minute:
+                    self._all_calls.append(now)
+                    return waited
+                delay = max(0.01, self._all_calls[0] + 60 - now)
+            time.sleep(delay)
+            waited += delay
 
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+jsonl_stream.py - papers JSONL 的增量读取 / 流式写出
+
+用途：
+  - 各阶段脚本（dedupe/select/evidence cards/数据抽取表）共用的 JSONL I/O
+  - 逐行解析，调用方可以直接把生成器串起来处理，不必先把整个文件读进内存
+  - 若安装了 orjson 则优先用于解析（更快）；orjson 拒绝的行（如 json.dumps 写出的 NaN/Infinity）
+    回退到标准 json 解析，结果与旧版一致；写出仍使用标准 json，保证输出字节与旧版一致
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator
+
+try:
+    import orjson  # type: ignore[import-not-found]
+
+    def _loads(line: str) -> Any:
+        try:
+            return orjson.loads(line)
+        except orjson.JSONDecodeError:
+            # orjson 严格遵循 RFC 8259，不接受 NaN/Infinity；标准 json 可解析则以其为准
+            return json.loads(line)
+
+except ImportError:  # pragma: no cover - orjson 为可选依赖
+    orjson = None  # type: ignore[assignment]
+
+    def _loads(line: str) -> Any:
+        return json.loads(line)
+
+
+def iter_jsonl(path: Path, *, skip_invalid: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    逐行读取 JSONL，只产出 dict 记录。
+
+    Args:
+        path: JSONL 文件路径
+        skip_invalid: 默认遇到坏行（无法解析/非 dict）直接抛出异常；True 时跳过坏行（需调用方显式开启）
+    """
+    with Path(path).open("r", encoding="utf-8", errors="replace") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                obj = _loads(line)
+            except Exception as e:
+                if skip_invalid:
+                    continue
+                raise ValueError(f"{path}:{lineno}: invalid JSON: {e}") from e
+            if isinstance(obj, dict):
+                yield obj
+            elif not skip_invalid:
+                raise ValueError(f"{path}:{lineno}: expected JSON object, got {type(obj).__name__}")
+
+
+def dumps_record(record: Dict[str, Any]) -> str:
+    """单条记录的 JSONL 表示（与各脚本历史输出一致：ensure_ascii=False）。"""
+    return json.dumps(record, ensure_ascii=False)
+
+
+def write_jsonl(path: Path, records: Iterable[Dict[str, Any]]) -> int:
+    """
+    流式写出 JSONL（先写临时文件再原子替换），返回写出的记录数。
+
+    records 可以是生成器：写出过程中逐条消费，不会整体物化。
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp-{os.getpid()}")
+    count = 0
+    try:
+        with tmp.open("w", encoding="utf-8") as f:
+            for record in records:
+                f.write(dumps_record(record) + "\n")
+                count += 1
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    return count
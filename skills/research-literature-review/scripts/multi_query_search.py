@@ -17,6 +17,7 @@ multi_query_search.py - 多查询并行检索并合并结果
 
 v1.1 - 2026-01-02 (新增查询质量评估)
 v1.2 - 2026-01-25 (新增：多源检索 + 自动降级 + Semantic Scholar 限流保护)
+v1.3 - 2026-10-16 (新增：并发检索模式，配额由共享令牌桶控制)
 """
 
 from __future__ import annotations
@@ -26,6 +27,7 @@ import json
 import random
 import sys
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, asdict, field
 from pathlib import Path
 from typing import Any, Dict, List, Optional
@@ -341,7 +343,11 @@ def _enrich_missing_abstracts_global(
         candidates = candidates[:max_total]
 
     timeout_seconds = int(ae.get("timeout_seconds", 3))
-    fetcher = AbstractFetcher(timeout=timeout_seconds, cache_dir=cache_dir)
+    fetcher = AbstractFetcher(
+        timeout=timeout_seconds, cache_dir=cache_dir, batch_size=int(ae.get("batch_size", 50) or 0)
+    )
+    # 先按来源批量查询 DOI，逐篇循环只处理批量未命中的条目
+    fetcher.prefetch_by_doi([str(p.get("doi") or "") for p in candidates], topic=topic)
 
     filled = 0
     attempted = 0
@@ -388,6 +394,34 @@ def _enrich_missing_abstracts_global(
     }
 
 
+def _consume_budget(
+    provider: str,
+    *,
+    rate_limiter: Optional[Any],
+    global_limiter: Optional[Any],
+    paced: bool,
+) -> None:
+    """
+    发起 provider 请求前消耗配额。
+
+    - 顺序模式：仅记录全局请求（冷却判断在调用前由 can_request 完成）
+    - 并发模式：先向全局令牌桶申请额度，再按 provider 的补充速率排队
+    """
+    if global_limiter is not None:
+        try:
+            if paced and hasattr(global_limiter, "acquire"):
+                global_limiter.acquire()
+            else:
+                global_limiter.record_request()
+        except Exception:
+            pass
+    if paced and rate_limiter is not None and hasattr(rate_limiter, "acquire"):
+        try:
+            rate_limiter.acquire(provider)
+        except Exception:
+            pass
+
+
 def _search_one_query_with_fallback(
     query: str,
     *,
@@ -402,7 +436,14 @@ def _search_one_query_with_fallback(
     global_limiter: Optional[Any],
     retry: Optional[Any],
     health: Optional[Any],
+    paced: bool = False,
 ) -> tuple[list[dict], str, list[ProviderAttempt]]:
+    """
+    单查询多源检索（含降级）。
+
+    paced=True 用于并发模式：全局/分 provider 配额按共享令牌桶阻塞等待（acquire/reserve），
+    不再走“达到阈值 → 固定冷却 sleep”的顺序模式逻辑。
+    """
     provider_priority = list(search_cfg.get("provider_priority") or [])
     if not provider_priority:
         provider_priority = ["openalex"]
@@ -447,6 +488,7 @@ def _search_one_query_with_fallback(
                 max_year=max_year,
                 cache_dir=cache_dir,
                 enrich_abstracts=False,  # multi_query 场景统一在全局去重后补摘要，避免 per-query 扩散请求
+                rate_limiter=rate_limiter,
             )
         if provider == "semantic_scholar":
             if search_semantic_scholar is None:
@@ -467,6 +509,7 @@ def _search_one_query_with_fallback(
                 cache_dir=cache_dir,
                 retry=retry,
                 mailto=mailto,
+                rate_limiter=rate_limiter,
             )
         raise RuntimeError(f"不支持的 provider: {provider}")
 
@@ -502,7 +545,7 @@ def _search_one_query_with_fallback(
                 # 健康监控失败不阻断
                 pass
 
-        if global_limiter is not None:
+        if global_limiter is not None and not paced:
             try:
                 st = global_limiter.can_request()
                 if not getattr(st, "can_request", False):
@@ -527,12 +570,7 @@ def _search_one_query_with_fallback(
                 pass
 
         try:
-            if global_limiter is not None:
-                try:
-                    global_limiter.record_request()
-                except Exception:
-                    pass
-
+            _consume_budget(provider, rate_limiter=rate_limiter, global_limiter=global_limiter, paced=paced)
             papers = _do_search(provider)
             attempts.append(ProviderAttempt(provider=provider, status="success", results=len(papers)))
             chosen_provider = provider
@@ -555,11 +593,9 @@ def _search_one_query_with_fallback(
                     try:
                         st2 = rate_limiter.can_call("semantic_scholar")
                         if getattr(st2, "can_call", False):
-                            if global_limiter is not None:
-                                try:
-                                    global_limiter.record_request()
-                                except Exception:
-                                    pass
+                            _consume_budget(
+                                "semantic_scholar", rate_limiter=rate_limiter, global_limiter=global_limiter, paced=paced
+                            )
                             more = search_semantic_scholar(
                                 query=query,
                                 max_results=need,
@@ -591,6 +627,23 @@ def _search_one_query_with_fallback(
     return [], chosen_provider, attempts
 
 
+def _paper_key(p: Dict[str, Any]) -> str:
+    return p.get("doi") or f'{p.get("title", "").strip().lower()}::{p.get("year")}'
+
+
+def _resolve_workers(search_cfg: Dict[str, Any], workers: Optional[int]) -> int:
+    """并发检索线程数：显式参数优先，其次 config.yaml:search.concurrency。"""
+    if workers is not None:
+        return max(1, int(workers))
+    cc = search_cfg.get("concurrency", {}) if isinstance(search_cfg.get("concurrency", {}), dict) else {}
+    if not bool(cc.get("enabled", False)):
+        return 1
+    try:
+        return max(1, int(cc.get("max_workers", 4)))
+    except (TypeError, ValueError):
+        return 1
+
+
 def multi_search(
     queries: List[Dict[str, str]],
     max_results_per_query: int,
@@ -599,6 +652,7 @@ def multi_search(
     max_year: Optional[int],
     polite_delay: tuple[float, float] = (0.5, 2.0),
     cache_dir: Optional[Path] = None,  # API 缓存目录
+    workers: Optional[int] = None,
 ) -> tuple[List[Dict[str, Any]], List[SearchLog], Dict[str, Any], Dict[str, Any]]:
     """
     多查询并行检索
@@ -609,8 +663,13 @@ def multi_search(
         mailto: OpenAlex polite pool email
         min_year: 最小年份
         max_year: 最大年份
-        polite_delay: 礼貌延迟范围（秒）
+        polite_delay: 礼貌延迟范围（秒，仅顺序模式使用）
         cache_dir: API 缓存目录路径
+        workers: 并发线程数（None=读取 config.yaml:search.concurrency；1=顺序模式）
+
+    并发模式下查询在线程池中同时执行，配额由共享的 RateLimiter/GlobalRateLimiter
+    令牌桶控制（不再固定 sleep）；结果仍按查询输入顺序合并，
+    因此 SearchLog 与独有贡献（unique）统计与顺序模式一致、可复现。
 
     Returns:
         (合并后的论文列表, 检索日志列表)
@@ -622,12 +681,16 @@ def multi_search(
     fallback_cfg = search_cfg.get("fallback", {}) if isinstance(search_cfg.get("fallback", {}), dict) else {}
     protection_cfg = search_cfg.get("rate_limit_protection", {}) if isinstance(search_cfg.get("rate_limit_protection", {}), dict) else {}
     protection_enabled = bool(protection_cfg.get("enabled", True))
+    n_workers = _resolve_workers(search_cfg, workers)
 
     detector = ProviderDetector(
         cache_ttl=int(fallback_cfg.get("detection_ttl", 300)),
         cache_enabled=bool(fallback_cfg.get("cache_detections", True)),
     ) if ProviderDetector is not None else None
     rate_limiter = RateLimiter(protection_cfg) if (RateLimiter is not None and protection_enabled) else None
+    shared_bucket = getattr(rate_limiter, "shared", None)
+    # 并发模式或启用跨进程共享令牌桶时，按令牌排队取代“冷却 + 固定 sleep”
+    paced = n_workers > 1 or shared_bucket is not None
     global_limiter = None
     if protection_enabled and GlobalRateLimiter is not None and isinstance(protection_cfg.get("global", {}), dict):
         gcfg = protection_cfg.get("global", {}) or {}
@@ -635,89 +698,105 @@ def multi_search(
             global_limiter = GlobalRateLimiter(
                 max_per_minute=int(gcfg.get("max_calls_per_minute", 120)),
                 cooldown_on_limit=int(gcfg.get("cooldown_on_limit", 30)),
+                shared=shared_bucket,
             )
     retry = ExponentialBackoffRetry((protection_cfg.get("retry") or {})) if (ExponentialBackoffRetry is not None and protection_enabled) else None
     health = APIHealthMonitor((protection_cfg.get("health_monitor") or {})) if (APIHealthMonitor is not None and protection_enabled) else None
 
-    for i, q in enumerate(queries, 1):
-        query_str = q.get("query", "")
-        rationale = q.get("rationale", "")
-        if not query_str:
-            logs.append(SearchLog(
-                query="", rationale=rationale, returned=0, unique=0, notes="查询字符串为空"
-            ))
-            continue
+    def _run_query(query_str: str) -> tuple[list[dict], str, list[ProviderAttempt]]:
+        return _search_one_query_with_fallback(
+            query_str,
+            max_results=max_results_per_query,
+            mailto=mailto,
+            min_year=min_year,
+            max_year=max_year,
+            cache_dir=cache_dir,
+            search_cfg=search_cfg,
+            detector=detector,
+            rate_limiter=rate_limiter,
+            global_limiter=global_limiter,
+            retry=retry,
+            health=health,
+            paced=paced,
+        )
+
+    # 并发模式：一次性提交全部查询；下方仍按输入顺序取结果，保证日志与统计确定性
+    executor: Optional[ThreadPoolExecutor] = None
+    futures: Dict[int, Future] = {}
+    if paced:
+        print(f"并发检索：{n_workers} 个线程（配额由共享令牌桶控制）")
+        executor = ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix="multi-query")
+        for i, q in enumerate(queries, 1):
+            query_str = q.get("query", "")
+            if query_str:
+                futures[i] = executor.submit(_run_query, query_str)
+
+    seen_keys: set[str] = set()
+    try:
+        for i, q in enumerate(queries, 1):
+            query_str = q.get("query", "")
+            rationale = q.get("rationale", "")
+            if not query_str:
+                logs.append(SearchLog(
+                    query="", rationale=rationale, returned=0, unique=0, notes="查询字符串为空"
+                ))
+                continue
+
+            print(f"\n[{i}/{len(queries)}] 检索: {query_str}")
+            print(f"  理由: {rationale}")
 
-        print(f"\n[{i}/{len(queries)}] 检索: {query_str}")
-        print(f"  理由: {rationale}")
+            try:
+                if paced:
+                    papers, provider_used, attempts = futures[i].result()
+                else:
+                    papers, provider_used, attempts = _run_query(query_str)
+                print(f"  返回: {len(papers)} 篇")
+            except Exception as e:
+                print(f"  ✗ 检索失败: {e}")
+                logs.append(SearchLog(
+                    query=query_str, rationale=rationale, returned=0, unique=0, notes=f"检索失败: {e}"
+                ))
+                continue
+
+            # 计算本次查询的独有贡献（去重前；按查询顺序累计已见 key）
+            unique_count = sum(1 for p in papers if _paper_key(p) not in seen_keys)
+            seen_keys.update(_paper_key(p) for p in papers)
+
+            all_papers.extend(papers)
+
+            # 质量评估（v1.1 新增）
+            quality_score, quality_label = _assess_query_quality(len(papers), unique_count)
+            dedupe_rate = unique_count / len(papers) if len(papers) > 0 else 0.0
 
-        try:
-            papers, provider_used, attempts = _search_one_query_with_fallback(
-                query_str,
-                max_results=max_results_per_query,
-                mailto=mailto,
-                min_year=min_year,
-                max_year=max_year,
-                cache_dir=cache_dir,
-                search_cfg=search_cfg,
-                detector=detector,
-                rate_limiter=rate_limiter,
-                global_limiter=global_limiter,
-                retry=retry,
-                health=health,
-            )
-            print(f"  返回: {len(papers)} 篇")
-        except Exception as e:
-            print(f"  ✗ 检索失败: {e}")
             logs.append(SearchLog(
-                query=query_str, rationale=rationale, returned=0, unique=0, notes=f"检索失败: {e}"
+                query=query_str,
+                rationale=rationale,
+                returned=len(papers),
+                unique=unique_count,
+                notes="",
+                dedupe_rate=round(dedupe_rate, 3),
+                quality_score=round(quality_score, 3),
+                quality_label=quality_label,
+                provider_used=provider_used or "",
+                attempts=[asdict(a) for a in (attempts or [])],
             ))
-            continue
 
-        # 计算本次查询的独有贡献（去重前）
-        seen_keys = {
-            p.get("doi") or f'{p.get("title", "").strip().lower()}::{p.get("year")}'
-            for p in all_papers
-        }
-        new_papers = [
-            p for p in papers
-            if (p.get("doi") or f'{p.get("title", "").strip().lower()}::{p.get("year")}')
-               not in seen_keys
-        ]
-        unique_count = len(new_papers)
-
-        all_papers.extend(papers)
-
-        # 质量评估（v1.1 新增）
-        quality_score, quality_label = _assess_query_quality(len(papers), unique_count)
-        dedupe_rate = unique_count / len(papers) if len(papers) > 0 else 0.0
-
-        logs.append(SearchLog(
-            query=query_str,
-            rationale=rationale,
-            returned=len(papers),
-            unique=unique_count,
-            notes="",
-            dedupe_rate=round(dedupe_rate, 3),
-            quality_score=round(quality_score, 3),
-            quality_label=quality_label,
-            provider_used=provider_used or "",
-            attempts=[asdict(a) for a in (attempts or [])],
-        ))
-
-        # 礼貌延迟
-        if i < len(queries):
-            # 兼容旧参数：仍保留随机区间，但允许由配置给出更小的“礼貌延迟”
-            delay = random.uniform(*polite_delay)
-            if rate_limiter is not None and (provider_used or "") == "openalex":
-                try:
-                    oa_delay = float(getattr(rate_limiter, "openalex_polite_delay", 0.0) or 0.0)
-                    if oa_delay > 0:
-                        delay = max(oa_delay, min(delay, oa_delay + 0.25))
-                except Exception:
-                    pass
-            print(f"  等待 {delay:.1f} 秒...")
-            time.sleep(delay)
+            # 礼貌延迟（仅顺序模式；并发模式由令牌桶按 provider 排队）
+            if not paced and i < len(queries):
+                # 兼容旧参数：仍保留随机区间，但允许由配置给出更小的“礼貌延迟”
+                delay = random.uniform(*polite_delay)
+                if rate_limiter is not None and (provider_used or "") == "openalex":
+                    try:
+                        oa_delay = float(getattr(rate_limiter, "openalex_polite_delay", 0.0) or 0.0)
+                        if oa_delay > 0:
+                            delay = max(oa_delay, min(delay, oa_delay + 0.25))
+                    except Exception:
+                        pass
+                print(f"  等待 {delay:.1f} 秒...")
+                time.sleep(delay)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
 
     # 全局去重
     deduped = _dedupe_papers(all_papers)
@@ -808,6 +887,12 @@ def main() -> int:
         default=None,
         help="工作目录隔离根目录（可选；默认从环境变量 SYSTEMATIC_LITERATURE_REVIEW_SCOPE_ROOT 读取）",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="并发检索线程数（默认读取 config.yaml:search.concurrency；1=顺序检索）",
+    )
     args = parser.parse_args()
 
     scope_root = get_effective_scope_root(args.scope_root)
@@ -835,6 +920,7 @@ def main() -> int:
         min_year=args.min_year,
         max_year=args.max_year,
         cache_dir=args.cache_dir,  # 传递缓存目录参数
+        workers=args.workers,
     )
 
     # 限制总结果数
@@ -7,13 +7,19 @@ multi_source_abstract.py - 多源摘要补充模块
   2. 自动识别主题类型（生物医学/通用）以调整 API 优先级
   3. 实现超时控制和降级策略
   4. 提供批量处理能力（支持并发）
+  5. 按 DOI 批量查询：每个来源一次请求最多查 N 个 DOI（OpenAlex `filter=doi:a|b`、
+     Semantic Scholar `/paper/batch`、Crossref `filter=doi:a,doi:b`、PubMed esearch/efetch），
+     只把仍缺摘要的 DOI 交给下一个来源；HTTP 连接按线程复用（keep-alive）
 
 Usage:
     fetcher = AbstractFetcher(timeout=5)
     abstract = fetcher.fetch_by_doi("10.1126/science.1231143", topic="CRISPR gene editing")
 
+    # 批量：先按来源分组批量查询，再对剩余条目逐篇兜底
+    enriched = fetcher.fetch_batch(papers, topic="CRISPR gene editing")
+
 Author: research-literature-review skill
-Version: 1.0.5
+Version: 1.1.0
 """
 
 from __future__ import annotations
@@ -21,14 +27,13 @@ from __future__ import annotations
 import concurrent.futures
 import json
 import re
-import time
-import urllib.error
+import threading
 import urllib.parse
-import urllib.request
+import xml.etree.ElementTree as ET
 from dataclasses import dataclass, field
 from functools import partial
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
 
 # 可选：复用本 skill 的 API 缓存（减少重复请求、降低限流风险）
 try:
@@ -59,6 +64,26 @@ SEMANTIC_SCHOLAR_API = "https://api.semanticscholar.org/graph/v1/paper"
 PUBMED_API = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi"
 CROSSREF_API = "https://api.crossref.org/works"
 OPENALEX_API = "https://api.openalex.org/works"
+PUBMED_ESEARCH_API = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
+PUBMED_EFETCH_API = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
+
+USER_AGENT = "pipelines/skills research-literature-review multi-source-abstract"
+
+# 各来源单次批量请求的 DOI 上限（服务端限制；实际批大小取 min(batch_size, 上限)）
+PROVIDER_BATCH_LIMITS = {
+    "crossref": 50,
+    "semantic_scholar": 500,
+    "pubmed": 200,
+    "openalex": 50,
+}
+
+# 来源名 -> FetchStatistics 成功计数字段
+_SUCCESS_FIELDS = {
+    "crossref": "crossref_success",
+    "semantic_scholar": "semantic_scholar_success",
+    "pubmed": "pubmed_success",
+    "openalex": "openalex_fallback_success",
+}
 
 
 # ============================================================================
@@ -110,12 +135,94 @@ def _clean_abstract(text: str) -> str:
     return text.strip()
 
 
+def _rebuild_inverted_index(aii: Any) -> str:
+    """把 OpenAlex 的 abstract_inverted_index 还原为摘要文本（可能为 null）。"""
+    if not isinstance(aii, dict):
+        return ""
+    positions: Dict[int, str] = {}
+    for token, idxs in aii.items():
+        if not isinstance(idxs, list):
+            continue
+        for idx in idxs:
+            if isinstance(idx, int) and idx not in positions:
+                positions[idx] = str(token)
+    if not positions:
+        return ""
+    return _clean_abstract(" ".join(positions[i] for i in sorted(positions)))
+
+
+class _SessionPool:
+    """
+    按线程复用 requests.Session（keep-alive 长连接）。
+
+    Session 不保证线程安全，因此用 threading.local 隔离；代理（HTTP(S)_PROXY）、
+    重定向与 TLS 均交由 requests 处理，与 crossref/semantic_scholar/openalex 检索脚本一致。
+    """
+
+    def __init__(self, pool_size: int = 5) -> None:
+        self._local = threading.local()
+        self.pool_size = pool_size
+
+    def reserve(self, workers: int) -> None:
+        """按并发数放大连接池（只影响之后新建的 Session，即新工作线程）。"""
+        self.pool_size = max(self.pool_size, int(workers))
+
+    def session(self) -> Any:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            import requests  # type: ignore
+            from requests.adapters import HTTPAdapter  # type: ignore
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=len(PROVIDER_BATCH_LIMITS), pool_maxsize=self.pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({"User-Agent": USER_AGENT, "Accept": "application/json"})
+            self._local.session = session
+        return session
+
+
+_POOL = _SessionPool()
+
+
+def _http_request(
+    url: str,
+    timeout: int,
+    headers: Optional[Dict[str, str]] = None,
+    *,
+    method: str = "GET",
+    body: Optional[bytes] = None,
+    on_request: Optional[Callable[[], None]] = None,
+) -> Optional[bytes]:
+    """
+    通过当前线程的 Session 发起请求，返回响应体（非 2xx / 网络错误返回 None）
+
+    Args:
+        on_request: 每次真正发出网络请求前回调（用于按来源统计请求数）
+    """
+    try:
+        import requests  # type: ignore
+    except ModuleNotFoundError:
+        return None
+
+    if on_request is not None:
+        on_request()
+    try:
+        resp = _POOL.session().request(method, url, headers=headers, data=body, timeout=timeout)
+    except requests.RequestException:
+        return None
+    if not 200 <= resp.status_code < 300:
+        return None
+    return resp.content
+
+
 def _make_request(
     url: str,
     timeout: int,
     headers: Optional[Dict[str, str]] = None,
     *,
     cache: Optional[Any] = None,
+    on_request: Optional[Callable[[], None]] = None,
 ) -> Optional[Any]:
     """
     发起 HTTP GET 请求并解析 JSON 响应
@@ -128,13 +235,6 @@ def _make_request(
     Returns:
         解析后的 JSON 对象，失败返回 None
     """
-    default_headers = {
-        "User-Agent": "pipelines/skills research-literature-review multi-source-abstract",
-        "Accept": "application/json",
-    }
-    if headers:
-        default_headers.update(headers)
-
     if cache is not None:
         try:
             cached = cache.get(url, None)
@@ -143,26 +243,32 @@ def _make_request(
         except Exception:
             pass
 
+    data = _http_request(url, timeout, headers, on_request=on_request)
+    if data is None:
+        return None
     try:
-        req = urllib.request.Request(url, headers=default_headers)
-        with urllib.request.urlopen(req, timeout=timeout) as resp:  # nosec B310
-            data = resp.read()
-            parsed = json.loads(data.decode("utf-8", errors="replace"))
-            if cache is not None:
-                try:
-                    cache.set(url, None, parsed)
-                except Exception:
-                    pass
-            return parsed
-    except (urllib.error.URLError, urllib.error.HTTPError, json.JSONDecodeError, TimeoutError):
+        parsed = json.loads(data.decode("utf-8", errors="replace"))
+    except json.JSONDecodeError:
         return None
+    if cache is not None:
+        try:
+            cache.set(url, None, parsed)
+        except Exception:
+            pass
+    return parsed
 
 
 # ============================================================================
 # 单个 API 获取函数
 # ============================================================================
 
-def _fetch_from_semantic_scholar(doi: str, timeout: int, *, cache: Optional[Any] = None) -> Optional[str]:
+def _fetch_from_semantic_scholar(
+    doi: str,
+    timeout: int,
+    *,
+    cache: Optional[Any] = None,
+    on_request: Optional[Callable[[], None]] = None,
+) -> Optional[str]:
     """
     从 Semantic Scholar API 获取摘要
 
@@ -182,7 +288,7 @@ def _fetch_from_semantic_scholar(doi: str, timeout: int, *, cache: Optional[Any]
     params = {"fields": "abstract"}
 
     full_url = f"{url}?{urllib.parse.urlencode(params)}"
-    data = _make_request(full_url, timeout, cache=cache)
+    data = _make_request(full_url, timeout, cache=cache, on_request=on_request)
 
     if data and "abstract" in data:
         abstract = data["abstract"]
@@ -192,7 +298,13 @@ def _fetch_from_semantic_scholar(doi: str, timeout: int, *, cache: Optional[Any]
     return None
 
 
-def _fetch_from_pubmed(doi: str, timeout: int, *, cache: Optional[Any] = None) -> Optional[str]:
+def _fetch_from_pubmed(
+    doi: str,
+    timeout: int,
+    *,
+    cache: Optional[Any] = None,
+    on_request: Optional[Callable[[], None]] = None,
+) -> Optional[str]:
     """
     从 PubMed API 获取摘要
 
@@ -207,7 +319,7 @@ def _fetch_from_pubmed(doi: str, timeout: int, *, cache: Optional[Any] = None) -
         return None
 
     # 步骤 1：使用 esearch 查找 PubMed ID
-    search_url = f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
+    search_url = PUBMED_ESEARCH_API
     search_params = {
         "db": "pubmed",
         "term": f"{doi}[doi]",
@@ -220,6 +332,7 @@ def _fetch_from_pubmed(doi: str, timeout: int, *, cache: Optional[Any] = None) -
         f"{search_url}?{urllib.parse.urlencode(search_params)}",
         timeout,
         cache=cache,
+        on_request=on_request,
     )
 
     if not search_response:
@@ -233,7 +346,7 @@ def _fetch_from_pubmed(doi: str, timeout: int, *, cache: Optional[Any] = None) -
 
     # 步骤 2：使用 esummary 获取摘要（如果有的话）
     # 注意：esummary 不直接提供摘要，需要用 efetch
-    fetch_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
+    fetch_url = PUBMED_EFETCH_API
     fetch_params = {
         "db": "pubmed",
         "id": pmid,
@@ -242,25 +355,31 @@ def _fetch_from_pubmed(doi: str, timeout: int, *, cache: Optional[Any] = None) -
         "tool": "research-literature-review",
     }
 
-    try:
-        req = urllib.request.Request(
-            f"{fetch_url}?{urllib.parse.urlencode(fetch_params)}",
-            headers={"User-Agent": "pipelines/skills research-literature-review multi-source-abstract"},
-        )
-        with urllib.request.urlopen(req, timeout=timeout) as resp:  # nosec B310
-            xml_data = resp.read().decode("utf-8", errors="replace")
-
-            # 简单解析 XML 提取 AbstractText
-            abstract_match = re.search(r"<AbstractText>([^<]+)</AbstractText>", xml_data, re.DOTALL)
-            if abstract_match:
-                return _clean_abstract(abstract_match.group(1))
-    except Exception:
+    raw = _http_request(
+        f"{fetch_url}?{urllib.parse.urlencode(fetch_params)}",
+        timeout,
+        {"Accept": "application/xml"},
+        on_request=on_request,
+    )
+    if raw is None:
         return None
+    xml_data = raw.decode("utf-8", errors="replace")
+
+    # 简单解析 XML 提取 AbstractText
+    abstract_match = re.search(r"<AbstractText>([^<]+)</AbstractText>", xml_data, re.DOTALL)
+    if abstract_match:
+        return _clean_abstract(abstract_match.group(1))
 
     return None
 
 
-def _fetch_from_crossref(doi: str, timeout: int, *, cache: Optional[Any] = None) -> Optional[str]:
+def _fetch_from_crossref(
+    doi: str,
+    timeout: int,
+    *,
+    cache: Optional[Any] = None,
+    on_request: Optional[Callable[[], None]] = None,
+) -> Optional[str]:
     """
     从 Crossref API 获取摘要
 
@@ -277,7 +396,7 @@ def _fetch_from_crossref(doi: str, timeout: int, *, cache: Optional[Any] = None)
     normalized_doi = _normalize_doi(doi)
     url = f"{CROSSREF_API}/{urllib.parse.quote(normalized_doi)}"
 
-    data = _make_request(url, timeout, cache=cache)
+    data = _make_request(url, timeout, cache=cache, on_request=on_request)
 
     if data and "message" in data:
         message = data["message"]
@@ -293,7 +412,13 @@ def _fetch_from_crossref(doi: str, timeout: int, *, cache: Optional[Any] = None)
     return None
 
 
-def _fetch_from_openalex_by_doi(doi: str, timeout: int, *, cache: Optional[Any] = None) -> Optional[str]:
+def _fetch_from_openalex_by_doi(
+    doi: str,
+    timeout: int,
+    *,
+    cache: Optional[Any] = None,
+    on_request: Optional[Callable[[], None]] = None,
+) -> Optional[str]:
     """
     从 OpenAlex API 直接获取摘要（作为备用）
 
@@ -313,22 +438,205 @@ def _fetch_from_openalex_by_doi(doi: str, timeout: int, *, cache: Optional[Any]
     normalized_doi = _normalize_doi(doi)
     url = f"{OPENALEX_API}/https://doi.org/{urllib.parse.quote(normalized_doi)}"
 
-    data = _make_request(url, timeout, cache=cache)
+    data = _make_request(url, timeout, cache=cache, on_request=on_request)
 
+    # 重建摘要（OpenAlex 的 abstract_inverted_index 可能为 null）
     aii = data.get("abstract_inverted_index") if isinstance(data, dict) else None
-    if isinstance(aii, dict):
-        # 重建摘要（OpenAlex 的 abstract_inverted_index 可能为 null）
-        positions: Dict[int, str] = {}
-        for token, idxs in aii.items():
-            if not isinstance(idxs, list):
-                continue
-            for idx in idxs:
-                if isinstance(idx, int) and idx not in positions:
-                    positions[idx] = str(token)
-        if positions:
-            return _clean_abstract(" ".join(positions[i] for i in sorted(positions)))
+    return _rebuild_inverted_index(aii) or None
 
-    return None
+
+# ============================================================================
+# 批量 API 获取函数（按 DOI 分组，一次请求查询多篇）
+#
+# 约定：dois 为已标准化的 DOI 列表；返回 {doi: abstract}（仅包含查到摘要的 DOI），
+# 请求失败返回 None（调用方据此区分“来源已答复但无摘要”和“请求失败”）。
+# ============================================================================
+
+def _batch_from_crossref(
+    dois: List[str],
+    timeout: int,
+    *,
+    on_request: Optional[Callable[[], None]] = None,
+) -> Optional[Dict[str, str]]:
+    """Crossref：同名 filter 之间为 OR 关系（filter=doi:a,doi:b）"""
+    params = {
+        "filter": ",".join(f"doi:{d}" for d in dois),
+        "rows": str(len(dois)),
+        "select": "DOI,abstract,subtitle",
+    }
+    data = _make_request(f"{CROSSREF_API}?{urllib.parse.urlencode(params)}", timeout, on_request=on_request)
+    if not isinstance(data, dict):
+        return None
+    items = (data.get("message") or {}).get("items") or []
+    found: Dict[str, str] = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        doi = _normalize_doi(str(item.get("DOI") or ""))
+        for key in ["abstract", "subtitle"]:
+            value = item.get(key)
+            if isinstance(value, list):
+                value = value[0] if value else ""
+            if isinstance(value, str) and value.strip():
+                found[doi] = _clean_abstract(value)
+                break
+    return found
+
+
+def _batch_from_semantic_scholar(
+    dois: List[str],
+    timeout: int,
+    *,
+    on_request: Optional[Callable[[], None]] = None,
+) -> Optional[Dict[str, str]]:
+    """Semantic Scholar：POST /paper/batch，返回列表与 ids 一一对应（未命中为 null）"""
+    body = json.dumps({"ids": [f"DOI:{d}" for d in dois]}).encode("utf-8")
+    raw = _http_request(
+        f"{SEMANTIC_SCHOLAR_API}/batch?{urllib.parse.urlencode({'fields': 'abstract'})}",
+        timeout,
+        {"Content-Type": "application/json"},
+        method="POST",
+        body=body,
+        on_request=on_request,
+    )
+    if raw is None:
+        return None
+    try:
+        data = json.loads(raw.decode("utf-8", errors="replace"))
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(data, list):
+        return None
+    found: Dict[str, str] = {}
+    for doi, item in zip(dois, data):
+        if isinstance(item, dict) and item.get("abstract"):
+            found[doi] = _clean_abstract(str(item["abstract"]))
+    return found
+
+
+def _pubmed_article_doi(article: ET.Element) -> str:
+    # 只看文章自身的 ID（ReferenceList 里也有 ArticleId，属于被引文献）
+    for el in article.findall("./PubmedData/ArticleIdList/ArticleId"):
+        if el.get("IdType") == "doi" and el.text:
+            return _normalize_doi(el.text)
+    for el in article.findall("./MedlineCitation/Article/ELocationID"):
+        if el.get("EIdType") == "doi" and el.text:
+            return _normalize_doi(el.text)
+    return ""
+
+
+def _batch_from_pubmed(
+    dois: List[str],
+    timeout: int,
+    *,
+    on_request: Optional[Callable[[], None]] = None,
+) -> Optional[Dict[str, str]]:
+    """PubMed：esearch 用 OR 一次查出全部 PMID，再一次 efetch 取回摘要（每批 2 个请求）"""
+    search_params = {
+        "db": "pubmed",
+        "term": " OR ".join(f'"{d}"[doi]' for d in dois),
+        "retmax": str(len(dois) * 2),
+        "retmode": "json",
+        "tool": "research-literature-review",
+    }
+    search = _make_request(
+        f"{PUBMED_ESEARCH_API}?{urllib.parse.urlencode(search_params)}", timeout, on_request=on_request
+    )
+    if not isinstance(search, dict):
+        return None
+    idlist = (search.get("esearchresult") or {}).get("idlist") or []
+    if not idlist:
+        return {}
+
+    fetch_params = {
+        "db": "pubmed",
+        "id": ",".join(str(i) for i in idlist),
+        "rettype": "abstract",
+        "retmode": "xml",
+        "tool": "research-literature-review",
+    }
+    raw = _http_request(
+        f"{PUBMED_EFETCH_API}?{urllib.parse.urlencode(fetch_params)}",
+        timeout,
+        {"Accept": "application/xml"},
+        on_request=on_request,
+    )
+    if raw is None:
+        return None
+    try:
+        root = ET.fromstring(raw)  # nosec B314 - NCBI efetch 响应
+    except ET.ParseError:
+        return None
+
+    wanted = set(dois)
+    found: Dict[str, str] = {}
+    for article in root.iter("PubmedArticle"):
+        doi = _pubmed_article_doi(article)
+        if doi not in wanted:
+            continue
+        parts = ["".join(el.itertext()) for el in article.iter("AbstractText")]
+        text = _clean_abstract(" ".join(p for p in parts if p.strip()))
+        if text:
+            found[doi] = text
+    return found
+
+
+def _batch_from_openalex(
+    dois: List[str],
+    timeout: int,
+    *,
+    on_request: Optional[Callable[[], None]] = None,
+) -> Optional[Dict[str, str]]:
+    """OpenAlex：filter=doi:a|b|c，只取 doi 与 abstract_inverted_index 两个字段"""
+    params = {
+        "filter": "doi:" + "|".join(f"https://doi.org/{d}" for d in dois),
+        "per-page": str(len(dois)),
+        "select": "doi,abstract_inverted_index",
+    }
+    data = _make_request(f"{OPENALEX_API}?{urllib.parse.urlencode(params)}", timeout, on_request=on_request)
+    if not isinstance(data, dict):
+        return None
+    found: Dict[str, str] = {}
+    for work in data.get("results") or []:
+        if not isinstance(work, dict):
+            continue
+        doi = _normalize_doi(str(work.get("doi") or ""))
+        text = _rebuild_inverted_index(work.get("abstract_inverted_index"))
+        if doi and text:
+            found[doi] = text
+    return found
+
+
+_SINGLE_FETCHERS: Dict[str, Callable[..., Optional[str]]] = {
+    "crossref": _fetch_from_crossref,
+    "semantic_scholar": _fetch_from_semantic_scholar,
+    "pubmed": _fetch_from_pubmed,
+    "openalex": _fetch_from_openalex_by_doi,
+}
+
+_BATCH_FETCHERS: Dict[str, Callable[..., Optional[Dict[str, str]]]] = {
+    "crossref": _batch_from_crossref,
+    "semantic_scholar": _batch_from_semantic_scholar,
+    "pubmed": _batch_from_pubmed,
+    "openalex": _batch_from_openalex,
+}
+
+# 会破坏批量查询语法的字符（含这些字符的 DOI 只走逐篇查询）
+_BATCH_UNSAFE_CHARS = {
+    "crossref": ",",
+    "semantic_scholar": "",
+    "pubmed": '"',
+    "openalex": "|,",
+}
+
+
+def _batchable(provider: str, doi: str) -> bool:
+    return not any(ch in doi for ch in _BATCH_UNSAFE_CHARS.get(provider, ""))
+
+
+def _chunks(items: List[str], size: int) -> Iterable[List[str]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
 
 
 # ============================================================================
@@ -346,6 +654,8 @@ class FetchStatistics:
     openalex_fallback_success: int = 0
     total_success: int = 0
     total_failed: int = 0
+    # 各来源实际发出的 HTTP 请求数（命中缓存不计）
+    requests_by_provider: Dict[str, int] = field(default_factory=dict)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -358,10 +668,13 @@ class FetchStatistics:
             "total_enriched": self.semantic_scholar_success + self.pubmed_success + self.crossref_success + self.openalex_fallback_success,
             "final_coverage": f"{(self.total_success / max(1, self.total_papers) * 100):.1f}%",
             "total_failed": self.total_failed,
+            "requests_by_provider": dict(sorted(self.requests_by_provider.items())),
+            "total_requests": sum(self.requests_by_provider.values()),
         }
 
     def __str__(self) -> str:
         d = self.to_dict()
+        requests = ", ".join(f"{k}={v}" for k, v in d["requests_by_provider"].items()) or "none"
         return (
             f"Abstract Fetch Statistics:\n"
             f"  Total papers: {d['total_papers']}\n"
@@ -372,7 +685,8 @@ class FetchStatistics:
             f"  Enriched from OpenAlex fallback: {d['openalex_fallback_enriched']}\n"
             f"  Total enriched: {d['total_enriched']}\n"
             f"  Final coverage: {d['final_coverage']}\n"
-            f"  Total failed: {d['total_failed']}"
+            f"  Total failed: {d['total_failed']}\n"
+            f"  API requests: {d['total_requests']} ({requests})"
         )
 
 
@@ -391,6 +705,7 @@ class AbstractFetcher:
         enable_semantic_scholar: 是否启用 Semantic Scholar
         enable_pubmed: 是否启用 PubMed
         enable_crossref: 是否启用 Crossref
+        batch_size: 批量查询时每个请求最多包含的 DOI 数；<=1 时退回逐篇查询
 
     Note:
         OpenAlex 的条目并非都包含摘要，因此在“需要高摘要覆盖率”的场景（写作、对齐检查）
@@ -406,10 +721,15 @@ class AbstractFetcher:
     enable_crossref: bool = True
     cache_dir: Optional[Path] = None
     cache_ttl_seconds: int = 86400
+    batch_size: int = 50
 
     # 统计信息（内部使用）
     _stats: FetchStatistics = field(default_factory=FetchStatistics, init=False, repr=False)
     _cache: Optional[Any] = field(default=None, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    # 批量预取结果：doi -> (来源, 摘要)；以及每个 DOI 已明确答复“无摘要”的来源
+    _prefetched: Dict[str, Tuple[str, str]] = field(default_factory=dict, init=False, repr=False)
+    _answered: Dict[str, Set[str]] = field(default_factory=dict, init=False, repr=False)
 
     def __post_init__(self) -> None:
         if CacheStorage is None or self.cache_dir is None:
@@ -420,41 +740,177 @@ class AbstractFetcher:
         except Exception:
             self._cache = None
 
-    def _get_api_priority(self, topic: str) -> List[Callable[[str, int], Optional[str]]]:
+    def _bump(self, attr: str, n: int = 1) -> None:
+        with self._lock:
+            setattr(self._stats, attr, getattr(self._stats, attr) + n)
+
+    def _count_request(self, provider: str) -> None:
+        with self._lock:
+            counts = self._stats.requests_by_provider
+            counts[provider] = counts.get(provider, 0) + 1
+
+    def _provider_order(self, topic: str) -> List[str]:
         """
-        根据主题类型返回 API 优先级列表
+        根据主题类型返回来源优先级（来源名）
 
         优先级策略（基于测试结果）：
         1. Crossref - 在测试中表现最稳定
         2. Semantic Scholar - 数据质量高但部分受限
         3. PubMed - 仅生物医学主题
         4. OpenAlex fallback - 最后尝试
-
-        Args:
-            topic: 研究主题
-
-        Returns:
-            API 函数列表（按优先级排序）
         """
         is_biomed = _is_biomedical_topic(topic)
 
         # 主来源（最多取 N 个），OpenAlex fallback 始终追加在末尾
-        primary: list[Callable[[str, int], Optional[str]]] = []
+        primary: List[str] = []
         if self.enable_crossref:
-            primary.append(partial(_fetch_from_crossref, cache=self._cache))
+            primary.append("crossref")
         if self.enable_semantic_scholar:
-            primary.append(partial(_fetch_from_semantic_scholar, cache=self._cache))
+            primary.append("semantic_scholar")
         if self.enable_pubmed:
             # 生物医学主题优先，其余主题放在更靠后的位置
             if is_biomed:
-                primary.append(partial(_fetch_from_pubmed, cache=self._cache))
+                primary.append("pubmed")
             else:
-                primary.append(partial(_fetch_from_pubmed, cache=self._cache))
+                primary.append("pubmed")
 
         max_sources = max(0, int(self.max_retries))
         primary = primary[:max_sources] if max_sources else primary
 
-        return primary + [partial(_fetch_from_openalex_by_doi, cache=self._cache)]
+        return primary + ["openalex"]
+
+    def _single_fetcher(self, provider: str) -> Callable[[str, int], Optional[str]]:
+        return partial(
+            _SINGLE_FETCHERS[provider],
+            cache=self._cache,
+            on_request=partial(self._count_request, provider),
+        )
+
+    def _get_api_priority(self, topic: str) -> List[Callable[[str, int], Optional[str]]]:
+        """
+        根据主题类型返回 API 优先级列表
+
+        Args:
+            topic: 研究主题
+
+        Returns:
+            API 函数列表（按优先级排序，顺序见 _provider_order）
+        """
+        return [self._single_fetcher(p) for p in self._provider_order(topic)]
+
+    def _record_success(self, provider: str) -> None:
+        with self._lock:
+            field_name = _SUCCESS_FIELDS[provider]
+            setattr(self._stats, field_name, getattr(self._stats, field_name) + 1)
+            self._stats.total_success += 1
+
+    # ------------------------------------------------------------------
+    # 批量预取
+    # ------------------------------------------------------------------
+
+    def _batch_cache_key(self, provider: str, doi: str) -> str:
+        return f"batch://{provider}/{doi}"
+
+    def _fetch_chunk(self, provider: str, dois: List[str]) -> Optional[Dict[str, str]]:
+        """对一批 DOI 发起单个来源的批量请求，并逐 DOI 写入缓存（含“无摘要”的答复）。"""
+        found = _BATCH_FETCHERS[provider](
+            dois, self.timeout, on_request=partial(self._count_request, provider)
+        )
+        if found is None or self._cache is None:
+            return found
+        for doi in dois:
+            try:
+                self._cache.set(self._batch_cache_key(provider, doi), None, {"abstract": found.get(doi)})
+            except Exception:
+                pass
+        return found
+
+    def prefetch_by_doi(self, dois: Iterable[str], topic: str = "", max_workers: int = 5) -> Dict[str, str]:
+        """
+        按来源优先级批量预取摘要：每个来源每个请求最多查询 batch_size 个 DOI，
+        只把仍缺摘要的 DOI 交给下一个来源。
+
+        结果保存在获取器内部，后续 fetch_by_doi 会直接命中；
+        已明确答复“无摘要”的来源在逐篇兜底时不会再重复请求。
+
+        Returns:
+            {标准化 DOI: 摘要}（仅本次新查到的条目）
+        """
+        pending: List[str] = []
+        seen: Set[str] = set()
+        for raw in dois:
+            doi = _normalize_doi(str(raw or ""))
+            if doi and doi not in seen and doi not in self._prefetched:
+                seen.add(doi)
+                pending.append(doi)
+        if not pending or int(self.batch_size) <= 1:
+            return {}
+
+        result: Dict[str, str] = {}
+        workers = max(1, int(max_workers))
+        _POOL.reserve(workers)
+        for provider in self._provider_order(topic):
+            if not pending:
+                break
+            size = max(1, min(int(self.batch_size), PROVIDER_BATCH_LIMITS[provider]))
+
+            to_request: List[str] = []
+            for doi in pending:
+                if not _batchable(provider, doi):
+                    continue
+                cached = None
+                if self._cache is not None:
+                    try:
+                        cached = self._cache.get(self._batch_cache_key(provider, doi), None)
+                    except Exception:
+                        cached = None
+                if isinstance(cached, dict):
+                    self._answered.setdefault(doi, set()).add(provider)
+                    if cached.get("abstract"):
+                        self._prefetched[doi] = (provider, str(cached["abstract"]))
+                        result[doi] = str(cached["abstract"])
+                else:
+                    to_request.append(doi)
+
+            chunks = list(_chunks(to_request, size))
+            if chunks:
+                with concurrent.futures.ThreadPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+                    outcomes = list(executor.map(partial(self._fetch_chunk, provider), chunks))
+                for chunk, found in zip(chunks, outcomes):
+                    if found is None:
+                        # 请求失败：不标记为已答复，留给下一个来源 / 逐篇兜底重试
+                        continue
+                    for doi in chunk:
+                        self._answered.setdefault(doi, set()).add(provider)
+                        if found.get(doi):
+                            self._prefetched[doi] = (provider, found[doi])
+                            result[doi] = found[doi]
+
+            pending = [d for d in pending if d not in self._prefetched]
+
+        return result
+
+    # ------------------------------------------------------------------
+    # 单篇获取
+    # ------------------------------------------------------------------
+
+    def _fetch_by_doi(self, doi: str, topic: str) -> Optional[str]:
+        normalized = _normalize_doi(doi)
+        hit = self._prefetched.get(normalized)
+        if hit is not None:
+            provider, abstract = hit
+            self._record_success(provider)
+            return abstract
+
+        answered = self._answered.get(normalized, set())
+        for provider in self._provider_order(topic):
+            if provider in answered:
+                continue
+            abstract = self._single_fetcher(provider)(doi, self.timeout)
+            if abstract:
+                self._record_success(provider)
+                return abstract
+        return None
 
     def fetch_by_doi(self, doi: str, topic: str = "") -> Optional[str]:
         """
@@ -470,27 +926,13 @@ class AbstractFetcher:
         if not doi:
             return None
 
-        self._stats.total_papers += 1
+        self._bump("total_papers")
 
-        # 按 API 优先级依次尝试
-        for fetch_func in self._get_api_priority(topic):
-            abstract = fetch_func(doi, self.timeout)
-            if abstract:
-                # 记录成功的 API
-                raw = getattr(fetch_func, "func", fetch_func)
-                func_name = getattr(raw, "__name__", str(raw))
-                if "semantic_scholar" in func_name:
-                    self._stats.semantic_scholar_success += 1
-                elif "pubmed" in func_name:
-                    self._stats.pubmed_success += 1
-                elif "crossref" in func_name:
-                    self._stats.crossref_success += 1
-                elif "openalex_by_doi" in func_name:
-                    self._stats.openalex_fallback_success += 1
-                self._stats.total_success += 1
-                return abstract
+        abstract = self._fetch_by_doi(doi, topic)
+        if abstract:
+            return abstract
 
-        self._stats.total_failed += 1
+        self._bump("total_failed")
         return None
 
     def fetch_by_title(self, title: str, topic: str = "") -> Optional[str]:
@@ -521,22 +963,26 @@ class AbstractFetcher:
         }
 
         full_url = f"{url}?{urllib.parse.urlencode(params)}"
-        data = _make_request(full_url, self.timeout, cache=self._cache)
+        data = _make_request(
+            full_url,
+            self.timeout,
+            cache=self._cache,
+            on_request=partial(self._count_request, "semantic_scholar"),
+        )
 
         if data and "data" in data and data["data"]:
             paper = data["data"][0]
             # 标题匹配度检查（简单的大小写不敏感比较）
             if title.lower().strip() == paper.get("title", "").lower().strip():
                 if "abstract" in paper and paper["abstract"]:
-                    self._stats.semantic_scholar_success += 1
-                    self._stats.total_success += 1
+                    self._record_success("semantic_scholar")
                     return _clean_abstract(paper["abstract"])
 
         return None
 
     def fetch_batch(self, papers: List[Dict[str, Any]], topic: str = "", max_workers: int = 5) -> List[Dict[str, Any]]:
         """
-        批量获取摘要（并发处理）
+        批量获取摘要（先按来源批量预取，再对剩余条目并发逐篇兜底）
 
         Args:
             papers: 论文列表，每项至少包含 `doi` 和 `abstract` 字段
@@ -544,25 +990,30 @@ class AbstractFetcher:
             max_workers: 最大并发数
 
         Returns:
-            更新后的论文列表（abstract 字段可能被填充）
+            更新后的论文列表（与输入顺序一致；abstract 字段可能被填充）
         """
         self._stats = FetchStatistics()  # 重置统计
 
+        missing_dois = [
+            paper.get("doi") or paper.get("DOI") or ""
+            for paper in papers
+            if not paper.get("abstract")
+        ]
+        self.prefetch_by_doi(missing_dois, topic=topic, max_workers=max_workers)
+
         def enrich_paper(paper: Dict[str, Any]) -> Dict[str, Any]:
             """为单篇论文补充摘要"""
+            self._bump("total_papers")
             if paper.get("abstract"):
                 # 已有摘要，记录统计
-                self._stats.total_papers += 1
-                self._stats.openalex_has_abstract += 1
-                self._stats.total_success += 1
+                self._bump("openalex_has_abstract")
+                self._bump("total_success")
                 return paper
 
-            self._stats.total_papers += 1
-
             # 尝试按 DOI 获取
             doi = paper.get("doi") or paper.get("DOI") or ""
             if doi:
-                abstract = self.fetch_by_doi(doi, topic)
+                abstract = self._fetch_by_doi(doi, topic)
                 if abstract:
                     paper["abstract"] = abstract
                     return paper
@@ -575,19 +1026,20 @@ class AbstractFetcher:
                     paper["abstract"] = abstract
                     return paper
 
-            self._stats.total_failed += 1
+            self._bump("total_failed")
             return paper
 
-        # 并发处理
-        result = []
+        # 并发处理（预取命中的条目不再发请求）
+        _POOL.reserve(max_workers)
         with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {executor.submit(enrich_paper, paper.copy()): paper for paper in papers}
-            for future in concurrent.futures.as_completed(futures):
+            futures = [executor.submit(enrich_paper, paper.copy()) for paper in papers]
+            result = []
+            for paper, future in zip(papers, futures):
                 try:
                     result.append(future.result())
                 except Exception:
                     # 失败时保留原论文
-                    result.append(futures[future])
+                    result.append(paper)
 
         return result
 
@@ -637,6 +1089,12 @@ Examples:
     parser.add_argument("--output", type=Path, help="Output JSONL file path")
     parser.add_argument("--timeout", type=int, default=5, help="API timeout in seconds (default: 5)")
     parser.add_argument("--max-workers", type=int, default=5, help="Max concurrent workers for batch mode (default: 5)")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=50,
+        help="DOIs per batched API request in batch mode; <=1 disables batching (default: 50)",
+    )
     parser.add_argument("--cache-dir", type=Path, default=None, help="API cache directory path (optional)")
     parser.add_argument("--cache-ttl-seconds", type=int, default=86400, help="Cache TTL seconds (default: 86400)")
     parser.add_argument("--no-semantic-scholar", action="store_true", help="Disable Semantic Scholar API")
@@ -653,6 +1111,7 @@ Examples:
         enable_crossref=not args.no_crossref,
         cache_dir=args.cache_dir,
         cache_ttl_seconds=int(args.cache_ttl_seconds),
+        batch_size=int(args.batch_size),
     )
 
     # 单 DOI 模式
@@ -15,10 +15,10 @@ openalex_search.py - 使用 OpenAlex 进行快速检索并生成 papers.jsonl
 import argparse
 import json
 import logging
-import random
 import re
 import sys
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
@@ -65,11 +65,23 @@ def _normalize_doi(raw: str) -> str:
     return raw.lower()
 
 
-def _reconstruct_abstract(abstract_inverted_index: Optional[Dict[str, Any]]) -> str:
-    if not abstract_inverted_index:
-        return ""
+# 批量检索只取 _work_to_paper 用到的顶层字段（select= 投影），整页响应体积约为完整 work 的 1/5
+OPENALEX_SELECT_FIELDS = (
+    "id",
+    "doi",
+    "title",
+    "publication_year",
+    "primary_location",
+    "authorships",
+    "abstract_inverted_index",
+)
+
+
+def _reconstruct_abstract_sparse(abstract_inverted_index: Dict[str, Any]) -> str:
     positions: Dict[int, str] = {}
     for token, idxs in abstract_inverted_index.items():
+        if not isinstance(idxs, list):
+            continue
         for idx in idxs:
             if idx not in positions:
                 positions[idx] = token
@@ -78,6 +90,26 @@ def _reconstruct_abstract(abstract_inverted_index: Optional[Dict[str, Any]]) ->
     return " ".join(positions[i] for i in sorted(positions))
 
 
+def _reconstruct_abstract(abstract_inverted_index: Optional[Dict[str, Any]]) -> str:
+    """
+    单遍还原 abstract_inverted_index：位置总数即词数，按下标直接写入预分配列表，
+    省去中间 dict 与排序。逆序遍历 token，使同一位置上“先出现的 token 获胜”（与旧实现一致）；
+    位置有空洞/重复/为负时退回稀疏实现。
+    """
+    if not abstract_inverted_index:
+        return ""
+    try:
+        words: list[Optional[str]] = [None] * sum(map(len, abstract_inverted_index.values()))
+        for token, idxs in reversed(abstract_inverted_index.items()):
+            for idx in idxs:
+                if idx < 0:
+                    raise IndexError(idx)
+                words[idx] = token
+        return " ".join(words)  # type: ignore[arg-type]
+    except (IndexError, TypeError):
+        return _reconstruct_abstract_sparse(abstract_inverted_index)
+
+
 def _work_to_paper(work: Dict[str, Any], abstract_fetcher: Optional["AbstractFetcher"] = None, topic: str = "") -> Dict[str, Any]:
     doi = _normalize_doi(work.get("doi") or "")
     venue = ""
@@ -137,6 +169,7 @@ def _enrich_missing_abstracts(
     min_abstract_chars: int,
     max_papers_total: int,
     abstract_timeout: int,
+    batch_size: int = 50,
 ) -> None:
     """
     对缺失摘要的条目做“有限补齐”：
@@ -155,7 +188,7 @@ def _enrich_missing_abstracts(
     backoff_base_seconds = float(backoff_base_seconds)
 
     # 初始化 fetcher（优先复用 cache_dir，减少重复请求/限流风险）
-    fetcher = AbstractFetcher(timeout=int(abstract_timeout), cache_dir=cache_dir)
+    fetcher = AbstractFetcher(timeout=int(abstract_timeout), cache_dir=cache_dir, batch_size=int(batch_size))
 
     # 优先补齐：有 DOI 的缺摘要文献
     def _needs(p: Dict[str, Any]) -> bool:
@@ -167,6 +200,9 @@ def _enrich_missing_abstracts(
     if max_papers_total > 0:
         candidates = candidates[:max_papers_total]
 
+    # 先按来源批量查询 DOI，逐篇循环只处理批量未命中的条目
+    fetcher.prefetch_by_doi([str(p.get("doi") or "") for p in candidates], topic=topic)
+
     for p in candidates:
         doi = str(p.get("doi") or "").strip()
         title = str(p.get("title") or "").strip()
@@ -268,6 +304,7 @@ def search_openalex(
     enrich_abstracts: Optional[bool] = None,  # None=follow config.yaml; True/False=explicit override
     abstract_timeout: Optional[int] = None,
     cache_dir: Optional[Path] = None,  # API 缓存目录
+    rate_limiter: Optional[Any] = None,  # 可选：响应状态/限流头反馈给 RateLimiter
 ) -> list[Dict[str, Any]]:
     try:
         import requests  # type: ignore
@@ -310,17 +347,27 @@ def search_openalex(
         }
     )
 
+    paging_cfg = (cfg.get("search") or {}).get("openalex_paging") if isinstance(cfg.get("search"), dict) else None
+    paging_cfg = paging_cfg if isinstance(paging_cfg, dict) else {}
+    select_fields = bool(paging_cfg.get("select_fields", True))
+    prefetch_next_page = bool(paging_cfg.get("prefetch_next_page", True))
+    protection_cfg = (cfg.get("search") or {}).get("rate_limit_protection") if isinstance(cfg.get("search"), dict) else None
+    oa_protection = (protection_cfg or {}).get("openalex") if isinstance(protection_cfg, dict) else None
+    polite_delay = float((oa_protection or {}).get("polite_delay", 0.25) if isinstance(oa_protection, dict) else 0.25)
+
     def fetch_with_cursor(search_query: str) -> list[Dict[str, Any]]:
         """
         Cursor-based pagination (preferred by OpenAlex for deep retrieval).
 
         Notes:
         - We still cap at max_results to avoid unbounded queries.
-        - We keep a small polite delay to reduce burstiness.
+        - `select=` projects only the fields _work_to_paper needs (smaller payloads).
+        - The next-cursor request is issued in a background thread while the current page
+          is converted; requests are spaced by the polite delay (or the shared rate limiter)
+          measured between request starts instead of sleeping after each page.
         """
         url = "https://api.openalex.org/works"
         per_page = min(200, max(1, max_results))
-        cursor = "*"
         out: list[Dict[str, Any]] = []
 
         filters = []
@@ -330,7 +377,9 @@ def search_openalex(
             filters.append(f"to_publication_date:{max_year}-12-31")
         filter_str = ",".join(filters) if filters else None
 
-        while cursor and len(out) < max_results:
+        last_request = [0.0]
+
+        def fetch_page(cursor: str) -> Dict[str, Any]:
             params: Dict[str, Any] = {
                 "search": search_query,
                 "per-page": per_page,
@@ -340,36 +389,64 @@ def search_openalex(
                 params["mailto"] = mailto
             if filter_str:
                 params["filter"] = filter_str
+            if select_fields:
+                params["select"] = ",".join(OPENALEX_SELECT_FIELDS)
 
             # 尝试从缓存获取
-            data = None
             if cache_storage is not None:
                 cached_data = cache_storage.get(url, params)
                 if cached_data is not None:
-                    data = cached_data
                     logger.debug(f"缓存命中: cursor={cursor[:8]}...")
+                    return cached_data
+
+            # 缓存未命中或未启用缓存时，调用 API（礼貌间隔从上一次请求发出时算起）
+            if rate_limiter is not None and last_request[0] > 0:
+                rate_limiter.acquire("openalex")
+            else:
+                gap = polite_delay - (time.monotonic() - last_request[0])
+                if last_request[0] > 0 and gap > 0:
+                    time.sleep(gap)
+            last_request[0] = time.monotonic()
+            resp = session.get(url, params=params, timeout=30)
+            if rate_limiter is not None:
+                rate_limiter.observe_response("openalex", resp.status_code, resp.headers)
+            resp.raise_for_status()
+            data = resp.json()
 
-            # 缓存未命中或未启用缓存时，调用 API
-            if data is None:
-                resp = session.get(url, params=params, timeout=30)
-                resp.raise_for_status()
-                data = resp.json()
+            # 保存到缓存
+            if cache_storage is not None:
+                cache_storage.set(url, params, data)
+            return data
 
-                # 保存到缓存
-                if cache_storage is not None:
-                    cache_storage.set(url, params, data)
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch_next_page else None
+        try:
+            data: Optional[Dict[str, Any]] = fetch_page("*")
+            while data is not None and len(out) < max_results:
+                results = data.get("results", []) or []
+                if not results:
+                    break
 
-            results = data.get("results", []) or []
-            if not results:
-                break
+                # 先发出下一页请求，再解析当前页
+                cursor = (data.get("meta") or {}).get("next_cursor")
+                remaining = max_results - len(out) - len(results)
+                pending: Optional[Future] = None
+                if cursor and remaining > 0 and executor is not None:
+                    pending = executor.submit(fetch_page, cursor)
 
-            for work in results:
-                out.append(_work_to_paper(work, abstract_fetcher=None, topic=query))
-                if len(out) >= max_results:
-                    break
+                for work in results:
+                    out.append(_work_to_paper(work, abstract_fetcher=None, topic=query))
+                    if len(out) >= max_results:
+                        break
 
-            cursor = (data.get("meta") or {}).get("next_cursor")
-            time.sleep(0.25 + random.random() * 0.25)
+                if pending is not None:
+                    data = pending.result()
+                elif cursor and len(out) < max_results:
+                    data = fetch_page(cursor)
+                else:
+                    data = None
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
 
         return out
 
@@ -432,6 +509,7 @@ def search_openalex(
             min_abstract_chars=int(ae.get("min_abstract_chars", 80)),
             max_papers_total=int(ae.get("max_papers_total", 200)),
             abstract_timeout=timeout_seconds,
+            batch_size=int(ae.get("batch_size", 50) or 0),
         )
 
     return deduped
@@ -11,15 +11,18 @@ pipeline_runner.py - 相关性驱动的系统综述 Pipeline Runner
 from __future__ import annotations
 
 import argparse
+import hashlib
+import importlib
 import json
 import os
 import re
 import subprocess
 import sys
+from contextlib import contextmanager
 from dataclasses import dataclass, asdict, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 import io
 
 import yaml
@@ -45,6 +48,17 @@ def _default_bensz_work_dir(topic: str) -> Path:
     raise ValueError(f"无法在 {root} 下分配唯一工作目录: {base}")
 
 
+@contextmanager
+def _working_directory(path: Path) -> Iterator[None]:
+    """临时切换 cwd（进程内执行阶段脚本时与子进程 cwd=work_dir 的语义保持一致）。"""
+    previous = Path.cwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
 # ============================================================================
 # 数据模型
 # ============================================================================
@@ -61,6 +75,8 @@ class PipelineState:
     output_files: Dict[str, str] = field(default_factory=dict)
     config: Dict[str, Any] = field(default_factory=dict)
     metrics: Dict[str, Any] = field(default_factory=dict)
+    # 阶段指纹：输入文件内容 + 相关配置 + 脚本版本的哈希（用于自动跳过未变化的阶段）
+    stage_fingerprints: Dict[str, str] = field(default_factory=dict)
 
     def to_json(self, path: Path) -> None:
         path.write_text(json.dumps(asdict(self), ensure_ascii=False, indent=2), encoding="utf-8")
@@ -111,6 +127,49 @@ class PipelineRunner:
         "高分优先",
     ]
 
+    # 可进程内执行的阶段脚本：均提供 main(argv) 且只做本地 JSONL/Markdown 处理
+    IN_PROCESS_SCRIPTS = {
+        "dedupe_papers.py",
+        "select_references.py",
+        "build_evidence_cards.py",
+        "update_working_conditions_data_extraction.py",
+    }
+
+    # 数据抽取表渲染行数上限（阶段5）
+    DATA_EXTRACTION_MAX_ROWS = 200000
+
+    # 阶段指纹的组成：脚本（版本=文件内容哈希）与相关配置段（点分路径）
+    STAGE_SCRIPTS = {
+        "1_search": ["multi_query_search.py", "openalex_search.py", "semantic_scholar_search.py", "crossref_search.py"],
+        "2_dedupe": ["dedupe_papers.py", "jsonl_stream.py"],
+        "3_score": [],
+        "4_select": ["select_references.py", "jsonl_stream.py"],
+        "4.5_word_budget": ["plan_word_budget.py"],
+        "5_write": [
+            "multi_source_abstract.py",
+            "build_evidence_cards.py",
+            "update_working_conditions_data_extraction.py",
+            "jsonl_stream.py",
+        ],
+        "6_validate": [
+            "validate_word_budget.py",
+            "validate_counts.py",
+            "validate_review_tex.py",
+            "validate_subtopic_count.py",
+            "generate_validation_report.py",
+        ],
+        "7_export": ["compile_latex_with_bibtex.py", "convert_latex_to_word.py"],
+    }
+    STAGE_CONFIG_KEYS = {
+        "1_search": ["search"],
+        "2_dedupe": ["dedupe"],
+        "4_select": ["selection", "scoring", "search.abstract_enrichment.min_abstract_chars"],
+        "4.5_word_budget": ["word_budget", "scoring.default_word_range"],
+        "5_write": ["writing", "search.abstract_enrichment", "output"],
+        "6_validate": ["validation", "search.abstract_enrichment.min_abstract_chars"],
+        "7_export": ["latex", "word", "output"],
+    }
+
     STAGES = {
         "0_setup": "初始化与参数收集",
         "1_search": "文献检索",
@@ -213,6 +272,12 @@ class PipelineRunner:
         output_cfg = self.config.get("output", {}) if isinstance(self.config, dict) else {}
         self.output_templates = output_cfg
 
+        pipeline_cfg = self.config.get("pipeline", {}) if isinstance(self.config, dict) else {}
+        pipeline_cfg = pipeline_cfg if isinstance(pipeline_cfg, dict) else {}
+        self.in_process = bool(pipeline_cfg.get("in_process", False))
+        self.memoize = bool(pipeline_cfg.get("memoize", False))
+        self._file_hash_cache: Dict[tuple, str] = {}
+
         self.state = PipelineState(
             topic=self.topic,
             domain=self.domain,
@@ -250,6 +315,8 @@ class PipelineRunner:
         self.state.to_json(self._state_file())
 
     def _run_script(self, script_name: str, args: List[str]) -> bool:
+        if self.in_process and script_name in self.IN_PROCESS_SCRIPTS:
+            return self._run_script_in_process(script_name, args)
         script_path = Path(__file__).parent / script_name
         cmd = [sys.executable, str(script_path)] + args
         # 固定 cwd 到 work_dir：避免相对路径输出散落到启动目录，影响 resume 与产物隔离
@@ -262,6 +329,78 @@ class PipelineRunner:
         )
         return False
 
+    def _run_script_in_process(self, script_name: str, args: List[str]) -> bool:
+        """在当前解释器中调用脚本的 main(argv)；失败语义与子进程模式一致（返回 False 并打印命令）。"""
+        scripts_dir = str(Path(__file__).parent)
+        if scripts_dir not in sys.path:
+            sys.path.insert(0, scripts_dir)
+        rc: Any = 0
+        try:
+            module = importlib.import_module(Path(script_name).stem)
+            with _working_directory(self.work_dir):
+                rc = module.main(list(args))
+        except SystemExit as e:
+            rc = e.code
+            if rc is not None and not isinstance(rc, int):
+                print(rc, file=sys.stderr)
+                rc = 1
+        except Exception as e:  # noqa: BLE001
+            print(f"✗ 进程内执行异常: {e}", file=sys.stderr)
+            rc = 1
+        if not rc:
+            return True
+        print(
+            f"✗ 运行脚本失败（exit={rc}, in-process）: {script_name} {' '.join(args)} (cwd={self.work_dir})",
+            file=sys.stderr,
+        )
+        return False
+
+    def _stream_selected_to_local_stages(
+        self, selected: Path, cards_path: Optional[Path], abstract_max_chars: int
+    ) -> tuple[bool, bool]:
+        """
+        进程内执行阶段5的两个本地阶段：逐行解析 selected，一次遍历同时
+        流式写出证据卡（cards_path 为 None 时跳过）并按 DOI 汇集数据抽取表记录。
+
+        返回 (证据卡是否成功, 数据抽取表是否已写入)；未写入时调用方回退到按脚本执行。
+        """
+        scripts_dir = str(Path(__file__).parent)
+        if scripts_dir not in sys.path:
+            sys.path.insert(0, scripts_dir)
+        try:
+            jsonl_stream = importlib.import_module("jsonl_stream")
+            cards = importlib.import_module("build_evidence_cards")
+            extraction = importlib.import_module("update_working_conditions_data_extraction")
+
+            records = jsonl_stream.iter_jsonl(selected, skip_invalid=True)
+            by_doi: Dict[str, Dict[str, Any]] = {}
+            if cards_path is None:
+                by_doi = extraction.index_papers_by_doi(records)
+                cards_ok = True
+            else:
+
+                def tap(papers):
+                    for paper in papers:
+                        key = extraction.paper_key(paper)
+                        if key:
+                            by_doi[key] = paper
+                        yield paper
+
+                count = jsonl_stream.write_jsonl(cards_path, cards.iter_cards(tap(records), abstract_max_chars))
+                cards_ok = count > 0
+                if not cards_ok:
+                    # 与脚本模式一致：没有记录时不留下空的证据卡文件
+                    cards_path.unlink()
+                    print(f"no papers loaded: {selected}", file=sys.stderr)
+
+            extraction.write_data_extraction_table(
+                self.data_extraction_table.resolve(), by_doi, self.DATA_EXTRACTION_MAX_ROWS
+            )
+        except Exception as e:  # noqa: BLE001
+            print(f"✗ 进程内执行异常: {e}", file=sys.stderr)
+            return False, False
+        return cards_ok, True
+
     def _run_script_capture_output(self, script_name: str, args: List[str]) -> tuple[bool, str]:
         """运行脚本并捕获 stdout 输出，返回 (成功状态, 输出文本)"""
         script_path = Path(__file__).parent / script_name
@@ -283,6 +422,105 @@ class PipelineRunner:
         tpl = self.output_templates.get(key, f"{self.file_stem}_{key}.txt")
         return self.work_dir / tpl.format(topic=self.file_stem)
 
+    # ---------------- stage memoization ---------------- #
+    def _hash_file(self, path: Path) -> str:
+        """文件内容哈希（同一次运行内按 (path, size, mtime) 缓存）；缺失文件记为 'missing'。"""
+        try:
+            st = path.stat()
+        except OSError:
+            return "missing"
+        key = (str(path), st.st_size, st.st_mtime_ns)
+        cached = self._file_hash_cache.get(key)
+        if cached is None:
+            h = hashlib.sha256()
+            with path.open("rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    h.update(chunk)
+            cached = self._file_hash_cache[key] = h.hexdigest()
+        return cached
+
+    def _config_value(self, dotted: str) -> Any:
+        node: Any = self.config
+        for part in dotted.split("."):
+            if not isinstance(node, dict):
+                return None
+            node = node.get(part)
+        return node
+
+    def _stage_input_files(self, name: str) -> Dict[str, Path]:
+        """各阶段的输入文件（按约定路径而非 state 推导，避免阶段自身改写 state 后指纹漂移）。"""
+        a = self.artifacts_dir
+        stem = self.file_stem
+        selected = a / f"selected_papers_{stem}.jsonl"
+        if name == "1_search":
+            return {"queries": a / f"queries_{stem}.json"}
+        if name == "2_dedupe":
+            return {"papers": Path(self.state.input_files.get("papers", "") or a / f"papers_{stem}.jsonl")}
+        if name == "3_score":
+            return {"deduped": a / f"papers_deduped_{stem}.jsonl", "scored": a / f"scored_papers_{stem}.jsonl"}
+        if name == "4_select":
+            return {"scored": Path(self.state.input_files.get("scored_papers", "") or a / f"scored_papers_{stem}.jsonl")}
+        if name == "4.5_word_budget":
+            return {"selected": selected}
+        if name == "5_write":
+            return {"selected": selected, "word_budget_final": a / self.word_budget_final}
+        if name == "6_validate":
+            return {
+                "working_conditions": self._output_path("working_conditions"),
+                "review_tex": self._output_path("review_tex"),
+                "references_bib": self._output_path("references_bib"),
+                "word_budget_final": a / self.word_budget_final,
+                "selected": Path(self.state.input_files.get("selected_papers", "") or selected),
+            }
+        if name == "7_export":
+            return {"review_tex": self._output_path("review_tex"), "references_bib": self._output_path("references_bib")}
+        return {}
+
+    def _stage_fingerprint(self, name: str) -> str:
+        """阶段指纹 = sha256(输入文件内容哈希 + 相关配置 + 脚本版本 + 运行参数)。"""
+        scripts_dir = Path(__file__).parent
+        payload = {
+            "stage": name,
+            "params": {
+                "topic": self.topic,
+                "review_level": self.review_level,
+                "file_stem": self.file_stem,
+                "target_words": self.target_words,
+                "target_refs": self.target_refs,
+            },
+            "inputs": {k: self._hash_file(p) for k, p in sorted(self._stage_input_files(name).items())},
+            "config": {k: self._config_value(k) for k in self.STAGE_CONFIG_KEYS.get(name, [])},
+            "scripts": {sc: self._hash_file(scripts_dir / sc) for sc in self.STAGE_SCRIPTS.get(name, [])},
+        }
+        raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _stage_is_fresh(self, name: str) -> bool:
+        recorded = (self.state.stage_fingerprints or {}).get(name)
+        return bool(recorded) and name in self.state.completed_stages and recorded == self._stage_fingerprint(name)
+
+    def _invalidate_stage(self, name: str) -> None:
+        """输入变化需要重算时，清理阶段内“已存在即复用”的派生产物，避免沿用旧结果。"""
+        if name in self.state.completed_stages:
+            self.state.completed_stages.remove(name)
+        self.state.stage_fingerprints.pop(name, None)
+        if name == "1_search":
+            self.state.input_files.pop("papers", None)
+        elif name == "3_score":
+            scored = self.artifacts_dir / f"scored_papers_{self.file_stem}.jsonl"
+            if scored.exists():
+                print(f"  ⚠️ 上游去重结果已变化，请确认 AI 评分文件仍对应新的候选库: {scored}")
+        elif name == "5_write":
+            for derived in (
+                self.artifacts_dir / f"selected_papers_enriched_{self.file_stem}.jsonl",
+                self.artifacts_dir / f"evidence_cards_{self.file_stem}.jsonl",
+            ):
+                if derived.exists():
+                    derived.unlink()
+            selected = self.artifacts_dir / f"selected_papers_{self.file_stem}.jsonl"
+            if selected.exists():
+                self.state.input_files["selected_papers"] = str(selected)
+
     def _write_working_conditions_skeleton(self, path: Path) -> None:
         if path.exists():
             return
@@ -611,6 +849,7 @@ class PipelineRunner:
                         "--output", str(enriched),
                         "--topic", self.topic,
                         "--timeout", str(timeout_seconds),
+                        "--batch-size", str(int(ae.get("batch_size", 50) or 0)),
                     ]
                     if self.cache_dir is not None:
                         enrich_args.extend(
@@ -631,37 +870,47 @@ class PipelineRunner:
             writing_cfg = self.config.get("writing", {}) if isinstance(self.config, dict) else {}
             ev_cfg = (writing_cfg.get("evidence_cards") or {}) if isinstance(writing_cfg.get("evidence_cards"), dict) else {}
             ev_enabled = bool(ev_cfg.get("enabled", True))
+            cards_path: Optional[Path] = None
             if ev_enabled:
                 cards_path = self.artifacts_dir / f"evidence_cards_{self.file_stem}.jsonl"
-                if not cards_path.exists():
-                    max_chars = int(ev_cfg.get("abstract_max_chars", 800) or 800)
-                    ok = self._run_script(
-                        "build_evidence_cards.py",
-                        [
-                            "--input", str(selected),
-                            "--output", str(cards_path),
-                            "--abstract-max-chars", str(max_chars),
-                        ],
-                    )
-                    if ok and cards_path.exists():
-                        self.state.output_files.setdefault("notes", {})
-                        if isinstance(self.state.output_files["notes"], dict):
-                            self.state.output_files["notes"]["evidence_cards"] = str(cards_path)
-                        print(f"  ✓ evidence_cards: {cards_path}")
-                    else:
-                        print("  ⚠️ evidence_cards 生成失败（不阻断写作阶段）", file=sys.stderr)
+                if cards_path.exists():
+                    cards_path = None
+            max_chars = int(ev_cfg.get("abstract_max_chars", 800) or 800)
 
-            self._run_script(
-                "update_working_conditions_data_extraction.py",
-                [
-                    "--md",
-                    str(self.data_extraction_table),
-                    "--papers",
-                    str(selected),
-                    "--max-rows",
-                    "200000",
-                ],
-            )
+            if self.in_process:
+                # 进程内：selected 只解析一遍，记录直接流经证据卡与数据抽取表两个阶段
+                cards_ok, table_ok = self._stream_selected_to_local_stages(selected, cards_path, max_chars)
+            else:
+                cards_ok = cards_path is None or self._run_script(
+                    "build_evidence_cards.py",
+                    [
+                        "--input", str(selected),
+                        "--output", str(cards_path),
+                        "--abstract-max-chars", str(max_chars),
+                    ],
+                )
+                table_ok = False
+            if cards_path is not None:
+                if cards_ok and cards_path.exists():
+                    self.state.output_files.setdefault("notes", {})
+                    if isinstance(self.state.output_files["notes"], dict):
+                        self.state.output_files["notes"]["evidence_cards"] = str(cards_path)
+                    print(f"  ✓ evidence_cards: {cards_path}")
+                else:
+                    print("  ⚠️ evidence_cards 生成失败（不阻断写作阶段）", file=sys.stderr)
+
+            if not table_ok:
+                self._run_script(
+                    "update_working_conditions_data_extraction.py",
+                    [
+                        "--md",
+                        str(self.data_extraction_table),
+                        "--papers",
+                        str(selected),
+                        "--max-rows",
+                        str(self.DATA_EXTRACTION_MAX_ROWS),
+                    ],
+                )
             self.state.output_files["data_extraction_table"] = str(self.data_extraction_table)
 
         print("\n  请生成以下文件后继续：")
@@ -877,7 +1126,11 @@ class PipelineRunner:
         ]
 
         start_idx = resume_from if resume_from is not None else 0
-        if resume_from is None and self.state.completed_stages:
+        # 指纹模式：未显式指定起点时从头逐阶段比对指纹，只重算输入/配置/脚本发生变化的阶段；
+        # 下游阶段的输入是上游产物的内容哈希，因此上游产物变化会自然传导到下游。
+        # 旧版 checkpoint（无指纹记录）沿用“从最后完成阶段之后继续”的语义。
+        memoized = self.memoize and resume_from is None and bool(self.state.stage_fingerprints)
+        if resume_from is None and self.state.completed_stages and not memoized:
             try:
                 last = self.state.completed_stages[-1]
                 stage_names = [s[0] for s in stages]
@@ -889,6 +1142,15 @@ class PipelineRunner:
             if i < start_idx:
                 print(f"⊙ 跳过已完成阶段: {name}")
                 continue
+            if memoized and self._stage_is_fresh(name):
+                print(f"⊙ 跳过未变化阶段: {name}（输入/配置/脚本指纹一致）")
+                continue
+            if memoized:
+                # 仅指纹模式下、记录的指纹与当前不一致时清理派生产物；
+                # 显式 --resume-from 或未开启 memoize 时保持原有“已存在即复用”的恢复语义
+                recorded = self.state.stage_fingerprints.get(name)
+                if recorded and recorded != self._stage_fingerprint(name):
+                    self._invalidate_stage(name)
             print(f"\n▶ 执行阶段: {name} - {self.STAGES.get(name, name)}")
             self.state.current_stage = name
             stage_start = datetime.now().isoformat()
@@ -911,6 +1173,8 @@ class PipelineRunner:
                 print(f"✗ 阶段 {name} 未完成")
                 self.save_state()
                 return False
+            self.state.stage_fingerprints[name] = self._stage_fingerprint(name)
+            self.save_state()
 
         # Pipeline 完成后自动整理工作目录
         print("\n[整理] 移动中间文件到隐藏目录")
@@ -6,6 +6,9 @@ plan_word_budget.py - 为 research-literature-review 生成 per-paper/per-sectio
 - 70% 引用段落 + 30% 无引用段落（摘要/结论/展望等），支持无引用节点写入空文献 ID 行。
 - 按大纲节点权重分配，再按文献 score softmax+扰动分配；综/述按基准比例拆分并可随 score 轻微倾斜。
 - 独立运行 3 次（不同种子），输出 run1/2/3 CSV 并对齐取均值生成 final CSV；检查总字数误差 ≤ tolerance，否则按比例缩放。
+- 可选 Monte-Carlo：额外 N 次采样（word_budget.monte_carlo_runs）与种子运行一起取均值，使 final 更稳定。
+  安装 numpy 时以“行（文献×大纲）× 采样次数”矩阵批量计算分段 softmax 与均值；
+  种子运行沿用 Python random 的扰动序列，因此 run1/2/3 CSV 与纯 Python 实现一致。
 
 输入：
   - --selected: 选中文献 jsonl（需含 id/doi、score、subtopic）
@@ -35,6 +38,13 @@ import yaml
 
 from path_scope import get_effective_scope_root, resolve_and_check
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy 可选；缺失时退回纯 Python 实现（不支持 Monte-Carlo）
+    np = None  # type: ignore[assignment]
+
+Row = Tuple[str, str, float, float]
+
 
 # ---------------------------------------------------------------------------
 # 数据模型
@@ -269,6 +279,191 @@ def align_and_average(runs: List[List[Tuple[str, str, float, float]]]) -> List[T
     return averaged
 
 
+# ---------------------------------------------------------------------------
+# 矩阵化实现（numpy）
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class BudgetLayout:
+    """
+    所有采样共享的行结构。行顺序与 run_once 输出一致（按大纲节点，再按节内文献）。
+
+    noisy 行（有文献的引用段）参与分段 softmax；其余为固定行（无引用段/无文献的引用段）。
+    """
+
+    keys: List[Tuple[str, str]]
+    alloc: Any            # (R,) 每行所在大纲节点的字数配额
+    zong_ratio: Any       # (R,) 每行“综”比例（固定行为 summary_ratio）
+    noisy_rows: Any       # (N,) noisy 行在 keys 中的下标
+    base_scores: Any      # (N,) noisy 行的文献 score
+    seg_starts: Any       # (S,) 每个 softmax 分段在 noisy 行中的起点
+    seg_index: Any        # (N,) noisy 行所属分段
+    fixed_rows: Any       # (F,) 固定行下标
+    fixed_zong: Any       # (F,)
+    fixed_shu: Any        # (F,)
+
+
+def build_layout(sections: List[Section], papers: List[Paper], target_words: float, cfg: Dict[str, Any]) -> BudgetLayout:
+    ratio = cfg.get("ratio", {})
+    summary_ratio = float(cfg.get("summary_ratio", 0.55))
+    commentary_ratio = float(cfg.get("commentary_ratio", 0.45))
+    section_alloc = allocate_to_sections(
+        sections,
+        papers,
+        target_words * float(ratio.get("cited", 0.7)),
+        target_words * float(ratio.get("non_cited", 0.3)),
+    )
+
+    keys: List[Tuple[str, str]] = []
+    alloc: List[float] = []
+    zong_ratio: List[float] = []
+    noisy_rows: List[int] = []
+    base_scores: List[float] = []
+    seg_starts: List[int] = []
+    seg_index: List[int] = []
+    fixed_rows: List[int] = []
+    fixed_zong: List[float] = []
+    fixed_shu: List[float] = []
+
+    for sec in sections:
+        a = section_alloc.get(sec.sid, 0.0)
+        ps: List[Paper] = []
+        if sec.cited:
+            ps = [p for p in papers if p.subtopic == sec.subtopic] if sec.subtopic else papers
+        if not ps:
+            fixed_rows.append(len(keys))
+            fixed_zong.append(a * summary_ratio)
+            fixed_shu.append(a * commentary_ratio)
+            keys.append(("", sec.title))
+            alloc.append(a)
+            zong_ratio.append(summary_ratio)
+            continue
+        seg_starts.append(len(noisy_rows))
+        for p in ps:
+            tilt = (p.score - 5.0) / 10.0
+            noisy_rows.append(len(keys))
+            base_scores.append(p.score)
+            seg_index.append(len(seg_starts) - 1)
+            keys.append((p.pid, sec.title))
+            alloc.append(a)
+            zong_ratio.append(max(0.1, min(0.9, summary_ratio + 0.1 * tilt)))
+
+    return BudgetLayout(
+        keys=keys,
+        alloc=np.asarray(alloc, dtype=float),
+        zong_ratio=np.asarray(zong_ratio, dtype=float),
+        noisy_rows=np.asarray(noisy_rows, dtype=np.intp),
+        base_scores=np.asarray(base_scores, dtype=float),
+        seg_starts=np.asarray(seg_starts, dtype=np.intp),
+        seg_index=np.asarray(seg_index, dtype=np.intp),
+        fixed_rows=np.asarray(fixed_rows, dtype=np.intp),
+        fixed_zong=np.asarray(fixed_zong, dtype=float),
+        fixed_shu=np.asarray(fixed_shu, dtype=float),
+    )
+
+
+def seeded_noise(layout: BudgetLayout, seed: int, noise_strength: float) -> Any:
+    """与 run_once 完全相同的扰动序列（random.seed + 逐行 uniform），形状 (N, 1)。"""
+    rng = random.Random(seed)
+    n = len(layout.noisy_rows)
+    u = np.fromiter((rng.random() for _ in range(n)), dtype=float, count=n)
+    return (-noise_strength + (noise_strength - -noise_strength) * u)[:, None]
+
+
+def simulate(layout: BudgetLayout, noise: Any) -> Tuple[Any, Any]:
+    """
+    批量计算 k 次采样的综/述字数：noise 形状 (N, k)，返回 zong/shu 形状 (R, k)。
+
+    分段 softmax：每个引用段一段，段内减最大值后取 exp，再按段求和归一化。
+    """
+    k = noise.shape[1]
+    zong = np.empty((len(layout.keys), k))
+    shu = np.empty((len(layout.keys), k))
+    if len(layout.fixed_rows):
+        zong[layout.fixed_rows] = layout.fixed_zong[:, None]
+        shu[layout.fixed_rows] = layout.fixed_shu[:, None]
+    if len(layout.noisy_rows):
+        x = layout.base_scores[:, None] + noise
+        x -= np.maximum.reduceat(x, layout.seg_starts, axis=0)[layout.seg_index]
+        np.exp(x, out=x)
+        x /= np.add.reduceat(x, layout.seg_starts, axis=0)[layout.seg_index]
+        rows = layout.noisy_rows
+        total = layout.alloc[rows][:, None] * x
+        z = total * layout.zong_ratio[rows][:, None]
+        zong[rows] = z
+        shu[rows] = total - z
+    return zong, shu
+
+
+def _rows_from_columns(keys: List[Tuple[str, str]], zong: Any, shu: Any) -> List[Row]:
+    return [(pid, sec, float(z), float(s)) for (pid, sec), z, s in zip(keys, zong.tolist(), shu.tolist())]
+
+
+def _merge_duplicate_keys(keys: List[Tuple[str, str]], zong: Any, shu: Any) -> List[Row]:
+    """与 align_and_average 相同：同一 (文献ID, 大纲) 的多行合并为均值，保持首次出现顺序。"""
+    if len(set(keys)) == len(keys):
+        return _rows_from_columns(keys, zong, shu)
+    acc: Dict[Tuple[str, str], Tuple[float, float, int]] = {}
+    for key, z, s in zip(keys, zong.tolist(), shu.tolist()):
+        a_z, a_s, n = acc.get(key, (0.0, 0.0, 0))
+        acc[key] = (a_z + z, a_s + s, n + 1)
+    return [(pid, sec, a_z / n, a_s / n) for (pid, sec), (a_z, a_s, n) in acc.items()]
+
+
+def plan_budget(
+    sections: List[Section],
+    papers: List[Paper],
+    target_words: float,
+    cfg: Dict[str, Any],
+    seeds: List[int],
+    monte_carlo_runs: int = 0,
+    *,
+    chunk_size: int = 512,
+) -> Tuple[List[List[Row]], List[Row]]:
+    """
+    生成各种子运行的行与最终均值行（未做 tolerance 缩放）。
+
+    final = (种子运行 + monte_carlo_runs 次额外采样) 的逐行均值；额外采样按 chunk_size 分块，
+    内存占用与采样次数无关。numpy 不可用时退回 run_once/align_and_average，并忽略 Monte-Carlo。
+    """
+    monte_carlo_runs = max(0, int(monte_carlo_runs))
+    if np is None:
+        runs = [run_once(sections, papers, target_words, cfg, seed) for seed in seeds]
+        if monte_carlo_runs:
+            print("⚠️ 未安装 numpy：忽略 monte_carlo_runs，仅对种子运行取均值")
+        return runs, align_and_average(runs)
+
+    noise_strength = float(cfg.get("noise_strength", 0.1))
+    layout = build_layout(sections, papers, target_words, cfg)
+
+    runs: List[List[Row]] = []
+    sum_z = np.zeros(len(layout.keys))
+    sum_s = np.zeros(len(layout.keys))
+    for seed in seeds:
+        zong, shu = simulate(layout, seeded_noise(layout, seed, noise_strength))
+        runs.append(_rows_from_columns(layout.keys, zong[:, 0], shu[:, 0]))
+        sum_z += zong[:, 0]
+        sum_s += shu[:, 0]
+
+    if monte_carlo_runs:
+        rng = np.random.default_rng(list(seeds) or [0])
+        done = 0
+        while done < monte_carlo_runs:
+            k = min(chunk_size, monte_carlo_runs - done)
+            # 按“采样次数”为外层抽样后转置：每次采样消耗的随机流与分块大小无关
+            noise = rng.uniform(-noise_strength, noise_strength, size=(k, len(layout.noisy_rows))).T
+            zong, shu = simulate(layout, noise)
+            sum_z += zong.sum(axis=1)
+            sum_s += shu.sum(axis=1)
+            done += k
+
+    n_runs = len(seeds) + monte_carlo_runs
+    if n_runs == 0:
+        return runs, []
+    return runs, _merge_duplicate_keys(layout.keys, sum_z / n_runs, sum_s / n_runs)
+
+
 def total_words(rows: List[Tuple[str, str, float, float]]) -> float:
     return sum(z + s for _, _, z, s in rows)
 
@@ -300,6 +495,12 @@ def parse_args() -> argparse.Namespace:
     )
     p.add_argument("--target-words", type=float, help="override target words")
     p.add_argument("--review-level", default="premium", choices=["premium", "standard", "basic"], help="review level for inferring target words")
+    p.add_argument(
+        "--monte-carlo-runs",
+        type=int,
+        default=None,
+        help="extra sampling runs averaged into the final CSV (default: config word_budget.monte_carlo_runs)",
+    )
     return p.parse_args()
 
 
@@ -343,17 +544,17 @@ def main() -> int:
         target_words = 15000.0
 
     seeds = cfg.get("seeds", [17, 23, 43])
-    runs: List[List[Tuple[str, str, float, float]]] = []
+    monte_carlo_runs = int(args.monte_carlo_runs if args.monte_carlo_runs is not None else cfg.get("monte_carlo_runs", 0) or 0)
     out_dir = args.output_dir
 
-    for i, seed in enumerate(seeds, 1):
-        rows = run_once(sections, papers, target_words, cfg, seed)
+    runs, final_rows = plan_budget(sections, papers, target_words, cfg, seeds, monte_carlo_runs)
+    for i, rows in enumerate(runs, 1):
         run_path = out_dir / cfg.get("outputs", {}).get("run_pattern", "word_budget_run{n}.csv").format(n=i)
         write_csv(run_path, rows)
-        runs.append(rows)
         print(f"✓ 生成 {run_path}")
+    if monte_carlo_runs and np is not None:
+        print(f"✓ Monte-Carlo：{len(seeds)} 次种子运行 + {monte_carlo_runs} 次额外采样取均值")
 
-    final_rows = align_and_average(runs)
     total = total_words(final_rows)
     tol = float(cfg.get("tolerance", 0.05))
     if target_words > 0 and abs(total - target_words) / target_words > tol:
@@ -6,15 +6,25 @@ rate_limiter.py - provider 配额管理 + 智能路由
   - Semantic Scholar 零配置场景下的速率限制（默认 100/min）
   - 在多查询场景中自动把主力负载放到 OpenAlex（无官方限制）
   - 对包含 DOI 的查询优先走 Crossref 进行权威校验/补全
+  - 可选：令牌桶放到跨进程共享的 SQLite 状态文件（shared_rate_limiter.py），
+    并按 Retry-After / X-RateLimit-* 响应头自适应调整速率
 """
 
 from __future__ import annotations
 
 import re
+import threading
 import time
 from collections import defaultdict
 from dataclasses import dataclass
-from typing import Dict, Optional, Tuple
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+try:
+    from shared_rate_limiter import SharedTokenBucket, parse_rate_limit_headers
+except ImportError:  # pragma: no cover
+    SharedTokenBucket = None  # type: ignore[assignment,misc]
+    parse_rate_limit_headers = None  # type: ignore[assignment]
 
 
 _DOI_RE = re.compile(r"(10\\.[0-9]{4,9}/[-._;()/:A-Za-z0-9]+)", re.IGNORECASE)
@@ -48,6 +58,8 @@ class RateLimiter:
 
         ss_cfg = cfg.get("semantic_scholar", {}) if isinstance(cfg.get("semantic_scholar", {}), dict) else {}
         oa_cfg = cfg.get("openalex", {}) if isinstance(cfg.get("openalex", {}), dict) else {}
+        cr_cfg = cfg.get("crossref", {}) if isinstance(cfg.get("crossref", {}), dict) else {}
+        shared_cfg = cfg.get("shared", {}) if isinstance(cfg.get("shared", {}), dict) else {}
 
         self.semantic_max_per_minute = int(ss_cfg.get("max_calls_per_minute", 80))
         self.semantic_max_per_session = int(ss_cfg.get("max_calls_per_session", 500))
@@ -55,10 +67,103 @@ class RateLimiter:
         self.semantic_fallback_to_openalex = bool(ss_cfg.get("fallback_to_openalex", True))
 
         self.openalex_polite_delay = float(oa_cfg.get("polite_delay", 0.25))
+        self.crossref_max_per_second = float(cr_cfg.get("max_calls_per_second", 0) or 0)
 
         self._calls = defaultdict(list)  # provider -> timestamps
         self._cooldown_until: Dict[str, float] = {}
+        self._next_slot: Dict[str, float] = {}  # provider -> 下一个可用令牌时间（并发调度用）
+        self._waits: Dict[str, list[float]] = defaultdict(list)  # provider -> 本进程各次等待秒数
         self._session_start = time.time()
+        self._lock = threading.RLock()
+
+        # 跨进程共享令牌桶：失败时静默退回进程内调度
+        self.shared: Optional[Any] = None
+        if self.enabled and SharedTokenBucket is not None and bool(shared_cfg.get("enabled", False)):
+            try:
+                path = shared_cfg.get("path")
+                self.shared = SharedTokenBucket(Path(path).expanduser() if path else None)
+                burst = float(shared_cfg.get("burst", 1) or 1)
+                for provider in ("semantic_scholar", "openalex", "crossref"):
+                    interval = self.min_interval(provider)
+                    if interval > 0:
+                        self.shared.configure(provider, rate=1.0 / interval, capacity=burst)
+            except Exception:
+                self.shared = None
+
+    def min_interval(self, provider: str) -> float:
+        """单个 provider 相邻两次请求的最小间隔（秒），即令牌桶的补充周期。"""
+        provider = str(provider or "").strip()
+        if provider == "semantic_scholar":
+            return 60.0 / max(1, self.semantic_max_per_minute)
+        if provider == "openalex":
+            return max(0.0, self.openalex_polite_delay)
+        if provider == "crossref" and self.crossref_max_per_second > 0:
+            return 1.0 / self.crossref_max_per_second
+        return 0.0
+
+    def reserve(self, provider: str) -> float:
+        """
+        为一次请求预约令牌，返回调用方需要等待的秒数（不记录调用）。
+
+        并发检索时各线程共享同一个 limiter：预约按 provider 串行排队，
+        因此同一 provider 的请求被均匀摊开到配额允许的速率上，无需固定 sleep。
+        """
+        if not self.enabled:
+            return 0.0
+        interval = self.min_interval(provider)
+        if interval <= 0:
+            return 0.0
+        provider = str(provider or "").strip()
+        if self.shared is not None:
+            try:
+                delay = self.shared.reserve(provider)
+            except Exception:
+                delay = None
+            if delay is not None:
+                with self._lock:
+                    self._waits[provider].append(delay)
+                return delay
+        with self._lock:
+            now = time.time()
+            slot = max(now, self._next_slot.get(provider, 0.0), self._cooldown_until.get(provider, 0.0))
+            self._next_slot[provider] = slot + interval
+            delay = max(0.0, slot - now)
+            self._waits[provider].append(delay)
+        return delay
+
+    def acquire(self, provider: str) -> float:
+        """阻塞直到 provider 有可用令牌；返回实际等待秒数。"""
+        delay = self.reserve(provider)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    def observe_response(self, provider: str, status: Optional[int], headers: Optional[Mapping[str, Any]] = None) -> None:
+        """
+        把 provider 的响应状态与限流头反馈给令牌桶（请求完成后、raise_for_status 之前调用）。
+
+        共享模式下由 SharedTokenBucket 自适应调整速率；进程内模式只处理 429 的 Retry-After，
+        把该 provider 的下一个令牌推迟到指定时间之后。
+        """
+        if not self.enabled:
+            return
+        provider = str(provider or "").strip()
+        if self.shared is not None:
+            try:
+                self.shared.observe(provider, status, headers)
+                return
+            except Exception:
+                pass
+        if int(status or 0) != 429 or parse_rate_limit_headers is None:
+            return
+        hint = parse_rate_limit_headers(headers)
+        delay = hint.retry_after if hint.retry_after is not None else hint.reset_after
+        if delay is None:
+            return
+        with self._lock:
+            until = time.time() + delay
+            self._cooldown_until[provider] = max(self._cooldown_until.get(provider, 0.0), until)
+            self._next_slot[provider] = max(self._next_slot.get(provider, 0.0), until)
 
     def can_call(self, provider: str) -> ProviderLimitStatus:
         if not self.enabled:
@@ -68,6 +173,10 @@ class RateLimiter:
         if provider != "semantic_scholar":
             return ProviderLimitStatus(True)
 
+        with self._lock:
+            return self._can_call_locked(provider)
+
+    def _can_call_locked(self, provider: str) -> ProviderLimitStatus:
         now = time.time()
         until = self._cooldown_until.get(provider)
         if until is not None and now < until:
@@ -89,7 +198,8 @@ class RateLimiter:
     def record_call(self, provider: str) -> None:
         if not self.enabled:
             return
-        self._calls[str(provider)].append(time.time())
+        with self._lock:
+            self._calls[str(provider)].append(time.time())
 
     def recommended_provider(self, providers: list[str], query: str = "") -> str:
         """
@@ -124,11 +234,29 @@ class RateLimiter:
     def summary(self) -> Dict[str, Dict[str, float]]:
         now = time.time()
         out: Dict[str, Dict[str, float]] = {}
-        for provider, timestamps in self._calls.items():
+        with self._lock:
+            items = [(p, list(ts)) for p, ts in self._calls.items()]
+            waits = {p: list(w) for p, w in self._waits.items()}
+        for provider, timestamps in items:
             recent_calls = len([t for t in timestamps if now - t < 60])
             out[provider] = {
                 "calls_last_minute": float(recent_calls),
                 "total_calls": float(len(timestamps)),
                 "session_duration_seconds": float(now - self._session_start),
             }
+        # 令牌等待指标（本进程）：排队次数、总/最大等待秒数
+        for provider, w in waits.items():
+            entry = out.setdefault(provider, {"session_duration_seconds": float(now - self._session_start)})
+            entry["token_acquires"] = float(len(w))
+            entry["token_waits"] = float(sum(1 for x in w if x > 0))
+            entry["wait_seconds_total"] = round(sum(w), 3)
+            entry["wait_seconds_max"] = round(max(w), 3) if w else 0.0
+        if self.shared is not None:
+            try:
+                for provider, m in self.shared.metrics().items():
+                    if provider in out:
+                        out[provider]["shared_rate_per_minute"] = m["rate_per_minute"]
+                        out[provider]["shared_throttled"] = m["throttled"]
+            except Exception:
+                pass
         return out
@@ -17,10 +17,11 @@ import math
 import re
 import sys
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import yaml
 
+from jsonl_stream import iter_jsonl, write_jsonl
 from path_scope import get_effective_scope_root, resolve_and_check
 
 try:
@@ -33,19 +34,7 @@ DEFAULT_MIN_ABSTRACT_CHARS = 80
 
 
 def _read_jsonl(path: Path) -> List[Dict[str, Any]]:
-    items: List[Dict[str, Any]] = []
-    with path.open("r", encoding="utf-8", errors="replace") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                obj = json.loads(line)
-            except Exception:
-                continue
-            if isinstance(obj, dict):
-                items.append(obj)
-    return items
+    return list(iter_jsonl(path, skip_invalid=True))
 
 
 def _normalize_key(paper: Dict[str, Any]) -> str:
@@ -276,7 +265,7 @@ def _select_papers(
     return selected, rationale
 
 
-def main() -> int:
+def main(argv: Optional[List[str]] = None) -> int:
     parser = argparse.ArgumentParser(description="Select references by score and generate bib.")
     parser.add_argument("--input", required=True, type=Path, help="Scored papers jsonl")
     parser.add_argument("--output", required=True, type=Path, help="Selected papers jsonl output")
@@ -304,7 +293,7 @@ def main() -> int:
         default=None,
         help="Treat abstract shorter than N chars as missing (default: from config.yaml search.abstract_enrichment.min_abstract_chars, fallback: 80)",
     )
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     scope_root = get_effective_scope_root(args.scope_root)
     if scope_root is not None:
@@ -366,10 +355,7 @@ def main() -> int:
         print("✗ 无可选文献", file=sys.stderr)
         return 1
 
-    args.output.parent.mkdir(parents=True, exist_ok=True)
-    with args.output.open("w", encoding="utf-8") as fo:
-        for p in selected:
-            fo.write(json.dumps(p, ensure_ascii=False) + "\n")
+    write_jsonl(args.output, selected)
 
     # 生成简易 BibTeX
     args.bib.parent.mkdir(parents=True, exist_ok=True)
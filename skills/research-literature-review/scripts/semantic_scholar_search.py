@@ -122,6 +122,8 @@ def search_semantic_scholar(
             raise RuntimeError(st.reason or "semantic_scholar rate-limited")
 
         resp = requests.get(endpoint, params=params, headers=headers, timeout=timeout)
+        # 429/限流头反馈给令牌桶：后续请求按 Retry-After 排队，而不是整段冷却
+        rate_limiter.observe_response("semantic_scholar", resp.status_code, resp.headers)
         resp.raise_for_status()
         data = resp.json()
 
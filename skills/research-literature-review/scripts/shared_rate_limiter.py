@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+shared_rate_limiter.py - 跨进程共享的 provider 令牌桶（SQLite 后端）
+
+背景：
+  - RateLimiter / GlobalRateLimiter 的调用历史只在进程内存里；流水线的并行子进程、
+    同时运行的多个 skill 各自以为独占配额，结果一起撞上 429 再集体冷却
+  - 这里把每个 provider 的令牌桶放进一个 SQLite 文件，所有进程在同一事务里取令牌，
+    因此合计速率不会超过 provider 的真实上限
+
+令牌桶语义：
+  - rate（令牌/秒）按时间补充，最多积累 capacity 个；每次请求取 1 个
+  - 令牌不足时允许“透支”：返回需要等待的秒数，后来者排在透支之后，天然 FIFO
+  - 429 / Retry-After：速率减半，并把令牌压到负数，使桶恰好在 Retry-After 后恢复
+  - X-RateLimit-* / X-Rate-Limit-*：按剩余额度与重置时间重新估算速率（不超过配置上限）
+  - 正常响应且无限流头：速率按配置值的 10% 逐步回升
+
+Usage:
+    bucket = SharedTokenBucket(default_state_path())
+    bucket.configure("semantic_scholar", rate=80 / 60, capacity=1)
+    time.sleep(bucket.reserve("semantic_scholar"))
+    ...
+    bucket.observe("semantic_scholar", resp.status_code, resp.headers)
+
+    python shared_rate_limiter.py --stats          # 查看各 provider 的速率与等待指标
+    python shared_rate_limiter.py --reset-metrics
+"""
+
+from __future__ import annotations
+
+import argparse
+import email.utils
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, Mapping, Optional
+
+STATE_FILE_NAME = "rate_limits.sqlite3"
+MIN_RATE_FRACTION = 0.05   # 自适应降速的下限（相对配置速率）
+RECOVERY_FRACTION = 0.10   # 每次正常响应回升的幅度（相对配置速率）
+THROTTLE_FACTOR = 0.5      # 429 时的乘性降速系数
+
+_NUMBER_RE = re.compile(r"[-+]?\d+(?:\.\d+)?")
+
+
+def default_state_path() -> Path:
+    """
+    默认状态文件位置（所有进程需一致才能共享配额）：
+      - 优先 SYSTEMATIC_LITERATURE_REVIEW_CACHE_DIR（与 API 缓存同目录）
+      - 否则系统临时目录（同一台机器上的并发 skill 共享）
+    """
+    env_cache_dir = os.environ.get("SYSTEMATIC_LITERATURE_REVIEW_CACHE_DIR")
+    if env_cache_dir:
+        return Path(env_cache_dir) / STATE_FILE_NAME
+    return Path(tempfile.gettempdir()) / f"research-literature-review-{STATE_FILE_NAME}"
+
+
+@dataclass
+class RateLimitHint:
+    """从响应头解析出的限流信息（缺失的字段为 None）"""
+
+    retry_after: Optional[float] = None
+    limit: Optional[float] = None
+    remaining: Optional[float] = None
+    reset_after: Optional[float] = None
+    interval: Optional[float] = None
+
+    @property
+    def empty(self) -> bool:
+        return all(v is None for v in (self.retry_after, self.limit, self.remaining, self.reset_after, self.interval))
+
+
+def _first_number(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    m = _NUMBER_RE.search(str(value))
+    return float(m.group(0)) if m else None
+
+
+def _parse_interval(value: Optional[str]) -> Optional[float]:
+    """Crossref 风格的窗口长度：'1s' / '60' / '1m'"""
+    number = _first_number(value)
+    if number is None:
+        return None
+    unit = str(value).strip().lower()[-1:]
+    return number * {"m": 60.0, "h": 3600.0}.get(unit, 1.0)
+
+
+def _parse_retry_after(value: Optional[str], now: float) -> Optional[float]:
+    if value is None:
+        return None
+    text = str(value).strip()
+    try:
+        return max(0.0, float(text))
+    except ValueError:
+        pass
+    try:
+        dt = email.utils.parsedate_to_datetime(text)
+    except (TypeError, ValueError):
+        return None
+    if dt is None:
+        return None
+    return max(0.0, dt.timestamp() - now)
+
+
+def parse_rate_limit_headers(headers: Optional[Mapping[str, Any]], *, now: Optional[float] = None) -> RateLimitHint:
+    """
+    解析 Retry-After 与 X-RateLimit-*（含 X-Rate-Limit-* / RateLimit-* 变体）。
+
+    Reset 既可能是 epoch 秒，也可能是“距重置的秒数”，按数值大小区分。
+    """
+    if not headers:
+        return RateLimitHint()
+    now = time.time() if now is None else now
+    h = {str(k).lower(): str(v) for k, v in headers.items()}
+
+    def pick(*names: str) -> Optional[str]:
+        for name in names:
+            if name in h:
+                return h[name]
+        return None
+
+    reset = _first_number(pick("x-ratelimit-reset", "x-rate-limit-reset", "ratelimit-reset"))
+    if reset is not None and reset > 1e9:
+        reset = reset - now
+    return RateLimitHint(
+        retry_after=_parse_retry_after(pick("retry-after"), now),
+        limit=_first_number(pick("x-ratelimit-limit", "x-rate-limit-limit", "ratelimit-limit")),
+        remaining=_first_number(pick("x-ratelimit-remaining", "x-rate-limit-remaining", "ratelimit-remaining")),
+        reset_after=max(0.0, reset) if reset is not None else None,
+        interval=_parse_interval(pick("x-rate-limit-interval", "x-ratelimit-interval")),
+    )
+
+
+class SharedTokenBucket:
+    """
+    SQLite 令牌桶：每次取令牌/调整速率都在 BEGIN IMMEDIATE 事务中完成，
+    多线程、多进程并发时天然串行。
+    """
+
+    def __init__(self, path: Optional[Path] = None, *, busy_timeout: float = 30.0):
+        self.path = Path(path) if path is not None else default_state_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.busy_timeout = float(busy_timeout)
+        self._local = threading.local()
+        with self._transaction() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS buckets (
+                    provider TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    capacity REAL NOT NULL,
+                    rate REAL NOT NULL,
+                    base_rate REAL NOT NULL,
+                    updated REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS wait_metrics (
+                    provider TEXT PRIMARY KEY,
+                    acquires INTEGER NOT NULL DEFAULT 0,
+                    waits INTEGER NOT NULL DEFAULT 0,
+                    wait_total REAL NOT NULL DEFAULT 0,
+                    wait_max REAL NOT NULL DEFAULT 0,
+                    throttled INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=self.busy_timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    @staticmethod
+    def _settle(row: sqlite3.Row | tuple, now: float) -> float:
+        """按经过的时间补充令牌，返回当前令牌数（可能为负，表示已有透支排队）"""
+        tokens, capacity, rate, _base, updated = row
+        return min(capacity, tokens + max(0.0, now - updated) * rate)
+
+    def configure(self, provider: str, *, rate: float, capacity: float = 1.0) -> None:
+        """
+        登记/更新 provider 的配置速率（令牌/秒）。
+
+        已存在的桶保留当前令牌与自适应速率（仅夹到新的上限内），
+        因此各进程重复 configure 不会重置彼此的排队状态。
+        """
+        rate = float(rate)
+        if rate <= 0:
+            return
+        capacity = max(1.0, float(capacity))
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO buckets (provider, tokens, capacity, rate, base_rate, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (provider, capacity, capacity, rate, rate, now),
+            )
+            conn.execute(
+                "UPDATE buckets SET capacity = ?, base_rate = ?, rate = MIN(rate, ?) WHERE provider = ?",
+                (capacity, rate, rate, provider),
+            )
+
+    def reserve(self, provider: str, tokens: float = 1.0) -> float:
+        """取令牌并返回调用方需要等待的秒数；未登记的 provider 不限速（返回 0）。"""
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT tokens, capacity, rate, base_rate, updated FROM buckets WHERE provider = ?",
+                (provider,),
+            ).fetchone()
+            if row is None:
+                return 0.0
+            level = self._settle(row, now) - float(tokens)
+            rate = row[2]
+            wait = 0.0 if level >= 0 else -level / rate
+            conn.execute("UPDATE buckets SET tokens = ?, updated = ? WHERE provider = ?", (level, now, provider))
+            conn.execute("INSERT OR IGNORE INTO wait_metrics (provider) VALUES (?)", (provider,))
+            conn.execute(
+                "UPDATE wait_metrics SET acquires = acquires + 1, waits = waits + ?, "
+                "wait_total = wait_total + ?, wait_max = MAX(wait_max, ?) WHERE provider = ?",
+                (1 if wait > 0 else 0, wait, wait, provider),
+            )
+        return wait
+
+    def acquire(self, provider: str) -> float:
+        """阻塞直到取得令牌；返回实际等待秒数。"""
+        wait = self.reserve(provider)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def observe(self, provider: str, status: Optional[int], headers: Optional[Mapping[str, Any]] = None) -> RateLimitHint:
+        """根据响应状态码与限流头调整该 provider 的速率/排队；返回解析出的提示。"""
+        now = time.time()
+        hint = parse_rate_limit_headers(headers, now=now)
+        status = int(status or 0)
+        throttled = status == 429 or (status == 503 and hint.retry_after is not None)
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT tokens, capacity, rate, base_rate, updated FROM buckets WHERE provider = ?",
+                (provider,),
+            ).fetchone()
+            if row is None:
+                return hint
+            level = self._settle(row, now)
+            rate, base_rate = row[2], row[3]
+            floor = base_rate * MIN_RATE_FRACTION
+
+            if throttled:
+                rate = max(floor, rate * THROTTLE_FACTOR)
+                delay = hint.retry_after if hint.retry_after is not None else hint.reset_after
+                if delay is None:
+                    delay = 1.0 / rate
+                # 透支到恰好在 Retry-After 之后恢复：后续请求自动排在其后，无需额外冷却
+                level = min(level, 0.0) - delay * rate
+                conn.execute("INSERT OR IGNORE INTO wait_metrics (provider) VALUES (?)", (provider,))
+                conn.execute("UPDATE wait_metrics SET throttled = throttled + 1 WHERE provider = ?", (provider,))
+            elif hint.limit and hint.interval:
+                rate = min(base_rate, hint.limit / hint.interval)
+            elif hint.remaining is not None and hint.reset_after is not None:
+                if hint.remaining <= 0:
+                    level = min(level, 0.0) - hint.reset_after * rate
+                else:
+                    rate = min(base_rate, max(floor, hint.remaining / max(1.0, hint.reset_after)))
+            elif 200 <= status < 300:
+                rate = min(base_rate, rate + base_rate * RECOVERY_FRACTION)
+
+            conn.execute(
+                "UPDATE buckets SET tokens = ?, rate = ?, updated = ? WHERE provider = ?",
+                (level, rate, now, provider),
+            )
+        return hint
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """各 provider 的当前速率与累计等待指标（跨进程汇总）"""
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT b.provider, b.rate, b.base_rate, b.tokens, b.capacity, b.updated, "
+            "COALESCE(m.acquires, 0), COALESCE(m.waits, 0), COALESCE(m.wait_total, 0), "
+            "COALESCE(m.wait_max, 0), COALESCE(m.throttled, 0) "
+            "FROM buckets b LEFT JOIN wait_metrics m ON m.provider = b.provider ORDER BY b.provider"
+        ).fetchall()
+        now = time.time()
+        out: Dict[str, Dict[str, float]] = {}
+        for provider, rate, base_rate, tokens, capacity, updated, acquires, waits, wait_total, wait_max, throttled in rows:
+            level = min(capacity, tokens + max(0.0, now - updated) * rate)
+            out[provider] = {
+                "rate_per_minute": round(rate * 60.0, 3),
+                "configured_per_minute": round(base_rate * 60.0, 3),
+                "queued_seconds": round(max(0.0, -level / rate), 3),
+                "acquires": float(acquires),
+                "waits": float(waits),
+                "wait_seconds_total": round(wait_total, 3),
+                "wait_seconds_max": round(wait_max, 3),
+                "wait_seconds_avg": round(wait_total / acquires, 3) if acquires else 0.0,
+                "throttled": float(throttled),
+            }
+        return out
+
+    def reset_metrics(self) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM wait_metrics")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect the shared cross-process rate limiter state")
+    parser.add_argument("--path", type=Path, default=None, help=f"State file (default: {default_state_path()})")
+    parser.add_argument("--stats", action="store_true", help="Print per-provider rate and wait metrics as JSON")
+    parser.add_argument("--reset-metrics", action="store_true", help="Clear accumulated wait metrics")
+    args = parser.parse_args(argv)
+
+    bucket = SharedTokenBucket(args.path)
+    if args.reset_metrics:
+        bucket.reset_metrics()
+        print(f"✓ wait metrics reset: {bucket.path}")
+    if args.stats or not args.reset_metrics:
+        print(json.dumps(bucket.metrics(), ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -19,13 +19,13 @@ v3.2 更新：
 from __future__ import annotations
 
 import argparse
-import json
 import re
 import sys
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
+from jsonl_stream import iter_jsonl
 from path_scope import get_effective_scope_root, resolve_and_check
 
 BEGIN = "<!-- AUTO:DATA_EXTRACTION_TABLE:BEGIN -->"
@@ -67,26 +67,26 @@ class Row:
     limitations: str
 
 
-def _load_papers_jsonl(path: Path) -> Dict[str, Dict[str, Any]]:
+def paper_key(obj: Dict[str, Any]) -> str:
+    """数据抽取表的行键：规范化 DOI，缺失时用 id；都没有时返回空串（该记录不入表）。"""
+    return _normalize_doi(_safe_str(obj.get("doi"))) or _safe_str(obj.get("id"))
+
+
+def index_papers_by_doi(papers: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """按 paper_key 索引记录；papers 可以是上游阶段直接交来的生成器。"""
     by_doi: Dict[str, Dict[str, Any]] = {}
-    with path.open("r", encoding="utf-8", errors="replace") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                obj = json.loads(line)
-            except Exception:
-                continue
-            if not isinstance(obj, dict):
-                continue
-            doi = _normalize_doi(_safe_str(obj.get("doi"))) or _safe_str(obj.get("id"))
-            if not doi:
-                continue
-            by_doi[doi] = obj
+    for obj in papers:
+        doi = paper_key(obj)
+        if not doi:
+            continue
+        by_doi[doi] = obj
     return by_doi
 
 
+def _load_papers_jsonl(path: Path) -> Dict[str, Dict[str, Any]]:
+    return index_papers_by_doi(iter_jsonl(path, skip_invalid=True))
+
+
 def _iter_rows(papers_by_doi: Dict[str, Dict[str, Any]]) -> Iterable[Row]:
     for doi, paper in papers_by_doi.items():
         title = _safe_str(paper.get("title")) or doi
@@ -151,7 +151,21 @@ def _replace_marker_block(text: str, new_block: str) -> str:
     return f"{BEGIN}\n{new_block}{END}\n"
 
 
-def main() -> int:
+def write_data_extraction_table(md: Path, papers_by_doi: Dict[str, Dict[str, Any]], max_rows: int) -> None:
+    """渲染数据抽取表并写入 md 的标记块（不存在标记块时整体替换）。"""
+    rows = list(_iter_rows(papers_by_doi))
+    rows.sort(key=lambda r: (-(r.score or 0), r.subtopic.lower(), -(r.year or 0)))
+    if max_rows > 0:
+        rows = rows[:max_rows]
+    table = _render_table(rows)
+
+    existing = _read_text(md)
+    new_text = _replace_marker_block(existing, table)
+    _write_text(md, new_text)
+    print(f"✓ 写入数据抽取表: {md}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
     parser = argparse.ArgumentParser(description="Update Data Extraction table with score/subtopic columns.")
     parser.add_argument("--md", required=True, type=Path, help="Path to markdown table output")
     parser.add_argument("--papers", required=True, type=Path, help="Path to papers jsonl (selected/scored)")
@@ -162,7 +176,7 @@ def main() -> int:
         default=None,
         help="工作目录隔离根目录（可选；默认从环境变量 SYSTEMATIC_LITERATURE_REVIEW_SCOPE_ROOT 读取）",
     )
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     scope_root = get_effective_scope_root(args.scope_root)
     if scope_root is not None:
@@ -182,16 +196,7 @@ def main() -> int:
         print(f"✗ failed to load papers: {e}", file=sys.stderr)
         return 1
 
-    rows = list(_iter_rows(papers_by_doi))
-    rows.sort(key=lambda r: (-(r.score or 0), r.subtopic.lower(), -(r.year or 0)))
-    if args.max_rows > 0:
-        rows = rows[: args.max_rows]
-    table = _render_table(rows)
-
-    existing = _read_text(md)
-    new_text = _replace_marker_block(existing, table)
-    _write_text(md, new_text)
-    print(f"✓ 写入数据抽取表: {md}")
+    write_data_extraction_table(md, papers_by_doi, args.max_rows)
     return 0
 
 
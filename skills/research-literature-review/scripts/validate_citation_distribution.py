@@ -12,44 +12,135 @@ validate_citation_distribution.py - 验证 LaTeX 文件中的引用分布
     python scripts/validate_citation_distribution.py review.tex
     python scripts/validate_citation_distribution.py review.tex --output report.json
     python scripts/validate_citation_distribution.py review.tex --check-diversity
+
+实现说明：
+    所有检查共用一次逐行扫描得到的 CitationIndex（引用列表 + 段落 + 段落→key→行号），
+    不再由各函数分别用正则重扫全文；.bib 的 key 集合按 (mtime, size, 内容哈希) 缓存。
 """
 
 import argparse
+import hashlib
 import json
+import os
 import re
-from collections import defaultdict
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
 from pathlib import Path
 from statistics import stdev
 from typing import Dict, List, Tuple, Optional
 
+CITE_RE = re.compile(r'\\cite\{([^}]+)\}')
+BIB_KEY_RE = re.compile(r'@+\w+\s*\{([^,]+),')
+BIB_KEY_CACHE_NAME = 'bib_keys_index.json'
+
+Citation = Tuple[str, int, int, List[str]]
+
 
-def extract_citations(tex_content: str) -> List[Tuple[str, int, int, List[str]]]:
+@dataclass
+class CitationIndex:
     """
-    提取所有 \\cite{} 命令及其位置
+    一次扫描得到的引用索引，供分布/多样性/零引用段落等检查共用。
 
-    Args:
-        tex_content: LaTeX 文件内容
+    Attributes:
+        citations: (cite_command, number_of_keys, line_number, [keys])，不含注释行
+        paragraphs: 与 parse_paragraphs() 相同结构的段落列表
+        paragraph_keys: 段落下标 -> {key: [行号, ...]}（与段落 cite_count 口径一致，含段内注释行）
+    """
+    citations: List[Citation] = field(default_factory=list)
+    paragraphs: List[Dict] = field(default_factory=list)
+    paragraph_keys: List[Dict[str, List[int]]] = field(default_factory=list)
 
-    Returns:
-        List of (cite_command, number_of_keys, line_number, [keys])
+    @property
+    def key_freq(self) -> Counter:
+        freq: Counter = Counter()
+        for _, _, _, keys in self.citations:
+            freq.update(keys)
+        return freq
+
+    def key_lines(self, key: str) -> List[int]:
+        """某个 key 在正文（非注释行）中被引用的行号"""
+        return [line for _, _, line, keys in self.citations if key in keys]
+
+
+def _summarize_paragraph(lines: List[str], start_line: int, end_line: int, cite_count: int) -> Dict:
+    paragraph_text = '\n'.join(lines)
+    return {
+        'text': paragraph_text[:100] + '...' if len(paragraph_text) > 100 else paragraph_text,
+        'cite_count': cite_count,
+        'line_start': start_line,
+        'line_end': end_line,
+    }
+
+
+def build_citation_index(tex_content: str) -> CitationIndex:
+    """
+    单遍扫描 LaTeX 内容，同时产出引用列表与段落统计。
+
+    段落规则与历史实现一致：段落从“非空、非注释、非命令”行开始，到空行结束（段内的命令/注释行计入段落）。
+    段落引用数按整段文本计数；若某行存在未闭合的 \\cite{（可能跨行），该段退回整段正则计数以保持口径。
     """
-    pattern = r'\\cite\{([^}]+)\}'
-    citations = []
+    index = CitationIndex()
     lines = tex_content.split('\n')
 
+    par_lines: List[str] = []
+    par_start = 0
+    par_count = 0
+    par_keys: Dict[str, List[int]] = defaultdict(list)
+    par_dangling = False
+
+    def close_paragraph(end_line: int) -> None:
+        count = par_count
+        if par_dangling:
+            count = len(CITE_RE.findall('\n'.join(par_lines)))
+        index.paragraphs.append(_summarize_paragraph(par_lines, par_start, end_line, count))
+        index.paragraph_keys.append(dict(par_keys))
+
+    in_paragraph = False
     for line_num, line in enumerate(lines, 1):
-        # 跳过注释行
         stripped = line.strip()
-        if stripped.startswith('%'):
+        if in_paragraph and not stripped:
+            close_paragraph(line_num - 1)
+            in_paragraph = False
             continue
+        if not in_paragraph and stripped and not stripped.startswith('%') and not stripped.startswith('\\'):
+            in_paragraph = True
+            par_lines, par_start, par_count, par_keys, par_dangling = [], line_num, 0, defaultdict(list), False
+        if in_paragraph:
+            par_lines.append(line)
 
-        matches = re.finditer(pattern, line)
-        for match in matches:
+        if '\\cite{' not in line:
+            continue
+        # 注释行不计入引用列表，但段内注释行计入段落引用数（历史口径）
+        is_comment = stripped.startswith('%')
+        last_end = 0
+        for match in CITE_RE.finditer(line):
             keys = [k.strip() for k in match.group(1).split(',') if k.strip()]
-            n_keys = len(keys)
-            citations.append((match.group(0), n_keys, line_num, keys))
+            if not is_comment:
+                index.citations.append((match.group(0), len(keys), line_num, keys))
+            if in_paragraph:
+                par_count += 1
+                for key in keys:
+                    par_keys[key].append(line_num)
+            last_end = match.end()
+        if in_paragraph and '\\cite{' in line[last_end:]:
+            par_dangling = True
+
+    if in_paragraph:
+        close_paragraph(len(lines))
+    return index
+
+
+def extract_citations(tex_content: str) -> List[Citation]:
+    """
+    提取所有 \\cite{} 命令及其位置
+
+    Args:
+        tex_content: LaTeX 文件内容
 
-    return citations
+    Returns:
+        List of (cite_command, number_of_keys, line_number, [keys])
+    """
+    return build_citation_index(tex_content).citations
 
 
 def analyze_distribution(citations: List[Tuple[str, int, int, List[str]]]) -> Dict:
@@ -200,41 +291,7 @@ def parse_paragraphs(tex_content: str) -> List[Dict]:
     Returns:
         段落列表，每个段落包含 text, cite_count, line_start, line_end
     """
-    paragraphs = []
-    lines = tex_content.split('\n')
-
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-
-        # 跳过注释行、空行、LaTeX 命令行
-        if not line or line.startswith('%') or line.startswith('\\'):
-            i += 1
-            continue
-
-        # 收集段落内容（直到空行或新命令）
-        paragraph_lines = []
-        start_line = i + 1
-        while i < len(lines):
-            current = lines[i].strip()
-            if not current or current.startswith('\\') and current.startswith('%'):
-                break
-            paragraph_lines.append(lines[i])
-            i += 1
-
-        if paragraph_lines:
-            paragraph_text = '\n'.join(paragraph_lines)
-            cite_count = len(re.findall(r'\\cite\{[^}]+\}', paragraph_text))
-            paragraphs.append({
-                'text': paragraph_text[:100] + '...' if len(paragraph_text) > 100 else paragraph_text,
-                'cite_count': cite_count,
-                'line_start': start_line,
-                'line_end': i
-            })
-
-        i += 1
-
-    return paragraphs
+    return build_citation_index(tex_content).paragraphs
 
 
 def extract_bib_keys(bib_content: str) -> set:
@@ -247,8 +304,66 @@ def extract_bib_keys(bib_content: str) -> set:
     Returns:
         所有文献 key 的集合
     """
-    pattern = r'@+\w+\s*\{([^,]+),'
-    keys = re.findall(pattern, bib_content)
+    return set(BIB_KEY_RE.findall(bib_content))
+
+
+# 进程内缓存：resolved path -> (mtime_ns, size, sha256, keys)
+_BIB_KEY_MEMO: Dict[str, Tuple[int, int, str, frozenset]] = {}
+
+
+def load_bib_keys(bib_path: Path, cache_dir: Optional[Path] = None) -> set:
+    """
+    读取 .bib 的 key 集合，按 (mtime, size, 内容哈希) 缓存。
+
+    - mtime/size 未变：直接命中，不读文件
+    - mtime 变了但内容哈希相同（如 touch、重新保存）：命中并刷新 mtime
+    - cache_dir 给出时额外持久化到 cache_dir/bib_keys_index.json，跨次运行复用
+    """
+    bib_path = Path(bib_path)
+    resolved = str(bib_path.resolve())
+    st = bib_path.stat()
+
+    disk_index: Dict[str, Dict] = {}
+    index_path = Path(cache_dir) / BIB_KEY_CACHE_NAME if cache_dir is not None else None
+    entry = _BIB_KEY_MEMO.get(resolved)
+    if entry is None and index_path is not None and index_path.exists():
+        try:
+            disk_index = json.loads(index_path.read_text(encoding='utf-8'))
+            raw = disk_index.get(resolved)
+            if isinstance(raw, dict):
+                entry = (int(raw['mtime_ns']), int(raw['size']), str(raw['sha256']), frozenset(raw['keys']))
+        except (ValueError, KeyError, TypeError, OSError):
+            disk_index, entry = {}, None
+
+    if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+        _BIB_KEY_MEMO[resolved] = entry
+        return set(entry[3])
+
+    data = bib_path.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    if entry is not None and entry[2] == digest:
+        keys = entry[3]
+    else:
+        keys = frozenset(extract_bib_keys(data.decode('utf-8')))
+    entry = (st.st_mtime_ns, st.st_size, digest, keys)
+    _BIB_KEY_MEMO[resolved] = entry
+
+    if index_path is not None:
+        try:
+            if not disk_index and index_path.exists():
+                disk_index = json.loads(index_path.read_text(encoding='utf-8'))
+            disk_index[resolved] = {
+                'mtime_ns': entry[0],
+                'size': entry[1],
+                'sha256': entry[2],
+                'keys': sorted(keys),
+            }
+            index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = index_path.with_name(f'.{index_path.name}.tmp-{os.getpid()}')
+            tmp.write_text(json.dumps(disk_index, ensure_ascii=False), encoding='utf-8')
+            os.replace(tmp, index_path)
+        except (OSError, ValueError):
+            pass
     return set(keys)
 
 
@@ -258,6 +373,7 @@ def check_citation_diversity(
     bib_keys: Optional[set] = None,
     *,
     min_ref_util: Optional[float] = None,
+    index: Optional[CitationIndex] = None,
 ) -> Dict:
     """
     检查引用多样性，包含 4 个维度：
@@ -270,12 +386,15 @@ def check_citation_diversity(
         tex_content: LaTeX 文件内容
         citations: 引用列表
         bib_keys: BibTeX 文献 key 集合（可选，如果不提供则跳过文献利用率检测）
+        index: 已构建的 CitationIndex（可选；提供时不再重扫 tex_content）
 
     Returns:
         包含 4 个指标及通过状态的字典
     """
     # 解析段落
-    paragraphs = parse_paragraphs(tex_content)
+    if index is None:
+        index = build_citation_index(tex_content)
+    paragraphs = index.paragraphs
     total_paragraphs = len(paragraphs)
 
     if total_paragraphs == 0:
@@ -361,18 +480,20 @@ def check_citation_diversity(
     }
 
 
-def find_zero_cite_paragraphs(tex_content: str) -> List[Dict]:
+def find_zero_cite_paragraphs(tex_content: str, index: Optional[CitationIndex] = None) -> List[Dict]:
     """
     找出所有零引用段落
 
     Args:
         tex_content: LaTeX 文件内容
+        index: 已构建的 CitationIndex（可选）
 
     Returns:
         零引用段落列表
     """
-    paragraphs = parse_paragraphs(tex_content)
-    return [p for p in paragraphs if p['cite_count'] == 0]
+    if index is None:
+        index = build_citation_index(tex_content)
+    return [p for p in index.paragraphs if p['cite_count'] == 0]
 
 
 def generate_diversity_recommendations(diversity_result: Dict) -> List[str]:
@@ -465,6 +586,8 @@ def main():
     parser.add_argument('--bib', '-b', help='BibTeX 文件路径（用于文献利用率检测）')
     parser.add_argument('--min-ref-util', type=float, default=None,
                         help='可选：启用文献利用率硬门槛（例如 60/70/85）；默认仅展示指标，不做硬性门槛')
+    parser.add_argument('--cache-dir', default=os.environ.get('SYSTEMATIC_LITERATURE_REVIEW_CACHE_DIR'),
+                        help='可选：.bib key 索引的持久缓存目录（默认读取 SYSTEMATIC_LITERATURE_REVIEW_CACHE_DIR）')
 
     args = parser.parse_args()
 
@@ -480,8 +603,9 @@ def main():
         print(f"❌ 错误：无法读取文件 {e}")
         return 1
 
-    # 提取引用
-    citations = extract_citations(tex_content)
+    # 单遍扫描：引用列表 + 段落索引，后续各项检查共用
+    index = build_citation_index(tex_content)
+    citations = index.citations
 
     if not citations:
         print(f"⚠️  警告：未找到任何 \\cite{{}} 命令")
@@ -505,8 +629,7 @@ def main():
             bib_path = Path(args.bib)
             if bib_path.exists():
                 try:
-                    bib_content = bib_path.read_text(encoding='utf-8')
-                    bib_keys = extract_bib_keys(bib_content)
+                    bib_keys = load_bib_keys(bib_path, Path(args.cache_dir) if args.cache_dir else None)
                 except Exception as e:
                     print(f"⚠️  警告：无法读取 BibTeX 文件 {e}")
             else:
@@ -519,6 +642,7 @@ def main():
             citations,
             bib_keys,
             min_ref_util=args.min_ref_util,
+            index=index,
         )
         diversity_recommendations = generate_diversity_recommendations(diversity_result)
 